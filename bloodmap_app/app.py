@@ -115,15 +115,25 @@ def _call_first(mod, names):
                 pass
 
 # Optional modules (no-op if absent)
-branding = _safe_import("branding")
-pdf_export = _safe_import("pdf_export")
-lab_diet = _safe_import("lab_diet")
-special_tests = _safe_import("special_tests")
-onco_map = _safe_import("onco_map")
-drug_db = _safe_import("drug_db")
-peds_dose = _safe_import("peds_dose")
-core_utils = _safe_import("core_utils")
-ui_results = _safe_import("ui_results")
+# === [PATCH 2026-10-18 KST] 지연 로딩 레지스트리: 기능 모듈은 프로세스당 1회, 처음 쓰는 탭에서 로드 ===
+import lazy_modules as _lazy
+_lazy.refresh()  # 파일이 실제로 바뀐 모듈만 다시 실행(평소엔 stat 만)
+# === [PATCH 2026-10-18 KST] 블록 계측(perf_probe): 리런마다 번호, 탭/핫패스별 ms → 개발자 패널·JSONL ===
+import time as _bm_time
+import perf_probe as _probe
+_probe.begin_run()
+_bm_run_t0 = _bm_time.perf_counter()
+# === [/PATCH] ===
+branding = _lazy.lazy("branding", ["branding.py", "modules/branding.py"], "배너")
+pdf_export = _lazy.lazy("pdf_export", ["pdf_export.py", "modules/pdf_export.py"], "보고서 PDF")
+lab_diet = _lazy.lazy("lab_diet", ["lab_diet.py", "modules/lab_diet.py"], "식이 가이드")
+special_tests = _lazy.lazy("special_tests", ["special_tests.py", "modules/special_tests.py", "/mnt/data/special_tests.py"], "특수검사")
+onco_map = _lazy.lazy("onco_map", ["onco_map.py", "modules/onco_map.py"], "항암 맵")
+drug_db = _lazy.lazy("drug_db", ["drug_db.py", "modules/drug_db.py"], "약물 DB")
+peds_dose = _lazy.lazy("peds_dose", ["peds_dose.py", "modules/peds_dose.py"], "소아 용량")
+core_utils = _lazy.lazy("core_utils", ["core_utils.py", "modules/core_utils.py"], "공통")
+ui_results = _lazy.lazy("ui_results", [], "결과 UI")
+# === [/PATCH] ===
 
 # Utility: wkey (avoid duplicate definitions)
 if "wkey" not in globals():
@@ -138,47 +148,8 @@ if "wkey" not in globals():
 # ---- Onco import shim (robust) ----
 import sys
 from pathlib import Path
-try:
-    # 1) Standard import if available
-    from onco_map import ensure_onco_map, ONCO_REGIMENS, build_onco_map, auto_recs_by_dx  # type: ignore
-except Exception:
-    # 2) Dynamic load from multiple candidate paths
-    def _load_local_module(mod_name: str, file_path: str):
-        import importlib.util
-        spec = importlib.util.spec_from_file_location(mod_name, file_path)
-        m = importlib.util.module_from_spec(spec)
-        sys.modules[mod_name] = m
-        spec.loader.exec_module(m)
-        return m
-
-    _onco = None
-    _candidates = [
-        Path(__file__).parent / "onco_map.py",
-        Path(__file__).parent / "modules" / "onco_map.py",
-        Path("/mount/src/hoya12/bloodmap_app/onco_map.py"),
-        Path("/mount/src/hoya12/bloodmap_app/modules/onco_map.py"),
-        Path("/mnt/data/onco_map.py"),
-    ]
-    for _p in _candidates:
-        try:
-            if _p.is_file():
-                _onco = _load_local_module("onco_map", str(_p))
-                break
-        except Exception:
-            pass
-
-    if _onco is None:
-        # 3) Safe fallbacks to keep app running
-        def ensure_onco_map(m): return m
-        ONCO_REGIMENS = {}
-        def build_onco_map(): return {}
-        def auto_recs_by_dx(*args, **kwargs): return {"chemo": [], "targeted": [], "abx": []}
-    else:
-        ensure_onco_map = getattr(_onco, "ensure_onco_map", lambda m: m)
-        ONCO_REGIMENS  = getattr(_onco, "ONCO_REGIMENS", {})
-        build_onco_map = getattr(_onco, "build_onco_map", lambda: {})
-        auto_recs_by_dx = getattr(_onco, "auto_recs_by_dx",
-                                  lambda *a, **k: {"chemo": [], "targeted": [], "abx": []})
+# onco_map 은 여기서 import 하지 않음 — 함수 대리자가 처음 호출될 때(암 선택/항암제 탭) 레지스트리로 1회 로드
+ensure_onco_map = _lazy.lazy_attr("onco_map", "ensure_onco_map", lambda m: m)
 # ---- End Onco import shim ----
 import datetime as _dt
 from zoneinfo import ZoneInfo as _ZoneInfo
@@ -187,7 +158,7 @@ KST = _ZoneInfo("Asia/Seoul")
 def now_kst():
     return _dt.datetime.now(tz=KST)
 
-import os, sys, re, io, csv
+import os, sys, re, io, csv, hashlib
 from pathlib import Path
 import importlib.util
 import streamlit as st
@@ -267,149 +238,77 @@ APP_VERSION = "항상 여러분들의 힘이 되도록 노력하겠습니다. 
 
 # ---------- Safe Import Helper ----------
 def _load_local_module(mod_name: str, rel_paths):
-    here = Path(__file__).resolve().parent
-    for rel in rel_paths:
-        cand = (here / rel).resolve()
-        if cand.exists():
-            spec = importlib.util.spec_from_file_location(mod_name, str(cand))
-            mod = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(mod)
-            sys.modules[mod_name] = mod
-            return mod, str(cand)
-    try:
-        mod = __import__(mod_name)
-        return mod, f"(sys.path)::{mod.__file__}"
-    except Exception:
-        return None, None
+    # 레지스트리 경유: 프로세스당 1회 실행(재실행마다 모듈 본문을 다시 돌리지 않음)
+    return _lazy.load(mod_name, rel_paths)
 
 # ---------- Optional modules with graceful fallback ----------
-_branding, BRANDING_PATH = _load_local_module("branding", ["branding.py", "modules/branding.py"])
-if _branding and hasattr(_branding, "render_deploy_banner"):
-    render_deploy_banner = _branding.render_deploy_banner
-else:
-    def render_deploy_banner(*a, **k):
-        return None
+# === [PATCH 2026-10-18 KST] 기능 모듈은 여기서 로드하지 않음: 함수 대리자(_lazy.lazy_attr)가 처음 호출될 때
+# 그 탭 안에서 로드. 경로 표시는 _lazy.locate(실행 없이 경로만) ===
+BRANDING_PATH = _lazy.locate("branding", ["branding.py", "modules/branding.py"])
+render_deploy_banner = _lazy.lazy_attr("branding", "render_deploy_banner", lambda *a, **k: None)
+
+def _ensure_unique_pin_fallback(user_key: str, auto_suffix: bool = True):
+    if not user_key:
+        return "guest#PIN", False, "empty"
+    if "#" not in user_key:
+        user_key += "#0001"
+    return user_key, False, "ok"
+
+CORE_PATH = _lazy.locate("core_utils", ["core_utils.py", "modules/core_utils.py"])
+ensure_unique_pin = _lazy.lazy_attr("core_utils", "ensure_unique_pin", _ensure_unique_pin_fallback)
+
+PDF_PATH = _lazy.locate("pdf_export", ["pdf_export.py", "modules/pdf_export.py"])
+export_md_to_pdf = _lazy.lazy_attr("pdf_export", "export_md_to_pdf", lambda md_text: md_text.encode("utf-8"))
+
+# PDF 렌더: 프로세스 풀 + SHA-256 내용 캐시(pdf_service) — 보고서 탭에서 처음 PDF 를 만들 때 구성
+_pdf_service = None
+_pdf_service_ready = False
+
+def _render_pdf(md: str) -> bytes:
+    global _pdf_service, _pdf_service_ready
+    if not _pdf_service_ready:
+        _pdf_service_ready = True
+        if hasattr(pdf_export, "export_md_to_pdf"):
+            try:
+                import pdf_service as _svc  # type: ignore
+                _svc.configure(PDF_PATH)
+                _pdf_service = _svc
+            except Exception:
+                _pdf_service = None
+    return _pdf_service.render(md) if _pdf_service is not None else export_md_to_pdf(md)
 
-_core, CORE_PATH = _load_local_module("core_utils", ["core_utils.py", "modules/core_utils.py"])
-if _core and hasattr(_core, "ensure_unique_pin"):
-    ensure_unique_pin = _core.ensure_unique_pin
-else:
-    def ensure_unique_pin(user_key: str, auto_suffix: bool = True):
-        if not user_key:
-            return "guest#PIN", False, "empty"
-        if "#" not in user_key:
-            user_key += "#0001"
-        return user_key, False, "ok"
-
-_pdf, PDF_PATH = _load_local_module("pdf_export", ["pdf_export.py", "modules/pdf_export.py"])
-if _pdf and hasattr(_pdf, "export_md_to_pdf"):
-    export_md_to_pdf = _pdf.export_md_to_pdf
-else:
-    def export_md_to_pdf(md_text: str) -> bytes:
-        return md_text.encode("utf-8")
-
-_onco, ONCO_PATH = _load_local_module("onco_map", ["onco_map.py", "modules/onco_map.py"])
-if _onco:
-    build_onco_map = getattr(_onco, "build_onco_map", lambda: {})
-    dx_display = getattr(_onco, "dx_display", lambda g, d: f"{g} - {d}")
-    auto_recs_by_dx = getattr(_onco, "auto_recs_by_dx", lambda *a, **k: {"chemo": [], "targeted": [], "abx": []})
-else:
-    build_onco_map = lambda: {}
-    dx_display = lambda g, d: f"{g} - {d}"
-    def auto_recs_by_dx(*args, **kwargs):
-        return {"chemo": [], "targeted": [], "abx": []}
-
-_drugdb, DRUGDB_PATH = _load_local_module("drug_db", ["drug_db.py", "modules/drug_db.py"])
-if _drugdb:
-    DRUG_DB = getattr(_drugdb, "DRUG_DB", {})
-    ensure_onco_drug_db = getattr(_drugdb, "ensure_onco_drug_db", lambda db: None)
-    display_label = getattr(_drugdb, "display_label", lambda k, db=None: str(k))
-else:
-    DRUG_DB = {}
-    def ensure_onco_drug_db(db):
-        pass
-    def display_label(k, db=None):
-        return str(k)
+ONCO_PATH = _lazy.locate("onco_map", ["onco_map.py", "modules/onco_map.py"])
+build_onco_map = _lazy.lazy_attr("onco_map", "build_onco_map", lambda: {})
+dx_display = _lazy.lazy_attr("onco_map", "dx_display", lambda g, d: f"{g} - {d}")
+auto_recs_by_dx = _lazy.lazy_attr("onco_map", "auto_recs_by_dx",
+                                  lambda *a, **k: {"chemo": [], "targeted": [], "abx": []})
 
-_ld, LD_PATH = _load_local_module("lab_diet", ["lab_diet.py", "modules/lab_diet.py"])
-if _ld and hasattr(_ld, "lab_diet_guides"):
-    lab_diet_guides = _ld.lab_diet_guides
-else:
-    def lab_diet_guides(labs, heme_flag=False):
-        return []
+DRUGDB_PATH = _lazy.locate("drug_db", ["drug_db.py", "modules/drug_db.py"])
+DRUG_DB = {}   # 아래 Preload 에서 공유본(refdata)/스냅샷으로 채움
+ensure_onco_drug_db = _lazy.lazy_attr("drug_db", "ensure_onco_drug_db", lambda db: None)
+display_label = _lazy.lazy_attr("drug_db", "display_label", lambda k, db=None: str(k))
+ensure_onco_drug_db = _probe.wrap(ensure_onco_drug_db, "ensure_onco_drug_db")
 
-_pd, PD_PATH = _load_local_module("peds_dose", ["peds_dose.py", "modules/peds_dose.py"])
-if _pd:
-    acetaminophen_ml = getattr(_pd, "acetaminophen_ml", lambda wt: (0.0, 0.0))
-    ibuprofen_ml = getattr(_pd, "ibuprofen_ml", lambda wt: (0.0, 0.0))
-else:
-    def acetaminophen_ml(w):
-        return (0.0, 0.0)
-    def ibuprofen_ml(w):
-        return (0.0, 0.0)
+LD_PATH = _lazy.locate("lab_diet", ["lab_diet.py", "modules/lab_diet.py"])
+lab_diet_guides = _lazy.lazy_attr("lab_diet", "lab_diet_guides", lambda labs, heme_flag=False: [])
 
-# === LOCAL MODULE LOADER v2 (early) ===
-try:
-    _bm__LML2_ready  # guard
-except Exception:
-    def _load_local_module2(mod_name: str, candidates):
-        """
-        Try multiple candidate paths. Return (module, used_path) or (None, None).
-        Searches common bases; safe for both single path and list of paths.
-        """
-        import importlib.util, sys
-        from pathlib import Path
-        def _try(fp: Path):
-            try:
-                spec = importlib.util.spec_from_file_location(mod_name, str(fp))
-                if not spec or not spec.loader:
-                    return None, None
-                m = importlib.util.module_from_spec(spec)
-                sys.modules[mod_name] = m
-                spec.loader.exec_module(m)
-                return m, str(fp)
-            except Exception:
-                return None, None
-        base_candidates = []
-        seq = candidates if isinstance(candidates, (list, tuple)) else [candidates]
-        for c in seq:
-            c = str(c)
-            if c.startswith("/"):
-                fps = [Path(c)]
-            else:
-                fps = [
-                    Path(__file__).parent / c,
-                    Path(__file__).parent / "modules" / c,
-                    Path("/mount/src/hoya12/bloodmap_app") / c,
-                    Path("/mount/src/hoya12/bloodmap_app/modules") / c,
-                    Path("/mnt/data") / c,
-                ]
-            for fp in fps:
-                base_candidates.append(fp)
-        for fp in base_candidates:
-            if fp.exists():
-                m, used = _try(fp)
-                if m:
-                    return m, used
-        return None, None
-    _bm__LML2_ready = True
-# === /LOCAL MODULE LOADER v2 (early) ===
-_sp, SPECIAL_PATH = _load_local_module2("special_tests", ["special_tests.py", "modules/special_tests.py", "/mnt/data/special_tests.py"])
-if _sp and hasattr(_sp, "special_tests_ui"):
-    special_tests_ui = _sp.special_tests_ui
-else:
-    SPECIAL_PATH = None
-    def special_tests_ui():
-        st.warning("special_tests.py를 찾지 못해, 특수검사 UI는 더미로 표시됩니다.")
-        return []
+PD_PATH = _lazy.locate("peds_dose", ["peds_dose.py", "modules/peds_dose.py"])
+acetaminophen_ml = _lazy.lazy_attr("peds_dose", "acetaminophen_ml", lambda wt: (0.0, 0.0))
+ibuprofen_ml = _lazy.lazy_attr("peds_dose", "ibuprofen_ml", lambda wt: (0.0, 0.0))
+
+def _special_tests_ui_fallback():
+    st.warning("special_tests.py를 찾지 못해, 특수검사 UI는 더미로 표시됩니다.")
+    return []
+
+SPECIAL_PATH = _lazy.locate("special_tests", ["special_tests.py", "modules/special_tests.py", "/mnt/data/special_tests.py"])
+special_tests_ui = _lazy.lazy_attr("special_tests", "special_tests_ui", _special_tests_ui_fallback)
+# === [/PATCH] ===
+special_tests_ui = _probe.wrap(special_tests_ui, "special_tests_ui")
 
 # --- plotting backend (matplotlib → st.line_chart → 표 폴백) ---
-try:
-    import matplotlib.pyplot as plt
-    _HAS_MPL = True
-except Exception:
-    plt = None
-    _HAS_MPL = False
+# matplotlib 은 그래프를 그릴 때 처음 로드(설치 여부만 먼저 확인)
+_HAS_MPL = _lazy.available("matplotlib")
+plt = _lazy.lazy_import("matplotlib.pyplot", "그래프") if _HAS_MPL else None
 
 # ---------- Page & Banner ----------
 st.set_page_config(page_title=f"Bloodmap {APP_VERSION}", layout="wide")
@@ -454,21 +353,24 @@ def _safe_float(v, default=0.0):
         return default
 
 # ---------- Emergency scoring (Weights + Presets) ----------
-DEFAULT_WEIGHTS = {
-    "w_anc_lt500": 1.0, "w_anc_500_999": 1.0,
-    "w_temp_38_0_38_4": 1.0, "w_temp_ge_38_5": 1.0,
-    "w_plt_lt20k": 1.0, "w_hb_lt7": 1.0, "w_crp_ge10": 1.0, "w_hr_gt130": 1.0,
-    "w_hematuria": 1.0, "w_melena": 1.0, "w_hematochezia": 1.0,
-    "w_chest_pain": 1.0, "w_dyspnea": 1.0, "w_confusion": 1.0,
-    "w_oliguria": 1.0, "w_persistent_vomit": 1.0, "w_petechiae": 1.0,
-    "w_thunderclap": 1.0, "w_visual_change": 1.0,
-}
-PRESETS = {
-    "기본(Default)": DEFAULT_WEIGHTS,
-    "발열·감염 민감": {**DEFAULT_WEIGHTS, "w_temp_ge_38_5": 2.0, "w_temp_38_0_38_4": 1.5, "w_crp_ge10": 1.5, "w_anc_lt500": 2.0, "w_anc_500_999": 1.5},
-    "출혈 위험 민감": {**DEFAULT_WEIGHTS, "w_plt_lt20k": 2.5, "w_petechiae": 2.0, "w_hematochezia": 2.0, "w_melena": 2.0},
-    "신경계 위중 민감": {**DEFAULT_WEIGHTS, "w_thunderclap": 3.0, "w_visual_change": 2.5, "w_confusion": 2.5, "w_chest_pain": 1.2},
-}
+# === [PATCH 2026-10-18 KST] 공유 참조데이터(refdata): 테이블 원본은 ref_tables.py ===
+# 빌드/스냅샷 실패만 폴백으로 — NameError 같은 코드 오류는 삼키지 않음(조용히 매 rerun 재빌드로 떨어지지 않도록)
+import pickle as _pickle
+_REF_ERRORS = (ImportError, OSError, ValueError, LookupError, TypeError, EOFError, _pickle.PickleError)
+try:
+    import refdata as _refdata  # type: ignore
+except ImportError:
+    _refdata = None
+try:
+    _REF = _refdata.get(DRUGDB_PATH) if _refdata is not None else None
+except _REF_ERRORS:
+    _REF = None
+if _REF is not None:
+    DEFAULT_WEIGHTS = _REF.emergency_default_weights
+    PRESETS = _REF.emergency_presets
+else:
+    from ref_tables import EMERGENCY_DEFAULT_WEIGHTS as DEFAULT_WEIGHTS, EMERGENCY_PRESETS as PRESETS  # type: ignore
+# === [/PATCH] ===
 
 def get_weights():
     key = st.session_state.get("key", "guest#PIN")
@@ -557,9 +459,31 @@ def emergency_level(labs: dict, temp_c, hr, symptoms: dict):
     level = "🚨 응급" if risk >= 5 else ("🟧 주의" if risk >= 2 else "🟢 안심")
     return level, reasons, contrib
 
+emergency_level = _probe.wrap(emergency_level, "emergency_level")
+
 # ---------- Preload ----------
-ensure_onco_drug_db(DRUG_DB)
-ONCO = build_onco_map() or {}
+# === [PATCH 2026-10-18 KST] DRUG_DB/ONCO/DX_KO 는 프로세스 공유본 사용(세션마다 재빌드 X) ===
+if _REF is not None:
+    DRUG_DB = _REF.drug_db
+    ONCO = _REF.onco_map
+    DX_KO = _REF.dx_ko
+    # 세션 한정 임시 등록 약물은 공유본을 건드리지 않고 오버레이
+    _tmp_db = st.session_state.get("_tmp_drug_db") or {}
+    if _tmp_db:
+        DRUG_DB = {**DRUG_DB, **_tmp_db}
+else:
+    # drug DB 스냅샷: ensure 체인은 drug_db.py 변경 시에만 실행
+    try:
+        import drug_db_snapshot as _dbsnap  # type: ignore
+        _snap_db = _dbsnap.load_drug_db(DRUGDB_PATH)
+    except _REF_ERRORS:
+        _snap_db = None
+    if _snap_db:
+        DRUG_DB = _snap_db
+    else:
+        ensure_onco_drug_db(DRUG_DB)
+    ONCO = build_onco_map() or {}
+# === [/PATCH] ===
 
 # ---------- Sidebar ----------
 with st.sidebar:
@@ -838,6 +762,10 @@ def build_peds_notes(
 # ---------- Tabs ----------
 tab_labels = ["🏠 홈", "👶 소아 증상", "🧬 암 선택", "💊 항암제(진단 기반)", "🧪 피수치 입력", "🔬 특수검사", "📄 보고서", "📊 기록/그래프"]
 t_home, t_peds, t_dx, t_chemo, t_labs, t_special, t_report, t_graph = st.tabs(tab_labels)
+t_home, t_peds, t_dx, t_chemo, t_labs, t_special, t_report, t_graph = [
+    _probe.tab(_t, f"tab:{_n}") for _t, _n in zip(
+        (t_home, t_peds, t_dx, t_chemo, t_labs, t_special, t_report, t_graph),
+        ("home", "peds", "dx", "chemo", "labs", "special", "report", "graph"))]
 
 # HOME
 with t_home:
@@ -1325,42 +1253,10 @@ def _normalize_abbr(k: str) -> str:
     }
     return alias.get(k, k)
 
-LAB_REF_ADULT = {
-    "WBC": (4.0, 10.0),
-    "Hb": (12.0, 16.0),
-    "PLT": (150, 400),
-    "ANC": (1500, 8000),
-    "CRP": (0.0, 5.0),
-    "Na": (135, 145),
-    "Cr": (0.5, 1.2),
-    "Glu": (70, 140),
-    "Ca": (8.6, 10.2),
-    "P": (2.5, 4.5),
-    "T.P": (6.4, 8.3),
-    "AST": (0, 40),
-    "ALT": (0, 41),
-    "T.B": (0.2, 1.2),
-    "Alb": (3.5, 5.0),
-    "BUN": (7, 20),
-}
-LAB_REF_PEDS = {
-    "WBC": (5.0, 14.0),
-    "Hb": (11.0, 15.0),
-    "PLT": (150, 450),
-    "ANC": (1500, 8000),
-    "CRP": (0.0, 5.0),
-    "Na": (135, 145),
-    "Cr": (0.2, 0.8),
-    "Glu": (70, 140),
-    "Ca": (8.8, 10.8),
-    "P": (4.0, 6.5),
-    "T.P": (6.0, 8.0),
-    "AST": (0, 50),
-    "ALT": (0, 40),
-    "T.B": (0.2, 1.2),
-    "Alb": (3.8, 5.4),
-    "BUN": (5, 18),
-}
+LAB_REF_ADULT = _REF.lab_ref_adult if _REF is not None else None
+LAB_REF_PEDS = _REF.lab_ref_peds if _REF is not None else None
+if LAB_REF_ADULT is None or LAB_REF_PEDS is None:
+    from ref_tables import LAB_REF_ADULT, LAB_REF_PEDS  # type: ignore
 def lab_ref(is_peds: bool):
     return LAB_REF_PEDS if is_peds else LAB_REF_ADULT
 
@@ -1410,10 +1306,27 @@ with t_labs:
     ]
     with st.expander("📋 검사값 붙여넣기(자동 인식)", expanded=False):
         pasted = st.text_area("예: WBC: 4.5\nHb 12.3\nPLT, 200\nNa 140 mmol/L", height=120, key=wkey("labs_paste"))
+        # === [PATCH 2026-10-18 KST] lab_ingest: 컴파일된 토크나이저 + 표(날짜가 열)/퇴원요약 + 단위 환산 ===
+        _lab_ingest = _lazy.get("lab_ingest")
+        _ingest_uid = st.session_state.get("key", "guest")
+        _ingest_ok = _lab_ingest is not None and bool(st.session_state.get("_pin_ok")) and not str(_ingest_uid).startswith("guest")
+        if _ingest_ok:
+            st.checkbox("날짜가 있는 값은 누적 기록(그래프)에도 저장", value=False, key=wkey("labs_paste_store"))
+        # === [/PATCH] ===
         if st.button("붙여넣기 파싱 → 적용", key=wkey("parse_paste")):
             parsed = {}
             try:
-                if pasted:
+                if pasted and _lab_ingest is not None:
+                    _rep = _lab_ingest.IngestReport()
+                    _pts = _lab_ingest.parse_text(str(pasted), report=_rep)
+                    parsed = _lab_ingest.latest_values(_pts)
+                    if _rep.converted:
+                        st.caption("단위 환산(입력 단위 → 앱 기준 단위): " + _lab_ingest.conversion_note(_rep))
+                    _dated = [p for p in _pts if p.ts is not None]
+                    if _dated and _ingest_ok and st.session_state.get(wkey("labs_paste_store")):
+                        _srep = _lab_ingest.store_points(_ingest_uid, _dated)
+                        st.success(f"누적 기록에 {_srep.stored}개 시점 저장")
+                elif pasted:
                     for line in str(pasted).splitlines():
                         s = line.strip()
                         if not s:
@@ -1435,13 +1348,30 @@ with t_labs:
                 if parsed:
                     for abbr, _ in order:
                         if abbr in parsed:
-                            st.session_state[wkey(abbr)] = parsed[abbr]
+                            st.session_state[wkey(abbr)] = f"{parsed[abbr]:g}"  # text_input 값은 문자열
                     st.success(f"적용됨: {', '.join(list(parsed.keys())[:12])} ...")
                 else:
                     st.info("인식 가능한 수치를 찾지 못했습니다. 줄마다 '항목 값' 형태인지 확인해주세요.")
             except Exception:
                 st.error("파싱 중 예외가 발생했지만 앱은 계속 동작합니다. 입력 형식을 다시 확인하세요.")
 
+    # === [PATCH 2026-10-18 KST] 검사결과 파일 가져오기(한 줄씩 읽어 누적 기록에 저장) ===
+    if _ingest_ok:
+        with st.expander("📂 검사결과 파일 가져오기(여러 날짜 → 누적 기록)", expanded=False):
+            _up = st.file_uploader("CSV/TSV/TXT — 병원 출력물(날짜가 열인 표)·UTF-8/CP949 모두 가능",
+                                   type=["csv", "tsv", "txt"], key=wkey("labs_import_file"))
+            if _up is not None and st.button("가져오기", key=wkey("labs_import_go")):
+                try:
+                    _irep = _lab_ingest.ingest(_ingest_uid, _up)
+                    st.success(f"{_irep.stored}개 시점 저장 · 인코딩 {_irep.encoding} · 구분자 {_irep.delimiter!r}")
+                    if _irep.converted:
+                        st.caption("단위 환산(입력 단위 → 앱 기준 단위): " + _lab_ingest.conversion_note(_irep))
+                    if _irep.unknown_headers:
+                        st.caption("인식하지 못한 열: " + ", ".join(_irep.unknown_headers[:10]))
+                except Exception as e:
+                    st.error(f"가져오기 실패: {e}")
+    # === [/PATCH] ===
+
     cols = st.columns(4)
     values = {}
     for i, (abbr, kor) in enumerate(order):
@@ -1460,17 +1390,14 @@ with t_labs:
 with t_dx:
 
     # ---- DX label fallbacks (avoid NameError) ----
-    try:
-        DX_KO  # type: ignore
-    except NameError:
+    # globals() 로 확인 — 맨 이름만 쓴 줄은 Streamlit magic 이 st.write 로 그려 DX_KO 전체가 JSON 으로 찍히고 pandas 도 로드됨
+    if "DX_KO" not in globals():
         try:
             from onco_map import DX_KO as _DXK  # if module available
             DX_KO = _DXK
         except Exception:
             DX_KO = {}
-    try:
-        _dx_norm  # type: ignore
-    except NameError:
+    if "_dx_norm" not in globals():
         try:
             from onco_map import _norm as _dx_norm  # if module exposes it
         except Exception:
@@ -1544,7 +1471,7 @@ with t_dx:
     st.session_state["dx_disp"] = disp
     st.info(f"선택: {disp}")
 
-    recs = auto_recs_by_dx(group, disease, DRUG_DB) or {}
+    recs = auto_recs_by_dx(group, disease, DRUG_DB, ONCO or None) or {}
     if any(recs.values()):
         st.markdown("**자동 추천 요약**")
         for cat, arr in recs.items():
@@ -1703,7 +1630,11 @@ with t_chemo:
             except Exception:
                 pass
 
-    label_map = {k: display_label(k, DRUG_DB) for k in DRUG_DB.keys()} if DRUG_DB else {}
+    try:
+        from drug_index import get_index as _drug_index  # 라벨은 DB 변경 시에만 재계산
+        label_map = _drug_index(DRUG_DB).labels if DRUG_DB else {}
+    except Exception:
+        label_map = {k: display_label(k, DRUG_DB) for k in DRUG_DB.keys()} if DRUG_DB else {}
 
     show_all = st.toggle("전체 보기(추천 외 약물 포함)", value=False, key=wkey("chemo_show_all"))
     if show_all or not recommended:
@@ -1718,9 +1649,11 @@ with t_chemo:
     if missing:
         st.warning("DB에 없는 추천/목록 약물이 있습니다: " + ", ".join(missing))
         if st.button("누락 약물 임시 등록(세션)", key=wkey("tmp_reg_missing")):
+            _tmp_db = st.session_state.setdefault("_tmp_drug_db", {})
             for k in missing:
                 if k not in DRUG_DB:
-                    DRUG_DB[k] = {"class": "", "ae": ["(보강 필요)"], "tags": []}
+                    _tmp_db[k] = {"class": "", "ae": ["(보강 필요)"], "tags": []}
+            DRUG_DB = {**DRUG_DB, **_tmp_db}  # 공유 DRUG_DB는 수정하지 않음
             st.success("임시 등록 완료(세션 한정). 부작용/태그는 추후 보강하세요.")
 
     pool_labels = [label_map.get(k, str(k)) for k in pool_keys]
@@ -2099,8 +2032,9 @@ with t_peds:
     wt = st.number_input("체중(kg)", min_value=0.0, max_value=200.0, value=default_wt, step=0.1, key=wkey("wt_peds_num"))
     st.session_state[wkey("wt_peds")] = wt
     try:
-        ap_ml_1, ap_ml_max = acetaminophen_ml(wt)
-        ib_ml_1, ib_ml_max = ibuprofen_ml(wt)
+        # 체중을 넣기 전에는 계산하지 않음(peds_dose 는 처음 계산할 때 로드)
+        ap_ml_1, ap_ml_max = acetaminophen_ml(wt) if wt > 0 else (0.0, 0.0)
+        ib_ml_1, ib_ml_max = ibuprofen_ml(wt) if wt > 0 else (0.0, 0.0)
     except Exception:
         ap_ml_1, ap_ml_max, ib_ml_1, ib_ml_max = (0.0, 0.0, 0.0, 0.0)
     colA, colB = st.columns(2)
@@ -2209,8 +2143,9 @@ from zoneinfo import ZoneInfo as _ZoneInfo
 import tempfile as _tmp
 
 def _preferred_writable_base():
-    # Try known writable locations in order
-    for p in ["/mnt/data/care_log", "/mount/data/care_log", "/tmp/care_log"]:
+    # Try known writable locations in order (env BLOODMAP_CARE_LOG_DIR first — load_driver/tests point it at a temp dir)
+    env_dir = os.environ.get("BLOODMAP_CARE_LOG_DIR", "").strip()
+    for p in ([env_dir] if env_dir else []) + ["/mnt/data/care_log", "/mount/data/care_log", "/tmp/care_log"]:
         try:
             os.makedirs(p, exist_ok=True)
             test_fp = os.path.join(p, ".touch")
@@ -2432,8 +2367,7 @@ with t_special:
             st.write(str(_e))
         if st.button("특수검사 모듈 리로드", key=_wkey("special_reload")):
             try:
-                if "_sp" in globals() and _sp:
-                    importlib.reload(_sp)
+                _lazy.refresh(force=True)   # 파일이 바뀌었으면 다시 실행
             except Exception:
                 pass
             st.rerun()
@@ -2509,7 +2443,8 @@ with t_report:
     group = st.session_state.get("onco_group", "")
     disease = st.session_state.get("onco_disease", "")
     meds = st.session_state.get("chemo_keys", [])
-    diets = lab_diet_guides(labs, heme_flag=(group == "혈액암"))
+    # 입력된 수치가 없으면 lab_diet 를 로드하지 않음
+    diets = lab_diet_guides(labs, heme_flag=(group == "혈액암")) if any(v not in (None, "") for v in labs.values()) else []
     temp = st.session_state.get(wkey("cur_temp"))
     hr = st.session_state.get(wkey("cur_hr"))
     age_years = _safe_float(st.session_state.get(wkey("age_years")), 0.0)
@@ -2585,6 +2520,15 @@ with t_report:
                         except Exception:
                             pass
                     hist.append(snap)
+                    # === [PATCH 2026-10-18 KST] PIN 인증 사용자는 누적 시계열(lab_store)에도 추가 ===
+                    if st.session_state.get("_pin_ok") and not str(st.session_state.get("key", "guest")).startswith("guest"):
+                        try:
+                            import lab_store as _lab_store  # type: ignore
+                            _lab_store.append(st.session_state.get("key"), snap["ts"],
+                                              {**(snap["labs"] or {}), "temp": snap["temp"], "hr": snap["hr"]})
+                        except Exception:
+                            pass
+                    # === [/PATCH] ===
                     st.success("현재 값이 기록에 추가되었습니다.")
                     if weird:
                         st.warning("비정상적으로 보이는 값 감지: " + ", ".join(weird) + " — 단위/오타를 확인하세요.")
@@ -2661,6 +2605,7 @@ with t_report:
                                 pass
                         plt.tight_layout()
                         st.pyplot(fig)
+                        plt.close(fig)
                 else:
                     try:
                         import pandas as pd
@@ -2866,23 +2811,30 @@ with t_report:
         st.download_button("💾 보고서 .md 다운로드", data=md.encode("utf-8"), file_name="bloodmap_report.md", mime="text/markdown")
         txt_data = md.replace("**", "")
         st.download_button("📝 보고서 .txt 다운로드", data=txt_data.encode("utf-8"), file_name="bloodmap_report.txt", mime="text/plain")
-        try:
-            pdf_bytes = export_md_to_pdf(md)
-            st.download_button("📄 보고서 .pdf 다운로드", data=pdf_bytes, file_name="bloodmap_report.pdf", mime="application/pdf")
-        except Exception:
-            st.caption("PDF 변환 모듈을 불러오지 못했습니다. .md 또는 .txt를 사용해주세요.")
+        # PDF 는 요청할 때만 변환(pdf_export/reportlab 은 이때 처음 로드) — 같은 내용이면 세션에 둔 결과 재사용
+        _md_sig = hashlib.sha256(md.encode("utf-8")).hexdigest()
+        _pdf_hit = st.session_state.get("_report_pdf")
+        if not (_pdf_hit and _pdf_hit[0] == _md_sig) and st.button("📄 PDF 만들기", key=wkey("report_pdf_make")):
+            try:
+                _pdf_hit = (_md_sig, _render_pdf(md))
+                st.session_state["_report_pdf"] = _pdf_hit
+            except TimeoutError:
+                _pdf_hit = None
+                st.caption("PDF 변환이 오래 걸리고 있습니다. 잠시 후 다시 눌러주세요.")
+            except Exception:
+                _pdf_hit = None
+                st.caption("PDF 변환 모듈을 불러오지 못했습니다. .md 또는 .txt를 사용해주세요.")
+        if _pdf_hit and _pdf_hit[0] == _md_sig:
+            st.download_button("📄 보고서 .pdf 다운로드", data=_pdf_hit[1], file_name="bloodmap_report.pdf", mime="application/pdf")
 
 
 # ---------------- Graph/Log Panel (separate tab) ----------------
 def render_graph_panel():
 
     import os, io, datetime as _dt
-    import pandas as pd
     import streamlit as st
-    try:
-        import matplotlib.pyplot as plt
-    except Exception:
-        plt = None
+    # pandas 는 읽을 데이터가 있을 때만, pyplot 은 실제로 그릴 때(graph_render 가 없을 때) 로드 — 설치 여부만 미리 확인
+    plt = _lazy.lazy_import("matplotlib.pyplot", "그래프") if _HAS_MPL else None
 
     st.markdown("### 📊 기록/그래프(파일 + 세션기록)")
 
@@ -2900,16 +2852,43 @@ def render_graph_panel():
         csv_files = []
 
     file_map = {os.path.basename(p): p for p in csv_files}
-    mode = st.radio("데이터 소스", ["세션 기록", "CSV 파일"], horizontal=True, key=wkey("g2_mode"))
+    # 누적 기록(lab_store): PIN 인증 사용자만, 요청 기간만 읽음
+    _uid = st.session_state.get("key", "guest")
+    _store = None
+    if st.session_state.get("_pin_ok") and not str(_uid).startswith("guest"):
+        try:
+            import lab_store as _store  # type: ignore
+        except Exception:
+            _store = None
+    modes = (["누적 기록"] if _store is not None else []) + ["세션 기록", "CSV 파일"]
+    mode = st.radio("데이터 소스", modes, horizontal=True, key=wkey("g2_mode"))
+    period = st.radio("기간", ("전체", "최근 7일", "최근 14일", "최근 30일"), horizontal=True, key=wkey("g2_period"))
+    _days = {"최근 7일": 7, "최근 14일": 14, "최근 30일": 30}.get(period)
     df = None
+    _data_ver = None
 
     hist = st.session_state.get("lab_history", [])
 
+    if mode == "누적 기록" and _store is not None:
+        try:
+            _start = (_dt.datetime.now() - _dt.timedelta(days=_days)) if _days else None
+            df = _store.query(_uid, start=_start).reset_index()
+            _data_ver = ("store", _store.safe_uid(_uid), _store.version(_uid))
+            if df.empty:
+                st.info("누적 기록이 없습니다. 보고서 옆 패널의 '기록' 탭에서 '현재 값을 기록에 추가'를 눌러보세요.")
+                df = None
+        except Exception as e:
+            st.error(f"누적 기록을 읽을 수 없습니다: {e}")
+            df = None
+
     if mode == "CSV 파일" and file_map:
         sel_name = st.selectbox("기록 파일 선택", sorted(file_map.keys()), key=wkey("g2_csv_select"))
         path = file_map[sel_name]
         try:
+            import pandas as pd
             df = pd.read_csv(path)
+            _fst = os.stat(path)
+            _data_ver = ("csv", path, _fst.st_mtime_ns, _fst.st_size)
         except Exception as e:
             st.error(f"CSV를 읽을 수 없습니다: {e}")
             df = None
@@ -2929,6 +2908,7 @@ def render_graph_panel():
                     row[k] = v
                 rows.append(row)
             if rows:
+                import pandas as pd
                 df = pd.DataFrame(rows)
                 try:
                     df["ts"] = pd.to_datetime(df["ts"])
@@ -2937,6 +2917,7 @@ def render_graph_panel():
 
     if df is None:
         return
+    import pandas as pd
 
     # 시간축 정렬/정규화
     time_col = None
@@ -2963,9 +2944,8 @@ def render_graph_panel():
     picks = st.multiselect("그래프 항목 선택", options=cols_avail, default=cols_avail[:4], key=wkey("g2_cols"))
 
     # 기간 필터
-    period = st.radio("기간", ("전체", "최근 7일", "최근 14일", "최근 30일"), horizontal=True, key=wkey("g2_period"))
     if period != "전체" and "datetime64" in str(df[time_col].dtype):
-        days = {"최근 7일": 7, "최근 14일": 14, "최근 30일": 30}[period]
+        days = _days
         cutoff = _dt.datetime.now() - _dt.timedelta(days=days)
         try:
             mask = df[time_col] >= cutoff
@@ -2978,9 +2958,28 @@ def render_graph_panel():
         return
 
     # 플롯
+    try:
+        import graph_render as _gr  # 캐시 + 다운샘플링 렌더러
+    except Exception:
+        _gr = None
     if plt is None:
         st.warning("matplotlib이 없어 간단 표로 대체합니다.")
         st.dataframe(df[[time_col] + picks].tail(50))
+    elif _gr is not None:
+        layout = st.radio("그래프 배치", ("항목별", "한 그림(다축)"), horizontal=True, key=wkey("g2_layout"))
+        if _data_ver is None:
+            try:
+                _data_ver = ("df", int(pd.util.hash_pandas_object(df[[time_col] + picks], index=False).sum()))
+            except Exception:
+                _data_ver = None   # 내용 해시 불가 → 프로세스 공유 캐시에 넣지 않음(id() 는 재사용되어 다른 데이터와 충돌)
+        series = {m_: pd.to_numeric(df[m_], errors="coerce").to_numpy() for m_ in picks}
+        if _data_ver is None:
+            pngs = _gr.render(df[time_col].to_numpy(), series, combined=(layout != "항목별"))
+        else:
+            pngs = _gr.render_cached(_data_ver, (period, _dt.date.today().isoformat()), df[time_col].to_numpy(),
+                                     series, combined=(layout != "항목별"))
+        for png in pngs:
+            st.image(png)
     else:
         for m_ in picks:
             try:
@@ -2994,7 +2993,9 @@ def render_graph_panel():
             ax.set_ylabel(m_)
             fig.autofmt_xdate(rotation=45)
             st.pyplot(fig)
+            plt.close(fig)
 
+render_graph_panel = _probe.wrap(render_graph_panel, "render_graph_panel")
 with t_graph:
     render_graph_panel()
 
@@ -3004,56 +3005,11 @@ from datetime import datetime
 
 
 # === SPECIAL TESTS IMPORT BRIDGE ===
+# 경로 해석/캐시는 lazy_modules(MANIFEST × SEARCH_BASES) — sys.path 변경·모듈 재실행 없음
 try:
-    import sys, importlib.util
-    from pathlib import Path as _P
-    _BM_BASES = [
-        _P(__file__).parent,
-        _P(__file__).parent / "modules",
-        _P("/mnt/data"),
-        _P("/mount/src/hoya12/bloodmap_app"),
-    ]
-    for _b in _BM_BASES:
-        try:
-            if str(_b) not in sys.path:
-                sys.path.insert(0, str(_b))
-        except Exception:
-            pass
-
     def _bm_import_by_paths(mod_name, rels):
         # rels can include absolute or relative candidates
-        def _load_fp(fp):
-            spec = importlib.util.spec_from_file_location(mod_name, str(fp))
-            if not spec or not spec.loader:
-                return None
-            m = importlib.util.module_from_spec(spec)
-            sys.modules[mod_name] = m
-            spec.loader.exec_module(m)
-            return m
-        # try explicit file paths
-        for rel in rels:
-            try:
-                p = _P(rel) if str(rel).startswith("/") else None
-                if p is None:
-                    for base in _BM_BASES:
-                        cand = base / rel
-                        if cand.exists():
-                            m = _load_fp(cand)
-                            if m: 
-                                return m, str(cand)
-                else:
-                    if p.exists():
-                        m = _load_fp(p)
-                        if m: 
-                            return m, str(p)
-            except Exception:
-                continue
-        # fallback to plain import
-        try:
-            m = __import__(mod_name)
-            return m, getattr(m, "__file__", None)
-        except Exception:
-            return None, None
+        return _lazy.load(mod_name, list(rels))
 
     # Resolve special_tests & UI symbol if missing
     if "special_tests_ui" not in globals():
@@ -3086,8 +3042,7 @@ except Exception:
 # === /CANONICAL DRUG KEY RESOLVER ===
 
 
-import pandas as pd
-import streamlit as st
+import streamlit as st  # pandas 는 쓰는 곳(그래프/피드백 관리)에서 import — 기동 시 로드하지 않음
 try:
     from zoneinfo import ZoneInfo
     _KST = ZoneInfo("Asia/Seoul")
@@ -3121,16 +3076,52 @@ def _feedback_dir():
 _FB_DIR = _feedback_dir()
 _FEEDBACK_CSV = os.path.join(_FB_DIR, "feedback.csv")
 
-def _atomic_save_csv(df: pd.DataFrame, path: str) -> None:
+def _atomic_save_csv(df: "pd.DataFrame", path: str) -> None:
     tmp = path + ".tmp"
     df.to_csv(tmp, index=False)
     os.replace(tmp, path)
 
+# === [PATCH 2026-10-18 KST] 피드백: SQLite(WAL) append-only 저장소 (기존 CSV는 1회 이관) ===
+try:
+    import feedback_store as _fb_store  # type: ignore
+    _FEEDBACK_DB = os.path.join(_FB_DIR, "feedback.sqlite3")
+except Exception:
+    _fb_store, _FEEDBACK_DB = None, None
+# === [PATCH 2026-10-18 KST] 통합 사용자 DB(user_store): 피드백도 같은 DB 파일로, 기존 파일은 1회 이관 ===
+try:
+    import user_store as _user_store  # type: ignore
+    _USER_DB = _user_store.db_path()
+    _user_store.migrate_in_background(feedback_dir=_FB_DIR, path=_USER_DB)  # 첫 rerun 을 막지 않음
+    if _fb_store is not None:
+        _FEEDBACK_DB = _USER_DB
+except Exception:
+    _user_store, _USER_DB = None, None
+# === [/PATCH] ===
+
 def _ensure_feedback_file() -> None:
+    if _fb_store is not None:
+        try:
+            _fb_store.migrate_csv(_FEEDBACK_CSV, _FEEDBACK_DB)
+            return
+        except Exception:
+            pass
     if not os.path.exists(_FEEDBACK_CSV):
+        import pandas as pd
         cols = ["ts_kst","name_or_nick","contact","category","rating","message","page"]
         _atomic_save_csv(pd.DataFrame(columns=cols), _FEEDBACK_CSV)
 
+def _append_feedback_csv(row: dict) -> None:
+    # 폴백: 전체 재작성 대신 한 줄 append
+    new_file = not os.path.exists(_FEEDBACK_CSV)
+    with open(_FEEDBACK_CSV, "a", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=list(row.keys()))
+        if new_file:
+            w.writeheader()
+        w.writerow(row)
+        f.flush()
+        os.fsync(f.fileno())
+# === [/PATCH] ===
+
 def set_current_tab_hint(name: str) -> None:
     st.session_state["_bm_current_tab"] = name
 
@@ -3157,19 +3148,26 @@ def render_feedback_box(default_category: str = "일반 의견", page_hint: str
                 "message": (msg or "").strip(),
                 "page": (page_hint or st.session_state.get("_bm_current_tab","")).strip(),
             }
-            try:
-                df = pd.read_csv(_FEEDBACK_CSV)
-            except Exception:
-                df = pd.DataFrame(columns=list(row.keys()))
-            df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-            _atomic_save_csv(df, _FEEDBACK_CSV)
+            saved = False
+            if _fb_store is not None:
+                try:
+                    _fb_store.append(row, _FEEDBACK_DB)
+                    saved = True
+                except Exception:
+                    saved = False
+            if not saved:
+                _append_feedback_csv(row)
             st.success("고맙습니다! 피드백이 저장되었습니다. (KST 기준)")
 
 def render_feedback_admin() -> None:
     pwd = st.text_input("관리자 비밀번호", type="password", key="fb_admin_pwd")
     admin_pw = st.secrets.get("ADMIN_PASS", "9047")
-    if admin_pw and pwd == admin_pw:
+    if admin_pw and pwd == admin_pw and _fb_store is not None:
+        _ensure_feedback_file()  # DB 쓰기 실패로 CSV 에 남은 행을 먼저 가져옴
+        _render_feedback_admin_db()
+    elif admin_pw and pwd == admin_pw:
         if os.path.exists(_FEEDBACK_CSV):
+            import pandas as pd
             try:
                 df = pd.read_csv(_FEEDBACK_CSV)
             except Exception:
@@ -3181,6 +3179,32 @@ def render_feedback_admin() -> None:
     else:
         st.caption("올바른 비밀번호를 입력하면 목록이 표시됩니다." if admin_pw else "ADMIN_PASS가 설정되지 않았습니다.")
 
+def _render_feedback_admin_db() -> None:
+    # 필터 + 페이지 단위 조회(전체 파일을 읽지 않음)
+    import pandas as pd
+    try:
+        cats = _fb_store.categories(_FEEDBACK_DB)
+    except Exception:
+        cats = []
+    sel_cats = st.multiselect("분류 필터", cats, key="fb_admin_cats")
+    text = st.text_input("검색어(메시지/이름/연락처)", key="fb_admin_q")
+    since = st.date_input("시작일(선택)", value=None, key="fb_admin_since")
+    size = st.selectbox("페이지 크기", [20, 50, 100, 200], index=1, key="fb_admin_size")
+    filters = {"category": sel_cats or None, "text": (text or "").strip() or None,
+               "since": since.strftime("%Y-%m-%d") if since else None}
+    total = _fb_store.count(_FEEDBACK_DB, **filters)
+    if not total:
+        st.info("조건에 맞는 피드백이 없습니다.")
+        return
+    pages = max(1, (total + size - 1) // size)
+    page = st.number_input(f"페이지 (1~{pages})", min_value=1, max_value=pages, value=1, step=1, key="fb_admin_page")
+    rows = _fb_store.query(_FEEDBACK_DB, limit=size, offset=(int(page) - 1) * size, **filters)
+    st.caption(f"총 {total}건 · {int(page)}/{pages} 페이지 (최신순)")
+    st.dataframe(pd.DataFrame(rows, columns=_fb_store.COLUMNS), use_container_width=True)
+    if st.button("필터 결과 CSV 준비", key="fb_admin_export"):
+        st.download_button("CSV 다운로드", data=_fb_store.export_csv(_FEEDBACK_DB, **filters),
+                           file_name="feedback.csv", mime="text/csv", use_container_width=True)
+
 def attach_feedback_sidebar(page_hint: str = "Sidebar") -> None:
     with st.sidebar:
         st.markdown("### 💬 의견 보내기")
@@ -3205,6 +3229,15 @@ _ss_setdefault(wkey('home_fb_counts_cache'), {'1':0,'2':0,'3':0,'4':0,'5':0})
 _ss_setdefault(wkey('home_fb_log_cache'), [])
 # === end mobile stability init ===
 
+# === [PATCH 2026-10-18 KST] 방문 카운터: metrics_store(메모리 누적 → 주기적 SQLite append, 집계는 조회 시) ===
+try:
+    import metrics_store as _metrics  # type: ignore
+    _metrics.configure(os.path.join(_FB_DIR, "metrics.sqlite3"))
+    _metrics.count_session_once(st.session_state, "sessions", flag="visited_today_counted")
+except Exception:
+    _metrics = None
+# === [/PATCH] ===
+
 
 # ===== [/INLINE FEEDBACK] =====
 # ---- Tab auto-select (route sync hack) ----
@@ -3239,6 +3272,9 @@ _label_by_route = {
     "graph": "📊 기록/그래프",
 }
 _cur_route = st.session_state.get("_route")
+if _metrics is not None and _cur_route and st.session_state.get("_bm_metrics_route") != _cur_route:
+    st.session_state["_bm_metrics_route"] = _cur_route
+    _metrics.incr("page_view", page=_cur_route)
 if _cur_route and _cur_route in _label_by_route and _cur_route != "home":
     _select_tab_by_label(_label_by_route[_cur_route])
 # ---- End Tab auto-select ----
@@ -3300,6 +3336,15 @@ except Exception:
 def _maybe_render_dev_panels(st):
     if not _is_dev():
         return
+    # 프로파일러는 프로세스 전체 상태(tracemalloc 켜기, 모든 세션의 계측 기록)를 건드림 — ?dev=1 로는 열리지 않고
+    # 서버 환경변수 BLOODMAP_DEV=1 일 때만 표시
+    if os.environ.get("BLOODMAP_DEV", "") == "1":
+        try:
+            with st.sidebar:
+                with st.expander("⏱️ 렌더 프로파일러", expanded=False):
+                    _probe.render_panel(st)
+        except Exception:
+            pass
     # Diagnostics/dev-only panels (safe; errors suppressed)
     try:
         from features_dev.diag_panel import render_diag_panel as _diag
@@ -3341,6 +3386,11 @@ try:
             with st.expander("🔧 Developer", expanded=False):
                 st.toggle("개발자 모드(베타 패널)", value=bool(st.session_state.get("dev_beta", True)), key="dev_beta")
                 st.caption("※ URL에 ?dev=1 또는 환경변수 BLOODMAP_DEV=1일 때만 보입니다.")
+                try:
+                    st.markdown("**⏱️ 모듈 로딩 시간(프로세스 기동 후)**")
+                    st.code(_lazy.report_text(), language="text")
+                except Exception:
+                    pass
 except Exception:
     pass
 # === [/PATCH] ===
@@ -3590,38 +3640,15 @@ def _load_local_module2(mod_name: str, candidates):
     Try multiple candidate paths. Return (module, used_path) or (None, None).
     Does NOT break older _load_local_module usage elsewhere.
     """
-    import importlib.util, sys
-    from pathlib import Path
-    def _try(fp: Path):
-        try:
-            spec = importlib.util.spec_from_file_location(mod_name, str(fp))
-            if not spec or not spec.loader:
-                return None, None
-            m = importlib.util.module_from_spec(spec)
-            sys.modules[mod_name] = m
-            spec.loader.exec_module(m)
-            return m, str(fp)
-        except Exception:
-            return None, None
-    base_candidates = []
-    for c in (candidates if isinstance(candidates, (list, tuple)) else [candidates]):
-        c = str(c)
-        fps = []
-        if c.startswith("/"):
-            fps = [Path(c)]
-        else:
-            fps = [
-                Path(__file__).parent / c,
-                Path(__file__).parent / "modules" / c,
-                Path("/mount/src/hoya12/bloodmap_app") / c,
-                Path("/mount/src/hoya12/bloodmap_app/modules") / c,
-                Path("/mnt/data") / c,
-            ]
-        for fp in fps:
-            base_candidates.append(fp)
-    for fp in base_candidates:
-        if fp.exists():
-            m, used = _try(fp)
-            if m:
-                return m, used
-    return None, None
+    seq = candidates if isinstance(candidates, (list, tuple)) else [candidates]
+    m, used = _lazy.load(mod_name, [str(p) for p in _lazy.expand(seq)])
+    return (m, used) if m is not None and used and not used.startswith("(sys.path)") else (None, None)
+
+
+# === [PATCH 2026-10-18 KST] 리런 전체 시간 기록 + 개발자 패널(블록별 계측) — 파일 맨 끝 유지 ===
+_probe.record("rerun", (_bm_time.perf_counter() - _bm_run_t0) * 1000.0)
+try:
+    _maybe_render_dev_panels(st)
+except Exception:
+    pass
+# === [/PATCH] ===
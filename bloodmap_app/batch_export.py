@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+batch_export.py
+일괄 보고서 내보내기 — 명단(uid 목록) 또는 데이터 폴더 전체의 ER 원페이지/요약을 MD·PDF 로
+- 입력: 통합 DB(user_store) 또는 기존 파일(bloodmap_graph/{uid}.json·{uid}.labs.csv, care_log/{uid}.jsonl)
+- 응급도: 최신 검사값을 triage_batch 로 한 번에(벡터화) 계산
+- PDF: pdf_service 워커 프로세스로 병렬 렌더(같은 내용은 캐시에서 바로)
+- 진행 상황 콜백/표시 + 재개 가능한 manifest.json(완료 항목은 입력이 그대로면 건너뜀)
+- 출력 파일: <uid 읽기용 부분>-<uid 해시>.md/.pdf — 원래 uid 는 manifest 항목의 "uid"
+
+CLI:
+    python batch_export.py --data-dir /mnt/data --out ./roster_out [--uids a_1234 b_5678 | --uids-file roster.txt]
+                           [--format both|md|pdf] [--workers N] [--no-resume]
+"""
+from __future__ import annotations
+import csv, glob, hashlib, json, os, sys, time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+MANIFEST_VERSION = 2   # 2: 파일 이름에 uid 해시(이전 manifest 는 충돌 가능 → 다시 생성)
+KST = timezone(timedelta(hours=9))
+LAB_TABLE_ROWS = 5
+LAB_TABLE_COLS = ["WBC", "Hb", "PLT", "ANC", "CRP", "Na", "K", "Cr"]
+# 파일 이름 → uid: 알려진 접미사만 뗌(uid 안의 '.' 보존 — "mr.kim_1234.json" → "mr.kim_1234")
+FILE_SUFFIXES = {"*.json": ".json", "*.labs.csv": ".labs.csv", "*.jsonl": ".jsonl"}
+
+ProgressFn = Callable[[int, int, str, str], None]
+
+
+@dataclass
+class UserData:
+    uid: str
+    config: Dict[str, Any] = field(default_factory=dict)
+    labs: List[Dict[str, Any]] = field(default_factory=list)
+    care: List[Dict[str, Any]] = field(default_factory=list)
+
+    def signature(self) -> str:
+        """입력 내용 해시 — manifest 재개 시 변경 여부 판단."""
+        blob = json.dumps([self.config, self.labs, self.care], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+# ---------- 입력 ----------
+def _dirs(data_dir: Optional[str]):
+    if data_dir:
+        return os.path.join(data_dir, "bloodmap_graph"), os.path.join(data_dir, "care_log")
+    try:
+        from pathsafe import resolve_data_dirs  # type: ignore
+        g, c, _p, _m = resolve_data_dirs()
+        return g, c
+    except Exception:
+        return "/mnt/data/bloodmap_graph", "/mnt/data/care_log"
+
+
+def _store(data_dir: Optional[str]):
+    """data_dir 의 통합 DB(있을 때만). data_dir 없으면 기본 DB."""
+    try:
+        import user_store  # type: ignore
+    except Exception:
+        return None, None
+    path = os.path.join(data_dir, user_store.DB_NAME) if data_dir else user_store.db_path()
+    return (user_store, path) if os.path.exists(path) else (None, None)
+
+
+def discover_uids(data_dir: Optional[str] = None) -> List[str]:
+    graph_dir, care_dir = _dirs(data_dir)
+    uids = set()
+    for folder, pat in ((graph_dir, "*.json"), (graph_dir, "*.labs.csv"), (care_dir, "*.jsonl")):
+        suffix = FILE_SUFFIXES[pat]
+        uids.update(os.path.basename(p)[:-len(suffix)] for p in glob.glob(os.path.join(folder, pat)))
+    us, path = _store(data_dir)
+    if us is not None:
+        for kind in ("profiles", "labs", "care"):
+            try:
+                uids.update(us.list_uids(kind, path=path))
+            except Exception:
+                pass
+    return sorted(u for u in uids if u)
+
+
+def _read_json(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def load_user(uid: str, data_dir: Optional[str] = None, now: Optional[datetime] = None,
+              care_hours: int = 24) -> UserData:
+    """uid 1명의 설정/검사/최근 케어로그. DB 값이 있으면 DB, 없으면 파일."""
+    graph_dir, care_dir = _dirs(data_dir)
+    now = now or datetime.now(KST).replace(tzinfo=None)
+    cutoff = (now - timedelta(hours=care_hours)).strftime("%Y-%m-%d %H:%M")
+    ud = UserData(uid=uid)
+    us, path = _store(data_dir)
+    if us is not None:
+        try:
+            ud.config = us.load_profile(uid, path=path) or {}
+            ud.labs = us.query_labs(uid, path=path)
+            ud.care = us.query_events(uid, start=cutoff, path=path)
+        except Exception:
+            pass
+    if not ud.config:
+        ud.config = _read_json(os.path.join(graph_dir, f"{uid}.json")) or {}
+    if not ud.labs:
+        try:
+            with open(os.path.join(graph_dir, f"{uid}.labs.csv"), "r", encoding="utf-8-sig", newline="") as f:
+                ud.labs = [dict(r) for r in csv.DictReader(f)]
+        except Exception:
+            ud.labs = []
+    if not ud.care:
+        try:
+            with open(os.path.join(care_dir, f"{uid}.jsonl"), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        ev = json.loads(line)
+                    except Exception:
+                        continue
+                    if str(ev.get("ts_kst", "")) >= cutoff:
+                        ud.care.append(ev)
+        except Exception:
+            pass
+    ud.labs.sort(key=lambda r: str(r.get("ts_kst") or r.get("ts") or ""))
+    return ud
+
+
+# ---------- 요약/마크다운 ----------
+def triage(users: Sequence[UserData]) -> List[Dict[str, Any]]:
+    """최신 검사 행 기준 응급도 — 전체 명단을 한 번에 계산."""
+    from triage_batch import emergency_level_batch
+    cols: Dict[str, list] = {k: [] for k in ("ANC", "PLT", "CRP", "Hb", "temp", "hr")}
+    for u in users:
+        last = u.labs[-1] if u.labs else {}
+        for k in cols:
+            cols[k].append(last.get(k, last.get(k.upper(), None)))
+    res = emergency_level_batch(cols)
+    return [{"risk": str(res.level[i]), "score": float(res.score[i]), "reasons": res.reasons(i)}
+            for i in range(len(users))]
+
+
+def _labs_md(labs: List[Dict[str, Any]]) -> str:
+    rows = labs[-LAB_TABLE_ROWS:]
+    if not rows:
+        return ""
+    cols = [c for c in LAB_TABLE_COLS if any(str(r.get(c, "") or "").strip() for r in rows)]
+    out = ["| 시점 | " + " | ".join(cols) + " |", "|---|" + "---|" * len(cols)]
+    for r in rows:
+        out.append(f"| {r.get('ts_kst') or r.get('ts') or ''} | " + " | ".join(str(r.get(c, "") or "") for c in cols) + " |")
+    return "\n".join(out)
+
+
+def _care_txt(care: List[Dict[str, Any]]) -> str:
+    return "\n".join(f"- [{x.get('ts_kst','')}] {x.get('type','')}: {x.get('detail','')}" for x in care)
+
+
+def _render_er_md(summary: dict, care_txt: str) -> str:
+    try:
+        from er_onepage import render_er_md  # type: ignore
+        return render_er_md(summary, care_txt)
+    except Exception:
+        pass
+    # er_onepage 가 설치되지 않은 경우 같은 레이아웃
+    lines = [f"# ER One-Page — {datetime.now(KST).strftime('%Y-%m-%d %H:%M')}", "",
+             f"## 🆘 응급도: **{summary.get('risk','N/A')}** / 분류: **{summary.get('triage','N/A')}**"]
+    if summary.get("key_findings"):
+        lines.append("### 주요 소견")
+        lines += [f"- {s}" for s in summary["key_findings"]]
+    if summary.get("vitals"):
+        lines += ["### 활력징후", summary["vitals"]]
+    if summary.get("labs_md"):
+        lines += ["### 최근 검사 요약", summary["labs_md"]]
+    lines += ["### 최근 24h 케어로그", care_txt or "(기록 없음)"]
+    return "\n".join(lines)
+
+
+def build_markdown(ud: UserData, tri: Dict[str, Any]) -> str:
+    cfg = ud.config or {}
+    last = ud.labs[-1] if ud.labs else {}
+    vitals = ", ".join(f"{k} {last[k]}" for k in ("temp", "hr") if str(last.get(k, "") or "").strip())
+    summary = {
+        "risk": tri.get("risk", "N/A"),
+        "triage": cfg.get("triage") or cfg.get("group") or f"점수 {tri.get('score', 0):.0f}",
+        "key_findings": tri.get("reasons") or [],
+        "vitals": vitals,
+        "labs_md": _labs_md(ud.labs),
+    }
+    md = _render_er_md(summary, _care_txt(ud.care))
+    name = cfg.get("nickname") or cfg.get("name") or ud.uid
+    return md.replace("# ER One-Page", f"# ER One-Page · {name}", 1)
+
+
+# ---------- manifest ----------
+def _safe(uid: str) -> str:
+    """출력 파일 이름 — 읽기 쉬운 부분 + 원래 uid 해시(앞 10자리). '.'·'#' 만 다른 uid 도 겹치지 않음."""
+    head = "".join(ch for ch in str(uid) if ch.isalnum() or ch in ("-", "_"))[:40] or "anonymous"
+    return f"{head}-{hashlib.sha256(str(uid).encode('utf-8')).hexdigest()[:10]}"
+
+
+def load_manifest(out_dir: str) -> Dict[str, Any]:
+    data = _read_json(os.path.join(out_dir, "manifest.json"))
+    if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION:
+        return data
+    return {"version": MANIFEST_VERSION, "items": {}}
+
+
+def _save_manifest(out_dir: str, manifest: Dict[str, Any]) -> None:
+    p = os.path.join(out_dir, "manifest.json")
+    tmp = p + ".tmp"
+    manifest["updated"] = datetime.now(KST).strftime("%Y-%m-%d %H:%M:%S")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, p)
+
+
+def _write(path: str, data: bytes) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _is_done(item: Optional[dict], sig: str, out_dir: str, fmt: str) -> bool:
+    if not item or item.get("status") != "done" or item.get("sig") != sig:
+        return False
+    need = (["md"] if fmt in ("md", "both") else []) + (["pdf"] if fmt in ("pdf", "both") else [])
+    return all(item.get(k) and os.path.exists(os.path.join(out_dir, item[k])) for k in need)
+
+
+def stderr_progress(done: int, total: int, uid: str, status: str) -> None:
+    sys.stderr.write(f"\r[{done}/{total}] {uid} {status}".ljust(60) + ("\n" if done == total else ""))
+    sys.stderr.flush()
+
+
+# ---------- 실행 ----------
+def export(uids: Optional[Iterable[str]] = None, out_dir: str = "batch_out", data_dir: Optional[str] = None,
+           fmt: str = "both", workers: Optional[int] = None, resume: bool = True,
+           progress: Optional[ProgressFn] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    명단 일괄 내보내기. uids 가 없으면 data_dir 전체.
+    반환: {"total", "done", "skipped", "failed", "elapsed_sec", "manifest"}
+    """
+    t0 = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    uids = list(dict.fromkeys(uids)) if uids else discover_uids(data_dir)
+    manifest = load_manifest(out_dir) if resume else {"version": MANIFEST_VERSION, "items": {}}
+    items = manifest.setdefault("items", {})
+    users = [load_user(u, data_dir, now=now) for u in uids]
+    sigs = [u.signature() for u in users]
+    todo = [i for i, u in enumerate(users) if not (resume and _is_done(items.get(u.uid), sigs[i], out_dir, fmt))]
+    total, done, failed = len(users), len(users) - len(todo), 0
+    if progress and done:
+        progress(done, total, "-", f"{done} skipped (manifest)")
+    tri = triage([users[i] for i in todo]) if todo else []
+
+    svc = None
+    if fmt in ("pdf", "both"):
+        try:
+            import pdf_service as svc  # type: ignore
+            if workers is not None or svc.MAX_WORKERS < (os.cpu_count() or 1):
+                svc.configure(workers=workers or os.cpu_count() or 1)
+        except Exception:
+            svc = None
+
+    pending = []
+    for j, i in enumerate(todo):
+        u = users[i]
+        name = _safe(u.uid)
+        md = build_markdown(u, tri[j])
+        item = {"uid": u.uid, "status": "md", "sig": sigs[i], "risk": tri[j]["risk"]}
+        if fmt in ("md", "both"):
+            _write(os.path.join(out_dir, name + ".md"), md.encode("utf-8"))
+            item["md"] = name + ".md"
+        items[u.uid] = item
+        if fmt in ("pdf", "both"):
+            fut = svc.submit(md) if svc is not None else None
+            pending.append((u.uid, name, md, fut))
+        else:
+            item["status"] = "done"
+            done += 1
+            if progress:
+                progress(done, total, u.uid, "md")
+    last_save = time.monotonic()
+    for uid, name, md, fut in pending:
+        item = items[uid]
+        try:
+            if fut is not None:
+                pdf = fut.result(timeout=300)
+            else:
+                from pdf_export import export_md_to_pdf  # type: ignore
+                pdf = export_md_to_pdf(md)
+            _write(os.path.join(out_dir, name + ".pdf"), pdf)
+            item.update(status="done", pdf=name + ".pdf")
+            done += 1
+            status = "ok"
+        except Exception as e:
+            item.update(status="failed", error=f"{type(e).__name__}: {e}"[:300])
+            failed += 1
+            status = "FAILED"
+        if progress:
+            progress(done + failed, total, uid, status)
+        if time.monotonic() - last_save > 2.0:
+            _save_manifest(out_dir, manifest)
+            last_save = time.monotonic()
+    _save_manifest(out_dir, manifest)
+    return {"total": total, "done": done, "skipped": total - len(todo), "failed": failed,
+            "elapsed_sec": round(time.perf_counter() - t0, 3), "manifest": os.path.join(out_dir, "manifest.json")}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(description="명단 일괄 ER 원페이지/요약 내보내기(MD/PDF)")
+    ap.add_argument("--data-dir", default=None, help="bloodmap_graph/, care_log/, bloodmap.sqlite3 가 있는 폴더")
+    ap.add_argument("--out", default="batch_out")
+    ap.add_argument("--uids", nargs="*", default=None)
+    ap.add_argument("--uids-file", default=None, help="한 줄에 uid 하나")
+    ap.add_argument("--format", choices=("both", "md", "pdf"), default="both")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--no-resume", action="store_true")
+    ap.add_argument("--quiet", action="store_true")
+    a = ap.parse_args(argv)
+    uids = list(a.uids or [])
+    if a.uids_file:
+        with open(a.uids_file, "r", encoding="utf-8") as f:
+            uids += [ln.strip() for ln in f if ln.strip() and not ln.startswith("#")]
+    res = export(uids or None, a.out, a.data_dir, a.format, a.workers, not a.no_resume,
+                 None if a.quiet else stderr_progress)
+    print(json.dumps(res, ensure_ascii=False))
+    return 1 if res["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(main())
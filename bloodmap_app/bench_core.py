@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+"""
+bench_core.py
+핵심 계산 벤치마크(Streamlit 없이 실행) — 결과는 정렬된 JSON, 두 결과 비교 시 회귀 표시
+    python bench_core.py run [-o out.json] [--rounds 7] [--quick] [-k 이름일부] [--baseline base.json]
+    python bench_core.py compare base.json head.json [--threshold 0.15] [--min-ms 0.01]
+- 케이스마다 setup(측정 제외) 후, 한 샘플이 TARGET_SAMPLE_MS 이상이 되도록 반복 횟수를 자동 결정(timeit.autorange 방식)
+  → rounds 개 샘플의 1회당 중앙값/최소/최대(ms)
+- app.py 안의 함수(emergency_level, check_chemo_interactions, _aggregate_all_aes)는
+  AST 로 해당 함수와 그 함수가 부르는 app.py 최상위 함수만 꺼내 실행(session_state 는 빈 dict)
+- carelog_ext.read 는 두 경로를 따로 측정: [user_store](앱 기본, SQLite) / [jsonl](DB 없을 때·이관 전 파일)
+- compare : head 중앙값 > base 중앙값 × (1+threshold) 이고 차이가 min-ms 이상이면 회귀 → 종료코드 1
+"""
+from __future__ import annotations
+import argparse, ast, gc, json, os, platform, re, shutil, statistics, subprocess, sys, tempfile, time, types
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+APP_DIR = Path(__file__).resolve().parent
+ROOT_DIR = APP_DIR.parent
+for _p in (str(APP_DIR), str(ROOT_DIR)):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+SCHEMA = 1
+TARGET_SAMPLE_MS = 50.0
+DEFAULT_ROUNDS = 7
+DEFAULT_THRESHOLD = 0.15
+DEFAULT_MIN_MS = 0.01
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[[], Callable[[], Any]]   # 측정 대상 0-인자 함수를 돌려줌(준비 비용은 제외)
+    max_inner: int = 100000
+
+
+_CASES: List[Case] = []
+
+
+def case(name: str, max_inner: int = 100000):
+    def deco(setup):
+        _CASES.append(Case(name, setup, max_inner))
+        return setup
+    return deco
+
+
+# ---------- app.py 함수 꺼내기 ----------
+def app_functions(names: Sequence[str], namespace: Optional[Dict[str, Any]] = None,
+                  path: Path = APP_DIR / "app.py") -> Dict[str, Callable]:
+    """app.py 최상위 함수 names 와 그 함수들이 부르는 최상위 함수들을 정의 순서대로 실행해 반환."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    defs: Dict[str, ast.FunctionDef] = {}
+    order: Dict[str, int] = {}
+    for i, node in enumerate(tree.body):
+        if isinstance(node, ast.FunctionDef):
+            defs[node.name] = node   # 같은 이름은 마지막 정의가 실제로 쓰임
+            order[node.name] = i
+    need, todo = set(), list(names)
+    while todo:
+        nm = todo.pop()
+        if nm in need or nm not in defs:
+            continue
+        need.add(nm)
+        for sub in ast.walk(defs[nm]):
+            if isinstance(sub, ast.Name) and isinstance(sub.ctx, ast.Load) and sub.id in defs:
+                todo.append(sub.id)
+    missing = [n for n in names if n not in defs]
+    if missing:
+        raise LookupError(f"app.py 에 없는 함수: {missing}")
+    mod = ast.Module(body=[defs[n] for n in sorted(need, key=order.get)], type_ignores=[])
+    ns: Dict[str, Any] = {"__name__": "bench_app", "re": re}
+    ns.update(namespace or {})
+    exec(compile(mod, str(path), "exec"), ns)
+    return {n: ns[n] for n in names}
+
+
+def _session_ns() -> types.SimpleNamespace:
+    return types.SimpleNamespace(session_state={})
+
+
+def _fresh_drug_db() -> Dict[str, Any]:
+    import drug_db
+    db: Dict[str, Any] = {}
+    drug_db.ensure_onco_drug_db(db)
+    return db
+
+
+# ---------- 케이스 ----------
+@case("drug_db.ensure_onco_drug_db(fresh)", max_inner=50)
+def _b_ensure():
+    import drug_db
+    def run():
+        drug_db.ensure_onco_drug_db({})
+    return run
+
+
+@case("onco_map.build_onco_map(rebuild)", max_inner=200)
+def _b_build_onco():
+    import onco_map
+    return lambda: onco_map.build_onco_map(profile=True)   # profile=True → 캐시 무시하고 레이어+동결까지 재빌드
+
+
+@case("onco_map.auto_recs_by_dx(all dx)")
+def _b_auto_recs():
+    import onco_map
+    omap = onco_map.build_onco_map()
+    db = _fresh_drug_db()
+    pairs = [(g, d) for g, dm in omap.items() for d in dm]
+    def run():
+        for g, d in pairs:
+            onco_map.auto_recs_by_dx(g, d, DRUG_DB=db, ONCO_MAP=omap)
+    return run
+
+
+@case("app.emergency_level")
+def _b_emergency():
+    from ref_tables import EMERGENCY_DEFAULT_WEIGHTS
+    fn = app_functions(["emergency_level"], {"st": _session_ns(),
+                                             "DEFAULT_WEIGHTS": EMERGENCY_DEFAULT_WEIGHTS})["emergency_level"]
+    labs = [{"ANC": "450", "PLT": 15000, "CRP": "12.5", "Hb": 6.8}, {"ANC": 1800, "PLT": 210000, "CRP": 0.3, "Hb": 12.1},
+            {"ANC": "800", "PLT": "", "CRP": None, "Hb": "9.0 g/dL"}]
+    syms = [{"melena": True, "dyspnea": True, "confusion": True}, {}, {"petechiae": True}]
+    def run():
+        for lb, sy, t, hr in zip(labs, syms, (39.1, 36.8, 38.2), (140, 80, 120)):
+            fn(lb, t, hr, sy)
+    return run
+
+
+@case("triage_weights.compute_score")
+def _b_triage():
+    import triage_weights as tw
+    base = next(iter(tw.PRESETS.values()))   # 기본 weights 팩토리는 없는 프리셋을 참조하므로 명시
+    cfg = tw.TriageConfig(weights={f: base.get(f, 1.0) for f in tw.FACTORS},
+                          signals={f: float(i % 6) for i, f in enumerate(tw.FACTORS)})
+    return lambda: tw.compute_score(cfg)
+
+
+@case("peds_rules.predict_from_symptoms")
+def _b_peds():
+    import peds_rules
+    inputs = [({"콧물": "투명", "기침": "조금", "설사": "없음", "눈꼽": "없음", "발열": "37.5~38"}, 37.9, 18),
+              ({"콧물": "누런", "기침": "심함", "설사": "3~4회", "눈꼽": "노란-농성", "발열": "39 이상"}, 39.4, 30),
+              ({"콧물": "없음", "기침": "없음", "설사": "5~6회", "눈꼽": "맑음", "발열": "38~38.5"}, 38.3, 6)]
+    def run():
+        for sym, t, age in inputs:
+            peds_rules.predict_from_symptoms(sym, t, age)
+    return run
+
+
+@case("lab_diet.lab_diet_guides")
+def _b_diet():
+    import lab_diet
+    labs = [{"Alb": 2.9, "K": 3.1, "Hb": 8.5, "Na": 131, "Ca": 8.1, "Glu": 210, "ANC": 400, "CRP": 5},
+            {"Alb": 4.2, "K": 4.0, "Hb": 13.1, "Na": 140, "Ca": 9.4, "Glu": 95, "ANC": 2500}]
+    def run():
+        for lb in labs:
+            lab_diet.lab_diet_guides(lb, heme_flag=True)
+    return run
+
+
+@case("app._aggregate_all_aes(30 meds)")
+def _b_aes():
+    db = _fresh_drug_db()
+    fn = app_functions(["_aggregate_all_aes"])["_aggregate_all_aes"]
+    meds = sorted(db)[:30]
+    return lambda: fn(meds, db)
+
+
+@case("app.check_chemo_interactions(12 meds)")
+def _b_inter():
+    db = _fresh_drug_db()
+    fn = app_functions(["check_chemo_interactions"], {"DRUG_DB": db})["check_chemo_interactions"]
+    keys = sorted(db)[:12]
+    return lambda: fn(keys)
+
+
+_MD_REPORT = "\n".join(
+    ["# BloodMap 보고서", "", "## 응급도 요약", "- 🚨 응급: ANC<500, 고열 ≥38.5℃", ""]
+    + [f"- {k}: {v}" for k, v in (("WBC", 1.2), ("Hb", 8.1), ("PLT", "23k"), ("ANC", 450), ("CRP", 12.5))]
+    + ["", "## 특수검사 해석"] + [f"- 🟡 주의 항목 {i} → 추적 필요" for i in range(40)]
+    + ["", "## 항암제 부작용"] + [f"- 약물{i}: 골수억제, 오심/구토, 탈모" for i in range(30)])
+
+
+@case("pdf_export.export_md_to_pdf(report)", max_inner=20)
+def _b_pdf():
+    import pdf_export
+    pdf_export.export_md_to_pdf("# warmup")   # 폰트 등록은 1회성 — 측정에서 제외
+    return lambda: pdf_export.export_md_to_pdf(_MD_REPORT)
+
+
+def _carelog_rows(lines: int):
+    import carelog_ext
+    end = datetime.strptime(carelog_ext.kst_now_str(), "%Y-%m-%d %H:%M")
+    for i in range(lines):
+        ts = (end - timedelta(minutes=lines - i)).strftime("%Y-%m-%d %H:%M")
+        yield {"ts_kst": ts, "type": "fever", "detail": f"38.{i % 10}℃ 해열제 {i}"}
+
+
+def _carelog_case(lines: int):
+    """이관 전/user_store 없는 배포의 JSONL+인덱스 경로."""
+    def setup():
+        import carelog_ext
+        tmp = Path(tempfile.mkdtemp(prefix="bench_carelog_"))
+        carelog_ext.ROOT, carelog_ext._db = tmp, None
+        p = carelog_ext._path("bench", "0000")
+        with p.open("w", encoding="utf-8") as f:
+            for row in _carelog_rows(lines):
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        carelog_ext.rebuild_index(p)
+        _CLEANUP.append(tmp)
+        return lambda: carelog_ext.read("bench", "0000", hours=24, limit=500)
+    return setup
+
+
+def _carelog_db_case(lines: int):
+    """앱이 실제로 쓰는 경로: carelog_ext.read → user_store.query_events(SQLite, 임시 DB)."""
+    def setup():
+        import carelog_ext, user_store
+        tmp = Path(tempfile.mkdtemp(prefix="bench_carelog_db_"))
+        db = str(tmp / user_store.DB_NAME)
+        _ENV_SAVED.setdefault("BLOODMAP_USER_DB", os.environ.get("BLOODMAP_USER_DB"))
+        os.environ["BLOODMAP_USER_DB"] = db
+        carelog_ext.ROOT, carelog_ext._db = tmp, user_store
+        uid = carelog_ext._uid("bench", "0000")
+        con = user_store.connect(db)
+        try:
+            con.execute("BEGIN")
+            con.executemany("INSERT INTO care_events(uid, ts_kst, type, detail) VALUES (?,?,?,?)",
+                            ((uid, r["ts_kst"], r["type"], r["detail"]) for r in _carelog_rows(lines)))
+            con.execute("COMMIT")
+        finally:
+            con.close()
+        _CLEANUP.append(tmp)
+        return lambda: carelog_ext.read("bench", "0000", hours=24, limit=500)
+    return setup
+
+
+_CLEANUP: List[Path] = []
+_ENV_SAVED: Dict[str, Optional[str]] = {}
+case("carelog_ext.read[jsonl](10k lines)", max_inner=2000)(_carelog_case(10_000))
+case("carelog_ext.read[jsonl](100k lines)", max_inner=2000)(_carelog_case(100_000))
+case("carelog_ext.read[user_store](10k rows)", max_inner=2000)(_carelog_db_case(10_000))
+case("carelog_ext.read[user_store](100k rows)", max_inner=2000)(_carelog_db_case(100_000))
+
+
+@case("lab_ingest.parse_text(paste 12 rows)")
+def _b_paste():
+    import lab_ingest
+    text = ("검사항목\t24-03-02\t24-03-05\nWBC\t0.8\t2.1\nHb\t81 g/L\t9.0\nPLT 23,000 /uL\n"
+            "ANC 320\nCRP 12.5 mg/dL\nNa 131\nK 3.1\nCr 0.6\nAST 45\nALT 60\nAlb 2.9 g/dL\n")
+    return lambda: lab_ingest.parse_text(text)
+
+
+@case("lab_ingest.parse_text(table 5k rows)", max_inner=20)
+def _b_paste_big():
+    import lab_ingest
+    rows = ["날짜,WBC,Hb,PLT,ANC,CRP,Na,K,Cr"]
+    d0 = datetime(2024, 1, 1)
+    for i in range(5000):
+        d = (d0 + timedelta(hours=6 * i)).strftime("%Y-%m-%d %H:%M")
+        rows.append(f"{d},{1 + i % 9}.{i % 10},{8 + i % 5}.1,{20 + i % 200},{300 + i % 2000},{i % 20}.5,"
+                    f"{130 + i % 10},{3 + i % 2}.4,0.{5 + i % 4}")
+    text = "\n".join(rows)
+    return lambda: lab_ingest.parse_text(text)
+
+
+# ---------- 실행 ----------
+def _time_case(c: Case, rounds: int, target_ms: float) -> Dict[str, Any]:
+    fn = c.setup()
+    fn()   # 워밍업(지연 import/캐시)
+    inner = 1
+    while True:   # 샘플 1개가 target_ms 이상 되도록
+        t0 = time.perf_counter()
+        for _ in range(inner):
+            fn()
+        el = (time.perf_counter() - t0) * 1000.0
+        if el >= target_ms or inner >= c.max_inner:
+            break
+        inner = min(c.max_inner, max(inner * 2, int(inner * target_ms / max(el, 1e-3))))
+    samples = []
+    gc_was = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            for _ in range(inner):
+                fn()
+            samples.append((time.perf_counter() - t0) * 1000.0 / inner)
+    finally:
+        if gc_was:
+            gc.enable()
+    return {"median_ms": round(statistics.median(samples), 5), "min_ms": round(min(samples), 5),
+            "max_ms": round(max(samples), 5), "rounds": rounds, "inner": inner}
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT_DIR),
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip()
+    except Exception:
+        return ""
+
+
+def run(rounds: int = DEFAULT_ROUNDS, select: Optional[str] = None, target_ms: float = TARGET_SAMPLE_MS,
+        log: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    try:
+        for c in _CASES:
+            if select and select.lower() not in c.name.lower():
+                continue
+            try:
+                results[c.name] = _time_case(c, rounds, target_ms)
+            except Exception as e:
+                results[c.name] = {"error": f"{type(e).__name__}: {e}"[:300]}
+            if log:
+                r = results[c.name]
+                log(f"{c.name:45s} " + (f"{r['median_ms']:12.4f} ms  (x{r['inner']})" if "median_ms" in r else r["error"]))
+    finally:
+        for p in _CLEANUP:
+            shutil.rmtree(p, ignore_errors=True)
+        _CLEANUP.clear()
+        for k, v in _ENV_SAVED.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        _ENV_SAVED.clear()
+    return {"schema": SCHEMA, "meta": {"commit": _git_commit(), "python": platform.python_version(),
+                                       "platform": platform.platform(), "rounds": rounds,
+                                       "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
+            "results": results}
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD,
+            min_ms: float = DEFAULT_MIN_MS) -> List[Dict[str, Any]]:
+    """케이스별 비교 행. status: regression / improved / same / new / missing / error."""
+    rows = []
+    b_res, h_res = base.get("results", {}), head.get("results", {})
+    for name in sorted(set(b_res) | set(h_res)):
+        b, h = b_res.get(name), h_res.get(name)
+        row = {"case": name, "base_ms": None, "head_ms": None, "ratio": None, "status": "same"}
+        if b is None or h is None:
+            row["status"] = "new" if b is None else "missing"
+        elif "median_ms" not in b or "median_ms" not in h:
+            row["status"] = "error"
+        else:
+            bm, hm = b["median_ms"], h["median_ms"]
+            row.update(base_ms=bm, head_ms=hm, ratio=round(hm / bm, 3) if bm else None)
+            if hm > bm * (1 + threshold) and hm - bm >= min_ms:
+                row["status"] = "regression"
+            elif hm < bm / (1 + threshold) and bm - hm >= min_ms:
+                row["status"] = "improved"
+        if row["status"] == "new" and h is not None:
+            row["head_ms"] = h.get("median_ms")
+        rows.append(row)
+    return rows
+
+
+def format_compare(rows: List[Dict[str, Any]]) -> str:
+    out = [f"{'case':45s} {'base_ms':>12} {'head_ms':>12} {'ratio':>7}  status"]
+    for r in rows:
+        f = lambda v: f"{v:12.4f}" if isinstance(v, (int, float)) else f"{'-':>12}"
+        ratio = f"{r['ratio']:7.3f}" if r["ratio"] is not None else f"{'-':>7}"
+        mark = "  <<<" if r["status"] == "regression" else ""
+        out.append(f"{r['case']:45s} {f(r['base_ms'])} {f(r['head_ms'])} {ratio}  {r['status']}{mark}")
+    return "\n".join(out)
+
+
+def _dump(data: Dict[str, Any], path: Optional[str]) -> None:
+    text = json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True) + "\n"
+    if path:
+        Path(path).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="BloodMap core benchmarks (headless)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run")
+    r.add_argument("-o", "--out")
+    r.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    r.add_argument("--quick", action="store_true", help="rounds=3, 샘플 목표 10ms")
+    r.add_argument("-k", "--select")
+    r.add_argument("--baseline", help="결과를 이 JSON 과 바로 비교")
+    r.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    r.add_argument("--min-ms", type=float, default=DEFAULT_MIN_MS)
+    r.add_argument("--list", action="store_true")
+    c = sub.add_parser("compare")
+    c.add_argument("base")
+    c.add_argument("head")
+    c.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    c.add_argument("--min-ms", type=float, default=DEFAULT_MIN_MS)
+    c.add_argument("--json", action="store_true", help="비교 결과를 JSON 으로")
+    a = ap.parse_args(argv)
+
+    if a.cmd == "run":
+        if a.list:
+            print("\n".join(cs.name for cs in _CASES))
+            return 0
+        rounds, target = (3, 10.0) if a.quick else (a.rounds, TARGET_SAMPLE_MS)
+        data = run(rounds, a.select, target, log=lambda s: print(s, file=sys.stderr))
+        _dump(data, a.out)
+        if a.baseline:
+            rows = compare(json.loads(Path(a.baseline).read_text(encoding="utf-8")), data, a.threshold, a.min_ms)
+            print(format_compare(rows), file=sys.stderr)
+            return 1 if any(x["status"] == "regression" for x in rows) else 0
+        return 0
+
+    base = json.loads(Path(a.base).read_text(encoding="utf-8"))
+    head = json.loads(Path(a.head).read_text(encoding="utf-8"))
+    rows = compare(base, head, a.threshold, a.min_ms)
+    if a.json:
+        _dump({"threshold": a.threshold, "min_ms": a.min_ms, "rows": rows}, None)
+    else:
+        print(format_compare(rows))
+    return 1 if any(x["status"] == "regression" for x in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 import streamlit as st
-import pandas as pd
 from datetime import date, datetime, timedelta
 
 # ---------- 숫자/포맷 유틸 ----------
@@ -47,6 +46,7 @@ def nickname_pin():
 def schedule_block():
     st.markdown("#### 📅 항암 스케줄(간단)")
     from datetime import date, timedelta
+    import pandas as pd  # 스케줄 표를 그릴 때만
     c1,c2,c3 = st.columns(3)
     with c1: start = st.date_input("시작일", value=date.today())
     with c2: cycle = st.number_input("주기(일)", min_value=1, step=1, value=21)
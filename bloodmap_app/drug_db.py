@@ -66,6 +66,14 @@ def picklist(keys, db=None):
 def key_from_label(label: str, db=None) -> str:
     if not label:
         return ""
+    if isinstance(db, dict) and db:
+        try:
+            from drug_index import get_index
+            k = get_index(db).label_to_key.get(label)
+            if k is not None:
+                return k
+        except Exception:
+            pass
     pos = label.find(" (")
     return label[:pos] if pos > 0 else label
 
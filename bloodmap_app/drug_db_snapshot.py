@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+drug_db_snapshot.py
+drug_db.ensure_onco_drug_db 패치 체인을 한 번만 돌려 만든 '완성본' 스냅샷
+- drug_db.py 내용의 SHA-256 이 파일명/헤더에 들어감 → 소스가 바뀔 때만 재빌드
+- 앱은 rerun마다 체인을 돌리지 않고 스냅샷 1회 read (프로세스 내에서는 bytes 재사용)
+- 반환값은 매번 새 dict (세션별 임시 등록이 공유본을 오염시키지 않도록)
+- 빌드 스텝: python bloodmap_app/drug_db_snapshot.py [--force]
+"""
+from __future__ import annotations
+import os, sys, pickle, hashlib, tempfile, threading
+import importlib.util
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+SNAPSHOT_FORMAT = 1
+DEFAULT_SOURCE = Path(__file__).resolve().parent / "drug_db.py"
+
+_LOCK = threading.Lock()
+# (source path, (mtime_ns, size), sha256, payload bytes)
+_MEM: Optional[Tuple[str, Tuple[int, int], str, bytes]] = None
+
+
+def _source(src=None) -> Path:
+    s = str(src or "")
+    if s.startswith("(sys.path)::"):
+        s = s.split("::", 1)[1]
+    p = Path(s) if s else DEFAULT_SOURCE
+    return p.resolve()
+
+
+def snapshot_dir() -> Path:
+    env = os.environ.get("BLOODMAP_SNAPSHOT_DIR")
+    if env:
+        base = Path(env)
+    else:
+        try:
+            from pathsafe import _pick_base_dir  # type: ignore
+            base = Path(_pick_base_dir()) / "cache"
+        except Exception:
+            base = Path(tempfile.gettempdir()) / "bloodmap" / "cache"
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def source_hash(src=None) -> str:
+    h = hashlib.sha256()
+    h.update(f"fmt={SNAPSHOT_FORMAT};py={sys.version_info[0]}.{sys.version_info[1]};".encode())
+    h.update(_source(src).read_bytes())
+    return h.hexdigest()
+
+
+def snapshot_path(digest: str) -> Path:
+    return snapshot_dir() / f"drug_db.{digest[:16]}.pkl"
+
+
+def _run_chain(src: Path) -> Dict[str, Any]:
+    # sys.modules["drug_db"]를 건드리지 않도록 별도 이름으로 로드
+    spec = importlib.util.spec_from_file_location("_drug_db_snapshot_src", str(src))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)  # type: ignore[union-attr]
+    db: Dict[str, Any] = {}
+    mod.ensure_onco_drug_db(db)
+    return db
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except Exception:
+            pass
+        raise
+
+
+def _prune(keep: Path) -> None:
+    for old in keep.parent.glob("drug_db.*.pkl"):
+        if old != keep:
+            try:
+                old.unlink()
+            except Exception:
+                pass
+
+
+def build_snapshot(src=None, force: bool = False) -> Path:
+    """체인을 실행해 스냅샷 파일을 만든다(이미 있으면 그대로). 경로 반환."""
+    p = _source(src)
+    digest = source_hash(p)
+    out = snapshot_path(digest)
+    if out.exists() and not force:
+        return out
+    db = _run_chain(p)
+    payload = pickle.dumps({"format": SNAPSHOT_FORMAT, "sha256": digest, "db": db},
+                           protocol=pickle.HIGHEST_PROTOCOL)
+    _write_atomic(out, payload)
+    _prune(out)
+    return out
+
+
+def _read_payload(path: Path, digest: str) -> Optional[bytes]:
+    try:
+        data = path.read_bytes()
+        head = pickle.loads(data)
+        if head.get("format") == SNAPSHOT_FORMAT and head.get("sha256") == digest:
+            return data
+    except Exception:
+        pass
+    return None
+
+
+def _payload_bytes(src=None) -> bytes:
+    global _MEM
+    p = _source(src)
+    st_ = p.stat()
+    stamp = (st_.st_mtime_ns, st_.st_size)
+    with _LOCK:
+        if _MEM and _MEM[0] == str(p) and _MEM[1] == stamp:
+            return _MEM[3]
+        digest = source_hash(p)
+        if _MEM and _MEM[0] == str(p) and _MEM[2] == digest:
+            _MEM = (str(p), stamp, digest, _MEM[3])
+            return _MEM[3]
+        path = snapshot_path(digest)
+        data = _read_payload(path, digest)
+        if data is None:
+            build_snapshot(p, force=True)
+            data = _read_payload(path, digest)
+        if data is None:
+            raise RuntimeError(f"drug_db snapshot unreadable: {path}")
+        _MEM = (str(p), stamp, digest, data)
+        return data
+
+
+def load_drug_db(src=None) -> Dict[str, Any]:
+    """완성된 DRUG_DB 사본(dict) 반환. 호출자가 수정해도 스냅샷은 안전."""
+    return pickle.loads(_payload_bytes(src))["db"]
+
+
+def snapshot_digest(src=None) -> str:
+    """현재 소스에 해당하는 스냅샷 해시(필요 시 빌드). 변경 감지용으로 저렴하게 호출 가능."""
+    _payload_bytes(src)
+    return _MEM[2]  # type: ignore[index]
+
+
+def current_hash() -> Optional[str]:
+    return _MEM[2] if _MEM else None
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="drug_db 스냅샷 빌드")
+    ap.add_argument("--src", default=None, help="drug_db.py 경로(기본: 같은 폴더)")
+    ap.add_argument("--force", action="store_true", help="해시가 같아도 재빌드")
+    a = ap.parse_args()
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    out = build_snapshot(a.src, force=a.force)
+    print(f"{out}  sha256={source_hash(a.src)}  entries={len(load_drug_db(a.src))}")
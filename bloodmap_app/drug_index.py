@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+drug_index.py
+DRUG_DB 역색인(별칭 → 키) — 선형 스캔 없이 O(1) 조회
+- 키/소문자 키/한글 alias/ALIAS_FALLBACK/KEY_ALIAS/_canonical_map_20251025/redirect_to
+- 표시 라벨(display_label) ↔ 키 양방향 맵
+- get_index(db): 같은 DB 객체(크기 동일)면 캐시 재사용, DB가 바뀌면 재빌드
+"""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+_MAX_CACHED = 8
+_LOCK = threading.Lock()
+# id(db) -> (db, len(db), index)   (db 참조를 쥐고 있으므로 id 재사용 없음)
+_CACHE: "OrderedDict[int, tuple]" = OrderedDict()
+
+
+@dataclass
+class AliasIndex:
+    db: Dict[str, Any]
+    by_lower: Dict[str, str] = field(default_factory=dict)
+    by_alias: Dict[str, str] = field(default_factory=dict)        # alias(정확히 일치) → 첫 키
+    by_alias_lower: Dict[str, str] = field(default_factory=dict)
+    by_name: Dict[str, str] = field(default_factory=dict)         # 외부 별칭표 → 캐노니컬 키
+    labels: Dict[str, str] = field(default_factory=dict)          # 키 → 표시 라벨
+    label_to_key: Dict[str, str] = field(default_factory=dict)
+
+    def match_pick(self, p: str) -> Optional[str]:
+        """auto_recs_by_dx 규칙 그대로: 키/소문자 키면 p 자체, 아니면 alias 일치하는 첫 키."""
+        if p in self.db or p.lower() in self.db:
+            return p
+        return self.by_alias.get(p)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """아무 표기(키/라벨/한글명/별칭) → 캐노니컬 키(redirect_to 따라감). 없으면 None."""
+        if not name:
+            return None
+        s = str(name).strip()
+        k = (s if s in self.db else None) or self.label_to_key.get(s) or self.by_lower.get(s.lower()) \
+            or self.by_alias.get(s) or self.by_alias_lower.get(s.lower()) \
+            or self.by_name.get(s) or self.by_name.get(s.lower())
+        if k is None:
+            return None
+        rec = self.db.get(k)
+        tgt = rec.get("redirect_to") if isinstance(rec, dict) else None
+        return tgt if tgt and tgt in self.db else k
+
+    def record(self, name: str) -> Optional[Dict[str, Any]]:
+        k = self.resolve(name)
+        return self.db.get(k) if k is not None else None
+
+
+def _label_fn():
+    try:
+        from drug_db import display_label  # type: ignore
+        return display_label
+    except Exception:
+        return lambda k, db=None: str(k)
+
+
+def _name_tables():
+    tables = []
+    try:
+        import drug_db  # type: ignore
+        fb = getattr(drug_db, "ALIAS_FALLBACK", {}) or {}
+        tables.append({ko: en for en, ko in fb.items()})
+        cm = getattr(drug_db, "_canonical_map_20251025", None)
+        if callable(cm):
+            tables.append(cm())
+    except Exception:
+        pass
+    try:
+        import onco_map  # type: ignore
+        tables.append(dict(getattr(onco_map, "KEY_ALIAS", {}) or {}))
+    except Exception:
+        pass
+    return tables
+
+
+def build_index(db: Dict[str, Any]) -> AliasIndex:
+    idx = AliasIndex(db=db)
+    label = _label_fn()
+    for k, rec in db.items():
+        if not isinstance(k, str):
+            continue
+        idx.by_lower.setdefault(k.lower(), k)
+        if isinstance(rec, dict):
+            a = rec.get("alias")
+            if isinstance(a, str) and a:
+                idx.by_alias.setdefault(a, k)
+                idx.by_alias_lower.setdefault(a.lower(), k)
+        try:
+            lb = label(k, db)
+        except Exception:
+            lb = str(k)
+        idx.labels[k] = lb
+        idx.label_to_key.setdefault(lb, k)
+    for table in _name_tables():
+        for name, tgt in table.items():
+            if not isinstance(name, str) or tgt not in db:
+                continue
+            idx.by_name.setdefault(name, tgt)
+            idx.by_name.setdefault(name.lower(), tgt)
+    return idx
+
+
+def get_index(db: Dict[str, Any]) -> AliasIndex:
+    """db 에 대한 역색인(캐시). 같은 객체·같은 크기면 재사용."""
+    key = id(db)
+    with _LOCK:
+        hit = _CACHE.get(key)
+        if hit and hit[0] is db and hit[1] == len(db):
+            _CACHE.move_to_end(key)
+            return hit[2]
+    idx = build_index(db)
+    with _LOCK:
+        _CACHE[key] = (db, len(db), idx)
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > _MAX_CACHED:
+            _CACHE.popitem(last=False)
+    return idx
+
+
+def invalidate() -> None:
+    with _LOCK:
+        _CACHE.clear()
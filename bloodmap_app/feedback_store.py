@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+feedback_store.py
+피드백 저장소 — SQLite(WAL) append-only
+- append()  : 한 건 INSERT (다중 워커 동시 기록 안전, 파일 재작성 없음)
+- query()/count() : 분류/페이지/기간/검색어/만족도 필터 + 페이지네이션(관리자 화면)
+- export_csv() : 필터 결과를 CSV 문자열로
+- feedback.csv(기존 파일·DB 쓰기 실패 시 폴백)는 migrate_csv 가 기록한 위치 이후 행만 이어서 이관
+"""
+from __future__ import annotations
+import csv, io, os, sqlite3, threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+COLUMNS = ["ts_kst", "name_or_nick", "contact", "category", "rating", "message", "page"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts_kst TEXT NOT NULL,
+    name_or_nick TEXT DEFAULT '',
+    contact TEXT DEFAULT '',
+    category TEXT DEFAULT '',
+    rating INTEGER,
+    message TEXT DEFAULT '',
+    page TEXT DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS ix_feedback_ts ON feedback(ts_kst);
+CREATE INDEX IF NOT EXISTS ix_feedback_cat_ts ON feedback(category, ts_kst);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_INIT_LOCK = threading.Lock()
+_INITED: set = set()
+_MIGRATED: Dict[Tuple[str, str], Optional[int]] = {}  # (csv, db) → 마지막으로 확인한 CSV 크기
+
+
+def default_path(base_dir: Optional[str] = None) -> str:
+    d = base_dir or os.environ.get("BLOODMAP_DATA_DIR") or os.path.join(os.path.expanduser("~"), ".bloodmap", "metrics")
+    os.makedirs(d, exist_ok=True)
+    return os.path.join(d, "feedback.sqlite3")
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    con = sqlite3.connect(db_path, timeout=15.0, isolation_level=None)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA busy_timeout=15000")
+    if db_path not in _INITED:
+        with _INIT_LOCK:
+            if db_path not in _INITED:
+                con.executescript(_SCHEMA)
+                _INITED.add(db_path)
+    return con
+
+
+def _rating(v) -> Optional[int]:
+    try:
+        return int(float(v))
+    except Exception:
+        return None
+
+
+def append(row: Dict[str, Any], db_path: str) -> int:
+    """피드백 1건 추가. 반환: row id."""
+    vals = [str(row.get(c, "") or "") for c in COLUMNS]
+    vals[4] = _rating(row.get("rating"))
+    con = connect(db_path)
+    try:
+        cur = con.execute(
+            "INSERT INTO feedback (ts_kst,name_or_nick,contact,category,rating,message,page) VALUES (?,?,?,?,?,?,?)",
+            vals)
+        return int(cur.lastrowid)
+    finally:
+        con.close()
+
+
+def _where(category=None, page=None, since=None, until=None, text=None, min_rating=None) -> Tuple[str, List[Any]]:
+    conds, args = [], []
+    if category:
+        cats = [category] if isinstance(category, str) else list(category)
+        if cats:
+            conds.append("category IN (%s)" % ",".join("?" * len(cats)))
+            args += cats
+    if page:
+        conds.append("page = ?"); args.append(page)
+    if since:
+        conds.append("ts_kst >= ?"); args.append(str(since))
+    if until:
+        conds.append("ts_kst < ?"); args.append(str(until))
+    if text:
+        conds.append("(message LIKE ? OR name_or_nick LIKE ? OR contact LIKE ?)")
+        like = f"%{text}%"
+        args += [like, like, like]
+    if min_rating:
+        conds.append("rating >= ?"); args.append(int(min_rating))
+    return ("WHERE " + " AND ".join(conds)) if conds else "", args
+
+
+def count(db_path: str, **filters) -> int:
+    w, args = _where(**filters)
+    con = connect(db_path)
+    try:
+        return int(con.execute(f"SELECT COUNT(*) FROM feedback {w}", args).fetchone()[0])
+    finally:
+        con.close()
+
+
+def query(db_path: str, limit: int = 50, offset: int = 0, newest_first: bool = True, **filters) -> List[Dict[str, Any]]:
+    """필터 + 페이지 조회(기본 최신순)."""
+    w, args = _where(**filters)
+    order = "DESC" if newest_first else "ASC"
+    con = connect(db_path)
+    try:
+        cur = con.execute(
+            f"SELECT {','.join(COLUMNS)} FROM feedback {w} ORDER BY ts_kst {order}, id {order} LIMIT ? OFFSET ?",
+            args + [int(limit), int(offset)])
+        return [dict(zip(COLUMNS, r)) for r in cur.fetchall()]
+    finally:
+        con.close()
+
+
+def iter_rows(db_path: str, batch: int = 1000, **filters) -> Iterable[Dict[str, Any]]:
+    w, args = _where(**filters)
+    con = connect(db_path)
+    try:
+        cur = con.execute(f"SELECT {','.join(COLUMNS)} FROM feedback {w} ORDER BY ts_kst, id", args)
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                break
+            for r in rows:
+                yield dict(zip(COLUMNS, r))
+    finally:
+        con.close()
+
+
+def export_csv(db_path: str, **filters) -> str:
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=COLUMNS)
+    w.writeheader()
+    for r in iter_rows(db_path, **filters):
+        w.writerow(r)
+    return buf.getvalue()
+
+
+def categories(db_path: str) -> List[str]:
+    con = connect(db_path)
+    try:
+        return [r[0] for r in con.execute("SELECT DISTINCT category FROM feedback ORDER BY category") if r[0]]
+    finally:
+        con.close()
+
+
+def _migrated_upto(con, key: str) -> Tuple[int, Optional[int]]:
+    """meta 기록 → (이관한 행 수, 이관한 바이트 위치). 예전 형식("n")은 위치를 모름(None)."""
+    r = con.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+    if not r:
+        return 0, 0
+    rows, _, off = str(r[0]).partition("@")
+    try:
+        return int(rows or 0), (int(off) if off else None)
+    except ValueError:
+        return 0, None
+
+
+def migrate_csv(csv_path: str, db_path: str) -> int:
+    """feedback.csv → DB 이관. meta 에 (행 수, 바이트 위치)를 기록하고 다음 호출 때는 그 뒤에 덧붙은 행만 가져옴
+    — DB 쓰기에 실패해 CSV 로 떨어진 피드백도 다음 이관 때 DB 로 들어감. 반환: 이번에 이관한 건수."""
+    if not csv_path or not os.path.exists(csv_path):
+        return 0
+    memo = (csv_path, db_path)
+    try:
+        size = os.path.getsize(csv_path)
+    except OSError:
+        return 0
+    if _MIGRATED.get(memo) == size:
+        return 0
+    con = connect(db_path)
+    try:
+        key = "migrated:" + os.path.abspath(csv_path)
+        done_rows, done_off = _migrated_upto(con, key)
+        if done_off == size:
+            _MIGRATED[memo] = size
+            return 0
+        n = 0
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            done_rows, done_off = _migrated_upto(con, key)
+            with open(csv_path, "rb") as f:
+                data = f.read()
+            end = data.rfind(b"\n") + 1  # 쓰는 중인 마지막 줄은 다음 번에 — 완결된 줄까지만
+            hdr_end = data.find(b"\n") + 1
+            if done_off is not None and done_off > len(data):
+                done_off, done_rows = 0, 0  # 파일이 새로 만들어짐
+            if not hdr_end or (done_off is not None and done_off >= end):
+                con.execute("ROLLBACK")
+                _MIGRATED[memo] = size
+                return 0
+            fields = next(csv.reader([data[:hdr_end].decode("utf-8-sig", "replace")]), None) or COLUMNS
+            body = data[max(done_off or 0, hdr_end):end].decode("utf-8", "replace")
+            rows = list(csv.DictReader(io.StringIO(body), fieldnames=fields))
+            if done_off is None:
+                rows = rows[done_rows:]  # 예전 기록(행 수만) — 이미 이관한 앞쪽 행은 건너뜀
+            for row in rows:
+                vals = [str(row.get(c, "") or "") for c in COLUMNS]
+                vals[4] = _rating(row.get("rating"))
+                con.execute(
+                    "INSERT INTO feedback (ts_kst,name_or_nick,contact,category,rating,message,page) VALUES (?,?,?,?,?,?,?)",
+                    vals)
+                n += 1
+            con.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, f"{done_rows + n}@{end}"))
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        _MIGRATED[memo] = size if end == size else None
+        return n
+    finally:
+        con.close()
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+font_manager.py
+PDF 폰트 관리 — 프로세스당 1회 탐색/파싱/등록
+- 탐색: 저장소 fonts/ → /mnt/data(FONT_MAP 경로) → env BLOODMAP_FONT_DIRS → 시스템 폰트 폴더
+- 파일별 검사 결과(임베드 가능 여부, 한글 커버리지)는 디스크에 기록 → 다음 프로세스는 실패할 폰트(CFF 아웃라인 OTF 등)를
+  다시 열지 않고, 한글을 못 그리는 폰트는 후보에서 바로 제외
+- TTF 는 한 번만 파싱해서 등록하고, 한글 서브셋(makeSubset 결과)을 메모해 같은 글자 구성의 PDF 재생성 시 재계산 생략
+- 쓸 수 있는 한글 TTF 가 없으면 한국어 CID 폰트(HYGothic-Medium) — 일본어 CID(HeiseiKakuGo)는 한글 글리프가 없음
+"""
+from __future__ import annotations
+import json, os, threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+FONT_EXTS = (".ttf", ".otf", ".ttc")
+HANGUL_RANGES: Sequence[Tuple[int, int]] = ((0xAC00, 0xD7A3), (0x1100, 0x11FF), (0x3130, 0x318F))
+CID_FALLBACKS = ("HYGothic-Medium", "HYSMyeongJo-Medium", "HeiseiKakuGo-W5")
+PROBE_VERSION = 1
+SUBSET_CACHE_MAX = 256
+
+_HERE = Path(__file__).resolve().parent
+_LOCK = threading.RLock()
+_DISCOVERED: Optional[List["FontInfo"]] = None
+_EXTRA: List[str] = []
+_LOADED: Dict[str, object] = {}          # path → TTFont (1회 파싱)
+_REGISTERED: Optional[Tuple[str, str]] = None
+_CHOSEN: List["FontInfo"] = []
+_STATS = {"parsed": 0, "probe_hit": 0, "subset_hit": 0, "subset_miss": 0}
+
+
+@dataclass
+class FontInfo:
+    path: str
+    name: str
+    weight: str            # Regular / Bold / Light / UltraLight
+    size: int
+    mtime_ns: int
+    ok: Optional[bool] = None
+    hangul: float = 0.0    # 한글 음절(AC00–D7A3) 커버리지 0~1
+    error: str = ""
+
+    @property
+    def key(self) -> str:
+        return f"{self.path}|{self.size}|{self.mtime_ns}"
+
+
+def search_dirs() -> List[str]:
+    dirs = [str(_HERE.parent / "fonts"), str(_HERE / "fonts"), "/mnt/data"]
+    dirs += [d for d in os.environ.get("BLOODMAP_FONT_DIRS", "").split(os.pathsep) if d]
+    dirs += ["/usr/share/fonts", "/usr/local/share/fonts", str(Path.home() / ".fonts"),
+             str(Path.home() / ".local/share/fonts"), "/Library/Fonts", "/System/Library/Fonts"]
+    out = []
+    for d in dirs:
+        if d not in out and os.path.isdir(d):
+            out.append(d)
+    return out
+
+
+def add_candidates(paths: Iterable[str]) -> None:
+    """추가 후보 경로(utils.pdf_utils.DEFAULT_FONT_PATHS 등). 등록 전에만 의미 있음."""
+    with _LOCK:
+        for p in paths or ():
+            if p and p not in _EXTRA:
+                _EXTRA.append(p)
+        if _DISCOVERED is not None:
+            known = {f.path for f in _DISCOVERED}
+            for p in _EXTRA:
+                fi = _info(p)
+                if fi is not None and fi.path not in known:
+                    _DISCOVERED.append(fi)
+
+
+def _weight(stem: str) -> str:
+    s = stem.lower()
+    for w in ("ultralight", "light", "bold"):
+        if w in s:
+            return {"ultralight": "UltraLight", "light": "Light", "bold": "Bold"}[w]
+    return "Regular"
+
+
+def _info(path: str) -> Optional[FontInfo]:
+    try:
+        st = os.stat(path)
+    except Exception:
+        return None
+    stem = Path(path).stem
+    return FontInfo(path=str(Path(path).resolve()), name=stem, weight=_weight(stem), size=st.st_size,
+                    mtime_ns=st.st_mtime_ns)
+
+
+def _walk(d: str, depth: int = 3) -> Iterable[str]:
+    base = d.rstrip(os.sep).count(os.sep)
+    for root, dirs, files in os.walk(d):
+        if root.count(os.sep) - base >= depth:
+            dirs[:] = []
+        for fn in files:
+            if fn.lower().endswith(FONT_EXTS):
+                yield os.path.join(root, fn)
+
+
+def discover(refresh: bool = False) -> List[FontInfo]:
+    """폰트 파일 목록(프로세스당 1회). /mnt/data 는 최상위만 봄(데이터 폴더라서)."""
+    global _DISCOVERED
+    with _LOCK:
+        if _DISCOVERED is not None and not refresh:
+            return _DISCOVERED
+        seen, out = set(), []
+        paths = list(_EXTRA)
+        for d in search_dirs():
+            paths += list(_walk(d, depth=1 if d == "/mnt/data" else 3))
+        for p in paths:
+            fi = _info(p)
+            if fi is None or fi.path in seen:
+                continue
+            seen.add(fi.path)
+            out.append(fi)
+        _DISCOVERED = out
+        return out
+
+
+# ---------- probe cache (디스크) ----------
+def _probe_path() -> Optional[str]:
+    d = os.environ.get("BLOODMAP_FONT_CACHE_DIR")
+    if not d:
+        try:
+            from pathsafe import _pick_base_dir  # type: ignore
+            d = os.path.join(_pick_base_dir(), "cache", "fonts")
+        except Exception:
+            return None
+    try:
+        os.makedirs(d, exist_ok=True)
+        return os.path.join(d, "probe.json")
+    except Exception:
+        return None
+
+
+def _probe_load() -> Dict[str, dict]:
+    p = _probe_path()
+    try:
+        with open(p, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == PROBE_VERSION:
+            return data.get("fonts", {})
+    except Exception:
+        pass
+    return {}
+
+
+def _probe_save(fonts: Dict[str, dict]) -> None:
+    p = _probe_path()
+    if not p:
+        return
+    tmp = f"{p}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": PROBE_VERSION, "fonts": fonts}, f, ensure_ascii=False)
+        os.replace(tmp, p)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+
+
+def _hangul_coverage(char_to_glyph) -> float:
+    lo, hi = HANGUL_RANGES[0]
+    total = hi - lo + 1
+    return sum(1 for c in range(lo, hi + 1) if c in char_to_glyph) / total
+
+
+def _memo_subsets(face) -> None:
+    """face.makeSubset(subset) 결과를 글자 구성(tuple)별로 메모 — 같은 서브셋은 재생성하지 않음."""
+    if getattr(face, "_bm_subset_memo", None) is not None:
+        return
+    orig = face.makeSubset
+    memo: "OrderedDict[tuple, bytes]" = OrderedDict()
+    lock = threading.Lock()
+
+    def makeSubset(subset):
+        key = tuple(subset)
+        with lock:
+            hit = memo.get(key)
+            if hit is not None:
+                memo.move_to_end(key)
+                _STATS["subset_hit"] += 1
+                return hit
+        data = orig(subset)
+        with lock:
+            _STATS["subset_miss"] += 1
+            memo[key] = data
+            while len(memo) > SUBSET_CACHE_MAX:
+                memo.popitem(last=False)
+        return data
+
+    face._bm_subset_memo = memo
+    face.makeSubset = makeSubset
+
+
+def _parse(fi: FontInfo, reg_name: str):
+    from reportlab.pdfbase.ttfonts import TTFont
+    f = _LOADED.get(fi.path)
+    if f is None:
+        f = TTFont(reg_name, fi.path)
+        _STATS["parsed"] += 1
+        _memo_subsets(f.face)
+        _LOADED[fi.path] = f
+    return f
+
+
+def probe(fonts: Optional[List[FontInfo]] = None) -> List[FontInfo]:
+    """각 폰트의 임베드 가능 여부/한글 커버리지. 디스크 기록이 있으면 파일을 열지 않음."""
+    fonts = discover() if fonts is None else fonts
+    cache = _probe_load()
+    dirty = False
+    with _LOCK:
+        for fi in fonts:
+            if fi.ok is not None:
+                continue
+            rec = cache.get(fi.key)
+            if rec is not None:
+                fi.ok, fi.hangul, fi.error = rec.get("ok"), float(rec.get("hangul", 0.0)), rec.get("error", "")
+                _STATS["probe_hit"] += 1
+                continue
+            try:
+                f = _parse(fi, "BM-" + fi.name)
+                fi.ok, fi.hangul = True, _hangul_coverage(f.face.charToGlyph)
+            except Exception as e:
+                fi.ok, fi.error = False, f"{type(e).__name__}: {e}"[:200]
+            cache[fi.key] = {"ok": fi.ok, "hangul": fi.hangul, "error": fi.error, "path": fi.path}
+            dirty = True
+    if dirty:
+        _probe_save(cache)
+    return fonts
+
+
+def korean_fonts(min_coverage: float = 0.9) -> List[FontInfo]:
+    """임베드 가능하고 한글 음절을 거의 다 가진 폰트(저장소 fonts/ 가 먼저)."""
+    return [f for f in probe() if f.ok and f.hangul >= min_coverage]
+
+
+def register_fonts(prefer: Sequence[str] = ()) -> Tuple[str, str]:
+    """(본문, 굵게) 폰트 이름. 프로세스당 1회 등록, 이후 호출은 즉시 반환."""
+    global _REGISTERED
+    if _REGISTERED is not None:
+        return _REGISTERED
+    with _LOCK:
+        if _REGISTERED is not None:
+            return _REGISTERED
+        from reportlab.pdfbase import pdfmetrics
+        kor = korean_fonts()
+        if prefer:
+            rank = {Path(p).resolve().as_posix(): i for i, p in enumerate(prefer)}
+            kor.sort(key=lambda f: rank.get(Path(f.path).as_posix(), len(rank)))
+        regular = next((f for f in kor if f.weight == "Regular"), kor[0] if kor else None)
+        bold = next((f for f in kor if f.weight == "Bold"), None)
+        chosen: List[FontInfo] = []
+        names = []
+        for fi, reg in ((regular, "KOR"), (bold, "KOR-Bold")):
+            if fi is None:
+                names.append(None)
+                continue
+            try:
+                f = _parse(fi, reg)
+                if f.fontName != reg:
+                    f.fontName = reg  # probe 때 임시 이름으로 파싱된 경우
+                pdfmetrics.registerFont(f)
+                names.append(reg)
+                chosen.append(fi)
+            except Exception:
+                names.append(None)
+        reg_name, bold_name = names
+        if reg_name is None:
+            from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+            for cid in CID_FALLBACKS:
+                try:
+                    pdfmetrics.registerFont(UnicodeCIDFont(cid))
+                    reg_name = cid
+                    break
+                except Exception:
+                    continue
+            reg_name = reg_name or "Helvetica"
+        _CHOSEN[:] = chosen
+        keep = {f.path for f in chosen}
+        for path in [p for p in _LOADED if p not in keep]:
+            _LOADED.pop(path, None)  # 검사용으로만 파싱한 폰트는 놓아줌
+        _REGISTERED = (reg_name, bold_name or reg_name)
+        return _REGISTERED
+
+
+def font_signature() -> tuple:
+    """후보 폰트 세트 식별자 — pdf_service 캐시 키용(앱 프로세스에서 호출됨).
+    폰트를 열거나 등록하지 않고 탐색 결과(경로/크기/mtime)만 씀 — probe.json 이 없는 첫 프로세스에서도
+    stat 만 하고, 어떤 후보가 바뀌면(=선택 결과가 바뀔 수 있으면) 키도 바뀜. 렌더 프로세스와 무관하게 같은 값."""
+    return (PROBE_VERSION,) + tuple(sorted((f.path, f.size, f.mtime_ns) for f in discover()))
+
+
+def report() -> List[dict]:
+    """진단용: 발견/검사된 폰트 목록."""
+    return [asdict(f) for f in probe()]
+
+
+def stats() -> Dict[str, int]:
+    return dict(_STATS, discovered=len(_DISCOVERED or []), loaded=len(_LOADED))
+
+
+def reset() -> None:
+    """테스트/폰트 교체용 — 다음 호출 때 다시 탐색(등록된 pdfmetrics 이름은 유지)."""
+    global _DISCOVERED, _REGISTERED
+    with _LOCK:
+        _DISCOVERED, _REGISTERED = None, None
+        _LOADED.clear()
+        _CHOSEN.clear()
@@ -3,6 +3,11 @@
 from __future__ import annotations
 import os, json, csv
 
+try:
+    import user_store as _db  # 통합 SQLite 저장소(있으면 df 는 DB 로)
+except Exception:
+    _db = None
+
 BASE_DIR = "/mnt/data/bloodmap_graph"
 
 def _ensure_dir(path=BASE_DIR):
@@ -40,7 +45,15 @@ def save(uid, fig=None, df=None, base_dir=BASE_DIR):
     except Exception:
         pass
 
-    # df 저장
+    # df 저장 — 통합 DB 가 있으면 (uid, ts) 행으로, 실패/미설치 시 기존 CSV
+    try:
+        if df is not None and _db is not None:
+            rows = df.to_dict("records") if hasattr(df, "to_dict") else list(df)
+            if rows and isinstance(rows[0], dict):
+                _db.save_labs(uid_s, rows)
+                df = None
+    except Exception:
+        pass
     try:
         if df is not None:
             if hasattr(df, "to_csv"):
@@ -74,3 +87,20 @@ def load(uid, base_dir=BASE_DIR):
         data = None
     csv_ok = csv_path if os.path.exists(csv_path) else None
     return data, csv_ok
+
+def load_rows(uid, base_dir=BASE_DIR):
+    """저장된 수치 행(list[dict], 시간순). DB 우선, 없으면 CSV."""
+    uid_s = _safe_uid(uid or "anonymous")
+    if _db is not None:
+        try:
+            rows = _db.query_labs(uid_s)
+            if rows:
+                return rows
+        except Exception:
+            pass
+    csv_path = os.path.join(base_dir, f"{uid_s}.labs.csv")
+    try:
+        with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+            return [dict(r) for r in csv.DictReader(f)]
+    except Exception:
+        return []
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+graph_render.py
+검사수치 그래프 렌더링(캐시 + 다운샘플링)
+- 캐시 키: (데이터 버전, 항목, 기간, 배치, 폭) → PNG bytes (LRU)
+- 폭(px)보다 긴 시계열은 LTTB(기본) 또는 min-max 로 줄여서 그림
+- 배치: 항목별 1장씩 / 한 그림에 전 항목(세로 다축, x축 공유)
+- pyplot 전역 상태를 쓰지 않는 Figure 객체로 그리고, 저장 직후 해제
+"""
+from __future__ import annotations
+import io, threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CACHE_MAX = 64
+DEFAULT_WIDTH_PX = 700
+DPI = 100
+
+_LOCK = threading.Lock()
+_CACHE: "OrderedDict[Hashable, List[bytes]]" = OrderedDict()
+_STATS = {"hit": 0, "miss": 0}
+
+
+# ---------- downsampling ----------
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets. 양 끝점 유지, n_out 개 점 반환."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    xf = x.astype(np.float64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    every = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        nlo, nhi = hi, min(int((i + 2) * every) + 1, n)
+        if nhi <= nlo:
+            nlo, nhi = n - 1, n
+        avg_x = xf[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        area = np.abs((xf[a] - avg_x) * (y[lo:hi] - y[a]) - (xf[a] - xf[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return x[idx], y[idx]
+
+
+def minmax(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """구간별 최소/최대 점 유지(스파이크 보존). 약 n_out 개 점."""
+    n = len(x)
+    buckets = max(1, n_out // 2)
+    if n <= n_out:
+        return x, y
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    keep: List[int] = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi <= lo:
+            continue
+        seg = y[lo:hi]
+        i1, i2 = lo + int(np.argmin(seg)), lo + int(np.argmax(seg))
+        keep.extend(sorted({i1, i2}))
+    keep_a = np.asarray(keep, dtype=np.int64)
+    return x[keep_a], y[keep_a]
+
+
+def downsample(x, y, max_points: int, method: str = "lttb"):
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    ok = ~np.isnan(y)
+    x, y = x[ok], y[ok]
+    if len(x) <= max_points:
+        return x, y
+    return (minmax if method == "minmax" else lttb)(x, y, max_points)
+
+
+# ---------- rendering ----------
+def _x_numeric(x) -> Tuple[np.ndarray, bool]:
+    arr = np.asarray(x)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype("datetime64[ms]").astype(np.int64), True
+    try:
+        return arr.astype(np.float64), False
+    except Exception:
+        return np.arange(len(arr), dtype=np.float64), False
+
+
+def _new_figure(nrows: int, width_px: int, height_px: int):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(width_px / DPI, height_px * nrows / DPI), dpi=DPI)
+    axes = fig.subplots(nrows, 1, sharex=True, squeeze=False)[:, 0]
+    return fig, list(axes)
+
+
+def _plot(ax, x, y, is_dt: bool, name: str, band=None):
+    xs = x.astype("datetime64[ms]") if is_dt else x
+    ax.plot(xs, y, marker="o" if len(y) <= 60 else None, markersize=3, linewidth=1.2)
+    ax.set_ylabel(name)
+    if band and len(band) == 2:
+        try:
+            ax.axhspan(float(band[0]), float(band[1]), alpha=0.15)
+        except Exception:
+            pass
+
+
+def _to_png(fig) -> bytes:
+    buf = io.BytesIO()
+    try:
+        fig.savefig(buf, format="png", bbox_inches="tight")
+        return buf.getvalue()
+    finally:
+        fig.clear()  # Figure 는 pyplot 에 등록되지 않으므로 clear 후 참조 해제로 즉시 회수
+
+
+def render(x, series: Dict[str, Any], combined: bool = False, width_px: int = DEFAULT_WIDTH_PX,
+           height_px: int = 260, method: str = "lttb", bands: Optional[Dict[str, Sequence[float]]] = None,
+           title_x: str = "시점") -> List[bytes]:
+    """series: {항목: y 배열}. combined=True 면 PNG 1장, 아니면 항목별 PNG 목록."""
+    xn, is_dt = _x_numeric(x)
+    bands = bands or {}
+    max_pts = max(16, int(width_px))
+    prepared = []
+    for name, y in series.items():
+        xs, ys = downsample(xn, y, max_pts, method)
+        if len(ys):
+            prepared.append((name, xs, ys))
+    if not prepared:
+        return []
+    out: List[bytes] = []
+    if combined:
+        fig, axes = _new_figure(len(prepared), width_px, height_px)
+        for ax, (name, xs, ys) in zip(axes, prepared):
+            _plot(ax, xs, ys, is_dt, name, bands.get(name))
+        axes[-1].set_xlabel(title_x)
+        fig.autofmt_xdate(rotation=45)
+        out.append(_to_png(fig))
+    else:
+        for name, xs, ys in prepared:
+            fig, axes = _new_figure(1, width_px, height_px)
+            _plot(axes[0], xs, ys, is_dt, name, bands.get(name))
+            axes[0].set_title(name)
+            axes[0].set_xlabel(title_x)
+            fig.autofmt_xdate(rotation=45)
+            out.append(_to_png(fig))
+    return out
+
+
+def render_cached(data_version: Hashable, period: Hashable, x, series: Dict[str, Any],
+                  combined: bool = False, width_px: int = DEFAULT_WIDTH_PX, **kw) -> List[bytes]:
+    """(데이터 버전, 항목, 기간, 배치, 폭) 키로 캐시된 PNG 목록. x/series 는 미스일 때만 사용."""
+    key = (data_version, tuple(series.keys()), period, bool(combined), int(width_px), kw.get("method", "lttb"))
+    with _LOCK:
+        hit = _CACHE.get(key)
+        if hit is not None:
+            _CACHE.move_to_end(key)
+            _STATS["hit"] += 1
+            return hit
+    pngs = render(x, series, combined=combined, width_px=width_px, **kw)
+    with _LOCK:
+        _STATS["miss"] += 1
+        _CACHE[key] = pngs
+        while len(_CACHE) > CACHE_MAX:
+            _CACHE.popitem(last=False)
+    return pngs
+
+
+def cache_info() -> Dict[str, int]:
+    with _LOCK:
+        return {"entries": len(_CACHE), "bytes": sum(len(b) for v in _CACHE.values() for b in v), **_STATS}
+
+
+def clear_cache() -> None:
+    with _LOCK:
+        _CACHE.clear()
@@ -0,0 +1,735 @@
+# -*- coding: utf-8 -*-
+"""
+lab_ingest.py
+검사수치 붙여넣기/파일 가져오기 엔진 (lab_store 로 스트리밍 저장)
+- 토크나이저: 미리 컴파일한 정규식 1개로 한 줄을 한 번만 훑음(날짜/단위/숫자/단어)
+- 인코딩 감지: BOM → UTF-8 → CP949(EUC-KR 상위 호환) → EUC-KR → latin-1
+- 구분자 감지: , \\t ; | 중 앞부분 줄에서 개수가 일정한 것, 없으면 공백 2칸 이상(병원 출력물 복사)
+- 레이아웃
+    rows : 한 줄 = 한 시점 (헤더: 날짜 + 항목들)          예) ts_kst,WBC,Hb,PLT …
+    wide : 날짜가 열 (헤더: 항목 + 날짜들)                 예) 검사항목  24-03-02  24-03-05 …
+    text : 자유 서술(퇴원요약 등) — "WBC 4.5", "Hb: 12.3 g/dL", "2024.03.02 PLT 50" …
+  한 입력 안에 섞여 있어도 됨(빈 줄 = 표 끝).
+- 단위 감지/환산: 단위가 적힌 값만 앱 기준 단위로(예: Hb g/L→g/dL, Cr µmol/L→mg/dL, WBC /µL→×10³/µL,
+  PLT ×10³/µL→/µL — 응급도/식이 가이드의 PLT<20000 과 같은 단위). 단위 없이 적힌 값은 입력 그대로
+- 자유 서술에서 짧거나 흔한 단어와 겹치는 별칭(K, P, Ca, got, 인 …)은 줄/목록 첫머리·구분자(:/=)·단위가 있을 때만
+- 큰 CSV 는 한 줄씩 읽어 BATCH_ROWS 단위로 lab_store.append_many
+"""
+from __future__ import annotations
+import codecs, csv, functools, io, re
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+BATCH_ROWS = 500
+SNIFF_BYTES = 64 * 1024
+SNIFF_LINES = 40
+DELIMITERS = (",", "\t", ";", "|")
+ENCODINGS = ("utf-8", "cp949", "euc-kr")
+MAX_BAD_CELLS = 200
+_BLANK_CELLS = {"", "-", "--", ".", "n/a", "na", "nd", "없음", "미시행"}
+
+# ---------- 항목 이름 ----------
+# 키: 소문자, 공백/점/하이픈/밑줄 제거
+_ALIASES: Dict[str, str] = {}
+for _canon, _names in {
+    "WBC": ("wbc", "백혈구", "whitebloodcell", "whitebloodcells", "leukocyte", "leukocytes"),
+    "Hb": ("hb", "hgb", "hemoglobin", "haemoglobin", "혈색소", "헤모글로빈"),
+    "PLT": ("plt", "platelet", "platelets", "혈소판"),
+    "ANC": ("anc", "절대호중구", "절대호중구수", "absoluteneutrophilcount", "호중구수"),
+    "CRP": ("crp", "creactiveprotein", "c반응단백", "c반응성단백"),
+    "Na": ("na", "sodium", "나트륨"),
+    "K": ("k", "potassium", "칼륨", "포타슘"),
+    "Cl": ("cl", "chloride", "염소"),
+    "Cr": ("cr", "crea", "creatinine", "크레아티닌"),
+    "Glu": ("glu", "glucose", "혈당", "포도당"),
+    "Ca": ("ca", "calcium", "칼슘"),
+    "P": ("p", "phosphorus", "phosphate", "인"),
+    "T.P": ("tp", "totalprotein", "총단백"),
+    "AST": ("ast", "sgot", "got"),
+    "ALT": ("alt", "sgpt", "gpt"),
+    "T.B": ("tb", "tbil", "totalbilirubin", "bilirubintotal", "총빌리루빈"),
+    "Alb": ("alb", "albumin", "알부민"),
+    "BUN": ("bun", "혈중요소질소", "요소질소"),
+    "UA": ("ua", "uricacid", "요산"),
+}.items():
+    for _n in _names:
+        _ALIASES[_n] = _canon
+_MAX_ALIAS_WORDS = 3
+
+WIDE_LABELS = {"항목", "검사", "검사명", "검사항목", "test", "item", "name", "analyte"}
+TS_NAMES = {"ts", "tskst", "date", "datetime", "time", "날짜", "일자", "일시", "검사일", "검사일자", "검사일시",
+            "채혈일", "채혈일시", "시각", "기록시각"}
+
+# ---------- 정규식(모듈 로드 시 1회 컴파일) ----------
+_UNIT_SRC = r"""
+    (?:[x×*]\s*)?10\s*(?:\^|\*\*|\*)?\s*[39³⁹]\s*/\s*(?:[uµμ]l|mm3|mm³|l)
+  | (?:cells|개)?\s*/\s*(?:[uµμ]l|mm3|mm³)
+  | [km]\s*/\s*[uµμ]l
+  | (?:mg|g)\s*/\s*(?:dl|l)
+  | (?:mmol|meq|[uµμ]mol)\s*/\s*l
+  | (?:iu|u)\s*/\s*l
+  | %
+"""
+_TOKEN = re.compile(r"""
+    (?P<kdate>(?P<ky>\d{4})\s*년\s*(?P<km>\d{1,2})\s*월\s*(?P<kd>\d{1,2})\s*일)
+  | (?P<date>(?P<y>\d{4}|\d{2})[-./](?P<m>\d{1,2})[-./](?P<d>\d{1,2})(?!\d)
+        (?:[ T]+(?P<hh>\d{1,2}):(?P<mi>\d{2})(?::\d{2})?)?)
+  | (?P<unit>(?<![a-z])(?:%s)(?![a-z]))
+  | (?P<num>[1-9]\d{0,2}(?:,\d{3})+(?:\.\d+)?(?![\d,])|\d+(?:[.,]\d+)?|[.,]\d+)
+  | (?P<word>[a-z가-힣](?:[a-z가-힣0-9]|[.\-](?=[a-z가-힣]))*)
+""" % _UNIT_SRC, re.I | re.X)
+_DATE_CELL = re.compile(r"""\s*(?:
+    (?P<ky>\d{4})\s*년\s*(?P<km>\d{1,2})\s*월\s*(?P<kd>\d{1,2})\s*일
+  | (?P<y>\d{4}|\d{2})[-./](?P<m>\d{1,2})[-./](?P<d>\d{1,2})
+  | (?P<m2>\d{1,2})[/.](?P<d2>\d{1,2})                      # 월/일만 — 표 헤더에서만(연도 추정)
+)(?:[ T]+(?P<hh>\d{1,2}):(?P<mi>\d{2})(?::\d{2})?)?\.?\s*$""", re.X)
+_WS_SPLIT = re.compile(r"\t| {2,}")
+_PLAIN_NUM = re.compile(r"\s*\d+(?:\.\d+)?\s*")   # 표 셀 대부분 — 토크나이저 없이 float()
+_THOUSANDS = re.compile(r"[1-9]\d{0,2}(?:,\d{3})+(?:\.\d+)?")
+_KEY_STRIP = re.compile(r"[\s.\-_]+")
+_UNIT_SPACE = re.compile(r"\s+")
+
+# ---------- 단위 ----------
+# 정규화된 단위 → {항목: 배율} (앱 기준 단위로 곱함). 표에 없는 조합은 그대로 둠.
+_COUNT_K = {"WBC": 1.0, "PLT": 1000.0, "ANC": 1000.0}      # ×10³/µL, ×10⁹/L
+_COUNT_1 = {"WBC": 0.001, "PLT": 1.0, "ANC": 1.0}         # /µL
+UNIT_FACTORS: Dict[str, Dict[str, float]] = {
+    "10^3/ul": _COUNT_K, "10^9/l": _COUNT_K, "k/ul": _COUNT_K,
+    "/ul": _COUNT_1, "10^6/ul": {},
+    "g/l": {"Hb": 0.1, "Alb": 0.1, "T.P": 0.1},
+    "g/dl": {"Hb": 1.0, "Alb": 1.0, "T.P": 1.0},
+    "mmol/l": {"Glu": 18.016, "Ca": 4.008, "BUN": 2.801, "P": 3.097, "Na": 1.0, "K": 1.0, "Cl": 1.0},
+    "meq/l": {"Na": 1.0, "K": 1.0, "Cl": 1.0},
+    "umol/l": {"Cr": 1 / 88.42, "T.B": 1 / 17.1, "UA": 1 / 59.48},
+    "mg/dl": {},
+    "u/l": {}, "mg/l": {}, "%": {},
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _unit_key(u: str) -> str:
+    s = _UNIT_SPACE.sub("", u.lower())
+    for a, b in (("µ", "u"), ("μ", "u"), ("×", ""), ("³", "3"), ("⁹", "9"), ("**", "^"), ("mm3", "ul"),
+                 ("cells", ""), ("개", "")):
+        s = s.replace(a, b)
+    if s.startswith("x"):
+        s = s[1:]
+    s = s.replace("10*", "10^")
+    if s.startswith("10") and not s.startswith("10^"):
+        s = "10^" + s[2:]
+    if s.startswith("m/ul"):
+        s = "10^6/ul"
+    return s
+
+
+# ---------- 작은 도우미 ----------
+def normalize_abbr(name: str, strict: bool = True) -> Optional[str]:
+    """항목 이름 → 앱 표준 약어(WBC/Hb/PLT/…). strict=False 면 모르는 이름은 대문자 그대로."""
+    key = _KEY_STRIP.sub("", (name or "").lower())
+    hit = _ALIASES.get(key)
+    if hit is None and "(" in (name or ""):
+        hit = _ALIASES.get(_KEY_STRIP.sub("", name.split("(", 1)[0].lower()))  # 'Hb(g/dL)'
+    if hit is not None or strict:
+        return hit
+    return (name or "").strip().upper().replace(" ", "") or None
+
+
+def parse_number(text: Any) -> Optional[float]:
+    """셀/문자열의 첫 숫자. '1,200' 은 천 단위, '4,5' 는 소수점으로 읽음."""
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    text = str(text)
+    if _PLAIN_NUM.fullmatch(text):
+        return float(text)
+    for m in _TOKEN.finditer(text):
+        if m.lastgroup == "num":
+            return _num(m.group("num"))
+    return None
+
+
+def _cell_value(cell: str) -> Tuple[Optional[float], Optional[str]]:
+    """표 셀 → (값, 셀 안에 적힌 단위). 예) '81 g/L' → (81.0, 'g/L'), '4.5 H' → (4.5, None)."""
+    if _PLAIN_NUM.fullmatch(cell):
+        return float(cell), None
+    toks = tokenize(cell)
+    for i, (kind, val) in enumerate(toks):
+        if kind == "num":
+            unit = toks[i + 1][1] if i + 1 < len(toks) and toks[i + 1][0] == "unit" else None
+            return val, unit
+    return None, None
+
+
+def _num(s: str) -> Optional[float]:
+    if "," in s:
+        s = s.replace(",", "") if _THOUSANDS.fullmatch(s) else s.replace(",", ".")
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def _mkdate(y, m, d, hh=None, mi=None, year: Optional[int] = None) -> Optional[datetime]:
+    try:
+        y = int(y) if y is not None else (year or datetime.now().year)
+        if y < 100:
+            y += 2000
+        return datetime(y, int(m), int(d), int(hh or 0), int(mi or 0))
+    except (TypeError, ValueError):
+        return None
+
+
+def _date_from_match(m: "re.Match", year: Optional[int] = None) -> Optional[datetime]:
+    g = m.groupdict()
+    if g.get("ky"):
+        return _mkdate(g["ky"], g["km"], g["kd"], g.get("hh"), g.get("mi"))
+    if g.get("y"):
+        return _mkdate(g["y"], g["m"], g["d"], g.get("hh"), g.get("mi"))
+    if g.get("m2"):
+        return _mkdate(None, g["m2"], g["d2"], g.get("hh"), g.get("mi"), year=year)
+    return None
+
+
+def parse_date_cell(cell: str, year: Optional[int] = None, allow_md: bool = True) -> Optional[datetime]:
+    """셀 전체가 날짜(시각)일 때만. 월/일만 있는 헤더는 year(기본: 올해)로 보완."""
+    cell = (cell or "").strip()
+    if len(cell) >= 10 and cell[4] == "-":
+        try:
+            return datetime.fromisoformat(cell)   # CSV 내보내기 대부분(YYYY-MM-DD[ HH:MM[:SS]])
+        except ValueError:
+            pass
+    m = _DATE_CELL.match(cell)
+    if m is None or (m.group("m2") and not allow_md):
+        return None
+    return _date_from_match(m, year)
+
+
+def convert(abbr: str, value: float, unit: Optional[str]) -> Tuple[float, Optional[str]]:
+    """(앱 기준 단위 값, 환산에 쓴 단위 키 또는 None). 단위가 없으면 항상 그대로(크기로 단위를 추측하지 않음)."""
+    if unit:
+        uk = _unit_key(unit)
+        f = UNIT_FACTORS.get(uk, {}).get(abbr)
+        if f is not None and f != 1.0:
+            return round(value * f, 4), uk
+    return value, None
+
+
+def _spans(line: str) -> List[Tuple[str, Any, int, int]]:
+    """한 줄 → [(종류, 값, 시작, 끝)] — 종류: date / unit / num / word. 구두점·괄호는 버림."""
+    out: List[Tuple[str, Any, int, int]] = []
+    for m in _TOKEN.finditer(line):
+        kind = m.lastgroup  # 바깥 그룹 이름(kdate/date/unit/num/word)
+        if kind in ("kdate", "date"):
+            dt = _date_from_match(m)
+            if dt is not None:
+                out.append(("date", dt, m.start(), m.end()))
+            continue
+        if kind == "unit":
+            out.append(("unit", m.group("unit"), m.start(), m.end()))
+        elif kind == "num":
+            v = _num(m.group("num"))
+            if v is not None:
+                out.append(("num", v, m.start(), m.end()))
+        elif kind == "word":
+            out.append(("word", m.group("word"), m.start(), m.end()))
+    return out
+
+
+def tokenize(line: str) -> List[Tuple[str, Any]]:
+    """한 줄 → [(종류, 값)] — 종류: date / unit / num / word. 구두점·괄호는 버림."""
+    return [(k, v) for k, v, _, _ in _spans(line)]
+
+
+def _match_analyte(toks: List[Tuple[str, Any]], i: int) -> Tuple[Optional[str], int]:
+    """toks[i] 부터 최대 3단어를 이어 붙여 가장 긴 별칭 일치 → (약어, 소비한 토큰 수)."""
+    words: List[str] = []
+    best, used = None, 0
+    for j in range(i, min(len(toks), i + _MAX_ALIAS_WORDS)):
+        kind, val = toks[j]
+        if kind != "word":
+            break
+        words.append(val)
+        hit = _ALIASES.get(_KEY_STRIP.sub("", "".join(words).lower()))
+        if hit is not None:
+            best, used = hit, j - i + 1
+    return best, used
+
+
+# ---------- 결과 ----------
+@dataclass
+class LabPoint:
+    ts: Optional[datetime]
+    values: Dict[str, float]
+    layout: str = "text"
+    line: int = 0          # 원본 줄 번호(1부터; 표/서술 블록은 첫 값이 나온 줄)
+
+
+@dataclass
+class IngestReport:
+    encoding: str = ""
+    delimiter: str = ""
+    lines: int = 0
+    points: int = 0
+    values: int = 0
+    stored: int = 0
+    layouts: Dict[str, int] = field(default_factory=dict)
+    converted: Dict[str, int] = field(default_factory=dict)   # "Hb g/l" → 건수
+    conversions: List[Tuple[str, float, str, float]] = field(default_factory=list)   # (항목, 원값, 단위, 환산값) — 화면 표시용, MAX_BAD_CELLS 까지
+    unknown_headers: List[str] = field(default_factory=list)
+    bad_cells: List[Tuple[int, str, str]] = field(default_factory=list)   # (줄, 항목, 원문) — MAX_BAD_CELLS 까지
+    bad_cell_count: int = 0
+
+    def note(self, pt: LabPoint) -> None:
+        self.points += 1
+        self.values += len(pt.values)
+        self.layouts[pt.layout] = self.layouts.get(pt.layout, 0) + 1
+
+    def bad(self, line: int, abbr: str, cell: str) -> None:
+        """표 셀이 비어 있지 않은데 숫자가 아님(가져오기 검증 보고용)."""
+        self.bad_cell_count += 1
+        if len(self.bad_cells) < MAX_BAD_CELLS:
+            self.bad_cells.append((line, abbr, cell.strip()[:40]))
+
+
+# ---------- 한 줄(자유 서술) ----------
+# 짧거나 일반 단어와 겹치는 별칭 — 자유 서술에서는 위치/구분자/단위 근거가 있어야 항목으로 읽음
+AMBIGUOUS_ALIASES = {"k", "p", "na", "ca", "cl", "cr", "tb", "tp", "ua", "got", "gpt", "인"}
+_LIST_SEP = re.compile(r"(?:^|[,;|/\t·•]|\s-\s)[\s\-*•·]*$")   # 줄/목록 항목의 첫머리
+_VALUE_SEP = re.compile(r"\s*[:=]\s*$")                           # 'K: 3.1', 'P=4.5'
+_AFTER_OK = re.compile(r"\s*(?:$|[,;|)\]]|[hl]\b|\(?[hl]\)|[↑↓*])", re.I)   # 값 뒤: 끝/구분자/H·L 표시
+
+
+def _ambiguous_ok(line: str, toks: List[Tuple[str, Any, int, int]], i: int, used: int, j_num: int,
+                  unit: Optional[str], in_run: bool) -> bool:
+    """
+    toks[i:i+used] 가 애매한 별칭일 때 뒤의 숫자 toks[j_num] 을 그 항목 값으로 볼지.
+    - 'CA-125', 'CA 19-9' 처럼 별칭/숫자에 하이픈으로 코드가 붙으면 항목 아님
+    - 구분자(: =) 또는 단위가 있으면 항목
+    - 줄/목록 첫머리거나 바로 앞이 항목 값(“Na 140 K 4.1”)이면, 숫자 뒤가 끝/구분자/단위/다른 항목/H·L 일 때만
+    """
+    a_end = toks[i + used - 1][3]
+    n_start, n_end = toks[j_num][2], toks[j_num][3]
+    if line[a_end:a_end + 1] == "-" or line[n_end:n_end + 2][:1] == "-" and line[n_end + 1:n_end + 2].isdigit():
+        return False
+    if unit is not None or _VALUE_SEP.search(line[a_end:n_start]):
+        return True
+    if not (in_run or _LIST_SEP.search(line[:toks[i][2]])):
+        return False
+    if _AFTER_OK.match(line, n_end):
+        return True
+    k = j_num + 1
+    return k < len(toks) and toks[k][0] == "word" and _match_analyte([(t[0], t[1]) for t in toks], k)[0] is not None
+
+
+def scan_text_line(line: str, report: Optional[IngestReport] = None) -> Tuple[Optional[datetime], Dict[str, float]]:
+    """(줄에서 본 첫 날짜, {약어: 값}). "WBC 4.5 Hb 12.1 PLT 50" 처럼 한 줄 여러 항목 지원."""
+    toks = _spans(line)
+    plain = [(t[0], t[1]) for t in toks]
+    when: Optional[datetime] = None
+    vals: Dict[str, float] = {}
+    in_run = False   # 바로 앞 토큰들이 '항목 값' 이었는지
+    i, n = 0, len(toks)
+    while i < n:
+        kind, val = plain[i]
+        if kind == "date":
+            when = when or val
+            i += 1
+            continue
+        if kind != "word":
+            in_run = False
+            i += 1
+            continue
+        abbr, used = _match_analyte(plain, i)
+        if abbr is None:
+            in_run = False
+            i += 1
+            continue
+        j = i + used
+        unit = None
+        if j < n and plain[j][0] == "unit":
+            unit = plain[j][1]
+            j += 1
+        if j < n and plain[j][0] == "num":
+            j_num = j
+            v = plain[j][1]
+            j += 1
+            if unit is None and j < n and plain[j][0] == "unit":
+                unit = plain[j][1]
+                j += 1
+            alias = _KEY_STRIP.sub("", "".join(plain[x][1] for x in range(i, i + used)).lower())
+            if alias in AMBIGUOUS_ALIASES and not _ambiguous_ok(line, toks, i, used, j_num, unit, in_run):
+                in_run = False
+                i += 1
+                continue
+            if abbr not in vals:
+                vals[abbr] = _convert_noted(abbr, v, unit, report)
+            in_run = True
+            i = j
+            continue
+        in_run = False
+        i += 1
+    return when, vals
+
+
+def _convert_noted(abbr: str, v: float, unit: Optional[str], report: Optional[IngestReport]) -> float:
+    out, used = convert(abbr, v, unit)
+    if used and report is not None:
+        k = f"{abbr} {used}"
+        report.converted[k] = report.converted.get(k, 0) + 1
+        if len(report.conversions) < MAX_BAD_CELLS:
+            report.conversions.append((abbr, v, str(unit), out))
+    return out
+
+
+def conversion_note(report: IngestReport, limit: int = 6) -> str:
+    """화면 표시용 — "PLT 23 x10^3/uL → 23000, Hb 81 g/L → 8.1" (환산이 없으면 빈 문자열)."""
+    if not report.converted:
+        return ""
+    shown = [f"{a} {v:g} {u} → {o:g}" for a, v, u, o in report.conversions[:limit]]
+    total = sum(report.converted.values())
+    if total > len(shown):
+        shown.append(f"외 {total - len(shown)}건")
+    return ", ".join(shown)
+
+
+def _cell_analyte(cell: str, strict: bool = False) -> Tuple[Optional[str], Optional[str]]:
+    """
+    헤더/라벨 셀 → (약어, 단위). 예) 'Hb(g/dL)', 'WBC [x10^3/uL]', '총 빌리루빈'.
+    strict: 셀에 항목 이름(같은 항목의 다른 표기 포함)과 단위 말고 다른 것이 있으면 항목 셀로 보지 않음(헤더 판정용).
+    """
+    toks = tokenize(cell)
+    if not toks or toks[0][0] != "word":
+        return None, None
+    abbr, used = _match_analyte(toks, 0)
+    if abbr is None:
+        return None, None
+    unit = None
+    i = used
+    while i < len(toks):
+        kind, val = toks[i]
+        if kind == "unit":
+            unit = unit or val
+            i += 1
+            continue
+        if kind == "word":
+            other, n = _match_analyte(toks, i)
+            if other == abbr:
+                i += n
+                continue
+        if strict:
+            return None, None
+        i += 1
+    return abbr, unit
+
+
+def _is_unit_cell(cell: str) -> bool:
+    m = _TOKEN.fullmatch(cell.strip())
+    return m is not None and m.lastgroup == "unit"
+
+
+# ---------- 표 헤더 ----------
+@dataclass
+class _Header:
+    kind: str                                   # rows / wide
+    cols: Dict[int, Tuple[str, Optional[str]]]  # rows: 열 → (약어, 단위)
+    ts_col: Optional[int] = None
+    dates: Dict[int, datetime] = field(default_factory=dict)   # wide: 열 → 시점
+    unit_col: Optional[int] = None
+
+
+def _header(cells: List[str], year: Optional[int], report: Optional[IngestReport]) -> Optional[_Header]:
+    stripped = [c.strip() for c in cells]
+    dates = {i: dt for i, c in enumerate(stripped) if c and (dt := parse_date_cell(c, year)) is not None}
+    if dates:
+        rest = [c for i, c in enumerate(stripped) if i not in dates and c]
+        labelled = any(_KEY_STRIP.sub("", c.lower()) in WIDE_LABELS for c in rest)
+        if (len(dates) >= 2 or labelled) and all(parse_number(c) is None for c in rest):
+            unit_col = next((i for i, c in enumerate(stripped) if _KEY_STRIP.sub("", c.lower()) in ("단위", "unit", "units")), None)
+            return _Header("wide", {}, dates=dates, unit_col=unit_col)
+        return None
+    cols: Dict[int, Tuple[str, Optional[str]]] = {}
+    ts_col = None
+    unknown = []
+    for i, c in enumerate(stripped):
+        if not c:
+            continue
+        if ts_col is None and _KEY_STRIP.sub("", c.lower()) in TS_NAMES:
+            ts_col = i
+            continue
+        abbr, unit = _cell_analyte(c, strict=True)
+        if abbr is not None and abbr not in [a for a, _ in cols.values()]:
+            cols[i] = (abbr, unit)
+        elif parse_number(c) is not None:
+            return None   # 숫자가 섞인 줄은 데이터 줄
+        else:
+            unknown.append(c)
+    if len(cols) >= 2 or (cols and ts_col is not None):
+        if report is not None:
+            report.unknown_headers.extend(u for u in unknown if u not in report.unknown_headers)
+        return _Header("rows", cols, ts_col=ts_col)
+    return None
+
+
+# ---------- 줄 스트림 → 시점 ----------
+def _rows(lines: Iterable[str], delimiter: Optional[str]) -> Iterator[Tuple[str, List[str]]]:
+    """(원문 줄, 셀 목록). 구분자가 있으면 csv.reader 하나로(따옴표 처리), 없으면 공백 2칸/탭으로 나눔."""
+    if not delimiter:
+        for raw in lines:
+            line = raw.rstrip("\r\n")
+            yield line, _WS_SPLIT.split(line.strip())
+        return
+    last = [""]
+
+    def _tap():
+        for raw in lines:
+            last[0] = raw.rstrip("\r\n")
+            yield last[0]
+
+    for cells in csv.reader(_tap(), delimiter=delimiter):
+        yield last[0], cells
+
+
+def iter_points_from_lines(lines: Iterable[str], delimiter: Optional[str] = None, year: Optional[int] = None,
+                           report: Optional[IngestReport] = None) -> Iterator[LabPoint]:
+    """
+    줄 단위 상태 기계: 헤더를 찾으면 표(rows/wide), 아니면 자유 서술.
+    rows 는 줄마다 바로 내보내고, wide/자유 서술은 블록(빈 줄/파일 끝)마다 시점별로 합쳐 내보냄.
+    """
+    rep = report if report is not None else IngestReport()
+    header: Optional[_Header] = None
+    pending: Dict[Optional[datetime], Dict[str, float]] = {}
+    pending_meta: Dict[Optional[datetime], Tuple[str, int]] = {}
+    context: Optional[datetime] = None
+
+    def _flush():
+        for ts, vals in pending.items():
+            if vals:
+                kind, first = pending_meta.get(ts, ("text", 0))
+                pt = LabPoint(ts, vals, kind, first)
+                rep.note(pt)
+                yield pt
+        pending.clear()
+        pending_meta.clear()
+
+    def _add(ts, vals, kind):
+        bucket = pending.setdefault(ts, {})
+        for k, v in vals.items():
+            bucket.setdefault(k, v)
+        pending_meta.setdefault(ts, (kind, rep.lines))
+
+    for line, cells in _rows(lines, delimiter):
+        rep.lines += 1
+        if not line.strip():
+            header = None
+            context = None
+            yield from _flush()
+            continue
+        if header is not None and len(cells) < 2:
+            header = None   # 표가 끝나고 서술이 시작됨
+        if header is None and len(cells) >= 2:
+            header = _header(cells, year, rep)
+            if header is not None:
+                continue
+        if header is not None and header.kind == "rows":
+            ts = None
+            if header.ts_col is not None and header.ts_col < len(cells):
+                ts = parse_date_cell(cells[header.ts_col], year, allow_md=False)
+            if ts is None:
+                ts = next((dt for i, c in enumerate(cells) if i not in header.cols
+                           and (dt := parse_date_cell(c, year, allow_md=False)) is not None), None)
+            vals = {}
+            for i, (abbr, unit) in header.cols.items():
+                if i < len(cells):
+                    v, cell_unit = _cell_value(cells[i])
+                    if v is not None:
+                        vals[abbr] = _convert_noted(abbr, v, cell_unit or unit, rep)
+                    elif cells[i].strip().lower() not in _BLANK_CELLS:
+                        rep.bad(rep.lines, abbr, cells[i])
+            if vals:
+                pt = LabPoint(ts, vals, "rows", rep.lines)
+                rep.note(pt)
+                yield pt
+                continue
+        if header is not None and header.kind == "wide":
+            label_idx = next((i for i, c in enumerate(cells) if i not in header.dates and c.strip()), None)
+            abbr, unit = _cell_analyte(cells[label_idx]) if label_idx is not None else (None, None)
+            if abbr is not None:
+                if unit is None and header.unit_col is not None and header.unit_col < len(cells):
+                    unit = cells[header.unit_col].strip() or None
+                if unit is None:
+                    unit = next((c.strip() for i, c in enumerate(cells)
+                                 if i not in header.dates and i != label_idx and _is_unit_cell(c)), None)
+                for i, ts in header.dates.items():
+                    if i < len(cells):
+                        v, cell_unit = _cell_value(cells[i])
+                        if v is not None:
+                            _add(ts, {abbr: _convert_noted(abbr, v, cell_unit or unit, rep)}, "wide")
+                        elif cells[i].strip().lower() not in _BLANK_CELLS:
+                            rep.bad(rep.lines, abbr, cells[i])
+                continue
+            # 항목 줄이 아니면(소제목 등) 자유 서술로
+        when, vals = scan_text_line(line, rep)
+        if when is not None:
+            context = when
+        if vals:
+            _add(context, vals, "text")
+    yield from _flush()
+
+
+# ---------- 감지 ----------
+def detect_encoding(sample: bytes) -> str:
+    if sample.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    for enc in ENCODINGS:
+        try:
+            # 끝부분이 멀티바이트 중간에서 잘렸을 수 있으므로 증분 디코더(final=False)
+            codecs.getincrementaldecoder(enc)().decode(sample, final=False)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+def detect_delimiter(lines: Sequence[str]) -> Optional[str]:
+    """앞부분 줄에서 구분자 개수가 일정(>=1)한 줄이 가장 많은 것. 없으면 None(공백 정렬/자유 서술)."""
+    rows = [ln for ln in lines if ln.strip()][:SNIFF_LINES]
+    if not rows:
+        return None
+    best, best_score = None, 0
+    for d in DELIMITERS:
+        counts = [ln.count(d) for ln in rows]
+        nz = [c for c in counts if c]
+        if not nz:
+            continue
+        mode = max(set(nz), key=nz.count)
+        score = sum(1 for c in counts if c == mode)
+        if score >= max(2, len(rows) // 2) and score > best_score:
+            best, best_score = d, score
+    return best
+
+
+# ---------- 입력 열기 ----------
+def _open_binary(src) -> Tuple[io.BufferedIOBase, bool]:
+    """(바이너리 스트림, 닫아야 하는지). src: 경로 / bytes / 바이너리 파일 객체(Streamlit UploadedFile 포함)."""
+    if isinstance(src, (str, Path)):
+        return open(src, "rb"), True
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        return io.BytesIO(bytes(src)), True
+    if hasattr(src, "read"):
+        return src, False
+    raise TypeError(f"unsupported source: {type(src).__name__}")
+
+
+def iter_points(src, encoding: Optional[str] = None, delimiter: Optional[str] = None, year: Optional[int] = None,
+                report: Optional[IngestReport] = None) -> Iterator[LabPoint]:
+    """파일/바이트를 한 줄씩 디코딩하며 시점을 내보냄(전체를 메모리에 올리지 않음)."""
+    rep = report if report is not None else IngestReport()
+    fh, close = _open_binary(src)
+    try:
+        start = fh.tell() if fh.seekable() else None
+        sample = fh.read(SNIFF_BYTES)
+        if start is not None:
+            fh.seek(start)
+            body = fh
+        else:
+            body = io.BufferedReader(_Prefixed(sample, fh))
+        enc = encoding or detect_encoding(sample)
+        if delimiter is None:
+            delimiter = detect_delimiter(sample.decode(enc, errors="ignore").splitlines())
+        rep.encoding, rep.delimiter = enc, delimiter or "whitespace"
+        text = io.TextIOWrapper(body, encoding=enc, errors="replace", newline="")
+        try:
+            yield from iter_points_from_lines(text, delimiter, year, rep)
+        finally:
+            try:
+                text.detach()
+            except Exception:
+                pass
+    finally:
+        if close:
+            fh.close()
+
+
+class _Prefixed(io.RawIOBase):
+    """되감을 수 없는 스트림 앞에 이미 읽은 샘플을 다시 붙임."""
+
+    def __init__(self, head: bytes, rest):
+        self._head, self._rest = memoryview(head), rest
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if len(self._head):
+            n = min(len(b), len(self._head))
+            b[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._rest.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+def parse_text(text: str, year: Optional[int] = None, report: Optional[IngestReport] = None) -> List[LabPoint]:
+    """붙여넣은 텍스트 → 시점 목록(입력 순서)."""
+    rep = report if report is not None else IngestReport()
+    lines = text.splitlines()
+    delimiter = detect_delimiter(lines)
+    rep.encoding, rep.delimiter = "text", delimiter or "whitespace"
+    return list(iter_points_from_lines(lines, delimiter, year, rep))
+
+
+def latest_values(points: Sequence[LabPoint]) -> Dict[str, float]:
+    """항목별 가장 최근 값(날짜 없는 값은 날짜 있는 값보다 우선 — 방금 붙여넣은 현재 수치로 봄)."""
+    out: Dict[str, float] = {}
+    stamp: Dict[str, datetime] = {}
+    for pt in points:
+        for k, v in pt.values.items():
+            if pt.ts is None:
+                if k not in out or k in stamp:
+                    out[k] = v
+                    stamp.pop(k, None)
+            elif k not in out or (k in stamp and pt.ts >= stamp[k]):
+                out[k] = v
+                stamp[k] = pt.ts
+    return out
+
+
+# ---------- lab_store 로 저장 ----------
+def store_points(uid, points: Iterable[LabPoint], default_ts: Optional[datetime] = None, batch: int = BATCH_ROWS,
+                 report: Optional[IngestReport] = None) -> IngestReport:
+    """시점들 → lab_store.append_many (batch 시점마다 한 번 잠그고 씀, 압축은 끝나고 1회)."""
+    import lab_store  # type: ignore
+    rep = report if report is not None else IngestReport()
+    fallback = default_ts or datetime.now()
+    buf: List[Tuple[Any, Dict[str, float]]] = []
+    for pt in points:
+        buf.append((pt.ts or fallback, pt.values))
+        if len(buf) >= batch:
+            rep.stored += lab_store.append_many(uid, buf, autocompact=False)
+            buf = []
+    if buf:
+        rep.stored += lab_store.append_many(uid, buf, autocompact=False)
+    if rep.stored >= lab_store.COMPACT_ROWS:
+        lab_store.compact(uid)   # 작은 가져오기는 다음 append 때 평소 규칙대로 압축
+    return rep
+
+
+def ingest(uid, src, encoding: Optional[str] = None, delimiter: Optional[str] = None, year: Optional[int] = None,
+           default_ts: Optional[datetime] = None, batch: int = BATCH_ROWS) -> IngestReport:
+    """
+    파일 경로/바이트/업로드 파일 → lab_store.append_many (batch 시점마다 한 번 잠그고 씀).
+    날짜 없는 값은 default_ts(기본: 지금) 시점으로 저장.
+    """
+    rep = IngestReport()
+    return store_points(uid, iter_points(src, encoding, delimiter, year, rep), default_ts, batch, rep)
+
+
+def ingest_text(uid, text: str, year: Optional[int] = None, default_ts: Optional[datetime] = None,
+                batch: int = BATCH_ROWS) -> IngestReport:
+    """붙여넣은 텍스트 → lab_store."""
+    rep = IngestReport()
+    return store_points(uid, parse_text(text, year, rep), default_ts, batch, rep)
@@ -0,0 +1,480 @@
+# -*- coding: utf-8 -*-
+"""
+lab_store.py
+사용자별 검사수치 시계열 저장소(append-only, 컬럼형)
+- 디렉터리: <data>/lab_store/<uid>/
+    schema.json      : {"gen": n, "columns": [...], "rows": m}  (원자적 교체 = 커밋 지점)
+    seg.<gen>/       : ts.npy(int64, ms) + <컬럼>.npy(float64, 결측 NaN) — ts 오름차순
+    wal.<gen>.log    : 압축 전 추가분(한 줄 = ts_ms \\t {"컬럼": 값} JSON)
+- append  : WAL 끝에 줄 추가 — WAL 줄 수는 (gen, 파일 크기)와 함께 기억해 다시 읽지 않음(O(1))
+- query   : 세그먼트는 mmap + searchsorted 로 요청 구간만 슬라이스, WAL은 작게 유지
+- compact : 세그먼트+WAL 병합 → 새 gen 커밋 → 이전 gen 삭제 (WAL이 COMPACT_ROWS 넘으면 자동)
+            전체 이력을 다시 쓰므로 O(N) — COMPACT_ROWS 건마다 1회라 append 당 분할상환 O(N/COMPACT_ROWS)
+- 잠금    : 쓰기/압축/조회 모두 사용자 잠금 안에서 — 조회 중 이전 gen 파일이 지워지지 않음
+- uid → 디렉터리 이름은 %XX 이스케이프(충돌 없음; "nick#12345" ≠ "nick1#2345")
+시간은 앱과 같은 KST naive 시각을 그대로 ms 로 인코딩(타임존 변환 없음).
+"""
+from __future__ import annotations
+import io, os, re, json, math, shutil, tempfile, threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl  # type: ignore
+except Exception:  # Windows 등
+    fcntl = None
+
+COMPACT_ROWS = 256
+_EPOCH = datetime(1970, 1, 1)
+_LOCKS: Dict[str, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+# uid -> (version, columns, ts, {col: arr})  — 프로세스 내 WAL 파싱 캐시
+_WAL_CACHE: Dict[str, tuple] = {}
+# uid 디렉터리 -> (gen, WAL 바이트 크기, 줄 수) — append 가 WAL 을 다시 파싱하지 않도록
+_WAL_LEN: Dict[str, Tuple[int, int, int]] = {}
+_DOT_DATE = re.compile(r"^(\d{4})\.(\d{1,2})\.(\d{1,2})(?=$|[ T])")
+
+
+def base_dir(root: Optional[str] = None) -> Path:
+    """저장소 루트: root 지정(예: 다른 데이터 폴더의 DB 옆) > env BLOODMAP_LAB_STORE_DIR > 기본 데이터 폴더/lab_store."""
+    env = root or os.environ.get("BLOODMAP_LAB_STORE_DIR")
+    if env:
+        p = Path(env)
+    else:
+        try:
+            from pathsafe import _pick_base_dir  # type: ignore
+            p = Path(_pick_base_dir()) / "lab_store"
+        except Exception:
+            p = Path(tempfile.gettempdir()) / "bloodmap" / "lab_store"
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+def safe_uid(uid) -> str:
+    """uid → 디렉터리 이름. 글자/숫자/-/_ 는 그대로, 나머지는 UTF-8 바이트별 %XX (되돌릴 수 있어 충돌 없음)."""
+    s = "".join(ch if (ch.isalnum() or ch in "-_") else "".join(f"%{b:02X}" for b in ch.encode("utf-8"))
+                for ch in str(uid or ""))
+    return s or "anonymous"
+
+
+def _legacy_uid(uid) -> str:
+    # 이전 버전 이름(허용 문자 외 삭제 — 충돌 가능). 기존 디렉터리 이전용
+    s = "".join(ch for ch in str(uid or "") if ch.isalnum() or ch in ("-", "_"))
+    return s or "anonymous"
+
+
+def _udir(uid, root: Optional[str] = None) -> Path:
+    base = base_dir(root)
+    d = base / safe_uid(uid)
+    if not d.exists():
+        old = base / _legacy_uid(uid)
+        if old != d and old.is_dir():
+            try:
+                os.rename(old, d)   # 처음 찾는 사용자에게 이전(원자적; 실패하면 새로 시작)
+            except OSError:
+                pass
+    return d
+
+
+# ---------- time helpers ----------
+def to_ms(ts) -> Optional[int]:
+    """datetime/ISO 문자열/ms 정수 → ms. 날짜 구분자 '/'·'.'(2024.03.01) 허용, 소수 초는 보존."""
+    if ts is None or ts == "":
+        return None
+    if isinstance(ts, (int, np.integer)):
+        return int(ts)
+    if isinstance(ts, float):
+        return None if math.isnan(ts) else int(ts)
+    if hasattr(ts, "to_pydatetime"):
+        ts = ts.to_pydatetime()
+    if not isinstance(ts, datetime):
+        s = str(ts).strip().replace("/", "-")
+        s = _DOT_DATE.sub(lambda m: f"{m.group(1)}-{int(m.group(2)):02d}-{int(m.group(3)):02d}", s)
+        try:
+            ts = datetime.fromisoformat(s)
+        except Exception:
+            return None
+    return int((ts.replace(tzinfo=None) - _EPOCH) / timedelta(milliseconds=1))
+
+
+def from_ms(ms: int) -> datetime:
+    return _EPOCH + timedelta(milliseconds=int(ms))
+
+
+def _num(v) -> float:
+    if v is None or v == "":
+        return math.nan
+    try:
+        return float(str(v).replace(",", "").strip()) if not isinstance(v, (int, float)) else float(v)
+    except Exception:
+        return math.nan
+
+
+# ---------- locking ----------
+class _UserLock:
+    def __init__(self, d: Path):
+        self.d = d
+        with _LOCKS_GUARD:
+            self.tl = _LOCKS.setdefault(str(d), threading.Lock())
+        self.fh = None
+
+    def __enter__(self):
+        self.tl.acquire()
+        if fcntl is not None:
+            try:
+                self.d.mkdir(parents=True, exist_ok=True)
+                self.fh = open(self.d / ".lock", "a")
+                fcntl.flock(self.fh.fileno(), fcntl.LOCK_EX)
+            except Exception:
+                self.fh = None
+        return self
+
+    def __exit__(self, *exc):
+        if self.fh is not None:
+            try:
+                fcntl.flock(self.fh.fileno(), fcntl.LOCK_UN)
+                self.fh.close()
+            except Exception:
+                pass
+        self.tl.release()
+
+
+# ---------- schema ----------
+def _read_schema(d: Path) -> Dict[str, Any]:
+    try:
+        with open(d / "schema.json", "r", encoding="utf-8") as f:
+            sc = json.load(f)
+        sc.setdefault("gen", 0); sc.setdefault("columns", []); sc.setdefault("rows", 0)
+        return sc
+    except Exception:
+        return {"gen": 0, "columns": [], "rows": 0}
+
+
+def _write_schema(d: Path, sc: Dict[str, Any]) -> None:
+    tmp = d / "schema.json.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(sc, f, ensure_ascii=False)
+        f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, d / "schema.json")
+
+
+def _wal_path(d: Path, gen: int) -> Path:
+    return d / f"wal.{gen}.log"
+
+
+# ---------- write ----------
+def append(uid, ts, values: Mapping[str, Any], fsync: bool = False, root: Optional[str] = None) -> int:
+    """한 시점 추가. values: {컬럼: 값} (숫자 변환 실패/빈 값은 저장 안 함). 반환: ts(ms)."""
+    ms = to_ms(ts if ts is not None else datetime.now())
+    if ms is None:
+        raise ValueError(f"invalid timestamp: {ts!r}")
+    clean = {str(k): _num(v) for k, v in (values or {}).items()}
+    clean = {k: v for k, v in clean.items() if not math.isnan(v)}
+    d = _udir(uid, root)
+    with _UserLock(d):
+        sc = _read_schema(d)
+        line = f"{ms}\t{json.dumps(clean, ensure_ascii=False, separators=(',', ':'))}\n"
+        pending = _wal_write(d, sc["gen"], [line], fsync)
+    if pending >= COMPACT_ROWS:
+        try:
+            compact(uid, root)
+        except Exception:
+            pass
+    return ms
+
+
+def append_many(uid, rows: Iterable[Tuple[Any, Mapping[str, Any]]], fsync: bool = True,
+                autocompact: bool = True, root: Optional[str] = None) -> int:
+    """
+    여러 시점을 한 번의 잠금/쓰기로 추가. rows: (ts, values) 반복자. 반환: 추가 건수.
+    autocompact=False: 대량 가져오기용 — 배치마다 WAL 재파싱/압축을 하지 않음(끝나고 compact() 1회).
+    """
+    lines: List[str] = []
+    for ts, values in rows:
+        ms = to_ms(ts)
+        if ms is None:
+            continue
+        clean = {str(k): _num(v) for k, v in (values or {}).items()}
+        clean = {k: v for k, v in clean.items() if not math.isnan(v)}
+        lines.append(f"{ms}\t{json.dumps(clean, ensure_ascii=False, separators=(',', ':'))}\n")
+    if not lines:
+        return 0
+    d = _udir(uid, root)
+    with _UserLock(d):
+        sc = _read_schema(d)
+        pending = _wal_write(d, sc["gen"], lines, fsync, count=autocompact)
+    if pending >= COMPACT_ROWS:
+        try:
+            compact(uid, root)
+        except Exception:
+            pass
+    return len(lines)
+
+
+def _wal_write(d: Path, gen: int, lines: List[str], fsync: bool, count: bool = True) -> int:
+    """
+    WAL 끝에 완결된 줄들을 추가하고 추가 후 WAL 줄 수를 반환(사용자 잠금 안에서 호출).
+    기록해 둔 (gen, 크기)가 쓰기 직전 크기와 같으면 줄 수만 더함 — 다른 프로세스가 썼거나
+    처음이면 한 번 파싱. count=False 면 파싱하지 않고 0(대량 가져오기).
+    """
+    key = str(d)
+    with open(_wal_path(d, gen), "a", encoding="utf-8") as f:
+        before = os.fstat(f.fileno()).st_size
+        f.write("".join(lines))
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+        after = os.fstat(f.fileno()).st_size
+    hit = _WAL_LEN.get(key)
+    if hit and hit[0] == gen and hit[1] == before:
+        rows = hit[2] + len(lines)
+    elif count:
+        rows = _wal_rows(d, gen)
+    else:
+        _WAL_LEN.pop(key, None)
+        return 0
+    _WAL_LEN[key] = (gen, after, rows)
+    return rows
+
+
+# ---------- read ----------
+# 공개 조회 함수는 _UserLock 안에서 schema → seg/WAL 을 읽음(compact 가 이전 gen 을 지우는 것과 직렬화).
+def _wal_rows(d: Path, gen: int) -> int:
+    hit = _parse_wal(d, gen)
+    return len(hit[2])
+
+
+def _parse_wal(d: Path, gen: int):
+    p = _wal_path(d, gen)
+    try:
+        stt = p.stat()
+        ver = (gen, stt.st_size, stt.st_mtime_ns)
+    except FileNotFoundError:
+        ver = (gen, 0, 0)
+    key = str(d)
+    hit = _WAL_CACHE.get(key)
+    if hit and hit[0] == ver:
+        return hit
+    ts: List[int] = []
+    cols: Dict[str, List[float]] = {}
+    if ver[1]:
+        try:
+            f = open(p, "r", encoding="utf-8")
+        except FileNotFoundError:
+            f = io.StringIO("")
+        with f:
+            for i, line in enumerate(f):
+                try:
+                    a, b = line.rstrip("\n").split("\t", 1)
+                    vals = json.loads(b)
+                    ms = int(a)
+                except Exception:
+                    continue  # 잘린 마지막 줄 등
+                n = len(ts)
+                ts.append(ms)
+                for k, v in vals.items():
+                    col = cols.get(k)
+                    if col is None:
+                        col = cols[k] = [math.nan] * n
+                    col.append(float(v))
+                for col in cols.values():
+                    if len(col) < n + 1:
+                        col.append(math.nan)
+    ts_a = np.asarray(ts, dtype=np.int64)
+    cols_a = {k: np.asarray(v, dtype=np.float64) for k, v in cols.items()}
+    order = np.argsort(ts_a, kind="stable")
+    if len(ts_a) and not np.all(order == np.arange(len(ts_a))):
+        ts_a = ts_a[order]
+        cols_a = {k: v[order] for k, v in cols_a.items()}
+    hit = (ver, list(cols_a.keys()), ts_a, cols_a)
+    _WAL_CACHE[key] = hit
+    return hit
+
+
+def _seg_arrays(d: Path, sc: Dict[str, Any]):
+    seg = d / f"seg.{sc['gen']}"
+    if not sc.get("rows") or not (seg / "ts.npy").exists():
+        return np.zeros(0, dtype=np.int64), {}
+    ts = np.load(seg / "ts.npy", mmap_mode="r")
+    cols = {}
+    for c in sc.get("columns", []):
+        p = seg / f"{_col_file(c)}.npy"
+        if p.exists():
+            cols[c] = np.load(p, mmap_mode="r")
+    return ts, cols
+
+
+def _col_file(c: str) -> str:
+    return "c_" + "".join(ch if (ch.isalnum() or ch in "-_") else f"%{ord(ch):x}" for ch in c)
+
+
+def version(uid, root: Optional[str] = None) -> Tuple[int, int, int, int]:
+    """데이터 버전(캐시 키용). 추가/압축 시 바뀜."""
+    d = _udir(uid, root)
+    with _UserLock(d):
+        sc = _read_schema(d)
+        try:
+            stt = _wal_path(d, sc["gen"]).stat()
+            return (sc["gen"], sc.get("rows", 0), stt.st_size, stt.st_mtime_ns)
+        except FileNotFoundError:
+            return (sc["gen"], sc.get("rows", 0), 0, 0)
+
+
+def columns(uid, root: Optional[str] = None) -> List[str]:
+    d = _udir(uid, root)
+    with _UserLock(d):
+        sc = _read_schema(d)
+        w = _parse_wal(d, sc["gen"])
+    return list(dict.fromkeys(list(sc.get("columns", [])) + w[1]))
+
+
+def count(uid, root: Optional[str] = None) -> int:
+    d = _udir(uid, root)
+    with _UserLock(d):
+        sc = _read_schema(d)
+        return int(sc.get("rows", 0)) + len(_parse_wal(d, sc["gen"])[2])
+
+
+def query_arrays(uid, start=None, end=None, cols: Optional[Sequence[str]] = None, root: Optional[str] = None):
+    """[start, end) 구간만 반환: (ts_ms int64 배열, {컬럼: float64 배열}) — ts 오름차순."""
+    d = _udir(uid, root)
+    with _UserLock(d):
+        return _query_arrays(d, start, end, cols)
+
+
+def _query_arrays(d: Path, start=None, end=None, cols: Optional[Sequence[str]] = None):
+    # 호출자가 _UserLock(d) 를 잡고 있어야 함(반환 배열은 복사본 — 잠금 해제 후에도 안전)
+    sc = _read_schema(d)
+    lo = to_ms(start) if start is not None else None
+    hi = to_ms(end) if end is not None else None
+    s_ts, s_cols = _seg_arrays(d, sc)
+    _ver, w_names, w_ts, w_cols = _parse_wal(d, sc["gen"])
+    names = list(cols) if cols else list(dict.fromkeys(list(s_cols.keys()) + list(w_names)))
+
+    def window(ts_arr):
+        i = int(np.searchsorted(ts_arr, lo, side="left")) if lo is not None else 0
+        j = int(np.searchsorted(ts_arr, hi, side="left")) if hi is not None else len(ts_arr)
+        return i, max(i, j)
+
+    i, j = window(s_ts)
+    k, l = window(w_ts)
+    ts = np.concatenate([np.asarray(s_ts[i:j]), w_ts[k:l]])
+    out: Dict[str, np.ndarray] = {}
+    for c in names:
+        a = np.asarray(s_cols[c][i:j]) if c in s_cols else np.full(j - i, np.nan)
+        b = w_cols[c][k:l] if c in w_cols else np.full(l - k, np.nan)
+        out[c] = np.concatenate([a, b]).astype(np.float64, copy=False)
+    if (l - k) and (j - i) and ts[j - i - 1] > ts[j - i]:
+        order = np.argsort(ts, kind="stable")
+        ts = ts[order]
+        out = {c: v[order] for c, v in out.items()}
+    return ts, out
+
+
+def query(uid, start=None, end=None, cols: Optional[Sequence[str]] = None, root: Optional[str] = None):
+    """구간 조회 → pandas DataFrame(index=ts DatetimeIndex). pandas 없으면 dict."""
+    ts, out = query_arrays(uid, start, end, cols, root=root)
+    try:
+        import pandas as pd  # type: ignore
+    except Exception:
+        return {"ts": [from_ms(int(x)) for x in ts], **{c: v.tolist() for c, v in out.items()}}
+    df = pd.DataFrame(out, index=pd.to_datetime(ts, unit="ms"))
+    df.index.name = "ts"
+    return df
+
+
+def last(uid, n: int = 10, cols: Optional[Sequence[str]] = None, root: Optional[str] = None):
+    """최근 n건(시간순)."""
+    ts, out = query_arrays(uid, None, None, cols, root=root)
+    return ts[-n:], {c: v[-n:] for c, v in out.items()}
+
+
+def query_rows(uid, start=None, end=None, cols: Optional[Sequence[str]] = None,
+               root: Optional[str] = None) -> List[Dict[str, Any]]:
+    """구간 조회 → 행 목록 [{"ts_kst": "YYYY-MM-DD HH:MM", 컬럼: 값}] (결측은 키 없음). 기존 CSV/DB 행 형식."""
+    ts, out = query_arrays(uid, start, end, cols, root=root)
+    rows: List[Dict[str, Any]] = []
+    for i, ms in enumerate(ts.tolist()):
+        t = from_ms(ms)
+        r: Dict[str, Any] = {"ts_kst": t.strftime("%Y-%m-%d %H:%M:%S" if t.second else "%Y-%m-%d %H:%M")}
+        for c, v in out.items():
+            x = float(v[i])
+            if not math.isnan(x):
+                r[c] = x
+        rows.append(r)
+    return rows
+
+
+def list_uids(root: Optional[str] = None) -> List[str]:
+    """기록이 있는 uid 목록(디렉터리 이름의 %XX 를 되돌림)."""
+    from urllib.parse import unquote
+    out = []
+    for p in base_dir(root).iterdir():
+        if p.is_dir() and ((p / "schema.json").exists() or any(p.glob("wal.*.log"))):
+            out.append(unquote(p.name))
+    return sorted(out)
+
+
+# ---------- maintenance ----------
+def compact(uid, root: Optional[str] = None) -> Dict[str, Any]:
+    """세그먼트 + WAL → 새 세그먼트(gen+1). 커밋은 schema.json 원자 교체."""
+    d = _udir(uid, root)
+    with _UserLock(d):
+        sc = _read_schema(d)
+        gen = int(sc["gen"])
+        ts, cols = _query_arrays(d)
+        if not len(ts) and not _wal_path(d, gen).exists():
+            return sc
+        new_gen = gen + 1
+        seg = d / f"seg.{new_gen}"
+        if seg.exists():
+            shutil.rmtree(seg, ignore_errors=True)
+        seg.mkdir(parents=True)
+        np.save(seg / "ts.npy", np.asarray(ts, dtype=np.int64))
+        for c, v in cols.items():
+            np.save(seg / f"{_col_file(c)}.npy", np.asarray(v, dtype=np.float64))
+        new_sc = {"gen": new_gen, "columns": list(cols.keys()), "rows": int(len(ts))}
+        _write_schema(d, new_sc)
+        try:
+            _wal_path(d, gen).unlink()
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(d / f"seg.{gen}", ignore_errors=True)
+        _WAL_CACHE.pop(str(d), None)
+        _WAL_LEN.pop(str(d), None)
+        return new_sc
+
+
+def clear(uid, root: Optional[str] = None) -> None:
+    """사용자 시계열 전체 삭제."""
+    d = _udir(uid, root)
+    with _UserLock(d):
+        for p in d.iterdir():
+            if p.name == ".lock":
+                continue
+            if p.is_dir():
+                shutil.rmtree(p, ignore_errors=True)
+            else:
+                try:
+                    p.unlink()
+                except Exception:
+                    pass
+        _WAL_CACHE.pop(str(d), None)
+        _WAL_LEN.pop(str(d), None)
+
+
+def import_rows(uid, rows: Iterable[Mapping[str, Any]], ts_key: str = "ts", root: Optional[str] = None) -> int:
+    """기존 lab_history(dict 목록)/CSV 행 일괄 이관. labs 하위 dict 도 평탄화."""
+    def gen():
+        for r in rows:
+            vals = dict(r.get("labs") or {}) if isinstance(r.get("labs"), dict) else {}
+            for k, v in r.items():
+                if k in (ts_key, "ts_kst", "labs", "mode", "ref"):
+                    continue
+                vals.setdefault(k, v)
+            yield (r.get(ts_key) or r.get("ts_kst"), vals)
+    n = append_many(uid, gen(), root=root)
+    return n
@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""
+lazy_modules.py
+기능 모듈 지연 로딩 레지스트리 + 모듈별 import 시간 리포트
+- load(name, candidates) : 프로세스당 정확히 1회 실행(이미 같은 파일이 sys.modules 에 있으면 재사용)
+- lazy(name) / lazy_import("matplotlib.pyplot") : 첫 속성 접근 때 로드하는 프록시 → 해당 탭이 쓸 때만 비용 발생
+- lazy_attr(name, "fn", fallback) : 모듈 함수 대리자(호출할 때 로드), locate(name) : 경로만 해석(실행 안 함)
+- report() : 모듈별 누적/자체 시간(ms), 함께 딸려 들어온 모듈 수 — `-X importtime` 의 기능 모듈 단위 요약
+- 경로 해석기: MANIFEST(모듈별 후보 파일) × SEARCH_BASES 를 1회 해석, sys.path 는 건드리지 않음
+- refresh() : 로드된 파일의 (크기, mtime) 확인 → 바뀐 경우 sha256 까지 같으면 그대로, 다를 때만 다시 실행(hot-reload)
+  env BLOODMAP_HOT_RELOAD=0 이면 끔. onco_map/drug_db/ref_tables 가 다시 로드되면 refdata.invalidate()
+"""
+from __future__ import annotations
+import hashlib, importlib, importlib.util, os, sys, threading, time, types
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+APP_DIR = Path(__file__).resolve().parent
+SEARCH_BASES: Tuple[Path, ...] = (
+    APP_DIR,
+    APP_DIR / "modules",
+    Path("/mount/src/hoya12/bloodmap_app"),
+    Path("/mount/src/hoya12/bloodmap_app/modules"),
+    Path("/mnt/data"),
+)
+# 다시 로드되면 refdata 공유본을 폐기해야 하는 모듈(refdata._stale 은 drug_db 스냅샷 해시만 비교)
+REFDATA_SOURCES = frozenset({"onco_map", "drug_db", "ref_tables"})
+# 모듈별 후보(상대 경로는 SEARCH_BASES 마다 시도, 절대 경로는 그대로). 호출 측이 후보를 주면 그것이 우선.
+MANIFEST: Dict[str, Tuple[str, ...]] = {
+    "special_tests": ("special_tests.py", str(APP_DIR.parent / "special_tests.py")),
+    "onco_map": ("onco_map.py",),
+    "drug_db": ("drug_db.py",),
+    "branding": ("branding.py",),
+    "pdf_export": ("pdf_export.py",),
+    "lab_diet": ("lab_diet.py",),
+    "peds_dose": ("peds_dose.py",),
+    "core_utils": ("core_utils.py",),
+    "lab_ingest": ("lab_ingest.py",),
+    "validators": ("validators.py",),
+    "ref_tables": ("ref_tables.py",),
+    "lab_store": ("lab_store.py",),
+    "user_store": ("user_store.py",),
+}
+HOT_RELOAD = os.environ.get("BLOODMAP_HOT_RELOAD", "1") != "0"
+REFRESH_INTERVAL_S = 1.0
+
+_LOCK = threading.RLock()
+_LOADED: Dict[str, "_Entry"] = {}
+_CANDIDATES: Dict[str, Tuple[str, ...]] = {}
+_FEATURE: Dict[str, str] = {}
+_RECORDS: List["ImportRecord"] = []
+_STACK: List[List[float]] = []   # 중첩 로드의 자식 시간 합(자체 시간 계산용)
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    feature: str
+    path: str
+    total_ms: float      # 누적(중첩 로드 포함)
+    self_ms: float       # 자체(레지스트리로 중첩 로드된 모듈 제외)
+    new_modules: int     # 이 로드로 sys.modules 에 새로 들어온 모듈 수
+    ok: bool
+    error: str = ""
+    reload: bool = False
+
+
+@dataclass
+class _Entry:
+    mod: Optional[types.ModuleType]
+    path: Optional[str]
+    stat: Optional[Tuple[int, int]] = None   # (size, mtime_ns) — 파일에서 로드한 경우만
+    sha: str = ""
+
+
+_LAST_REFRESH = 0.0
+
+
+def register(name: str, candidates: Sequence[str] = (), feature: str = "") -> None:
+    """모듈 후보 경로(앱 폴더 기준 상대 또는 절대)와 기능 라벨 등록. 로드는 하지 않음."""
+    with _LOCK:
+        if candidates:
+            _CANDIDATES[name] = tuple(str(c) for c in candidates)
+        if feature:
+            _FEATURE[name] = feature
+
+
+def expand(candidates: Sequence[str]) -> List[Path]:
+    """후보 → 절대 경로 목록(중복 제거, 순서 유지)."""
+    out: List[Path] = []
+    for rel in candidates:
+        p = Path(str(rel))
+        for cand in ([p] if p.is_absolute() else [b / p for b in SEARCH_BASES]):
+            if cand not in out:
+                out.append(cand)
+    return out
+
+
+def _resolve(name: str, candidates: Sequence[str]) -> Optional[Path]:
+    for cand in expand(candidates or MANIFEST.get(name, ())):
+        try:
+            if cand.is_file():
+                return cand.resolve()
+        except OSError:
+            continue
+    return None
+
+
+def _fingerprint(path: str) -> Tuple[Tuple[int, int], str]:
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        sha = hashlib.sha256(f.read()).hexdigest()
+    return (st.st_size, st.st_mtime_ns), sha
+
+
+def _exec_file(name: str, path: Path) -> types.ModuleType:
+    """파일을 새 모듈로 실행. 실패하면 sys.modules 를 이전 상태로 되돌림."""
+    prev = sys.modules.get(name)
+    spec = importlib.util.spec_from_file_location(name, str(path))
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load {name} from {path}")
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[name] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except BaseException:
+        if prev is not None:
+            sys.modules[name] = prev
+        else:
+            sys.modules.pop(name, None)
+        raise
+    return mod
+
+
+def _same_file(mod: Optional[types.ModuleType], path: Path) -> bool:
+    try:
+        return mod is not None and Path(mod.__file__).resolve() == path
+    except Exception:
+        return False
+
+
+def _timed(name: str, fn) -> Tuple[Any, ImportRecord]:
+    before = len(sys.modules)
+    _STACK.append([0.0])
+    t0 = time.perf_counter()
+    err, out = "", None
+    try:
+        out = fn()
+    except Exception as e:
+        err = f"{type(e).__name__}: {e}"[:300]
+    total = (time.perf_counter() - t0) * 1000.0
+    child = _STACK.pop()[0]
+    if _STACK:
+        _STACK[-1][0] += total
+    rec = ImportRecord(name=name, feature=_FEATURE.get(name, ""), path="", total_ms=round(total, 2),
+                       self_ms=round(total - child, 2), new_modules=max(0, len(sys.modules) - before),
+                       ok=not err, error=err)
+    return out, rec
+
+
+def load(name: str, candidates: Optional[Sequence[str]] = None, feature: str = ""
+         ) -> Tuple[Optional[types.ModuleType], Optional[str]]:
+    """
+    (module, path) — 프로세스당 1회만 실행(파일이 바뀌면 refresh() 가 다시 실행).
+    후보가 없으면 MANIFEST, 그래도 못 찾으면 일반 import.
+    path 는 파일 경로 또는 "(sys.path)::<file>" (기존 _load_local_module 과 같은 형식).
+    """
+    hit = _LOADED.get(name)
+    if hit is not None:
+        return hit.mod, hit.path
+    with _LOCK:
+        hit = _LOADED.get(name)
+        if hit is not None:
+            return hit.mod, hit.path
+        register(name, candidates or (), feature)
+        cand = _resolve(name, _CANDIDATES.get(name, ()))
+
+        def _do():
+            if cand is not None:
+                cur = sys.modules.get(name)
+                mod = cur if _same_file(cur, cand) else _exec_file(name, cand)
+                return mod, str(cand)
+            mod = importlib.import_module(name)
+            return mod, f"(sys.path)::{getattr(mod, '__file__', '')}"
+
+        out, rec = _timed(name, _do)
+        mod, path = out if out else (None, None)
+        rec.path = path or ""
+        _RECORDS.append(rec)
+        entry = _Entry(mod, path)
+        if mod is not None and cand is not None:
+            try:
+                entry.stat, entry.sha = _fingerprint(str(cand))
+            except OSError:
+                pass
+        _LOADED[name] = entry
+        return mod, path
+
+
+def refresh(force: bool = False) -> List[str]:
+    """
+    파일이 실제로 바뀐 모듈만 다시 실행하고 이름 목록을 돌려줌. 리런마다 불러도 됨:
+    REFRESH_INTERVAL_S 안의 반복 호출은 건너뛰고, 평소에는 모듈당 os.stat 1회.
+    다시 실행이 실패하면 이전 모듈을 그대로 씀(리포트에 오류 기록).
+    """
+    global _LAST_REFRESH
+    if not HOT_RELOAD and not force:
+        return []
+    now = time.monotonic()
+    if not force and now - _LAST_REFRESH < REFRESH_INTERVAL_S:
+        return []
+    _LAST_REFRESH = now
+    changed: List[str] = []
+    for name, e in list(_LOADED.items()):
+        if e.mod is None or e.stat is None or not e.path:
+            continue
+        try:
+            st = os.stat(e.path)
+        except OSError:
+            continue
+        if (st.st_size, st.st_mtime_ns) == e.stat:
+            continue
+        with _LOCK:
+            try:
+                stat, sha = _fingerprint(e.path)
+            except OSError:
+                continue
+            if sha == e.sha:
+                e.stat = stat   # touch/재배포만 — 내용 같음
+                continue
+            out, rec = _timed(name, lambda: _exec_file(name, Path(e.path)))
+            rec.path, rec.reload = e.path, True
+            _RECORDS.append(rec)
+            if out is not None:
+                _LOADED[name] = _Entry(out, e.path, stat, sha)
+                changed.append(name)
+            else:
+                e.stat = stat   # 고쳐질 때까지 같은 오류를 반복하지 않음
+    if any(n in REFDATA_SOURCES for n in changed):
+        rd = sys.modules.get("refdata")  # 공유 참조데이터가 이전 모듈로 만든 DRUG_DB/ONCO 를 들고 있음
+        if rd is not None:
+            rd.invalidate()
+    return changed
+
+
+def get(name: str) -> Optional[types.ModuleType]:
+    return load(name)[0]
+
+
+class LazyModule(types.ModuleType):
+    """
+    첫 속성 접근 때 load() — 실패하면 AttributeError(= 모듈 없음과 같은 취급).
+    매 접근마다 레지스트리에서 현재 모듈을 찾으므로 refresh() 로 다시 로드된 모듈을 따라감.
+    """
+
+    def _lm_target(self):
+        return load(object.__getattribute__(self, "__name__"))[0]
+
+    def __getattr__(self, attr: str):
+        mod = self._lm_target()
+        if mod is None:
+            raise AttributeError(f"module {self.__name__!r} unavailable ({attr})")
+        return getattr(mod, attr)
+
+    def __bool__(self) -> bool:
+        return self._lm_target() is not None
+
+    def __repr__(self) -> str:
+        loaded = object.__getattribute__(self, "__name__") in _LOADED
+        return f"<lazy module {self.__name__!r} ({'loaded' if loaded else 'pending'})>"
+
+
+def locate(name: str, candidates: Optional[Sequence[str]] = None) -> Optional[str]:
+    """모듈 파일 경로(로드했으면 그 경로, 아니면 해석만 — 실행하지 않음). 못 찾으면 None."""
+    hit = _LOADED.get(name)
+    if hit is not None:
+        return hit.path if hit.mod is not None else None
+    register(name, candidates or ())
+    p = _resolve(name, _CANDIDATES.get(name, ()))
+    return str(p) if p is not None else None
+
+
+def lazy_attr(name: str, attr: str, fallback: Optional[Callable[..., Any]] = None) -> Callable[..., Any]:
+    """
+    모듈 함수 대리자 — 호출할 때 load() 하고 그 시점의 모듈 속성을 부름(refresh 로 바뀐 모듈도 따라감).
+    모듈/속성이 없으면 fallback(없으면 None 반환).
+    """
+    def _call(*args, **kwargs):
+        mod = load(name)[0]
+        fn = getattr(mod, attr, None) if mod is not None else None
+        if not callable(fn):
+            fn = fallback
+        return fn(*args, **kwargs) if fn is not None else None
+    _call.__name__ = attr
+    _call.__qualname__ = f"{name}.{attr}"
+    return _call
+
+
+def lazy(name: str, candidates: Optional[Sequence[str]] = None, feature: str = "") -> LazyModule:
+    """앱 기능 모듈 프록시(후보 경로 기반)."""
+    register(name, candidates or (), feature)
+    return LazyModule(name)
+
+
+def import_module(modname: str, feature: str = "") -> Optional[types.ModuleType]:
+    """서드파티/표준 모듈 import 를 시간 기록과 함께(1회)."""
+    register(modname, (), feature)
+    return load(modname)[0]
+
+
+def lazy_import(modname: str, feature: str = "") -> LazyModule:
+    register(modname, (), feature)
+    return LazyModule(modname)
+
+
+def available(modname: str) -> bool:
+    """설치 여부만 확인(import 하지 않음)."""
+    try:
+        return importlib.util.find_spec(modname) is not None
+    except Exception:
+        return False
+
+
+def loaded(name: str) -> bool:
+    return name in _LOADED
+
+
+def last_error(name: str) -> str:
+    """가장 최근 로드/재로드 오류(없으면 "")."""
+    for r in reversed(_RECORDS):
+        if r.name == name:
+            return r.error
+    return ""
+
+
+def report() -> List[Dict[str, Any]]:
+    """로드 순서대로 기록. 정렬은 호출 측에서(self_ms/total_ms)."""
+    return [asdict(r) for r in _RECORDS]
+
+
+def report_text(sort: str = "total_ms") -> str:
+    rows = sorted(_RECORDS, key=lambda r: getattr(r, sort), reverse=True)
+    lines = [f"{'total_ms':>9} {'self_ms':>9} {'+mods':>6}  module (feature)"]
+    for r in rows:
+        mark = ("" if r.ok else f"  !! {r.error}") + ("  [reload]" if r.reload else "")
+        lines.append(f"{r.total_ms:9.1f} {r.self_ms:9.1f} {r.new_modules:6d}  {r.name}"
+                     f"{f' ({r.feature})' if r.feature else ''}{mark}")
+    return "\n".join(lines)
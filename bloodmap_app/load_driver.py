@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+load_driver.py
+AppTest 기반 헤드리스 부하 테스트 — 가상 보호자 여러 명이 한 워커(프로세스)에서 동시에 시나리오 실행
+- 시나리오(세션 1개): 첫 화면 → 별명#PIN → 수치 입력(칸마다 리런) → 암 그룹/진단 → 항암제 선택
+  → 보고서 내보내기 확인 → APAP 기록. 수치/진단은 synth_data 의 같은 번호 사용자에서 가져옴
+- AppTest 는 실행마다 프로세스 전역(Runtime/secrets)을 설치·해제하므로 리런은 _RUN_LOCK 으로 한 번에 하나씩.
+  스크립트가 GIL 에 묶인 워커와 같은 모델: 지연 = 대기(wait) + 실행(run), 세션마다 동작 사이 생각 시간(--think-ms)
+- 리런마다 지연(ms) 기록 → 단계별·전체 p50/p90/p95/p99/max (AppTest 요소 트리 처리 포함 — 스크립트 자체 시간은
+  결과의 probe_top(perf_probe 누적)에서). 측정 전 세션 1개로 워밍업(첫 import/캐시 비용 제외, --no-warmup)
+- 세션 메모리: session_state 추정 크기(재귀 sizeof) + 동시 세션 수 대비 RSS 증가분
+- --ramp 1,2,4,8 : 동시 세션 수를 늘려 가며 전체 p95 가 --slo-ms 를 처음 넘는 단계 보고
+- 서버/브라우저/네트워크 없이 실행. 저장소 경로(BLOODMAP_*)는 지정하지 않았으면 임시 폴더로
+    python load_driver.py [-c 4] [--loops 1] [--ramp 1,2,4,8] [--slo-ms 2000] [--json out.json]
+"""
+from __future__ import annotations
+import argparse, gc, json, os, random, sys, tempfile, threading, time, traceback
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+DEFAULT_SLO_MS = 2000.0
+DEFAULT_THINK_MS = 800.0
+RUN_TIMEOUT_S = 180
+LAB_FIELDS = ("WBC", "Hb", "PLT", "ANC", "CRP")
+_RUN_LOCK = threading.Lock()
+
+
+def _isolate_storage() -> str:
+    """앱이 쓰는 데이터 폴더를 임시 폴더로(이미 지정된 env 는 유지)."""
+    base = tempfile.mkdtemp(prefix="bloodmap_load_")
+    for env, sub in (("BLOODMAP_DATA_DIR", "data"), ("BLOODMAP_SNAPSHOT_DIR", "snap"),
+                     ("BLOODMAP_LAB_STORE_DIR", "lab_store"), ("BLOODMAP_CARE_LOG_DIR", "care_log")):
+        if not os.environ.get(env):
+            os.environ[env] = os.path.join(base, sub)
+            os.makedirs(os.environ[env], exist_ok=True)
+    return base
+
+
+def rss_kb() -> int:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except Exception:
+        try:
+            import resource
+            return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        except Exception:
+            return 0
+
+
+def deep_sizeof(obj: Any, _seen: Optional[set] = None, _depth: int = 0) -> int:
+    """컨테이너를 따라가며 합산한 대략의 크기(bytes). 같은 객체는 한 번만."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen or _depth > 12:
+        return 0
+    seen.add(id(obj))
+    try:
+        size = sys.getsizeof(obj)
+    except Exception:
+        return 0
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen, _depth + 1) + deep_sizeof(v, seen, _depth + 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(x, seen, _depth + 1) for x in obj)
+    elif hasattr(obj, "memory_usage") and hasattr(obj, "columns"):   # DataFrame
+        try:
+            size += int(obj.memory_usage(deep=True).sum())
+        except Exception:
+            pass
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen, _depth + 1)
+    return size
+
+
+def percentiles(values: Sequence[float], ps: Sequence[int] = (50, 90, 95, 99)) -> Dict[str, float]:
+    """최근접 순위 백분위 + max/mean/n."""
+    if not values:
+        return {"n": 0}
+    s = sorted(values)
+    out = {f"p{p}": round(s[min(len(s) - 1, max(0, -(-p * len(s) // 100) - 1))], 1) for p in ps}
+    out.update(n=len(s), max=round(s[-1], 1), mean=round(sum(s) / len(s), 1))
+    return out
+
+
+@dataclass
+class SessionResult:
+    index: int
+    samples: List[Tuple[str, float, float]] = field(default_factory=list)   # (단계, wait ms, run ms)
+    exceptions: List[str] = field(default_factory=list)
+    state_kb: float = 0.0
+    error: str = ""
+
+
+class CaregiverSession:
+    """AppTest 1개 = 브라우저 탭 1개. 위젯은 키 끝(wkey 접두사 이후)으로 찾음."""
+
+    def __init__(self, index: int, seed: int, think_ms: float = DEFAULT_THINK_MS):
+        from streamlit.testing.v1 import AppTest
+        import synth_data
+        self.index = index
+        self.user = synth_data.make_user(index, seed)
+        self.at = AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT_S)
+        self.at.secrets["ADMIN_PASS"] = os.environ.get("BLOODMAP_LOAD_ADMIN_PASS", "load-test")
+        self.result = SessionResult(index)
+        self.think_ms = think_ms
+        self._rng = random.Random(f"think:{seed}:{index}")
+
+    def _find(self, kind: str, suffix: str):
+        for w in getattr(self.at, kind):
+            if (w.key or "").split(":")[-1] == suffix:
+                return w
+        return None
+
+    def _run(self, step: str, widget=None) -> None:
+        if self.think_ms > 0 and self.result.samples:
+            time.sleep(self.think_ms * self._rng.uniform(0.5, 1.5) / 1000.0)
+        t0 = time.perf_counter()
+        with _RUN_LOCK:
+            t1 = time.perf_counter()
+            (widget.run() if widget is not None else self.at.run())
+        t2 = time.perf_counter()
+        self.result.samples.append((step, (t1 - t0) * 1000.0, (t2 - t1) * 1000.0))
+        for e in self.at.exception:
+            msg = f"{step}: {str(e.message)[:200]}"
+            if msg not in self.result.exceptions:
+                self.result.exceptions.append(msg)
+
+    def flow(self, loops: int = 1) -> None:
+        u = self.user
+        self._run("open")
+        w = self.at.text_input(key="user_key_raw")
+        self._run("login", w.set_value(f"{u.nick}#{u.pin}"))
+        for n in range(loops):
+            lab = u.labs[-1 - n % len(u.labs)]
+            for k in LAB_FIELDS:
+                w = self._find("text_input", k)
+                if w is not None:
+                    self._run("lab_input", w.set_value(str(lab[k])))
+            w = self._find("selectbox", "onco_group_sel")
+            if w is not None and u.config["group"] in w.options:
+                self._run("dx_group", w.set_value(u.config["group"]))
+            w = self._find("selectbox", "onco_disease_sel")
+            if w is not None:
+                idx = next((i for i, o in enumerate(w.options) if str(o).startswith(u.config["dx"])), 0)
+                self._run("dx_pick", w.select_index(idx))
+            w = self._find("multiselect", "drug_pick")
+            if w is not None and w.options:
+                want = [o for o in w.options if str(o).split(" (")[0] in u.config["regimen"]] or list(w.options[:2])
+                self._run("chemo_pick", w.set_value(want))
+            w = self._find("checkbox", "rep_all")
+            if w is not None:
+                self._run("report", w.check())
+                w = self._find("button", "report_pdf_make")   # PDF 는 요청 시 변환
+                if w is not None:
+                    self._run("report_pdf", w.click())
+                if not any("pdf" in str(b.label) for b in self.at.get("download_button")):
+                    self.result.exceptions.append("report: PDF 다운로드 버튼 없음")
+            w = self._find("button", "apap_log_ics")
+            if w is not None:
+                self._run("apap_log", w.click())
+        try:
+            ss = self.at.session_state
+            self.result.state_kb = round(deep_sizeof({k: ss[k] for k in ss}) / 1024.0, 1)
+        except Exception:
+            self.result.state_kb = 0.0
+
+
+def run_level(concurrency: int, loops: int = 1, seed: int = 20261018, offset: int = 0,
+              think_ms: float = DEFAULT_THINK_MS) -> Dict[str, Any]:
+    """동시 세션 concurrency 개로 시나리오 1회. 세션은 모두 만든 뒤 동시에 출발."""
+    gc.collect()
+    rss0 = rss_kb()
+    sessions = [CaregiverSession(offset + i, seed, think_ms) for i in range(concurrency)]
+    gate = threading.Barrier(concurrency)
+
+    def worker(s: CaregiverSession) -> None:
+        try:
+            gate.wait()
+            s.flow(loops)
+        except Exception as e:
+            s.result.error = f"{type(e).__name__}: {e}"[:300] + "\n" + traceback.format_exc(limit=3)[-600:]
+
+    threads = [threading.Thread(target=worker, args=(s,), name=f"caregiver-{s.index}", daemon=True) for s in sessions]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    rss1 = rss_kb()
+    results = [s.result for s in sessions]
+    all_ms = [w + ms for r in results for _, w, ms in r.samples]
+    run_ms = [ms for r in results for _, _, ms in r.samples]
+    steps: Dict[str, List[float]] = {}
+    for r in results:
+        for step, w, ms in r.samples:
+            steps.setdefault(step, []).append(w + ms)
+    del sessions
+    return {
+        "concurrency": concurrency, "loops": loops, "think_ms": think_ms, "wall_s": round(wall, 2),
+        "reruns": len(all_ms), "reruns_per_s": round(len(all_ms) / wall, 2) if wall else 0.0,
+        "busy": round(sum(run_ms) / 1000.0 / wall, 3) if wall else 0.0,   # 실행 시간 / 벽시계(1.0 = 포화)
+        "latency_ms": percentiles(all_ms),
+        "run_ms": percentiles(run_ms),
+        "wait_ms": percentiles([w for r in results for _, w, _ in r.samples]),
+        "steps_ms": {k: percentiles(v) for k, v in sorted(steps.items())},
+        "memory": {"rss_before_kb": rss0, "rss_after_kb": rss1,
+                   "rss_per_session_kb": round((rss1 - rss0) / concurrency, 1),
+                   "state_kb": percentiles([r.state_kb for r in results])},
+        "exceptions": sorted({m for r in results for m in r.exceptions})[:20],
+        "errors": [r.error for r in results if r.error][:5],
+    }
+
+
+def _probe_top(n: int = 8) -> List[Dict[str, Any]]:
+    try:
+        import perf_probe
+        return perf_probe.stats()[:n]
+    except Exception:
+        return []
+
+
+def _print_level(rep: Dict[str, Any]) -> None:
+    lat, mem = rep["latency_ms"], rep["memory"]
+    print(f"[c={rep['concurrency']:>3}] reruns={rep['reruns']:<5} {rep['reruns_per_s']:>6}/s busy={rep['busy']:.2f}  "
+          f"p50={lat.get('p50', '-')}  p95={lat.get('p95', '-')}  p99={lat.get('p99', '-')}  max={lat.get('max', '-')} ms  "
+          f"RSS/session={mem['rss_per_session_kb']} KB  state p50={mem['state_kb'].get('p50', '-')} KB"
+          + (f"  exceptions={len(rep['exceptions'])}" if rep["exceptions"] else "")
+          + (f"  errors={len(rep['errors'])}" if rep["errors"] else ""), file=sys.stderr)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="BloodMap headless load test (AppTest)")
+    ap.add_argument("-c", "--concurrency", type=int, default=4)
+    ap.add_argument("--ramp", help="예: 1,2,4,8 — 단계별로 동시 세션 수를 늘림(-c 무시)")
+    ap.add_argument("--loops", type=int, default=1, help="세션당 시나리오 반복 횟수")
+    ap.add_argument("--seed", type=int, default=20261018)
+    ap.add_argument("--slo-ms", type=float, default=DEFAULT_SLO_MS, help="허용 p95 리런 지연(대기+실행)")
+    ap.add_argument("--think-ms", type=float, default=DEFAULT_THINK_MS, help="동작 사이 평균 생각 시간(0 = 쉬지 않음)")
+    ap.add_argument("--json", help="결과 JSON 경로")
+    ap.add_argument("--no-warmup", action="store_true")
+    a = ap.parse_args(argv)
+
+    _isolate_storage()
+    import logging
+    import streamlit.testing.v1  # noqa: F401 — 로거가 생긴 뒤에 레벨 조정
+    for name in [n for n in logging.root.manager.loggerDict if n.startswith("streamlit")]:
+        logging.getLogger(name).setLevel(logging.ERROR)   # bare-mode ScriptRunContext 경고
+    levels = [int(x) for x in a.ramp.split(",") if x.strip()] if a.ramp else [a.concurrency]
+
+    report: Dict[str, Any] = {"slo_p95_ms": a.slo_ms, "levels": [], "max_ok_concurrency": 0}
+    offset = 0
+    if not a.no_warmup:
+        warm = run_level(1, 1, a.seed, offset, think_ms=0)
+        offset += 1
+        report["warmup"] = {"wall_s": warm["wall_s"], "errors": warm["errors"]}
+        try:
+            import perf_probe
+            perf_probe.clear()   # probe_top 은 측정 단계만
+        except Exception:
+            pass
+    for c in levels:
+        rep = run_level(c, a.loops, a.seed, offset, a.think_ms)
+        offset += c   # 단계마다 다른 사용자(별명#PIN)
+        report["levels"].append(rep)
+        _print_level(rep)
+        if rep["latency_ms"].get("p95", 0) > a.slo_ms or rep["errors"]:
+            report["first_breach"] = c
+            break
+        report["max_ok_concurrency"] = c
+    report["probe_top"] = _probe_top()
+    print(f"max concurrency within p95 ≤ {a.slo_ms:.0f} ms: {report['max_ok_concurrency']}", file=sys.stderr)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if a.json:
+        with open(a.json, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0 if not any(lv["errors"] for lv in report["levels"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
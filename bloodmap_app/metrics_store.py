@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+metrics_store.py
+사용량 카운터 — 프로세스 내 누적 + 주기적 flush, SQLite(WAL) append-only
+- incr(name, n=1, **labels) : deque.append 1회(원자적, 락 없음) — 세션 시작 경로에서 파일 I/O 없음
+- flush() : 쌓인 이벤트를 (이름, 라벨, 분) 단위로 합쳐 한 트랜잭션 INSERT. FLUSH_INTERVAL_S 마다/FLUSH_MAX 건마다/종료 시
+    행을 고치지 않고 추가만 하므로 여러 워커가 동시에 기록해도 증가분이 사라지지 않음
+- daily()/total()/by_label() : 일별 합계는 읽을 때 GROUP BY (KST 날짜)
+- 기존 usage_stats.csv(date, daily_opens) 는 migrate_usage_csv() 로 1회 이관
+"""
+from __future__ import annotations
+import atexit, csv, json, os, sqlite3, threading, time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+    _KST = ZoneInfo("Asia/Seoul")
+except Exception:
+    _KST = None
+
+FLUSH_INTERVAL_S = 10.0
+FLUSH_MAX = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counter_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts_kst TEXT NOT NULL,
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL DEFAULT '{}',
+    n INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_counter_name_ts ON counter_events(name, ts_kst);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_INIT_LOCK = threading.Lock()
+_INITED: set = set()
+_PENDING: "deque[Tuple[str, str, str, int]]" = deque()   # (minute, name, labels, n)
+_FLUSH_LOCK = threading.Lock()
+_LAST_FLUSH = time.monotonic()
+_DB_PATH: Optional[str] = None
+
+
+def _kst_now() -> datetime:
+    return datetime.now(_KST) if _KST else datetime.utcnow() + timedelta(hours=9)
+
+
+def default_path(base_dir: Optional[str] = None) -> str:
+    d = base_dir or os.environ.get("BLOODMAP_DATA_DIR") or os.path.join(os.path.expanduser("~"), ".bloodmap", "metrics")
+    os.makedirs(d, exist_ok=True)
+    return os.path.join(d, "metrics.sqlite3")
+
+
+def configure(db_path: Optional[str] = None) -> str:
+    """기록할 DB 경로 지정(없으면 default_path). 남은 이벤트는 먼저 이전 경로로 flush."""
+    global _DB_PATH
+    new = db_path or default_path()
+    if new == _DB_PATH:
+        return new
+    if _PENDING and _DB_PATH:
+        flush()
+    _DB_PATH = new
+    return _DB_PATH
+
+
+def _path(db_path: Optional[str]) -> str:
+    return db_path or _DB_PATH or configure()
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    con = sqlite3.connect(db_path, timeout=15.0, isolation_level=None)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA busy_timeout=15000")
+    if db_path not in _INITED:
+        with _INIT_LOCK:
+            if db_path not in _INITED:
+                con.executescript(_SCHEMA)
+                _INITED.add(db_path)
+    return con
+
+
+_MINUTE = [0.0, ""]   # [다음 분 경계(epoch), "YYYY-MM-DD HH:MM"] — incr 마다 시각 포맷하지 않음
+
+
+def _minute() -> str:
+    now = time.time()
+    if now >= _MINUTE[0]:
+        _MINUTE[1] = _kst_now().strftime("%Y-%m-%d %H:%M")
+        _MINUTE[0] = now - (now % 60) + 60
+    return _MINUTE[1]
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return "{}"
+    return json.dumps({k: str(v) for k, v in sorted(labels.items()) if v is not None},
+                      ensure_ascii=False, separators=(",", ":"))
+
+
+def incr(name: str, n: int = 1, **labels) -> None:
+    """카운터 증가. 예: incr("sessions"), incr("tab_view", tab="report")."""
+    _PENDING.append((_minute(), name, _labels(labels) if labels else "{}", int(n)))
+    if len(_PENDING) >= FLUSH_MAX or time.monotonic() - _LAST_FLUSH >= FLUSH_INTERVAL_S:
+        try:
+            flush(block=False)
+        except Exception:
+            pass   # 다음 flush 에서 재시도(이벤트는 되돌려 놓음)
+
+
+def pending() -> int:
+    return len(_PENDING)
+
+
+def flush(db_path: Optional[str] = None, block: bool = True) -> int:
+    """
+    쌓인 이벤트를 DB 에 기록. 반환: 기록한 행 수(합친 뒤).
+    block=False 면 다른 스레드가 flush 중일 때 바로 반환. 실패하면 이벤트를 되돌려 놓고 예외.
+    """
+    global _LAST_FLUSH
+    if not _FLUSH_LOCK.acquire(blocking=block):
+        return 0
+    try:
+        _LAST_FLUSH = time.monotonic()
+        agg: Dict[Tuple[str, str, str], int] = {}
+        while True:
+            try:
+                minute, name, labels, n = _PENDING.popleft()
+            except IndexError:
+                break
+            k = (minute, name, labels)
+            agg[k] = agg.get(k, 0) + n
+        if not agg:
+            return 0
+        rows = [(m, nm, lb, n) for (m, nm, lb), n in agg.items()]
+        try:
+            con = connect(_path(db_path))
+            try:
+                con.execute("BEGIN IMMEDIATE")
+                con.executemany("INSERT INTO counter_events (ts_kst,name,labels,n) VALUES (?,?,?,?)", rows)
+                con.execute("COMMIT")
+            finally:
+                con.close()
+        except Exception:
+            for r in rows:
+                _PENDING.append(r)
+            raise
+        return len(rows)
+    finally:
+        _FLUSH_LOCK.release()
+
+
+def _atexit_flush() -> None:
+    try:
+        flush()
+    except Exception:
+        pass
+
+
+atexit.register(_atexit_flush)
+
+
+def _where(name: str, since: Optional[str] = None, until: Optional[str] = None,
+           labels: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Any]]:
+    conds, args = ["name = ?"], [name]
+    if since:
+        conds.append("ts_kst >= ?"); args.append(str(since))
+    if until:
+        conds.append("ts_kst < ?"); args.append(str(until))
+    for k, v in (labels or {}).items():
+        conds.append("json_extract(labels, ?) = ?"); args += [f"$.{k}", str(v)]
+    return "WHERE " + " AND ".join(conds), args
+
+
+def _read(sql: str, args: List[Any], db_path: Optional[str]) -> List[tuple]:
+    if _PENDING:
+        try:
+            flush(db_path)   # 읽기 전에 이 프로세스의 미기록분 반영
+        except Exception:
+            pass
+    con = connect(_path(db_path))
+    try:
+        return con.execute(sql, args).fetchall()
+    finally:
+        con.close()
+
+
+def total(name: str, db_path: Optional[str] = None, since: Optional[str] = None, **labels) -> int:
+    w, args = _where(name, since=since, labels=labels)
+    rows = _read(f"SELECT COALESCE(SUM(n), 0) FROM counter_events {w}", args, db_path)
+    return int(rows[0][0])
+
+
+def today(name: str, db_path: Optional[str] = None, **labels) -> int:
+    return total(name, db_path, since=_kst_now().strftime("%Y-%m-%d"), **labels)
+
+
+def daily(name: str, days: Optional[int] = 7, db_path: Optional[str] = None, **labels) -> List[Tuple[str, int]]:
+    """[(YYYY-MM-DD, 합계)] 오래된 날짜부터. days=None 이면 전체."""
+    since = (_kst_now() - timedelta(days=days - 1)).strftime("%Y-%m-%d") if days else None
+    w, args = _where(name, since=since, labels=labels)
+    rows = _read(f"SELECT substr(ts_kst, 1, 10) AS day, SUM(n) FROM counter_events {w} GROUP BY day ORDER BY day",
+                 args, db_path)
+    return [(r[0], int(r[1])) for r in rows]
+
+
+def by_label(name: str, label: str, db_path: Optional[str] = None, since: Optional[str] = None) -> List[Tuple[str, int]]:
+    """라벨 값별 합계(많은 순). 예: by_label("tab_view", "tab")."""
+    w, args = _where(name, since=since)
+    rows = _read(f"SELECT json_extract(labels, ?) AS v, SUM(n) AS s FROM counter_events {w} "
+                 f"GROUP BY v ORDER BY s DESC", [f"$.{label}"] + args, db_path)
+    return [(r[0] if r[0] is not None else "", int(r[1])) for r in rows]
+
+
+def count_session_once(session_state, name: str = "sessions", flag: str = "_bm_session_counted", **labels) -> bool:
+    """세션당 1회만 incr. 반환: 이번 호출에서 셌는지."""
+    try:
+        if session_state.get(flag):
+            return False
+        session_state[flag] = True
+    except Exception:
+        return False
+    incr(name, **labels)
+    return True
+
+
+def migrate_usage_csv(csv_path: str, name: str = "sessions", db_path: Optional[str] = None) -> int:
+    """기존 usage_stats.csv(date, daily_opens) → 이벤트 1회 이관(meta 에 기록). 반환: 이관한 날짜 수."""
+    if not csv_path or not os.path.exists(csv_path):
+        return 0
+    con = connect(_path(db_path))
+    try:
+        key = "migrated:" + os.path.abspath(csv_path)
+        if con.execute("SELECT 1 FROM meta WHERE key=?", (key,)).fetchone():
+            return 0
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            if con.execute("SELECT 1 FROM meta WHERE key=?", (key,)).fetchone():
+                con.execute("ROLLBACK")
+                return 0
+            n = 0
+            with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+                for row in csv.DictReader(f):
+                    day = str(row.get("date") or "").strip()[:10]
+                    try:
+                        cnt = int(float(row.get("daily_opens") or 0))
+                    except Exception:
+                        continue
+                    if not day or cnt <= 0:
+                        continue
+                    con.execute("INSERT INTO counter_events (ts_kst,name,labels,n) VALUES (?,?,?,?)",
+                                (f"{day} 00:00", name, "{}", cnt))
+                    n += 1
+            con.execute("INSERT INTO meta(key, value) VALUES (?, ?)", (key, str(n)))
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        return n
+    finally:
+        con.close()
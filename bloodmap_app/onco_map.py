@@ -237,11 +237,25 @@ def auto_recs_by_dx(group: str, dx: str, DRUG_DB: Dict[str, Dict[str, Any]] = No
     omap = ONCO_MAP or build_onco_map()
     gmap = omap.get(group or "", {})
     dmap = gmap.get(dx or "", {})
+    idx = None
+    if DRUG_DB:
+        try:
+            from drug_index import get_index  # 별칭 역색인(O(1))
+            idx = get_index(DRUG_DB)
+        except Exception:
+            idx = None
     for k in out.keys():
         picks = [ _canon(p) for p in dmap.get(k, []) ]
         if DRUG_DB:
             # include if key exists OR lower() exists OR alias exists
             filtered = []
+            if idx is not None:
+                for p in picks:
+                    hit = idx.match_pick(p)
+                    if hit is not None:
+                        filtered.append(hit)
+                out[k] = filtered or picks
+                continue
             for p in picks:
                 if p in DRUG_DB or p.lower() in DRUG_DB:
                     filtered.append(p)
@@ -263,8 +277,7 @@ try:
 except NameError:
     __orig_build_onco_map = None
 
-def build_onco_map():
-    M = __orig_build_onco_map() if __orig_build_onco_map else {}
+def _ensure_aml_maintenance(M):
     try:
         heme = M.get("혈액암", {})
         aml = heme.get("AML", {})
@@ -286,6 +299,10 @@ def build_onco_map():
         pass
     return M
 
+def build_onco_map():
+    M = __orig_build_onco_map() if __orig_build_onco_map else {}
+    return _ensure_aml_maintenance(M)
+
 
 
 
@@ -497,3 +514,93 @@ def get_dx_notes() -> Dict[str, str]:
         pass
     return notes
 # === [/PATCH] ===
+
+
+
+# === [PATCH 2026-10-18 KST] build_onco_map 메모이즈 + 레이어 평탄화 ===
+# 래퍼 체인(_prev_build/_prev_build2/_prev_build3) 대신 base → 레이어 순차 적용 1회.
+# 결과는 읽기 전용(MappingProxy/tuple)으로 동결해 캐시 공유. 수정이 필요하면 onco_map_copy().
+# 프로파일: build_onco_map(profile=True) 또는 BLOODMAP_PROFILE_ONCO=1 → onco_map_profile()
+import os as _os
+import time as _time
+import threading as _threading
+from types import MappingProxyType as _MappingProxyType
+
+_ONCO_BASE_BUILD = __orig_build_onco_map
+ONCO_MAP_LAYERS = [
+    ("aml_maintenance", _ensure_aml_maintenance),
+    ("heme_20251025", _extend_onco_map_20251025),
+    ("solid_20251025", _extend_onco_map_solid_20251025),
+    ("user_20251025", _extend_onco_map_user_20251025),
+]
+_ONCO_LOCK = _threading.Lock()
+_ONCO_CACHE = None
+_ONCO_PROFILE: List[Dict[str, Any]] = []
+
+
+def _freeze(obj):
+    if isinstance(obj, dict):
+        return _MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+
+def _thaw(obj):
+    if isinstance(obj, (dict, _MappingProxyType)):
+        return {k: _thaw(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [_thaw(v) for v in obj]
+    return obj
+
+
+def _build_onco_map_layers(profile: bool = False):
+    timings: List[Dict[str, Any]] = []
+    t0 = _time.perf_counter()
+    m = (_ONCO_BASE_BUILD() if _ONCO_BASE_BUILD else {}) or {}
+    if profile:
+        timings.append({"layer": "base", "ms": (_time.perf_counter() - t0) * 1000.0})
+    for name, fn in ONCO_MAP_LAYERS:
+        t1 = _time.perf_counter()
+        try:
+            m = fn(m) or m
+        except Exception:
+            pass
+        if profile:
+            timings.append({"layer": name, "ms": (_time.perf_counter() - t1) * 1000.0})
+    if profile:
+        timings.append({"layer": "total", "ms": (_time.perf_counter() - t0) * 1000.0})
+    return m, timings
+
+
+def build_onco_map(profile: bool = False):
+    """최종 ONCO 맵(동결·캐시). profile=True 면 재빌드하며 레이어별 소요시간 기록."""
+    global _ONCO_CACHE, _ONCO_PROFILE
+    profile = profile or _os.environ.get("BLOODMAP_PROFILE_ONCO") == "1"
+    cached = _ONCO_CACHE
+    if cached is not None and not profile:
+        return cached
+    with _ONCO_LOCK:
+        if _ONCO_CACHE is None or profile:
+            m, timings = _build_onco_map_layers(profile=profile)
+            _ONCO_CACHE = _freeze(m)
+            if profile:
+                _ONCO_PROFILE = timings
+        return _ONCO_CACHE
+
+
+def onco_map_copy() -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+    """수정 가능한 깊은 사본(dict/list)."""
+    return _thaw(build_onco_map())
+
+
+def onco_map_profile() -> List[Dict[str, Any]]:
+    """마지막 프로파일 빌드의 레이어별 소요시간(ms)."""
+    return [dict(t) for t in _ONCO_PROFILE]
+
+
+def invalidate_onco_map() -> None:
+    global _ONCO_CACHE
+    with _ONCO_LOCK:
+        _ONCO_CACHE = None
+# === [/PATCH] ===
@@ -33,6 +33,13 @@ def resolve_data_dirs() -> tuple[str,str,str,str]:
         Path(d).mkdir(parents=True, exist_ok=True)
     return SAVE_DIR, CARE_DIR, PROF_DIR, MET_DIR
 
+def resolve_db_path() -> str:
+    """통합 사용자 DB(user_store) 경로 — env BLOODMAP_USER_DB > 기본 데이터 폴더/bloodmap.sqlite3."""
+    env = os.environ.get("BLOODMAP_USER_DB")
+    if env:
+        return env
+    return str(Path(_pick_base_dir())/"bloodmap.sqlite3")
+
 def safe_json_write(path: str, data: Any) -> None:
     p = Path(path)
     p.parent.mkdir(parents=True, exist_ok=True)
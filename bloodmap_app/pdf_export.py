@@ -17,7 +17,37 @@ FONT_MAP = [
     ("/mnt/data/d84103a9-b7ea-4030-8304-a4ef04d3e1f7.otf", "KOR-Alt"),
 ]
 
+# 레이아웃(스타일/여백/마크다운 해석) 변경 시 올림 — pdf_service 캐시 키에 포함
+LAYOUT_VERSION = 1
+
+try:
+    import font_manager as _fm  # 프로세스당 1회 탐색/파싱/등록(재실행마다 폰트를 다시 읽지 않음)
+    _fm.add_candidates([p for p, _n in FONT_MAP])
+except Exception:
+    _fm = None
+
+def font_signature():
+    """사용 가능한 폰트 세트 식별자(경로/크기/mtime). 폰트가 바뀌면 캐시 키도 바뀜."""
+    if _fm is not None:
+        try:
+            return _fm.font_signature()
+        except Exception:
+            pass
+    sig = []
+    for path, name in FONT_MAP:
+        try:
+            st_ = os.stat(path)
+            sig.append((name, path, st_.st_size, st_.st_mtime_ns))
+        except Exception:
+            continue
+    return tuple(sig)
+
 def _register_fonts():
+    if _fm is not None:
+        try:
+            return _fm.register_fonts()
+        except Exception:
+            pass
     regular = None
     bold = None
     for path, name in FONT_MAP:
@@ -93,6 +123,17 @@ def export_md_to_pdf(md_text: str) -> bytes:
     return buf.getvalue()
 
 
+def build_pdf(elements, title: str = "Report", font_candidates=None) -> bytes:
+    """utils.pdf_utils 용: [("h1"|"h2"|"p", text), ...] → PDF bytes (export_md_to_pdf 와 같은 레이아웃)."""
+    if font_candidates and _fm is not None:
+        _fm.add_candidates(font_candidates)
+    lines = []
+    if title and not any(k == "h1" for k, _t in elements or []):
+        lines += [f"# {title}", ""]
+    for kind, text in elements or []:
+        prefix = {"h1": "# ", "h2": "## ", "li": "- "}.get(kind, "")
+        lines += [prefix + ln for ln in str(text).splitlines()] + [""]
+    return export_md_to_pdf("\n".join(lines))
 
 # === [PATCH:P1_PDF_ONCO_AE_SECTION] BEGIN ===
 def append_onco_ae_section(md_text: str, drug_list, formulation_map=None):
@@ -0,0 +1,437 @@
+# -*- coding: utf-8 -*-
+"""
+pdf_service.py
+보고서 PDF 렌더링 서비스 — 프로세스 풀 + 내용 주소(SHA-256) 캐시
+- 키: sha256(markdown, 폰트 세트(pdf_export.font_signature), pdf_export.LAYOUT_VERSION)
+- 같은 보고서는 메모리 LRU → 디스크(<hash>.pdf) 순으로 바로 반환, 렌더 중인 같은 키는 같은 Future 공유
+- 디스크 캐시는 용량(BLOODMAP_PDF_CACHE_MB, 기본 256)·보존 기간(BLOODMAP_PDF_CACHE_DAYS, 기본 30) 제한 —
+  쓰기 때 오래된 파일부터(mtime 기준 LRU, 적중 시 mtime 갱신) 정리
+- 렌더는 상주 워커 프로세스(`python pdf_service.py --worker`, 파이프 통신)에서 → 여러 보호자가 동시에
+  내보내도 서로의 스크립트 스레드(GIL)를 막지 않음. multiprocessing spawn 은 streamlit 이 __main__ 으로
+  설치한 app.py 를 워커마다 다시 실행하므로 쓰지 않음
+- 워커를 띄울 수 없는 환경이거나 BLOODMAP_PDF_WORKERS=0 이면 현재 프로세스에서 동기 렌더(기존 동작)
+- render() 대기 시간 초과는 TimeoutError 로 알림 — 렌더는 계속되어 끝나면 캐시에 들어가고 풀은 그대로 사용
+"""
+from __future__ import annotations
+import hashlib, json, os, struct, subprocess, sys, threading, time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Dict, Optional
+
+MEM_CACHE_BYTES = 64 * 1024 * 1024
+_ENV_WORKERS = os.environ.get("BLOODMAP_PDF_WORKERS", "").strip()
+MAX_WORKERS = int(_ENV_WORKERS) if _ENV_WORKERS.isdigit() else min(2, os.cpu_count() or 1)
+
+
+def _env_num(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+
+
+DISK_CACHE_BYTES = int(_env_num("BLOODMAP_PDF_CACHE_MB", 256) * 1024 * 1024)
+DISK_CACHE_MAX_AGE = _env_num("BLOODMAP_PDF_CACHE_DAYS", 30) * 86400
+DISK_PRUNE_INTERVAL = 60.0  # 초 — 쓰기마다 디렉터리를 훑지 않도록
+
+_LOCK = threading.Lock()
+_MEM: "OrderedDict[str, bytes]" = OrderedDict()
+_MEM_BYTES = 0
+_PENDING: Dict[str, Future] = {}
+_STATS = {"mem_hit": 0, "disk_hit": 0, "render": 0, "inline": 0}
+_POOL = None
+_POOL_BROKEN = False
+_MODULE_PATH: Optional[str] = None
+_WORKERS: list = []
+_TLS = threading.local()
+_HDR = struct.Struct("<BQ")  # (status 0=ok/1=error, 길이)
+_LAST_PRUNE = 0.0
+
+# ---------- worker side ----------
+_W_MOD = None
+
+
+def _worker_init(module_path: Optional[str]) -> None:
+    global _W_MOD
+    import importlib.util, sys
+    if module_path and os.path.exists(module_path):
+        d = os.path.dirname(module_path)
+        if d not in sys.path:
+            sys.path.insert(0, d)
+        spec = importlib.util.spec_from_file_location("pdf_export", module_path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        sys.modules["pdf_export"] = mod
+        _W_MOD = mod
+    else:
+        import pdf_export as mod  # type: ignore
+        _W_MOD = mod
+    try:
+        _W_MOD._get_styles()  # 폰트 등록을 워커 기동 시 1회
+    except Exception:
+        pass
+
+
+def _read_exact(f, n: int) -> bytes:
+    buf = b""
+    while len(buf) < n:
+        chunk = f.read(n - len(buf))
+        if not chunk:
+            raise EOFError("pdf worker pipe closed")
+        buf += chunk
+    return buf
+
+
+def _worker_main(module_path: Optional[str]) -> None:
+    """상주 워커: stdin 으로 (길이, markdown) 을 받아 stdout 으로 (상태, 길이, PDF) 반환. EOF 면 종료."""
+    rin, rout = sys.stdin.buffer, sys.stdout.buffer
+    sys.stdout = sys.stderr  # 렌더 중 print 가 프로토콜을 깨지 않도록
+    _worker_init(module_path or None)
+    while True:
+        try:
+            _st, n = _HDR.unpack(_read_exact(rin, _HDR.size))
+            md_text = _read_exact(rin, n).decode("utf-8")
+        except EOFError:
+            return
+        try:
+            out, status = _W_MOD.export_md_to_pdf(md_text), 0
+        except Exception as e:
+            out, status = f"{type(e).__name__}: {e}".encode("utf-8"), 1
+        rout.write(_HDR.pack(status, len(out)) + out)
+        rout.flush()
+
+
+class _Worker:
+    """스레드 1개 ↔ 워커 프로세스 1개. 프로세스가 죽었으면 다음 요청 때 한 번 재기동."""
+
+    def __init__(self, module_path: Optional[str]):
+        self.module_path = module_path
+        self.proc = None
+
+    def _start(self) -> None:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join([os.path.dirname(os.path.abspath(__file__)), env.get("PYTHONPATH", "")])
+        self.proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker", self.module_path or ""],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                     env=env)
+
+    def _call(self, md_text: str) -> bytes:
+        if self.proc is None or self.proc.poll() is not None:
+            self._start()
+        data = (md_text or "").encode("utf-8")
+        self.proc.stdin.write(_HDR.pack(0, len(data)) + data)
+        self.proc.stdin.flush()
+        status, n = _HDR.unpack(_read_exact(self.proc.stdout, _HDR.size))
+        body = _read_exact(self.proc.stdout, n)
+        if status:
+            raise RuntimeError(body.decode("utf-8", "replace"))
+        return body
+
+    def render(self, md_text: str) -> bytes:
+        try:
+            return self._call(md_text)
+        except (EOFError, BrokenPipeError, OSError):
+            self.close()
+            return self._call(md_text)
+
+    def close(self) -> None:
+        p, self.proc = self.proc, None
+        if p is None:
+            return
+        try:
+            p.stdin.close()
+            p.wait(timeout=5)
+        except Exception:
+            try:
+                p.kill()
+            except Exception:
+                pass
+
+
+def _worker_render(md_text: str) -> bytes:
+    """풀 스레드에서 실행 — 스레드별 상주 워커 프로세스에 위임."""
+    w = getattr(_TLS, "worker", None)
+    if w is None or w.module_path != _MODULE_PATH:
+        w = _TLS.worker = _Worker(_MODULE_PATH)
+        with _LOCK:
+            _WORKERS.append(w)
+    return w.render(md_text)
+
+
+# ---------- caller side ----------
+def configure(module_path: Optional[str] = None, workers: Optional[int] = None) -> None:
+    """app 이 실제로 로드한 pdf_export 경로(PDF_PATH)를 알려줌 — 워커가 같은 파일을 로드.
+    workers: 워커 프로세스 수 변경(일괄 내보내기 등). 바뀌면 기존 워커는 정리."""
+    global _MODULE_PATH, MAX_WORKERS
+    if module_path and "::" in module_path:
+        module_path = module_path.split("::", 1)[1]
+    if module_path and module_path != _MODULE_PATH:
+        shutdown()
+        _MODULE_PATH = module_path
+    if workers is not None and int(workers) != MAX_WORKERS:
+        shutdown()
+        MAX_WORKERS = int(workers)
+
+
+def _pdf_module():
+    import sys
+    mod = sys.modules.get("pdf_export")
+    if mod is None:
+        import pdf_export as mod  # type: ignore
+    return mod
+
+
+def cache_key(md_text: str) -> str:
+    mod = _pdf_module()
+    try:
+        fonts = list(mod.font_signature())
+    except Exception:
+        fonts = []
+    payload = json.dumps([md_text or "", fonts, getattr(mod, "LAYOUT_VERSION", 0)],
+                         ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_dir() -> Optional[str]:
+    d = os.environ.get("BLOODMAP_PDF_CACHE_DIR")
+    if not d:
+        try:
+            from pathsafe import _pick_base_dir  # type: ignore
+            d = os.path.join(_pick_base_dir(), "cache", "pdf")
+        except Exception:
+            return None
+    try:
+        os.makedirs(d, exist_ok=True)
+        return d
+    except Exception:
+        return None
+
+
+def _mem_put(key: str, data: bytes) -> None:
+    global _MEM_BYTES
+    with _LOCK:
+        if key in _MEM:
+            _MEM.move_to_end(key)
+            return
+        _MEM[key] = data
+        _MEM_BYTES += len(data)
+        while _MEM_BYTES > MEM_CACHE_BYTES and len(_MEM) > 1:
+            _k, old = _MEM.popitem(last=False)
+            _MEM_BYTES -= len(old)
+
+
+def _disk_put(key: str, data: bytes) -> None:
+    global _LAST_PRUNE
+    d = cache_dir()
+    if not d:
+        return
+    p = os.path.join(d, key + ".pdf")
+    tmp = f"{p}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, p)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+    now = time.time()
+    with _LOCK:
+        if now - _LAST_PRUNE < DISK_PRUNE_INTERVAL:
+            return
+        _LAST_PRUNE = now
+    prune_disk(d, now=now)
+
+
+def prune_disk(d: Optional[str] = None, now: Optional[float] = None) -> int:
+    """디스크 캐시 정리: 보존 기간이 지난 파일 삭제 후 용량 초과분을 오래된(mtime) 순으로 삭제. 삭제 수 반환.
+    남은 .tmp(중단된 쓰기)도 한 시간이 지나면 삭제."""
+    d = d or cache_dir()
+    if not d:
+        return 0
+    now = time.time() if now is None else now
+    files, removed = [], 0
+    try:
+        names = os.listdir(d)
+    except Exception:
+        return 0
+    for fn in names:
+        fp = os.path.join(d, fn)
+        try:
+            stt = os.stat(fp)
+        except OSError:
+            continue
+        age = now - stt.st_mtime
+        if (fn.endswith(".tmp") and age > 3600) or (fn.endswith(".pdf") and DISK_CACHE_MAX_AGE > 0 and age > DISK_CACHE_MAX_AGE):
+            try:
+                os.remove(fp)
+                removed += 1
+            except OSError:
+                pass
+        elif fn.endswith(".pdf"):
+            files.append((stt.st_mtime, stt.st_size, fp))
+    total = sum(sz for _m, sz, _p in files)
+    for _m, sz, fp in sorted(files):
+        if total <= DISK_CACHE_BYTES:
+            break
+        try:
+            os.remove(fp)
+            removed += 1
+            total -= sz
+        except OSError:
+            pass
+    return removed
+
+
+def cached(md_text: str, key: Optional[str] = None) -> Optional[bytes]:
+    key = key or cache_key(md_text)
+    with _LOCK:
+        data = _MEM.get(key)
+        if data is not None:
+            _MEM.move_to_end(key)
+            _STATS["mem_hit"] += 1
+            return data
+    d = cache_dir()
+    if d:
+        p = os.path.join(d, key + ".pdf")
+        try:
+            with open(p, "rb") as f:
+                data = f.read()
+        except Exception:
+            data = None
+        if data:
+            try:
+                os.utime(p)  # LRU 정리 기준
+            except OSError:
+                pass
+            _mem_put(key, data)
+            with _LOCK:
+                _STATS["disk_hit"] += 1
+            return data
+    return None
+
+
+def _get_pool():
+    global _POOL, _POOL_BROKEN
+    if _POOL_BROKEN or MAX_WORKERS <= 0:
+        return None
+    with _LOCK:
+        if _POOL is None:
+            try:
+                from concurrent.futures import ThreadPoolExecutor
+                _POOL = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="pdf_service")
+            except Exception:
+                _POOL_BROKEN = True
+                return None
+        return _POOL
+
+
+def _done_future(value: Any = None, exc: Optional[BaseException] = None) -> Future:
+    f: Future = Future()
+    if exc is not None:
+        f.set_exception(exc)
+    else:
+        f.set_result(value)
+    return f
+
+
+def _finish(key: str, fut: Future) -> None:
+    with _LOCK:
+        _PENDING.pop(key, None)
+    if fut.cancelled() or fut.exception() is not None:
+        return
+    data = fut.result()
+    _mem_put(key, data)
+    _disk_put(key, data)
+
+
+def submit(md_text: str) -> Future:
+    """PDF 렌더 요청 → Future[bytes]. 캐시 적중이면 완료된 Future, 같은 키가 렌더 중이면 그 Future."""
+    key = cache_key(md_text)
+    data = cached(md_text, key)
+    if data is not None:
+        return _done_future(data)
+    with _LOCK:
+        fut = _PENDING.get(key)
+        if fut is not None:
+            return fut
+    pool = _get_pool()
+    fut = None
+    if pool is not None:
+        try:
+            fut = pool.submit(_worker_render, md_text)
+            with _LOCK:
+                _STATS["render"] += 1
+        except Exception:
+            fut = None
+    if fut is None:
+        with _LOCK:
+            _STATS["inline"] += 1
+        try:
+            fut = _done_future(_pdf_module().export_md_to_pdf(md_text))
+        except Exception as e:
+            return _done_future(exc=e)
+    with _LOCK:
+        _PENDING[key] = fut
+    fut.add_done_callback(lambda f, k=key: _finish(k, f))
+    return fut
+
+
+def render(md_text: str, timeout: Optional[float] = 60.0) -> bytes:
+    """submit + 대기. 워커 프로세스를 쓸 수 없으면(기동 실패/반복 종료) 이후 현재 프로세스에서 렌더.
+    timeout 초과는 TimeoutError 로 그대로 올림(풀은 정상 — 렌더가 끝나면 캐시에 들어가 다음 요청이 바로 받음).
+    FutureTimeout 은 3.11+ 에서 OSError 의 하위 클래스라 먼저 잡아야 함."""
+    global _POOL_BROKEN
+    fut = submit(md_text)
+    try:
+        return fut.result(timeout=timeout)
+    except FutureTimeout:
+        raise
+    except (EOFError, OSError):
+        _POOL_BROKEN = True
+        shutdown()
+        data = _pdf_module().export_md_to_pdf(md_text)
+        key = cache_key(md_text)
+        _mem_put(key, data)
+        _disk_put(key, data)
+        return data
+
+
+def cache_info() -> Dict[str, int]:
+    with _LOCK:
+        return {"entries": len(_MEM), "bytes": _MEM_BYTES, "pending": len(_PENDING), **_STATS}
+
+
+def clear_cache(disk: bool = False) -> None:
+    global _MEM_BYTES
+    with _LOCK:
+        _MEM.clear()
+        _MEM_BYTES = 0
+    d = cache_dir() if disk else None
+    if d:
+        for fn in os.listdir(d):
+            if fn.endswith(".pdf"):
+                try:
+                    os.remove(os.path.join(d, fn))
+                except Exception:
+                    pass
+
+
+def shutdown(wait: bool = False) -> None:
+    global _POOL
+    with _LOCK:
+        pool, _POOL = _POOL, None
+        workers, _WORKERS[:] = list(_WORKERS), []
+    if pool is not None:
+        try:
+            pool.shutdown(wait=wait, cancel_futures=True)
+        except Exception:
+            pass
+    for w in workers:
+        w.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "--worker":
+        _worker_main(sys.argv[2] if len(sys.argv) > 2 else None)
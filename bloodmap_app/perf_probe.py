@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+perf_probe.py
+리런 단위 블록 계측 — 이름 붙인 블록의 소요 시간(ms)/호출 수/할당(KB, 선택)
+- with block("emergency_level"): ...  /  @timed("name")  /  fn = wrap(fn)  /  t_home = tab(t_home, "tab:home")
+- record(name, ms) : with 로 감쌀 수 없는 구간(리런 전체 등)
+- begin_run() 로 리런 번호를 올리고, 기록은 링 버퍼(RING_SIZE)에 — 메모리 상한 고정
+- run_summary() : 가장 최근(또는 지정) 리런의 블록별 합계, stats() : 프로세스 누적
+- export_jsonl() : 링 버퍼를 JSONL 로(패치 전/후 비교용), render_panel(st) : 개발자 패널
+- 할당 추적(tracemalloc)은 기본 꺼짐 — set_alloc(True) 또는 env BLOODMAP_PROFILE_ALLOC=1
+- env BLOODMAP_PROFILE=0 이면 모든 계측이 즉시 통과(no-op)
+"""
+from __future__ import annotations
+import functools, io, json, os, threading, time, tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+RING_SIZE = 5000
+ENABLED = os.environ.get("BLOODMAP_PROFILE", "1") != "0"
+
+_RING: "deque[Record]" = deque(maxlen=RING_SIZE)
+_STATS: Dict[str, "BlockStats"] = {}
+_LOCK = threading.Lock()
+_RUN = [0]
+_TLS = threading.local()   # 세션마다 스크립트 스레드가 다르므로 중첩/리런 번호는 스레드별
+
+
+@dataclass
+class Record:
+    ts: float
+    run: int
+    block: str
+    ms: float
+    depth: int
+    ok: bool
+    alloc_kb: Optional[float] = None
+
+
+@dataclass
+class BlockStats:
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_ms: float = 0.0
+    errors: int = 0
+
+
+def set_alloc(on: bool) -> None:
+    """tracemalloc 켜기/끄기(켜면 전체 앱이 느려지므로 측정할 때만)."""
+    if on and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not on and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+if os.environ.get("BLOODMAP_PROFILE_ALLOC") == "1":
+    set_alloc(True)
+
+
+def begin_run() -> int:
+    """리런 시작 표시(스크립트 맨 앞에서 1회). 반환: 이 스레드의 리런 번호."""
+    with _LOCK:
+        _RUN[0] += 1
+        _TLS.run = _RUN[0]
+    _TLS.depth = 0
+    return _TLS.run
+
+
+def current_run() -> int:
+    return getattr(_TLS, "run", 0)
+
+
+def _record(name: str, ms: float, depth: int, ok: bool, alloc_kb: Optional[float]) -> None:
+    rec = Record(time.time(), current_run(), name, round(ms, 3), depth, ok,
+                 None if alloc_kb is None else round(alloc_kb, 1))
+    with _LOCK:
+        _RING.append(rec)
+        s = _STATS.get(name)
+        if s is None:
+            s = _STATS[name] = BlockStats()
+        s.calls += 1
+        s.total_ms += ms
+        s.last_ms = ms
+        if ms > s.max_ms:
+            s.max_ms = ms
+        if not ok:
+            s.errors += 1
+
+
+def record(name: str, ms: float) -> None:
+    """with 로 감쌀 수 없는 구간(예: 리런 전체)을 직접 기록."""
+    if ENABLED:
+        _record(name, float(ms), getattr(_TLS, "depth", 0), True, None)
+
+
+@contextmanager
+def block(name: str) -> Iterator[None]:
+    if not ENABLED:
+        yield
+        return
+    depth = getattr(_TLS, "depth", 0)
+    _TLS.depth = depth + 1
+    tracing = tracemalloc.is_tracing()
+    m0 = tracemalloc.get_traced_memory()[0] if tracing else 0
+    t0 = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException as e:
+        # st.rerun()/st.stop() 은 제어 흐름 예외 — 오류로 세지 않음
+        ok = type(e).__name__ in ("RerunException", "StopException")
+        raise
+    finally:
+        ms = (time.perf_counter() - t0) * 1000.0
+        alloc = (tracemalloc.get_traced_memory()[0] - m0) / 1024.0 if tracing and tracemalloc.is_tracing() else None
+        _TLS.depth = depth
+        _record(name, ms, depth, ok, alloc)
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """데코레이터: @timed() 또는 @timed("render_graph_panel")."""
+    def deco(fn: Callable) -> Callable:
+        return wrap(fn, name)
+    return deco
+
+
+def wrap(fn: Callable, name: Optional[str] = None) -> Callable:
+    """이미 정의된 함수를 계측 함수로(두 번 감싸지 않음)."""
+    if not callable(fn) or getattr(fn, "_perf_probe", None):
+        return fn
+    label = name or getattr(fn, "__name__", "fn")
+
+    @functools.wraps(fn)
+    def _probed(*args, **kwargs):
+        with block(label):
+            return fn(*args, **kwargs)
+    _probed._perf_probe = label
+    return _probed
+
+
+class _ProbedCtx:
+    """탭/컨테이너 프록시 — `with` 구간만 계측, 나머지 속성은 원본으로."""
+    __slots__ = ("_inner", "_name", "_cm")
+
+    def __init__(self, inner, name: str):
+        self._inner, self._name, self._cm = inner, name, []
+
+    def __enter__(self):
+        cm = block(self._name)
+        cm.__enter__()
+        self._cm.append(cm)
+        try:
+            return self._inner.__enter__()
+        except BaseException:
+            self._cm.pop().__exit__(None, None, None)
+            raise
+
+    def __exit__(self, et, ev, tb):
+        try:
+            return self._inner.__exit__(et, ev, tb)
+        finally:
+            self._cm.pop().__exit__(et, ev, tb)
+
+    def __getattr__(self, attr):
+        return getattr(self._inner, attr)
+
+
+def tab(container, name: str):
+    """st.tabs() 결과 등 `with` 로 쓰는 컨테이너를 계측 프록시로."""
+    return _ProbedCtx(container, name) if ENABLED else container
+
+
+def recent(n: int = 200) -> List[Dict[str, Any]]:
+    with _LOCK:
+        items = list(_RING)[-n:]
+    return [asdict(r) for r in items]
+
+
+def run_summary(run: Optional[int] = None) -> List[Dict[str, Any]]:
+    """리런 1회의 블록별 합계(ms 큰 순). run 생략 시 이 스레드의 최근 리런(없으면 버퍼의 마지막 리런)."""
+    with _LOCK:
+        items = list(_RING)
+    if run is None:
+        run = current_run() or (items[-1].run if items else 0)
+    agg: Dict[str, Dict[str, Any]] = {}
+    for r in items:
+        if r.run != run:
+            continue
+        a = agg.setdefault(r.block, {"block": r.block, "calls": 0, "ms": 0.0, "alloc_kb": None, "depth": r.depth})
+        a["calls"] += 1
+        a["ms"] = round(a["ms"] + r.ms, 3)
+        if r.alloc_kb is not None:
+            a["alloc_kb"] = round((a["alloc_kb"] or 0.0) + r.alloc_kb, 1)
+    return sorted(agg.values(), key=lambda a: a["ms"], reverse=True)
+
+
+def stats() -> List[Dict[str, Any]]:
+    """프로세스 누적(블록별 호출/합계/평균/최대)."""
+    with _LOCK:
+        rows = [(k, BlockStats(**asdict(v))) for k, v in _STATS.items()]
+    out = []
+    for k, s in rows:
+        out.append({"block": k, "calls": s.calls, "total_ms": round(s.total_ms, 2),
+                    "avg_ms": round(s.total_ms / s.calls, 3) if s.calls else 0.0,
+                    "max_ms": round(s.max_ms, 3), "last_ms": round(s.last_ms, 3), "errors": s.errors})
+    return sorted(out, key=lambda r: r["total_ms"], reverse=True)
+
+
+def export_jsonl(path: Optional[str] = None) -> str:
+    """링 버퍼 → JSONL 문자열(path 를 주면 파일에 이어 씀)."""
+    buf = io.StringIO()
+    for r in recent(RING_SIZE):
+        buf.write(json.dumps(r, ensure_ascii=False) + "\n")
+    text = buf.getvalue()
+    if path:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(text)
+    return text
+
+
+def clear() -> None:
+    with _LOCK:
+        _RING.clear()
+        _STATS.clear()
+
+
+def render_panel(st) -> None:
+    """개발자 패널: 최근 리런 블록별 표 + 누적 + JSONL 내려받기."""
+    st.markdown("**⏱️ 블록별 렌더 시간(최근 리런)**")
+    st.caption(f"리런 #{current_run()} — 패널 자신은 포함되지 않음.")
+    alloc = st.checkbox("할당 추적(tracemalloc, 느려짐)", value=tracemalloc.is_tracing(), key="_perf_alloc")
+    if alloc != tracemalloc.is_tracing():
+        set_alloc(alloc)
+    rows = run_summary()
+    if rows:
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+    else:
+        st.caption("기록 없음(BLOODMAP_PROFILE=0 이거나 첫 리런 전)")
+    with st.expander("누적(프로세스 기동 후)", expanded=False):
+        st.dataframe(stats(), use_container_width=True, hide_index=True)
+    st.download_button("JSONL 내보내기", data=export_jsonl(), file_name="perf_probe.jsonl",
+                       mime="application/json", key="_perf_export")
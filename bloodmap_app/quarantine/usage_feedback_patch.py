@@ -15,6 +15,14 @@ _METRICS_DIR = "/mnt/data/metrics"
 _USAGE_CSV = os.path.join(_METRICS_DIR, "usage_stats.csv")
 _FEEDBACK_CSV = os.path.join(_METRICS_DIR, "feedback.csv")
 
+# 방문 카운터: metrics_store(프로세스 내 누적 + SQLite append-only). 없으면 기존 CSV 방식
+try:
+    import metrics_store as _metrics
+    _METRICS_DB = os.path.join(_METRICS_DIR, "metrics.sqlite3")
+except Exception:
+    _metrics, _METRICS_DB = None, None
+_USAGE_MIGRATED = False
+
 def _kst_now() -> datetime:
     if _KST is not None:
         return datetime.now(_KST)
@@ -49,9 +57,26 @@ def _save_usage_df(df: pd.DataFrame) -> None:
     df.to_csv(tmp, index=False)
     os.replace(tmp, _USAGE_CSV)
 
+def _metrics_ready() -> bool:
+    global _USAGE_MIGRATED
+    if _metrics is None:
+        return False
+    if not _USAGE_MIGRATED:
+        try:
+            _ensure_metrics_dir()
+            _metrics.configure(_METRICS_DB)
+            _metrics.migrate_usage_csv(_USAGE_CSV)
+        except Exception:
+            return False
+        _USAGE_MIGRATED = True
+    return True
+
 def increment_daily_session_once(session_key: str = "_bm_session_counted") -> None:
     if st.session_state.get(session_key):
         return
+    if _metrics_ready():
+        _metrics.count_session_once(st.session_state, "sessions", flag=session_key)
+        return
     st.session_state[session_key] = True
     df = _load_usage_df()
     today = _today_str()
@@ -62,6 +87,13 @@ def increment_daily_session_once(session_key: str = "_bm_session_counted") -> No
     _save_usage_df(df)
 
 def get_usage_metrics():
+    if _metrics_ready():
+        try:
+            rows = _metrics.daily("sessions", days=7)
+            last7 = pd.DataFrame(rows, columns=["date", "daily_opens"])
+            return _metrics.today("sessions"), _metrics.total("sessions"), last7
+        except Exception:
+            pass
     df = _load_usage_df()
     today = _today_str()
     if df.empty:
@@ -85,6 +117,8 @@ def render_usage_panel() -> None:
         st.line_chart(last7.set_index("date")["daily_opens"])
 
 def set_current_tab_hint(name: str) -> None:
+    if _metrics_ready() and name and st.session_state.get("_bm_current_tab") != name:
+        _metrics.incr("tab_view", tab=name)
     st.session_state["_bm_current_tab"] = name
 
 def render_feedback_box(default_category: str = "일반 의견", page_hint: str = "") -> None:
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+ref_tables.py
+앱 전역에서 공유하는 참조 테이블(원본 정의)
+- 응급도 가중치(w_*)와 프리셋
+- 검사 참조범위(성인/소아)
+읽기 전용으로 취급: 공유본은 refdata.get() 이 MappingProxy 로 감싸 제공
+"""
+from __future__ import annotations
+from typing import Dict, Tuple
+
+# ---------- Emergency scoring weights (app.emergency_level) ----------
+EMERGENCY_DEFAULT_WEIGHTS: Dict[str, float] = {
+    "w_anc_lt500": 1.0, "w_anc_500_999": 1.0,
+    "w_temp_38_0_38_4": 1.0, "w_temp_ge_38_5": 1.0,
+    "w_plt_lt20k": 1.0, "w_hb_lt7": 1.0, "w_crp_ge10": 1.0, "w_hr_gt130": 1.0,
+    "w_hematuria": 1.0, "w_melena": 1.0, "w_hematochezia": 1.0,
+    "w_chest_pain": 1.0, "w_dyspnea": 1.0, "w_confusion": 1.0,
+    "w_oliguria": 1.0, "w_persistent_vomit": 1.0, "w_petechiae": 1.0,
+    "w_thunderclap": 1.0, "w_visual_change": 1.0,
+}
+EMERGENCY_PRESETS: Dict[str, Dict[str, float]] = {
+    "기본(Default)": EMERGENCY_DEFAULT_WEIGHTS,
+    "발열·감염 민감": {**EMERGENCY_DEFAULT_WEIGHTS, "w_temp_ge_38_5": 2.0, "w_temp_38_0_38_4": 1.5, "w_crp_ge10": 1.5, "w_anc_lt500": 2.0, "w_anc_500_999": 1.5},
+    "출혈 위험 민감": {**EMERGENCY_DEFAULT_WEIGHTS, "w_plt_lt20k": 2.5, "w_petechiae": 2.0, "w_hematochezia": 2.0, "w_melena": 2.0},
+    "신경계 위중 민감": {**EMERGENCY_DEFAULT_WEIGHTS, "w_thunderclap": 3.0, "w_visual_change": 2.5, "w_confusion": 2.5, "w_chest_pain": 1.2},
+}
+
+# ---------- Lab reference ranges ----------
+LAB_REF_ADULT: Dict[str, Tuple[float, float]] = {
+    "WBC": (4.0, 10.0),
+    "Hb": (12.0, 16.0),
+    "PLT": (150, 400),
+    "ANC": (1500, 8000),
+    "CRP": (0.0, 5.0),
+    "Na": (135, 145),
+    "Cr": (0.5, 1.2),
+    "Glu": (70, 140),
+    "Ca": (8.6, 10.2),
+    "P": (2.5, 4.5),
+    "T.P": (6.4, 8.3),
+    "AST": (0, 40),
+    "ALT": (0, 41),
+    "T.B": (0.2, 1.2),
+    "Alb": (3.5, 5.0),
+    "BUN": (7, 20),
+}
+LAB_REF_PEDS: Dict[str, Tuple[float, float]] = {
+    "WBC": (5.0, 14.0),
+    "Hb": (11.0, 15.0),
+    "PLT": (150, 450),
+    "ANC": (1500, 8000),
+    "CRP": (0.0, 5.0),
+    "Na": (135, 145),
+    "Cr": (0.2, 0.8),
+    "Glu": (70, 140),
+    "Ca": (8.8, 10.8),
+    "P": (4.0, 6.5),
+    "T.P": (6.0, 8.0),
+    "AST": (0, 50),
+    "ALT": (0, 40),
+    "T.B": (0.2, 1.2),
+    "Alb": (3.8, 5.4),
+    "BUN": (5, 18),
+}
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+refdata.py
+프로세스 단위 공유 참조데이터 레지스트리 (세션/rerun 간 1벌만 유지)
+- 완성 DRUG_DB(스냅샷), ONCO 맵, DX_KO, 검사 참조범위, 응급도/트리아지 프리셋
+- get()  : 최초 1회 빌드 후 캐시 반환 (lock 보호). drug_db.py 변경 시 자동 재빌드
+- invalidate() : 강제 폐기 → 다음 get()에서 재빌드
+공유본이므로 읽기 전용으로 사용. 세션 한정 수정은 사본/오버레이로 처리할 것.
+"""
+from __future__ import annotations
+import time, threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+_LOCK = threading.RLock()
+_REF: Optional["RefData"] = None
+_GEN = 0
+
+
+@dataclass(frozen=True)
+class RefData:
+    drug_db: Dict[str, Any]          # dict 유지(isinstance 검사 호환) — 수정 금지
+    onco_map: Mapping[str, Any]
+    dx_ko: Mapping[str, str]
+    lab_ref_adult: Mapping[str, Any]
+    lab_ref_peds: Mapping[str, Any]
+    emergency_default_weights: Mapping[str, float]
+    emergency_presets: Mapping[str, Mapping[str, float]]
+    triage_presets: Mapping[str, Mapping[str, float]]
+    drug_db_hash: Optional[str] = None
+    generation: int = 0
+    built_at: float = 0.0
+    build_sec: float = 0.0
+
+
+def _ro(d) -> Mapping:
+    return d if isinstance(d, MappingProxyType) else MappingProxyType(dict(d or {}))
+
+
+def _ro_nested(d) -> Mapping:
+    return MappingProxyType({k: _ro(v) for k, v in (d or {}).items()})
+
+
+def _load_drug_db(src):
+    try:
+        import drug_db_snapshot as _snap  # type: ignore
+        return _snap.load_drug_db(src), _snap.snapshot_digest(src)
+    except Exception:
+        pass
+    try:
+        import drug_db  # type: ignore
+        db: Dict[str, Any] = {}
+        drug_db.ensure_onco_drug_db(db)
+        return db, None
+    except Exception:
+        return {}, None
+
+
+def _load_onco():
+    try:
+        import onco_map  # type: ignore
+        return (onco_map.build_onco_map() or {}), getattr(onco_map, "DX_KO", {})
+    except Exception:
+        return {}, {}
+
+
+def _load_triage_presets():
+    try:
+        import triage_weights  # type: ignore
+        return getattr(triage_weights, "PRESETS", {})
+    except Exception:
+        return {}
+
+
+def _build(src) -> RefData:
+    import ref_tables as T  # type: ignore
+    t0 = time.perf_counter()
+    db, digest = _load_drug_db(src)
+    onco, dx_ko = _load_onco()
+    return RefData(
+        drug_db=db,
+        onco_map=_ro(onco),
+        dx_ko=_ro(dx_ko),
+        lab_ref_adult=_ro(T.LAB_REF_ADULT),
+        lab_ref_peds=_ro(T.LAB_REF_PEDS),
+        emergency_default_weights=_ro(T.EMERGENCY_DEFAULT_WEIGHTS),
+        emergency_presets=_ro_nested(T.EMERGENCY_PRESETS),
+        triage_presets=_ro_nested(_load_triage_presets()),
+        drug_db_hash=digest,
+        generation=_GEN,
+        built_at=time.time(),
+        build_sec=time.perf_counter() - t0,
+    )
+
+
+def _stale(ref: RefData, src) -> bool:
+    if not ref.drug_db_hash:
+        return False
+    try:
+        import drug_db_snapshot as _snap  # type: ignore
+        return _snap.snapshot_digest(src) != ref.drug_db_hash
+    except Exception:
+        return False
+
+
+def get(src=None) -> RefData:
+    """공유 참조데이터 반환(최초/무효화 후 1회 빌드). src: drug_db.py 경로(선택)."""
+    global _REF
+    ref = _REF
+    if ref is not None and not _stale(ref, src):
+        return ref
+    with _LOCK:
+        if _REF is None or _stale(_REF, src):
+            _REF = _build(src)
+        return _REF
+
+
+def invalidate() -> None:
+    """공유본 폐기. 다음 get()에서 재빌드."""
+    global _REF, _GEN
+    with _LOCK:
+        _REF = None
+        _GEN += 1
+    try:
+        import drug_index  # type: ignore
+        drug_index.invalidate()
+    except Exception:
+        pass
+
+
+def peek() -> Optional[RefData]:
+    return _REF
@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+"""
+special_rules.py
+특수검사 해석 규칙표 + 평가기 (Streamlit 없이 동작)
+- FIELDS : 섹션별 입력 항목(라벨/종류/자리표시/선택지/기본값/행) — UI 는 이 표대로 위젯만 그림
+- RULES  : (섹션, 그룹, 수준, 조건식, 문구). 조건식은 import 시 1회 compile, 빌트인 없이 평가
+    · 같은 그룹은 위에서부터 첫 일치 1개만(기존 if/elif 사다리)
+    · needs 를 생략하면 조건식에 쓰인 숫자 항목이 모두 있어야 평가(기존 `x is not None` 검사)
+- evaluate(values) / evaluate_many(panels) : 입력 해시별 LRU 캐시 → 저장된 과거 패널 일괄 재해석
+"""
+from __future__ import annotations
+import hashlib, json, threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+RULESET_VERSION = 1
+CACHE_MAX = 4096
+QUAL = ["없음", "+", "++", "+++"]
+FLAG_LABELS = {"ok": "🟢 정상", "warn": "🟡 주의", "risk": "🚨 위험"}
+
+SECTIONS: List[Tuple[str, str]] = [
+    ("소변검사 (Urinalysis)", "urine"),
+    ("혈구지수/망상 (RBC Indices / Reticulocyte)", "rbcidx"),
+    ("보체 (Complement C3/C4/CH50)", "complement"),
+    ("지질검사 (Lipid: TC/TG/HDL/LDL)", "lipid"),
+    ("심부전 지표 (BNP / NT-proBNP)", "heartfail"),
+    ("당 검사 (Glucose: FPG/PPG)", "glucose"),
+    ("심장/근육 (CK / CK-MB / Troponin)", "cardio"),
+    ("간담도 (GGT / ALP)", "hepatobiliary"),
+    ("췌장 (Amylase / Lipase)", "pancreas"),
+    ("응고 (PT-INR / aPTT / Fibrinogen / D-dimer)", "coag"),
+    ("염증 (ESR / Ferritin / Procalcitonin)", "inflammation"),
+    ("젖산 (Lactate)", "lactate"),
+]
+SECTION_IDS = [sid for _, sid in SECTIONS]
+
+
+def num(x) -> Optional[float]:
+    """입력 문자열 → 숫자(쉼표/단위 글자 무시). 못 읽으면 None."""
+    try:
+        if x is None: return None
+        if isinstance(x, (int, float)): return float(x)
+        s = str(x).replace(",", "").strip()
+        s2 = "".join(ch for ch in s if (ch.isdigit() or ch == '.' or ch == '-'))
+        return float(s2) if s2 else None
+    except Exception:
+        return None
+
+
+# ---------- 입력 항목 ----------
+@dataclass(frozen=True)
+class Field:
+    section: str
+    name: str
+    label: str
+    kind: str = "num"              # num / choice / text
+    placeholder: str = ""
+    options: Tuple[str, ...] = ()
+    default: Any = None
+    row: int = 0                   # 같은 row 는 한 줄(columns)에 배치
+
+
+def _F(section, row, name, label, kind="num", placeholder="", options=(), default=None) -> Field:
+    if kind == "choice" and default is None:
+        default = options[0]
+    return Field(section, name, label, kind, placeholder, tuple(options), default, row)
+
+
+FIELDS: Tuple[Field, ...] = (
+    _F("urine", 0, "alb", "Albumin (알부민뇨)", "choice", options=QUAL),
+    _F("urine", 0, "hem", "Hematuria/Blood (혈뇨/잠혈)", "choice", options=QUAL),
+    _F("urine", 0, "glu", "Glucose (요당)", "choice", options=QUAL),
+    _F("urine", 0, "nit", "Nitrite (아질산염)", "choice", options=QUAL),
+    _F("urine", 0, "leu", "Leukocyte esterase (백혈구 에스테라제)", "choice", options=QUAL),
+    _F("urine", 0, "sg", "Specific gravity (요비중)", "text", "예: 1.015"),
+    _F("urine", 1, "rbc", "RBC (/HPF, 적혈구/고배율 시야당)", placeholder="예: 0~2 정상, 3↑ 비정상"),
+    _F("urine", 1, "wbc", "WBC (/HPF, 백혈구/고배율 시야당)", placeholder="예: 0~4 정상, 5↑ 비정상"),
+    _F("urine", 1, "upcr", "UPCR (Protein/Cr, 단백/크레아티닌 비율, mg/gCr)", placeholder="예: 120"),
+    _F("urine", 1, "acr", "ACR (Albumin/Cr, 알부민/크레아티닌 비율, mg/gCr)", placeholder="예: 25"),
+
+    _F("rbcidx", 0, "mcv", "MCV (Mean Corpuscular Volume, 평균적혈구용적, fL)", placeholder="예: 75"),
+    _F("rbcidx", 0, "mch", "MCH (Mean Corpuscular Hemoglobin, 평균적혈구혈색소량, pg)", placeholder="예: 26"),
+    _F("rbcidx", 0, "rdw", "RDW (Red Cell Distribution Width, 적혈구분포폭, %)", placeholder="예: 13.5"),
+    _F("rbcidx", 0, "ret", "Reticulocyte (망상적혈구, %)", placeholder="예: 1.0"),
+
+    _F("complement", 0, "c3", "C3 (Complement 3, 보체 C3, mg/dL)", placeholder="예: 90"),
+    _F("complement", 0, "c4", "C4 (Complement 4, 보체 C4, mg/dL)", placeholder="예: 20"),
+    _F("complement", 0, "ch50", "CH50 (Total Complement Activity, 총보체활성, U/mL)", placeholder="예: 50"),
+
+    _F("lipid", 0, "tc", "Total Cholesterol (총콜레스테롤, mg/dL)", placeholder="예: 180"),
+    _F("lipid", 0, "tg", "Triglyceride (중성지방, mg/dL)", placeholder="예: 120"),
+    _F("lipid", 0, "hdl", "HDL (고밀도지단백, mg/dL)", placeholder="예: 55"),
+    _F("lipid", 0, "ldl", "LDL (저밀도지단백, mg/dL)", placeholder="예: 110"),
+
+    _F("heartfail", 0, "bnp", "BNP (B-type Natriuretic Peptide, 뇌나트륨이뇨펩티드, pg/mL)", placeholder="예: 60"),
+    _F("heartfail", 0, "ntp", "NT-proBNP (N-terminal proBNP, pg/mL)", placeholder="예: 125"),
+
+    _F("glucose", 0, "fpg", "FPG (Fasting Plasma Glucose, 식전혈당, mg/dL)", placeholder="예: 95"),
+    _F("glucose", 0, "ppg1", "PPG 1h (Postprandial 1-hour Glucose, 식후1시간, mg/dL)", placeholder="예: 150"),
+    _F("glucose", 0, "ppg2", "PPG 2h (Postprandial 2-hour Glucose, 식후2시간, mg/dL)", placeholder="예: 120"),
+
+    _F("cardio", 0, "ck", "CK (Creatine Kinase, 크레아틴키나아제, U/L)", placeholder="예: 160"),
+    _F("cardio", 0, "ckmb", "CK-MB (MB fraction, MB분획, ng/mL)", placeholder="예: 2.5"),
+    _F("cardio", 0, "troI", "Troponin I (트로포닌 I, ng/mL)", placeholder="예: 0.01"),
+    _F("cardio", 0, "troT", "Troponin T (트로포닌 T, ng/mL)", placeholder="예: 0.005"),
+    _F("cardio", 1, "ulnI", "ULN for Troponin I (정상상한, ng/mL)", placeholder="예: 0.04", default=0.04),
+    _F("cardio", 2, "ulnT", "ULN for Troponin T (정상상한, ng/mL)", placeholder="예: 0.014", default=0.014),
+
+    _F("hepatobiliary", 0, "ggt", "GGT (Gamma-GT, 감마지티피, U/L)", placeholder="예: 35"),
+    _F("hepatobiliary", 0, "alp", "ALP (Alkaline Phosphatase, 알칼리인산분해효소, U/L)", placeholder="예: 110"),
+
+    _F("pancreas", 0, "amy", "Amylase (아밀라아제, U/L)", placeholder="예: 60"),
+    _F("pancreas", 0, "lip", "Lipase (리파아제, U/L)", placeholder="예: 40"),
+
+    _F("coag", 0, "inr", "PT-INR (프로트롬빈 시간-INR)", placeholder="예: 1.0"),
+    _F("coag", 0, "aptt", "aPTT (활성화 부분 트롬보플라스틴 시간, sec)", placeholder="예: 30"),
+    _F("coag", 0, "fib", "Fibrinogen (피브리노겐, mg/dL)", placeholder="예: 300"),
+    _F("coag", 0, "dd", "D-dimer (디-다이머, µg/mL)", placeholder="예: 0.3"),
+
+    _F("inflammation", 0, "esr", "ESR (적혈구침강속도, mm/h)", placeholder="예: 10"),
+    _F("inflammation", 0, "ferr", "Ferritin (페리틴, ng/mL)", placeholder="예: 100"),
+    _F("inflammation", 0, "pct", "Procalcitonin (프로칼시토닌, ng/mL)", placeholder="예: 0.05"),
+
+    _F("lactate", 0, "lc", "Lactate (젖산, mmol/L)", placeholder="예: 1.5"),
+)
+if len({f.name for f in FIELDS}) != len(FIELDS):
+    raise ValueError("special_rules: field names must be unique")
+FIELDS_BY_SECTION: Dict[str, List[Field]] = {sid: [f for f in FIELDS if f.section == sid] for sid in SECTION_IDS}
+_FIELD = {f.name: f for f in FIELDS}
+
+
+# ---------- 규칙 ----------
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    section: str
+    group: str           # "" = 단독 규칙
+    level: str           # ok / warn / risk
+    when: str            # 조건식(항목 이름 사용)
+    message: str         # str.format(**값)
+    needs: Optional[Tuple[str, ...]] = None
+
+
+_RAW: Tuple[tuple, ...] = (
+    # --- 소변검사: 시험지/정성 ---
+    ("urine", "", "warn", "alb in ('+','++')", "알부민뇨 {alb} → 단백뇨 평가 필요"),
+    ("urine", "", "risk", "alb == '+++'", "알부민뇨 {alb} → 단백뇨 평가 필요"),
+    ("urine", "", "warn", "hem in ('+','++')", "혈뇨(잠혈) {hem} → 요로계 출혈/염증 가능"),
+    ("urine", "", "risk", "hem == '+++'", "혈뇨(잠혈) {hem} → 요로계 출혈/염증 가능"),
+    ("urine", "", "warn", "glu != '없음'", "요당 {glu} → 당뇨/세뇨관 이상 가능, 혈당 확인"),
+    ("urine", "", "warn", "nit != '없음'", "아질산염 {nit} → 세균성 요로감염 가능"),
+    ("urine", "", "warn", "leu in ('+','++')", "Leukocyte esterase {leu} → 백혈구뇨/요로감염 가능"),
+    ("urine", "", "risk", "leu == '+++'", "Leukocyte esterase {leu} → 백혈구뇨/요로감염 가능"),
+    # 현미경 수치
+    ("urine", "rbc", "risk", "rbc >= 25", "RBC {rbc}/HPF (다량) → 결석/종양/사구체 질환 등 평가 필요"),
+    ("urine", "rbc", "warn", "rbc >= 3", "RBC {rbc}/HPF (현미경적 혈뇨)"),
+    ("urine", "wbc", "risk", "wbc >= 20", "WBC {wbc}/HPF (다량) → 급성 요로감염/신우신염 의심"),
+    ("urine", "wbc", "warn", "wbc >= 5", "WBC {wbc}/HPF (백혈구뇨)"),
+    # UPCR/ACR (고값>10000은 '단일 라인')
+    ("urine", "upcr", "risk", "upcr > 10000", "UPCR {upcr} mg/gCr → 신증후군 범위(극고값). 단위/입력 오류 가능성도 있어 검사실/의료진에게 문의하세요."),
+    ("urine", "upcr", "risk", "upcr >= 3500", "UPCR {upcr} mg/gCr ≥ 3500 → 신증후군 범위 단백뇨 가능"),
+    ("urine", "upcr", "warn", "upcr >= 500", "UPCR {upcr} mg/gCr 500~3499 → 유의한 단백뇨"),
+    ("urine", "upcr", "warn", "upcr >= 150", "UPCR {upcr} mg/gCr 150~499 → 경미~중등 단백뇨"),
+    ("urine", "acr", "risk", "acr > 10000", "ACR {acr} mg/gCr → A3(중증) 범위(극고값). 단위/입력 오류 가능성도 있어 검사실/의료진에게 문의하세요."),
+    ("urine", "acr", "risk", "acr >= 300", "ACR {acr} mg/gCr ≥ 300 → 알부민뇨 A3(중증)"),
+    ("urine", "acr", "warn", "acr >= 30", "ACR {acr} mg/gCr 30~299 → 알부민뇨 A2(중등)"),
+    ("urine", "acr", "ok", "acr < 30", "ACR {acr} mg/gCr < 30 → A1 범주"),
+    # 패턴 종합
+    ("urine", "", "warn", "(wbc is not None and wbc >= 5) or leu != '없음' or nit != '없음'",
+     "요로감염 의심 패턴 → 요배양/항생제 필요성 상담", ()),
+
+    # --- 혈구지수/망상 ---
+    ("rbcidx", "mcv", "warn", "mcv < 80", "MCV {mcv} < 80 → 소구성 빈혈(철결핍/지중해빈혈 등) 감별"),
+    ("rbcidx", "mcv", "warn", "mcv > 100", "MCV {mcv} > 100 → 대구성 빈혈(B12/엽산/간질환/골수이상) 감별"),
+    ("rbcidx", "mcv", "ok", "80 <= mcv <= 100", "MCV {mcv} 정상범위(80~100)"),
+    ("rbcidx", "", "warn", "rdw > 14.5", "RDW {rdw}% ↑ → 적혈구 크기 불균일(철결핍/혼합결핍) 의심"),
+    ("rbcidx", "", "warn", "mcv < 80 and rdw > 14.5", "소구성 + RDW 증가 → **철결핍** 가능성 높음"),
+    ("rbcidx", "", "warn", "mcv < 80 and rdw <= 14.5", "소구성 + RDW 정상 → **지중해 빈혈 보인자** 감별"),
+    ("rbcidx", "", "warn", "mcv > 100 and ret < 0.5", "대구성 + 망상 저하 → **B12/엽산 결핍** 등 생성 저하형",
+     ("mcv", "rdw", "ret")),
+    ("rbcidx", "ret", "warn", "ret >= 2.0", "Reticulocyte {ret}% ↑ → 용혈/실혈 회복기 등 생산 증가 소견"),
+    ("rbcidx", "ret", "warn", "ret < 0.5", "Reticulocyte {ret}% ↓ → 조혈 저하(골수억제/영양결핍) 의심"),
+
+    # --- 보체 ---
+    ("complement", "", "warn", "c3 < 85", "C3 낮음({c3}) → 면역복합체 질환/활성화 가능성"),
+    ("complement", "", "warn", "c4 < 15", "C4 낮음({c4}) → 보체소모/면역 이상 가능성"),
+    ("complement", "ch50", "risk", "ch50 < 30", "CH50 {ch50} (낮음) → 보체 결핍/소모 의심"),
+    ("complement", "ch50", "warn", "ch50 < 40", "CH50 {ch50} (경도 저하) → 추적 필요"),
+
+    # --- 지질 ---
+    ("lipid", "tc", "risk", "tc >= 240", "총콜레스테롤 {tc} ≥ 240 → 고지혈증 가능"),
+    ("lipid", "tc", "warn", "tc >= 200", "총콜레스테롤 {tc} 200~239 → 경계역"),
+    ("lipid", "tg", "risk", "tg >= 500", "중성지방 {tg} ≥ 500 → 췌장염 위험"),
+    ("lipid", "tg", "warn", "tg >= 200", "중성지방 {tg} 200~499 → 고중성지방혈증"),
+    ("lipid", "", "warn", "hdl < 40", "HDL {hdl} < 40 → 낮음"),
+    ("lipid", "ldl", "risk", "ldl >= 190", "LDL {ldl} ≥ 190 → 매우 높음"),
+    ("lipid", "ldl", "warn", "ldl >= 160", "LDL {ldl} 160~189 → 높음"),
+    ("lipid", "ldl", "warn", "ldl >= 130", "LDL {ldl} 130~159 → 경계역"),
+
+    # --- 심부전 ---
+    ("heartfail", "", "warn", "bnp >= 100", "BNP {bnp} ≥ 100 → 심부전 의심(연령/신장기능 고려)"),
+    ("heartfail", "", "warn", "ntp >= 900", "NT-proBNP {ntp} 상승 → 연령/신장 기능 고려"),
+
+    # --- 당 ---
+    ("glucose", "fpg", "risk", "fpg >= 126", "FPG {fpg} ≥ 126 → 당뇨병 가능성"),
+    ("glucose", "fpg", "warn", "fpg >= 100", "FPG {fpg} 100~125 → 공복혈당장애"),
+    ("glucose", "", "warn", "ppg1 >= 200", "식후1h {ppg1} ≥ 200 → 고혈당"),
+    ("glucose", "ppg2", "risk", "ppg2 >= 200", "식후2h {ppg2} ≥ 200 → 당뇨병 가능성"),
+    ("glucose", "ppg2", "warn", "ppg2 >= 140", "식후2h {ppg2} 140~199 → 내당능장애"),
+
+    # --- 심장/근육 (ULN 미입력 시 기본값) ---
+    ("cardio", "ck", "risk", "ck >= 5000", "CK {ck} → 횡문근융해 의심(즉시 상담)"),
+    ("cardio", "ck", "warn", "ck >= 1000", "CK {ck} → 근손상/운동/약물 영향 가능"),
+    ("cardio", "", "warn", "ckmb >= 5", "CK-MB {ckmb} ≥ 5 → 심근 손상 지표 상승 가능"),
+    ("cardio", "", "risk", "troI >= ulnI", "Troponin I {troI} ≥ ULN → 심근 손상 의심"),
+    ("cardio", "", "risk", "troT >= ulnT", "Troponin T {troT} ≥ ULN → 심근 손상 의심"),
+
+    # --- 간담도 / 췌장 ---
+    ("hepatobiliary", "", "warn", "ggt >= 100", "GGT 상승({ggt}) → 담도/약물 영향 가능"),
+    ("hepatobiliary", "", "warn", "alp >= 150", "ALP 상승({alp}) → 담도/골질환 감별"),
+    ("pancreas", "", "warn", "amy >= 300", "Amylase 상승({amy}) → 췌장/타장기 영향 가능"),
+    ("pancreas", "", "risk", "lip >= 180", "Lipase 현저 상승({lip}) → 급성 췌장염 의심"),
+
+    # --- 응고 ---
+    ("coag", "", "warn", "inr >= 1.5", "INR {inr} ≥ 1.5 → 응고 저하/간기능 저하 가능"),
+    ("coag", "", "warn", "aptt >= 40", "aPTT {aptt} ≥ 40s → 내인성 경로 지연"),
+    ("coag", "", "risk", "fib < 150", "Fibrinogen {fib} < 150 → 소모/간기능 저하"),
+    ("coag", "", "warn", "dd >= 0.5", "D-dimer {dd} ≥ 0.5 → 혈전/염증 반응 가능(임상과 함께)"),
+
+    # --- 염증 / 젖산 ---
+    ("inflammation", "", "warn", "esr >= 40", "ESR {esr} ≥ 40 → 염증/만성질환 가능"),
+    ("inflammation", "", "warn", "ferr >= 300", "Ferritin {ferr} ≥ 300 → 염증/철과부하 감별"),
+    ("inflammation", "pct", "risk", "pct >= 2", "PCT {pct} ≥ 2 → 패혈증 가능성 높음"),
+    ("inflammation", "pct", "warn", "pct >= 0.5", "PCT {pct} 0.5~2 → 세균감염 의심"),
+    ("lactate", "", "warn", "lc >= 2", "Lactate {lc} ≥ 2 → 조직저산소/패혈증 감시"),
+)
+
+
+def _build_rules() -> Tuple[Rule, ...]:
+    out, seq = [], {}
+    for t in _RAW:
+        sec, group, level, when, msg = t[:5]
+        seq[sec] = seq.get(sec, 0) + 1
+        out.append(Rule(f"{sec}.{seq[sec]:02d}", sec, group, level, when, msg, t[5] if len(t) > 5 else None))
+    return tuple(out)
+
+
+RULES: Tuple[Rule, ...] = _build_rules()
+_NO_BUILTINS = {"__builtins__": {}}
+
+
+@dataclass(frozen=True)
+class _Compiled:
+    rule: Rule
+    code: Any
+    needs: Tuple[str, ...]
+
+
+def _compile(rule: Rule) -> _Compiled:
+    code = compile(rule.when, f"<rule {rule.id}>", "eval")
+    unknown = [n for n in code.co_names if n not in _FIELD and n != "None"]
+    if unknown:
+        raise ValueError(f"rule {rule.id}: unknown field(s) {unknown}")
+    if rule.needs is not None:
+        needs = tuple(rule.needs)
+    else:  # 조건식에 쓰인 숫자 항목(기본값 없는 것)은 모두 있어야 함
+        needs = tuple(n for n in code.co_names if _FIELD[n].kind == "num" and _FIELD[n].default is None)
+    return _Compiled(rule, code, needs)
+
+
+_COMPILED: Dict[str, List[_Compiled]] = {sid: [] for sid in SECTION_IDS}
+for _r in RULES:
+    _COMPILED[_r.section].append(_compile(_r))
+
+
+# ---------- 평가 ----------
+@dataclass(frozen=True)
+class Finding:
+    section: str
+    rule_id: str
+    level: str
+    message: str
+
+    @property
+    def line(self) -> str:
+        tag = FLAG_LABELS.get(self.level or "", "")
+        return f"{tag} {self.message}" if tag else self.message
+
+
+def normalize(values: Mapping[str, Any], sections: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """입력(문자열/숫자/None) → 평가용 값. 숫자 항목은 num(), 빈 값은 기본값."""
+    secs = SECTION_IDS if sections is None else list(sections)
+    env: Dict[str, Any] = {}
+    for sid in secs:
+        for f in FIELDS_BY_SECTION.get(sid, ()):
+            v = values.get(f.name) if values is not None else None
+            if f.kind == "num":
+                v = num(v)
+            elif f.kind == "choice":
+                v = v if v in f.options else f.default
+            if v is None or v == "":
+                v = f.default
+            env[f.name] = v
+    return env
+
+
+def _sections(sections: Optional[Iterable[str]]) -> List[str]:
+    if sections is None:
+        return SECTION_IDS
+    want = set(sections)
+    return [s for s in SECTION_IDS if s in want]
+
+
+def _key(env: Dict[str, Any], secs: Sequence[str]) -> str:
+    raw = json.dumps([RULESET_VERSION, list(secs), sorted(env.items())], ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def panel_hash(values: Mapping[str, Any], sections: Optional[Iterable[str]] = None) -> str:
+    """정규화된 입력 + 섹션 + 규칙 버전의 해시 — 캐시/저장 키."""
+    secs = _sections(sections)
+    return _key(normalize(values, secs), secs)
+
+
+def _run(env: Dict[str, Any], secs: Sequence[str]) -> Tuple[Finding, ...]:
+    out: List[Finding] = []
+    for sid in secs:
+        done = set()
+        for c in _COMPILED.get(sid, ()):
+            r = c.rule
+            if r.group and r.group in done:
+                continue
+            if any(env.get(n) is None for n in c.needs):
+                continue
+            try:
+                hit = bool(eval(c.code, _NO_BUILTINS, env))
+            except Exception:
+                hit = False
+            if hit:
+                out.append(Finding(sid, r.id, r.level, r.message.format(**env)))
+                if r.group:
+                    done.add(r.group)
+    return tuple(out)
+
+
+_CACHE: "OrderedDict[str, Tuple[Finding, ...]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+_STATS = {"hit": 0, "miss": 0}
+
+
+def evaluate(values: Mapping[str, Any], sections: Optional[Iterable[str]] = None) -> Tuple[Finding, ...]:
+    """한 패널 해석(섹션 순서, 규칙표 순서). 같은 입력은 캐시에서."""
+    secs = _sections(sections)
+    env = normalize(values, secs)
+    key = _key(env, secs)
+    with _CACHE_LOCK:
+        hit = _CACHE.get(key)
+        if hit is not None:
+            _CACHE.move_to_end(key)
+            _STATS["hit"] += 1
+            return hit
+    out = _run(env, secs)
+    with _CACHE_LOCK:
+        _STATS["miss"] += 1
+        _CACHE[key] = out
+        while len(_CACHE) > CACHE_MAX:
+            _CACHE.popitem(last=False)
+    return out
+
+
+def evaluate_lines(values: Mapping[str, Any], sections: Optional[Iterable[str]] = None) -> List[str]:
+    """UI/보고서용 문자열(기존 special_tests_ui 반환 형식)."""
+    return [f.line for f in evaluate(values, sections)]
+
+
+def evaluate_many(panels: Iterable[Mapping[str, Any]], sections: Optional[Iterable[str]] = None
+                  ) -> List[Tuple[Finding, ...]]:
+    """여러 패널/시점 일괄 해석(저장된 과거 기록 재해석). 입력 순서대로."""
+    secs = list(sections) if sections is not None else None
+    return [evaluate(p, secs) for p in panels]
+
+
+def cache_info() -> Dict[str, int]:
+    with _CACHE_LOCK:
+        return dict(_STATS, size=len(_CACHE))
+
+
+def clear_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
+        _STATS.update(hit=0, miss=0)
@@ -5,23 +5,26 @@
 - ✅ 소변검사/혈구지수/보체/지질/심부전/당/심장·근육/간담도/췌장/응고/염증/젖산
 - ✅ 모든 입력 라벨을 영어+한글 병기(예: "UPCR (Protein/Cr, 단백/크레아티닌 비율)")
 - ✅ UPCR/ACR 10000 초과 시 '단일 라인' 경고(극고값 + 단위/입력 오류 가능성)
+- 입력 항목/해석 규칙은 special_rules(FIELDS/RULES) — 여기서는 위젯만 그림
+- 섹션은 펼칠 때만 위젯 생성(기본 접힘, 즐겨찾기는 펼침), 섹션마다 st.fragment 부분 리런
 """
 from __future__ import annotations
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import streamlit as st
 
-def _num(x):
-    try:
-        if x is None: return None
-        if isinstance(x, (int,float)): return float(x)
-        s = str(x).replace(",", "").strip()
-        s2 = "".join(ch for ch in s if (ch.isdigit() or ch=='.' or ch=='-'))
-        return float(s2) if s2 else None
-    except Exception:
-        return None
+try:
+    import special_rules as _rules
+except Exception:  # 같은 폴더가 sys.path 에 없을 때(레지스트리 로드)
+    import importlib.util as _ilu, os as _os, sys as _sys
+    _spec = _ilu.spec_from_file_location("special_rules", _os.path.join(_os.path.dirname(__file__), "special_rules.py"))
+    _rules = _ilu.module_from_spec(_spec)
+    _sys.modules["special_rules"] = _rules
+    _spec.loader.exec_module(_rules)
+
+_num = _rules.num
 
 def _flag(kind: Optional[str]) -> str:
-    return {"ok":"🟢 정상", "warn":"🟡 주의", "risk":"🚨 위험"}.get(kind or "", "")
+    return _rules.FLAG_LABELS.get(kind or "", "")
 
 def _emit(lines: List[str], kind: Optional[str], msg: str):
     tag = _flag(kind)
@@ -30,25 +33,81 @@ def _emit(lines: List[str], kind: Optional[str], msg: str):
 def _tog_key(name: str) -> str: return f"stx_tog_{name}"
 def _fav_key(name: str) -> str: return f"stx_fav_{name}"
 
-SECTIONS = [
-    ("소변검사 (Urinalysis)", "urine"),
-    ("혈구지수/망상 (RBC Indices / Reticulocyte)", "rbcidx"),
-    ("보체 (Complement C3/C4/CH50)", "complement"),
-    ("지질검사 (Lipid: TC/TG/HDL/LDL)", "lipid"),
-    ("심부전 지표 (BNP / NT-proBNP)", "heartfail"),
-    ("당 검사 (Glucose: FPG/PPG)", "glucose"),
-    ("심장/근육 (CK / CK-MB / Troponin)", "cardio"),
-    ("간담도 (GGT / ALP)", "hepatobiliary"),
-    ("췌장 (Amylase / Lipase)", "pancreas"),
-    ("응고 (PT-INR / aPTT / Fibrinogen / D-dimer)", "coag"),
-    ("염증 (ESR / Ferritin / Procalcitonin)", "inflammation"),
-    ("젖산 (Lactate)", "lactate"),
-]
+SECTIONS = list(_rules.SECTIONS)
+_SUBTITLE = {"urine": "**요시험지/현미경 (Dipstick / Microscopy)**"}
 
 def _fav_list():
     st.session_state.setdefault("fav_tests", [])
     return st.session_state["fav_tests"]
 
+def _in_key(sec_id: str, name: str) -> str: return f"stx_in_{sec_id}_{name}"
+
+# 섹션 입력 보관소(위젯 상태와 별개) — 접힌 섹션은 위젯을 만들지 않으므로 값은 여기서 유지
+_VALS_KEY = "stx_vals"
+# 섹션별 부분 리런(st.fragment) — 한 섹션 입력 변경 시 그 섹션만 다시 그림. 없는 버전이면 일반 호출
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+def _saved() -> Dict[str, Dict[str, Any]]:
+    st.session_state.setdefault(_VALS_KEY, {})
+    return st.session_state[_VALS_KEY]
+
+def _field_widget(sec_id: str, f, saved: Dict[str, Any]) -> Any:
+    key = _in_key(sec_id, f.name)
+    if key not in st.session_state and f.name in saved:
+        st.session_state[key] = saved[f.name]   # 다시 펼칠 때 이전 입력 복원
+    if f.kind == "choice":
+        return st.selectbox(f.label, list(f.options), key=key)
+    return st.text_input(f.label, placeholder=f.placeholder, key=key)
+
+def _section_inputs(sec_id: str) -> Dict[str, Any]:
+    """FIELDS 의 row 순서대로: 한 행에 여러 항목이면 columns, 하나면 전체 폭. 값은 보관소에도 저장."""
+    store = _saved()
+    saved = store.get(sec_id, {})
+    values: Dict[str, Any] = {}
+    rows: Dict[int, list] = {}
+    for f in _rules.FIELDS_BY_SECTION.get(sec_id, ()):
+        rows.setdefault(f.row, []).append(f)
+    for _, fields in sorted(rows.items()):
+        if len(fields) == 1:
+            values[fields[0].name] = _field_widget(sec_id, fields[0], saved)
+            continue
+        cols = st.columns(len(fields))
+        for col, f in zip(cols, fields):
+            with col:
+                values[f.name] = _field_widget(sec_id, f, saved)
+    store[sec_id] = {k: v for k, v in values.items() if v not in (None, "", "없음")}
+    return values
+
+def _section_lines(sec_id: str) -> List[str]:
+    """보관된 입력으로 해석(special_rules 가 입력 해시별로 캐시)."""
+    vals = _saved().get(sec_id)
+    return _rules.evaluate_lines(vals, [sec_id]) if vals else []
+
+def _section_body(title: str, sec_id: str) -> None:
+    favs = _fav_list()
+    tk = _tog_key(sec_id)
+    st.session_state.setdefault(tk, sec_id in favs)   # 기본 접힘(즐겨찾기만 펼침)
+    c1, c2 = st.columns([0.8, 0.2])
+    with c1:
+        on = st.toggle(title, key=tk)
+    with c2:
+        isfav = sec_id in favs
+        if st.button("★" if isfav else "☆", key=_fav_key(f"btn_{sec_id}")):
+            if isfav: favs.remove(sec_id)
+            elif sec_id not in favs: favs.append(sec_id)
+            st.rerun()   # 상단 즐겨찾기 칩까지 갱신
+    if not on:
+        return   # 접힌 섹션: 위젯 없음(보관된 값의 해석은 전체 결과에 그대로 포함)
+    if sec_id in _SUBTITLE:
+        st.markdown(_SUBTITLE[sec_id])
+    _section_inputs(sec_id)
+    if _fragment is not None:
+        # 부분 리런 중에는 아래 '특수검사 해석' 목록이 다음 전체 리런까지 갱신되지 않으므로 섹션 결과를 바로 표시
+        for ln in _section_lines(sec_id):
+            st.caption(ln)
+
+_section_view = _fragment(_section_body) if _fragment is not None else _section_body
+
 def special_tests_ui() -> List[str]:
     lines: List[str] = []
     with st.expander("🧪 특수검사 (선택 입력)", expanded=True):
@@ -63,204 +122,7 @@ def special_tests_ui() -> List[str]:
                         st.session_state[_tog_key(sec_id)] = True
 
         for title, sec_id in SECTIONS:
-            c1, c2 = st.columns([0.8, 0.2])
-            with c1:
-                on = st.toggle(title, key=_tog_key(sec_id), value=bool(st.session_state.get(_tog_key(sec_id), True)))
-            with c2:
-                isfav = sec_id in favs
-                label = "★" if isfav else "☆"
-                if st.button(label, key=_fav_key(f"btn_{sec_id}")):
-                    if isfav: favs.remove(sec_id)
-                    else:
-                        if sec_id not in favs: favs.append(sec_id)
-            if not on:
-                continue
-
-            # --- 소변검사 / Urinalysis ---
-            if sec_id == "urine":
-                st.markdown("**요시험지/현미경 (Dipstick / Microscopy)**")
-                row1 = st.columns(6)
-                with row1[0]: alb = st.selectbox("Albumin (알부민뇨)", ["없음","+","++","+++"], index=0)
-                with row1[1]: hem = st.selectbox("Hematuria/Blood (혈뇨/잠혈)", ["없음","+","++","+++"], index=0)
-                with row1[2]: glu = st.selectbox("Glucose (요당)", ["없음","+","++","+++"], index=0)
-                with row1[3]: nit = st.selectbox("Nitrite (아질산염)", ["없음","+","++","+++"], index=0)
-                with row1[4]: leu = st.selectbox("Leukocyte esterase (백혈구 에스테라제)", ["없음","+","++","+++"], index=0)
-                with row1[5]: sg  = st.text_input("Specific gravity (요비중)", placeholder="예: 1.015")
-
-                row2 = st.columns(4)
-                with row2[0]: rbc  = _num(st.text_input("RBC (/HPF, 적혈구/고배율 시야당)", placeholder="예: 0~2 정상, 3↑ 비정상"))
-                with row2[1]: wbc  = _num(st.text_input("WBC (/HPF, 백혈구/고배율 시야당)", placeholder="예: 0~4 정상, 5↑ 비정상"))
-                with row2[2]: upcr = _num(st.text_input("UPCR (Protein/Cr, 단백/크레아티닌 비율, mg/gCr)", placeholder="예: 120"))
-                with row2[3]: acr  = _num(st.text_input("ACR (Albumin/Cr, 알부민/크레아티닌 비율, mg/gCr)", placeholder="예: 25"))
-
-                # 시험지/정성
-                if alb!="없음": _emit(lines, "warn" if alb in ["+","++"] else "risk", f"알부민뇨 {alb} → 단백뇨 평가 필요")
-                if hem!="없음": _emit(lines, "warn" if hem in ["+","++"] else "risk", f"혈뇨(잠혈) {hem} → 요로계 출혈/염증 가능")
-                if glu!="없음": _emit(lines, "warn", f"요당 {glu} → 당뇨/세뇨관 이상 가능, 혈당 확인")
-                if nit!="없음": _emit(lines, "warn", f"아질산염 {nit} → 세균성 요로감염 가능")
-                if leu!="없음": _emit(lines, "warn" if leu in ["+","++"] else "risk", f"Leukocyte esterase {leu} → 백혈구뇨/요로감염 가능")
-
-                # 현미경 수치
-                if rbc is not None:
-                    if rbc >= 25: _emit(lines, "risk", f"RBC {rbc}/HPF (다량) → 결석/종양/사구체 질환 등 평가 필요")
-                    elif rbc >= 3: _emit(lines, "warn", f"RBC {rbc}/HPF (현미경적 혈뇨)")
-                if wbc is not None:
-                    if wbc >= 20: _emit(lines, "risk", f"WBC {wbc}/HPF (다량) → 급성 요로감염/신우신염 의심")
-                    elif wbc >= 5: _emit(lines, "warn", f"WBC {wbc}/HPF (백혈구뇨)")
-
-                # UPCR/ACR 해석 (고값>10000은 '단일 라인'으로 정리)
-                if upcr is not None:
-                    if upcr > 10000:
-                        _emit(lines, "risk", f"UPCR {upcr} mg/gCr → 신증후군 범위(극고값). 단위/입력 오류 가능성도 있어 검사실/의료진에게 문의하세요.")
-                    elif upcr >= 3500:
-                        _emit(lines, "risk", f"UPCR {upcr} mg/gCr ≥ 3500 → 신증후군 범위 단백뇨 가능")
-                    elif upcr >= 500:
-                        _emit(lines, "warn", f"UPCR {upcr} mg/gCr 500~3499 → 유의한 단백뇨")
-                    elif upcr >= 150:
-                        _emit(lines, "warn", f"UPCR {upcr} mg/gCr 150~499 → 경미~중등 단백뇨")
-                if acr is not None:
-                    if acr > 10000:
-                        _emit(lines, "risk", f"ACR {acr} mg/gCr → A3(중증) 범위(극고값). 단위/입력 오류 가능성도 있어 검사실/의료진에게 문의하세요.")
-                    elif acr >= 300:
-                        _emit(lines, "risk", f"ACR {acr} mg/gCr ≥ 300 → 알부민뇨 A3(중증)")
-                    elif acr >= 30:
-                        _emit(lines, "warn", f"ACR {acr} mg/gCr 30~299 → 알부민뇨 A2(중등)")
-                    elif acr < 30:
-                        _emit(lines, "ok",  f"ACR {acr} mg/gCr < 30 → A1 범주")
-
-                # 패턴 종합
-                uti_flag = ((wbc is not None and wbc >= 5) or leu!="없음" or nit!="없음")
-                if uti_flag:
-                    _emit(lines, "warn", "요로감염 의심 패턴 → 요배양/항생제 필요성 상담")
-
-            # --- 혈구지수/망상 / RBC Indices & Reticulocytes ---
-            elif sec_id == "rbcidx":
-                g1, g2, g3, g4 = st.columns(4)
-                with g1: mcv = _num(st.text_input("MCV (Mean Corpuscular Volume, 평균적혈구용적, fL)",  placeholder="예: 75"))
-                with g2: mch = _num(st.text_input("MCH (Mean Corpuscular Hemoglobin, 평균적혈구혈색소량, pg)",  placeholder="예: 26"))
-                with g3: rdw = _num(st.text_input("RDW (Red Cell Distribution Width, 적혈구분포폭, %)",   placeholder="예: 13.5"))
-                with g4: ret = _num(st.text_input("Reticulocyte (망상적혈구, %)", placeholder="예: 1.0"))
-                # MCV
-                if mcv is not None:
-                    if mcv < 80: _emit(lines, "warn", f"MCV {mcv} < 80 → 소구성 빈혈(철결핍/지중해빈혈 등) 감별")
-                    elif mcv > 100: _emit(lines, "warn", f"MCV {mcv} > 100 → 대구성 빈혈(B12/엽산/간질환/골수이상) 감별")
-                    else: _emit(lines, "ok", f"MCV {mcv} 정상범위(80~100)")
-                # RDW
-                if rdw is not None:
-                    if rdw > 14.5: _emit(lines, "warn", f"RDW {rdw}% ↑ → 적혈구 크기 불균일(철결핍/혼합결핍) 의심")
-                # 조합 규칙
-                if mcv is not None and rdw is not None:
-                    if mcv < 80 and rdw > 14.5:
-                        _emit(lines, "warn", "소구성 + RDW 증가 → **철결핍** 가능성 높음")
-                    if mcv < 80 and (rdw <= 14.5):
-                        _emit(lines, "warn", "소구성 + RDW 정상 → **지중해 빈혈 보인자** 감별")
-                    if mcv > 100 and (ret is not None and ret < 0.5):
-                        _emit(lines, "warn", "대구성 + 망상 저하 → **B12/엽산 결핍** 등 생성 저하형")
-                # Retic
-                if ret is not None:
-                    if ret >= 2.0:
-                        _emit(lines, "warn", f"Reticulocyte {ret}% ↑ → 용혈/실혈 회복기 등 생산 증가 소견")
-                    elif ret < 0.5:
-                        _emit(lines, "warn", f"Reticulocyte {ret}% ↓ → 조혈 저하(골수억제/영양결핍) 의심")
-
-            elif sec_id == "complement":
-                d1,d2,d3 = st.columns(3)
-                with d1: c3   = _num(st.text_input("C3 (Complement 3, 보체 C3, mg/dL)", placeholder="예: 90"))
-                with d2: c4   = _num(st.text_input("C4 (Complement 4, 보체 C4, mg/dL)", placeholder="예: 20"))
-                with d3: ch50 = _num(st.text_input("CH50 (Total Complement Activity, 총보체활성, U/mL)", placeholder="예: 50"))
-                if c3 is not None and c3 < 85: _emit(lines, "warn", f"C3 낮음({c3}) → 면역복합체 질환/활성화 가능성")
-                if c4 is not None and c4 < 15: _emit(lines, "warn", f"C4 낮음({c4}) → 보체소모/면역 이상 가능성")
-                if ch50 is not None:
-                    if ch50 < 30: _emit(lines, "risk", f"CH50 {ch50} (낮음) → 보체 결핍/소모 의심")
-                    elif ch50 < 40: _emit(lines, "warn", f"CH50 {ch50} (경도 저하) → 추적 필요")
-
-            elif sec_id == "lipid":
-                l1,l2,l3,l4 = st.columns(4)
-                with l1: tc  = _num(st.text_input("Total Cholesterol (총콜레스테롤, mg/dL)", placeholder="예: 180"))
-                with l2: tg  = _num(st.text_input("Triglyceride (중성지방, mg/dL)", placeholder="예: 120"))
-                with l3: hdl = _num(st.text_input("HDL (고밀도지단백, mg/dL)", placeholder="예: 55"))
-                with l4: ldl = _num(st.text_input("LDL (저밀도지단백, mg/dL)", placeholder="예: 110"))
-                if tc is not None and tc >= 240: _emit(lines, "risk", f"총콜레스테롤 {tc} ≥ 240 → 고지혈증 가능")
-                elif tc is not None and tc >= 200: _emit(lines, "warn", f"총콜레스테롤 {tc} 200~239 → 경계역")
-                if tg is not None and tg >= 500: _emit(lines, "risk", f"중성지방 {tg} ≥ 500 → 췌장염 위험")
-                elif tg is not None and tg >= 200: _emit(lines, "warn", f"중성지방 {tg} 200~499 → 고중성지방혈증")
-                if hdl is not None and hdl < 40: _emit(lines, "warn", f"HDL {hdl} < 40 → 낮음")
-                if ldl is not None and ldl >= 190: _emit(lines, "risk", f"LDL {ldl} ≥ 190 → 매우 높음")
-                elif ldl is not None and ldl >= 160: _emit(lines, "warn", f"LDL {ldl} 160~189 → 높음")
-                elif ldl is not None and ldl >= 130: _emit(lines, "warn", f"LDL {ldl} 130~159 → 경계역")
-
-            elif sec_id == "heartfail":
-                h5,h6 = st.columns(2)
-                with h5: bnp = _num(st.text_input("BNP (B-type Natriuretic Peptide, 뇌나트륨이뇨펩티드, pg/mL)", placeholder="예: 60"))
-                with h6: ntp = _num(st.text_input("NT-proBNP (N-terminal proBNP, pg/mL)", placeholder="예: 125"))
-                if bnp is not None and bnp >= 100: _emit(lines, "warn", f"BNP {bnp} ≥ 100 → 심부전 의심(연령/신장기능 고려)")
-                if ntp is not None and ntp >= 900: _emit(lines, "warn", f"NT-proBNP {ntp} 상승 → 연령/신장 기능 고려")
-
-            elif sec_id == "glucose":
-                g1,g2,g3 = st.columns(3)
-                with g1: fpg  = _num(st.text_input("FPG (Fasting Plasma Glucose, 식전혈당, mg/dL)", placeholder="예: 95"))
-                with g2: ppg1 = _num(st.text_input("PPG 1h (Postprandial 1-hour Glucose, 식후1시간, mg/dL)", placeholder="예: 150"))
-                with g3: ppg2 = _num(st.text_input("PPG 2h (Postprandial 2-hour Glucose, 식후2시간, mg/dL)", placeholder="예: 120"))
-                if fpg is not None:
-                    if fpg >= 126: _emit(lines, "risk", f"FPG {fpg} ≥ 126 → 당뇨병 가능성")
-                    elif fpg >= 100: _emit(lines, "warn", f"FPG {fpg} 100~125 → 공복혈당장애")
-                if ppg1 is not None and ppg1 >= 200: _emit(lines, "warn", f"식후1h {ppg1} ≥ 200 → 고혈당")
-                if ppg2 is not None:
-                    if ppg2 >= 200: _emit(lines, "risk", f"식후2h {ppg2} ≥ 200 → 당뇨병 가능성")
-                    elif ppg2 >= 140: _emit(lines, "warn", f"식후2h {ppg2} 140~199 → 내당능장애")
-
-            elif sec_id == "cardio":
-                h1,h2,h3,h4 = st.columns(4)
-                with h1: ck   = _num(st.text_input("CK (Creatine Kinase, 크레아틴키나아제, U/L)", placeholder="예: 160"))
-                with h2: ckmb = _num(st.text_input("CK-MB (MB fraction, MB분획, ng/mL)", placeholder="예: 2.5"))
-                with h3: troI = _num(st.text_input("Troponin I (트로포닌 I, ng/mL)", placeholder="예: 0.01"))
-                with h4: troT = _num(st.text_input("Troponin T (트로포닌 T, ng/mL)", placeholder="예: 0.005"))
-                ulnI = _num(st.text_input("ULN for Troponin I (정상상한, ng/mL)", placeholder="예: 0.04"))
-                ulnT = _num(st.text_input("ULN for Troponin T (정상상한, ng/mL)", placeholder="예: 0.014"))
-                if ck is not None:
-                    if ck >= 5000: _emit(lines, "risk", f"CK {ck} → 횡문근융해 의심(즉시 상담)")
-                    elif ck >= 1000: _emit(lines, "warn", f"CK {ck} → 근손상/운동/약물 영향 가능")
-                if ckmb is not None and ckmb >= 5: _emit(lines, "warn", f"CK-MB {ckmb} ≥ 5 → 심근 손상 지표 상승 가능")
-                if troI is not None and troI >= (ulnI if ulnI is not None else 0.04): _emit(lines, "risk", f"Troponin I {troI} ≥ ULN → 심근 손상 의심")
-                if troT is not None and troT >= (ulnT if ulnT is not None else 0.014): _emit(lines, "risk", f"Troponin T {troT} ≥ ULN → 심근 손상 의심")
-
-            elif sec_id == "hepatobiliary":
-                a1,a2 = st.columns(2)
-                with a1: ggt = _num(st.text_input("GGT (Gamma-GT, 감마지티피, U/L)", placeholder="예: 35"))
-                with a2: alp = _num(st.text_input("ALP (Alkaline Phosphatase, 알칼리인산분해효소, U/L)", placeholder="예: 110"))
-                if ggt is not None and ggt >= 100: _emit(lines, "warn", f"GGT 상승({ggt}) → 담도/약물 영향 가능")
-                if alp is not None and alp >= 150: _emit(lines, "warn", f"ALP 상승({alp}) → 담도/골질환 감별")
-
-            elif sec_id == "pancreas":
-                p1,p2 = st.columns(2)
-                with p1: amy = _num(st.text_input("Amylase (아밀라아제, U/L)", placeholder="예: 60"))
-                with p2: lip = _num(st.text_input("Lipase (리파아제, U/L)", placeholder="예: 40"))
-                if amy is not None and amy >= 300: _emit(lines, "warn", f"Amylase 상승({amy}) → 췌장/타장기 영향 가능")
-                if lip is not None and lip >= 180:  _emit(lines, "risk", f"Lipase 현저 상승({lip}) → 급성 췌장염 의심")
-
-            elif sec_id == "coag":
-                c1,c2,c3,c4 = st.columns(4)
-                with c1: inr  = _num(st.text_input("PT-INR (프로트롬빈 시간-INR)", placeholder="예: 1.0"))
-                with c2: aptt = _num(st.text_input("aPTT (활성화 부분 트롬보플라스틴 시간, sec)", placeholder="예: 30"))
-                with c3: fib  = _num(st.text_input("Fibrinogen (피브리노겐, mg/dL)", placeholder="예: 300"))
-                with c4: dd   = _num(st.text_input("D-dimer (디-다이머, µg/mL)", placeholder="예: 0.3"))
-                if inr is not None and inr >= 1.5: _emit(lines, "warn", f"INR {inr} ≥ 1.5 → 응고 저하/간기능 저하 가능")
-                if aptt is not None and aptt >= 40: _emit(lines, "warn", f"aPTT {aptt} ≥ 40s → 내인성 경로 지연")
-                if fib is not None and fib < 150: _emit(lines, "risk", f"Fibrinogen {fib} < 150 → 소모/간기능 저하")
-                if dd is not None and dd >= 0.5: _emit(lines, "warn", f"D-dimer {dd} ≥ 0.5 → 혈전/염증 반응 가능(임상과 함께)")
-
-            elif sec_id == "inflammation":
-                i1,i2,i3 = st.columns(3)
-                with i1: esr  = _num(st.text_input("ESR (적혈구침강속도, mm/h)", placeholder="예: 10"))
-                with i2: ferr = _num(st.text_input("Ferritin (페리틴, ng/mL)", placeholder="예: 100"))
-                with i3: pct  = _num(st.text_input("Procalcitonin (프로칼시토닌, ng/mL)", placeholder="예: 0.05"))
-                if esr is not None and esr >= 40: _emit(lines, "warn", f"ESR {esr} ≥ 40 → 염증/만성질환 가능")
-                if ferr is not None and ferr >= 300: _emit(lines, "warn", f"Ferritin {ferr} ≥ 300 → 염증/철과부하 감별")
-                if pct is not None:
-                    if pct >= 2: _emit(lines, "risk", f"PCT {pct} ≥ 2 → 패혈증 가능성 높음")
-                    elif pct >= 0.5: _emit(lines, "warn", f"PCT {pct} 0.5~2 → 세균감염 의심")
-
-            elif sec_id == "lactate":
-                lc = _num(st.text_input("Lactate (젖산, mmol/L)", placeholder="예: 1.5"))
-                if lc is not None and lc >= 2: _emit(lines, "warn", f"Lactate {lc} ≥ 2 → 조직저산소/패혈증 감시")
+            _section_view(title, sec_id)
+    for _, sec_id in SECTIONS:
+        lines.extend(_section_lines(sec_id))
     return lines
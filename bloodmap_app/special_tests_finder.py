@@ -9,27 +9,40 @@ special_tests_finder.py — robust loader + embedded safe fallback
 동작
 - 가능한 경로에서 special_tests.py 외부 모듈을 먼저 찾고(import)
 - 실패 시 임베디드 안전판 UI를 즉시 렌더(탭이 비어 보이지 않음)
-- 호출 전후로 Streamlit 위젯을 항상 "원본"으로 복구하여 monkeypatch 재귀를 방지
+- special_tests 는 st.* 를 패치하지 않음(키드 위젯 팩토리). 예전 패치가 남아 있을 때만 1회 원본 복구
 """
 
 from __future__ import annotations
-import os, sys, importlib, importlib.util, types
+import os, importlib, types
 from pathlib import Path
 
-def _restore_streamlit_originals():
+_WIDGETS = ("text_input", "selectbox", "text_area", "toggle")
+
+def _is_wrapped(fn) -> bool:
+    return not str(getattr(fn, "__module__", "") or "").startswith("streamlit")
+
+def _restore_streamlit_originals() -> bool:
+    """
+    special_tests 는 더 이상 st.* 를 바꾸지 않음(키는 SectionWidgets 팩토리가 생성).
+    예전 배포본/외부 패치가 남아 있을 때만 원본으로 되돌림 — 평소에는 속성 확인만 하고 끝.
+    """
     try:
         import streamlit as st
     except Exception:
-        return
-    if not hasattr(st, "_bm_text_input_orig"):
-        st._bm_text_input_orig = st.text_input
-    if not hasattr(st, "_bm_selectbox_orig"):
-        st._bm_selectbox_orig = st.selectbox
-    if not hasattr(st, "_bm_text_area_orig"):
-        st._bm_text_area_orig = st.text_area
-    st.text_input  = st._bm_text_input_orig
-    st.selectbox   = st._bm_selectbox_orig
-    st.text_area   = st._bm_text_area_orig
+        return False
+    restored = False
+    for name in _WIDGETS:
+        cur = getattr(st, name, None)
+        if cur is None:
+            continue
+        orig = getattr(st, f"_bm_{name}_orig", None)
+        if orig is None and not _is_wrapped(cur):
+            setattr(st, f"_bm_{name}_orig", cur)
+            continue
+        if orig is not None and cur is not orig:
+            setattr(st, name, orig)
+            restored = True
+    return restored
 
 def _embedded_ui():
     import streamlit as st
@@ -78,19 +91,6 @@ def _embedded_ui():
     st.markdown("#### 메모")
     TA("특수검사 관련 메모(선택)", key=_k("memo_st"))
 
-def _load_by_path(p: Path) -> types.ModuleType | None:
-    try:
-        spec = importlib.util.spec_from_file_location("special_tests", str(p))
-        mod = importlib.util.module_from_spec(spec)  # type: ignore
-        sys.modules["special_tests"] = mod
-        assert spec and spec.loader
-        spec.loader.exec_module(mod)  # type: ignore
-        return mod
-    except Exception as e:
-        import streamlit as st
-        st.error(f"special_tests 로드 실패: {e}")
-        return None
-
 COMMON_PATHS = [
     Path(__file__).parent / "special_tests.py",                          # same dir
     Path(__file__).parent.parent / "special_tests.py",                   # parent
@@ -99,18 +99,21 @@ COMMON_PATHS = [
 ]
 
 def _find_module() -> types.ModuleType | None:
-    # Already importable?
+    # 경로 해석·캐시·변경 감지는 lazy_modules 가 담당(리런마다 모듈을 다시 실행하지 않음)
+    try:
+        import lazy_modules as _lazy
+    except Exception:
+        _lazy = None
+    if _lazy is not None:
+        mod, _ = _lazy.load("special_tests", [str(p) for p in COMMON_PATHS], "특수검사")
+        if mod is None and _lazy.last_error("special_tests"):
+            import streamlit as st
+            st.error(f"special_tests 로드 실패: {_lazy.last_error('special_tests')}")
+        return mod
     try:
         return importlib.import_module("special_tests")
     except Exception:
-        pass
-    # Search common paths
-    for p in COMMON_PATHS:
-        if p.exists():
-            m = _load_by_path(p)
-            if m is not None:
-                return m
-    return None
+        return None
 
 def _call_entry(mod: types.ModuleType):
     for name in ("special_tests_ui", "render_special_tests", "injector", "render", "main"):
@@ -128,14 +131,10 @@ def _call_entry(mod: types.ModuleType):
 def render_special_tests_safe():
     import streamlit as st
     os.environ["BM_DISABLE_ST_PATCH"] = "1"  # 전역 monkeypatch 차단 신호
-    _restore_streamlit_originals()
-
     mod = _find_module()
+    _restore_streamlit_originals()   # 로드 시 패치하는 예전 모듈 대비(평소엔 no-op)
     if mod is None:
-        _restore_streamlit_originals()
         _embedded_ui()
         st.caption("※ special_tests.py를 app.py와 같은 폴더 또는 /mount/src/hoya12/bloodmap_app/ 에 배치하면 다음 리런부터 실제 UI가 표시됩니다.")
         return
-
-    _restore_streamlit_originals()
     return _call_entry(mod)
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+synth_data.py
+부하/규모 테스트용 가상 사용자 데이터 생성기(시드 고정 → 항상 같은 결과)
+- 사용자 i 는 random.Random(f"{seed}:{i}") 로 독립 생성 → 범위를 나눠(--start/-n) 병렬 생성해도 동일
+- 검사 추이: 항암 주기마다 ANC nadir/회복 곡선, PLT 는 1~3일 늦은 nadir, Hb 는 누적 감소 + 수혈 반등,
+  발열성 호중구감소 에피소드에서 CRP 급등 → 같은 시각대의 케어로그(발열/APAP/IBU)와 맞물림
+- 출력(write_files) — 기존 파일 형식 그대로(user_store.migrate_files 로 이관 가능)
+    <out>/bloodmap_graph/<uid>.json       graph_store.save_config
+    <out>/bloodmap_graph/<uid>.labs.csv   graph_store.save_labs_csv (LAB_COLUMNS)
+    <out>/care_log/<uid>.jsonl            carelog_ext ({"ts_kst","type","detail"} 한 줄씩)
+    <out>/metrics/feedback.csv            feedback_store.COLUMNS
+    <out>/schedules.csv                   uid + mini_schedule 행(No, Date, Name, Who)
+- write_db() : 같은 데이터를 통합 SQLite(user_store + feedback 테이블)에 한 연결·배치 INSERT 로 적재
+              (검사수치는 DB 옆 lab_store/ — user_store 와 같은 위치 규칙)
+    python synth_data.py --out /tmp/synth -n 100000 [--seed 7] [--db] [--start 0] [--end "2026-10-01 09:00"]
+"""
+from __future__ import annotations
+import argparse, csv, json, math, os, random, sys, time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+LAB_COLUMNS = ["ts_kst", "WBC", "Hb", "PLT", "CRP", "ANC", "Na", "K", "Cr"]   # graph_store.LAB_COLUMNS
+FEEDBACK_COLUMNS = ["ts_kst", "name_or_nick", "contact", "category", "rating", "message", "page"]
+SCHEDULE_COLUMNS = ["uid", "No", "Date", "Name", "Who"]
+
+DEFAULT_SEED = 20261018
+DEFAULT_END = "2026-10-01 09:00"   # 기준 시각(마지막 기록 무렵) — 고정해야 재현 가능. "now" 면 현재 KST
+HEAVY_FRAC = 0.01                   # 기록이 아주 긴 사용자 비율(꼬리 분포)
+FEEDBACK_FRAC = 0.04
+
+# (그룹, 진단, 요법, 주기 일수) — onco_map 키와 같은 표기
+_DX: List[Tuple[str, str, Tuple[str, ...], int]] = [
+    ("혈액암", "AML", ("Cytarabine", "Daunorubicin"), 28),
+    ("혈액암", "ALL", ("Vincristine", "MTX", "6-MP"), 28),
+    ("혈액암", "APL", ("ATRA", "Arsenic Trioxide", "Idarubicin"), 28),
+    ("림프종", "DLBCL", ("Rituximab", "Cyclophosphamide", "Doxorubicin", "Vincristine", "Prednisone"), 21),
+    ("림프종", "BL", ("Cyclophosphamide", "MTX", "Cytarabine"), 21),
+    ("고형암", "유방암", ("Doxorubicin", "Cyclophosphamide", "Paclitaxel"), 21),
+    ("고형암", "폐선암", ("Pemetrexed", "Cisplatin"), 21),
+    ("고형암", "대장암", ("Oxaliplatin", "5-FU", "Leucovorin"), 14),
+    ("육종", "Osteosarcoma", ("MTX", "Doxorubicin", "Cisplatin"), 21),
+    ("육종", "Ewing sarcoma", ("Vincristine", "Doxorubicin", "Cyclophosphamide", "Ifosfamide", "Etoposide"), 21),
+]
+_DX_W = [14, 12, 3, 10, 3, 16, 12, 12, 8, 10]
+
+_FB_CATEGORIES = ["버그 제보", "개선 요청", "기능 아이디어", "데이터 오류 신고", "일반 의견"]
+_FB_MESSAGES = ["그래프가 느려요", "PDF 글자가 잘려요", "해열제 기록 알림이 있으면 좋겠어요", "수치 붙여넣기 잘 됩니다",
+                "특수검사 해석 감사합니다", "모바일에서 표가 넘쳐요", "단위가 헷갈립니다", "야간 응급 기준 설명이 필요해요"]
+_FB_PAGES = ["home", "labs", "dx", "chemo", "special", "report", "graph", "peds"]
+_NOTES = ["잘 먹음", "식욕 저하", "수면 양호", "기운 없음", "입안 헐음", "외래 진료", "수액 맞음", "컨디션 회복"]
+
+
+@dataclass
+class SynthUser:
+    index: int
+    nick: str
+    pin: str
+    config: Dict[str, Any]
+    labs: List[Dict[str, Any]] = field(default_factory=list)
+    care: List[Dict[str, str]] = field(default_factory=list)
+    schedule: List[Dict[str, Any]] = field(default_factory=list)
+    feedback: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def uid(self) -> str:   # graph_store/carelog_ext._uid 와 같은 규칙
+        return f"{self.nick}_{self.pin}"
+
+
+def _end_time(end: Optional[str]) -> datetime:
+    if end == "now":
+        from datetime import timezone
+        return datetime.now(timezone(timedelta(hours=9))).replace(tzinfo=None, second=0, microsecond=0)
+    return datetime.strptime(end or DEFAULT_END, "%Y-%m-%d %H:%M")
+
+
+def _ts(t: datetime) -> str:
+    return t.strftime("%Y-%m-%d %H:%M")
+
+
+def _dip(day: float, center: float, width: float) -> float:
+    return math.exp(-((day - center) / width) ** 2)
+
+
+def make_user(i: int, seed: int = DEFAULT_SEED, end: Optional[str] = None) -> SynthUser:
+    """사용자 i 1명 생성(결정적)."""
+    r = random.Random(f"{seed}:{i}")
+    t_end = _end_time(end)
+    group, dx, regimen, cycle = r.choices(_DX, weights=_DX_W)[0]
+    peds = r.random() < 0.35
+    age = r.randint(1, 17) if peds else r.randint(19, 82)
+    weight = round(max(8.0, (3.0 * age + 8 if peds else r.gauss(62, 11))) * r.uniform(0.85, 1.15), 1)
+    heavy = r.random() < HEAVY_FRAC
+    days = r.randint(400, 730) if heavy else r.randint(21, 180)
+    start = t_end - timedelta(days=days, hours=r.randint(0, 8))
+    nick = f"user{i:06d}"
+    pin = f"{r.randint(0, 9999):04d}"
+    config = {"nick": nick, "group": group, "dx": dx, "regimen": list(regimen), "cycle_days": cycle,
+              "age": age, "weight_kg": weight, "peds": peds, "created": _ts(start), "synthetic": True}
+    u = SynthUser(i, nick, pin, config)
+
+    # 개인 기준값/주기 반응
+    anc0 = r.uniform(1800, 4500)
+    plt0 = r.uniform(170_000, 360_000)
+    hb = r.uniform(10.5, 13.0) if peds else r.uniform(11.0, 14.5)
+    nadir = r.uniform(7.5, 12.0)
+    width = r.uniform(2.5, 4.5)
+    depth = r.uniform(0.75, 0.985)
+    plt_lag, plt_depth = r.uniform(1.0, 3.0), r.uniform(0.45, 0.9)
+    crp_base = r.uniform(0.05, 0.6)
+    na0, k0, cr0 = r.gauss(139, 1.5), r.gauss(4.1, 0.2), (0.35 if peds else 0.8) * r.uniform(0.8, 1.25)
+    fever_risk = r.uniform(0.15, 0.55)   # 주기당 발열성 호중구감소 확률
+
+    # 주기/발열 에피소드(케어로그와 공유)
+    cycles: List[datetime] = []
+    t = start
+    while t < t_end:
+        cycles.append(t)
+        t += timedelta(days=cycle + (r.randint(0, 7) if r.random() < 0.25 else 0))   # 지연된 주기
+    fevers: List[Tuple[datetime, float, float]] = []   # (시작, 지속 h, 최고 체온)
+    for c0 in cycles:
+        if r.random() < fever_risk:
+            f0 = c0 + timedelta(days=nadir + r.uniform(-1.5, 1.5), hours=r.randint(0, 23))
+            if f0 < t_end:
+                fevers.append((f0, r.uniform(18, 96), round(r.uniform(38.1, 40.2), 1)))
+
+    # 검사: 1~3일 간격(주기 nadir 무렵엔 더 자주), 시각은 외래/병동 채혈 시간대
+    d = start.replace(hour=0, minute=0)
+    ci = 0
+    while d < t_end:
+        while ci + 1 < len(cycles) and cycles[ci + 1] <= d:
+            ci += 1
+            hb -= r.uniform(0.05, 0.35)   # 누적 골수억제
+        dc = (d - cycles[ci]).total_seconds() / 86400.0
+        ts = d + timedelta(hours=r.choice((6, 7, 8, 9, 10, 14)), minutes=r.choice((0, 10, 20, 30, 40, 50)))
+        anc = anc0 * (1.0 - depth * _dip(dc, nadir, width)) * r.lognormvariate(0, 0.12)
+        if dc > nadir + width:
+            anc *= 1.0 + 0.35 * _dip(dc, nadir + 2.2 * width, width)   # 회복기 반동
+        plt_v = plt0 * (1.0 - plt_depth * _dip(dc, nadir + plt_lag, width * 1.2)) * r.lognormvariate(0, 0.1)
+        crp = crp_base * r.lognormvariate(0, 0.35)
+        for f0, dur, tmax in fevers:
+            h = (ts - f0).total_seconds() / 3600.0
+            if -6 <= h <= dur + 72:   # CRP 는 발열 뒤 12~48h 정점, 천천히 감소
+                crp += (tmax - 37.5) * r.uniform(4.0, 9.0) * math.exp(-((h - 30) / 40.0) ** 2)
+        if hb < 7.5 and r.random() < 0.6:
+            hb += r.uniform(1.5, 2.5)   # 수혈
+        hb_v = hb - 0.6 * _dip(dc, nadir + 2, 5) + r.gauss(0, 0.25)
+        wbc = anc / 1000.0 / r.uniform(0.55, 0.75) + r.uniform(0.2, 0.8)
+        u.labs.append({"ts_kst": _ts(ts), "WBC": round(wbc, 2), "Hb": round(max(5.0, hb_v), 1),
+                       "PLT": int(max(3000, plt_v) // 1000 * 1000), "CRP": round(crp, 2), "ANC": int(max(0, anc) // 10 * 10),
+                       "Na": round(na0 + r.gauss(0, 1.6) - (2.0 if crp > 5 else 0.0), 1),
+                       "K": round(k0 + r.gauss(0, 0.25), 1), "Cr": round(cr0 * r.lognormvariate(0, 0.08), 2)})
+        step = 1 if abs(dc - nadir) < width else r.choice((1, 2, 2, 3, 3, 4))
+        if r.random() < 0.06:
+            step += r.randint(2, 6)   # 빠진 검사
+        d += timedelta(days=step)
+
+    # 케어로그: 발열 에피소드마다 체온/해열제(APAP 4h↑, IBU 6h↑ 간격) + 가끔 증상/메모
+    wkg = weight
+    events: List[Tuple[datetime, str, str]] = []
+    for f0, dur, tmax in fevers:
+        t = f0
+        last_apap = last_ibu = f0 - timedelta(days=1)
+        while t < min(f0 + timedelta(hours=dur), t_end):
+            temp = round(37.6 + (tmax - 37.6) * r.uniform(0.55, 1.0), 1)
+            events.append((t, "발열", f"{temp}℃"))
+            if temp >= 38.0:
+                if (t - last_apap) >= timedelta(hours=4):
+                    mg = int(round(min(15 * wkg, 1000) / 10.0) * 10)
+                    events.append((t + timedelta(minutes=r.randint(1, 15)), "APAP", f"{mg}mg"))
+                    last_apap = t
+                elif peds and (t - last_ibu) >= timedelta(hours=6):
+                    mg = int(round(min(10 * wkg, 400) / 10.0) * 10)
+                    events.append((t + timedelta(minutes=r.randint(1, 15)), "IBU", f"{mg}mg"))
+                    last_ibu = t
+            t += timedelta(hours=r.uniform(2.5, 5.0))
+    n_misc = int(days * r.uniform(0.05, 0.5))
+    total_min = max(1, int((t_end - start).total_seconds() // 60))
+    for _ in range(n_misc):
+        t = start + timedelta(minutes=r.randrange(total_min))
+        kind = r.choices(("메모", "구토", "설사", "APAP"), weights=(6, 2, 2, 1))[0]
+        detail = r.choice(_NOTES) if kind == "메모" else (f"{r.randint(1, 4)}회" if kind in ("구토", "설사")
+                                                          else f"{int(round(min(15 * wkg, 1000) / 10.0) * 10)}mg")
+        events.append((t, kind, detail))
+    events.sort(key=lambda e: e[0])
+    u.care = [{"ts_kst": _ts(t), "type": k, "detail": v} for t, k, v in events if t <= t_end]
+
+    # 스케줄: 항암 주기 시작일(앞으로 2주기 포함), mini_schedule 행 형식
+    sched_days = [c.date() for c in cycles] + [cycles[-1].date() + timedelta(days=cycle * k) for k in (1, 2)]
+    name = f"{dx} 항암캘린더"
+    who = "소아" if peds else "질환"
+    u.schedule = [{"No": k + 1, "Date": dd.strftime("%Y-%m-%d"), "Name": name, "Who": who}
+                  for k, dd in enumerate(sched_days)]
+
+    # 피드백(일부 사용자만)
+    if r.random() < FEEDBACK_FRAC:
+        for _ in range(r.choice((1, 1, 1, 2, 3))):
+            t = start + timedelta(minutes=r.randrange(total_min))
+            u.feedback.append({"ts_kst": t.strftime("%Y-%m-%d %H:%M:%S"),
+                               "name_or_nick": nick if r.random() < 0.5 else "",
+                               "contact": f"{nick}@example.com" if r.random() < 0.2 else "",
+                               "category": r.choice(_FB_CATEGORIES), "rating": r.choices((1, 2, 3, 4, 5), (1, 1, 3, 6, 5))[0],
+                               "message": r.choice(_FB_MESSAGES), "page": r.choice(_FB_PAGES)})
+    return u
+
+
+def iter_users(n: int, seed: int = DEFAULT_SEED, start: int = 0, end: Optional[str] = None) -> Iterator[SynthUser]:
+    for i in range(start, start + n):
+        yield make_user(i, seed, end)
+
+
+def _csv_line(w, values) -> None:
+    w.writerow(["" if v is None else v for v in values])
+
+
+def write_files(out_dir: str, n: int, seed: int = DEFAULT_SEED, start: int = 0, end: Optional[str] = None,
+                log_every: int = 0) -> Dict[str, int]:
+    """기존 파일 형식으로 기록. 반환: 건수 요약. feedback.csv/schedules.csv 는 이어 쓰기(범위 분할 생성용)."""
+    gdir = os.path.join(out_dir, "bloodmap_graph")
+    cdir = os.path.join(out_dir, "care_log")
+    mdir = os.path.join(out_dir, "metrics")
+    for p in (gdir, cdir, mdir):
+        os.makedirs(p, exist_ok=True)
+    stats = {"users": 0, "labs": 0, "care": 0, "schedules": 0, "feedback": 0}
+    fb_path = os.path.join(mdir, "feedback.csv")
+    sc_path = os.path.join(out_dir, "schedules.csv")
+    fb_new, sc_new = not os.path.exists(fb_path), not os.path.exists(sc_path)
+    with open(fb_path, "a", encoding="utf-8", newline="") as fbf, open(sc_path, "a", encoding="utf-8", newline="") as scf:
+        fbw, scw = csv.writer(fbf), csv.writer(scf)
+        if fb_new:
+            fbw.writerow(FEEDBACK_COLUMNS)
+        if sc_new:
+            scw.writerow(SCHEDULE_COLUMNS)
+        for u in iter_users(n, seed, start, end):
+            uid = u.uid
+            with open(os.path.join(gdir, f"{uid}.json"), "w", encoding="utf-8") as f:
+                f.write(json.dumps(u.config, ensure_ascii=False, indent=2))
+            with open(os.path.join(gdir, f"{uid}.labs.csv"), "w", encoding="utf-8", newline="") as f:
+                w = csv.writer(f)
+                w.writerow(LAB_COLUMNS)
+                for row in u.labs:
+                    _csv_line(w, (row.get(c) for c in LAB_COLUMNS))
+            with open(os.path.join(cdir, f"{uid}.jsonl"), "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in u.care)
+            for s in u.schedule:
+                _csv_line(scw, [uid] + [s[c] for c in SCHEDULE_COLUMNS[1:]])
+            for fb in u.feedback:
+                _csv_line(fbw, (fb.get(c) for c in FEEDBACK_COLUMNS))
+            stats["users"] += 1
+            stats["labs"] += len(u.labs)
+            stats["care"] += len(u.care)
+            stats["schedules"] += len(u.schedule)
+            stats["feedback"] += len(u.feedback)
+            if log_every and stats["users"] % log_every == 0:
+                print(f"... {stats['users']} users", file=sys.stderr)
+    return stats
+
+
+def write_db(db_file: str, n: int, seed: int = DEFAULT_SEED, start: int = 0, end: Optional[str] = None,
+             batch_users: int = 500, log_every: int = 0) -> Dict[str, int]:
+    """통합 SQLite(user_store 스키마 + feedback 테이블)에 적재 — batch_users 명마다 커밋. 검사수치는 lab_store 로."""
+    import lab_store
+    import user_store
+    import feedback_store
+    lab_root = user_store._lab_root(db_file)
+    feedback_store.connect(db_file).close()   # feedback/meta 테이블
+    con = user_store.connect(db_file)
+    stats = {"users": 0, "labs": 0, "care": 0, "schedules": 0, "feedback": 0}
+    try:
+        buf: Dict[str, list] = {"profiles": [], "care": [], "schedules": [], "feedback": []}
+
+        def commit():
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                con.executemany("INSERT INTO profiles(uid, data, updated_ts) VALUES (?,?,?) "
+                                "ON CONFLICT(uid) DO UPDATE SET data=excluded.data, updated_ts=excluded.updated_ts",
+                                buf["profiles"])
+                con.executemany("INSERT INTO care_events(uid, ts_kst, type, detail) VALUES (?,?,?,?)", buf["care"])
+                con.executemany("INSERT INTO schedules(uid, date, name, who, data) VALUES (?,?,?,?,?) "
+                                "ON CONFLICT(uid, date, name) DO UPDATE SET who=excluded.who, data=excluded.data",
+                                buf["schedules"])
+                con.executemany("INSERT INTO feedback (ts_kst,name_or_nick,contact,category,rating,message,page) "
+                                "VALUES (?,?,?,?,?,?,?)", buf["feedback"])
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+            for v in buf.values():
+                v.clear()
+
+        for u in iter_users(n, seed, start, end):
+            uid = u.uid
+            buf["profiles"].append((uid, json.dumps(u.config, ensure_ascii=False), u.config["created"] + ":00"))
+            lab_store.append_many(uid, user_store._lab_points(u.labs), fsync=False, root=lab_root)
+            buf["care"].extend((uid, e["ts_kst"], e["type"], e["detail"]) for e in u.care)
+            buf["schedules"].extend((uid, s["Date"], s["Name"], s["Who"], json.dumps(s, ensure_ascii=False))
+                                    for s in u.schedule)
+            buf["feedback"].extend(tuple(fb[c] for c in FEEDBACK_COLUMNS) for fb in u.feedback)
+            stats["users"] += 1
+            stats["labs"] += len(u.labs)
+            stats["care"] += len(u.care)
+            stats["schedules"] += len(u.schedule)
+            stats["feedback"] += len(u.feedback)
+            if stats["users"] % batch_users == 0:
+                commit()
+            if log_every and stats["users"] % log_every == 0:
+                print(f"... {stats['users']} users", file=sys.stderr)
+        if buf["profiles"]:
+            commit()
+    finally:
+        con.close()
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="BloodMap synthetic data generator (deterministic by seed)")
+    ap.add_argument("--out", required=True, help="출력 폴더(--db 면 이 폴더의 bloodmap.sqlite3)")
+    ap.add_argument("-n", "--users", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    ap.add_argument("--start", type=int, default=0, help="첫 사용자 번호(범위 분할 생성)")
+    ap.add_argument("--end", default=DEFAULT_END, help='기준 시각 "YYYY-MM-DD HH:MM" 또는 now(비결정적)')
+    ap.add_argument("--db", action="store_true", help="파일 대신 통합 SQLite 에 적재")
+    a = ap.parse_args(argv)
+    t0 = time.perf_counter()
+    log_every = 10000 if a.users >= 20000 else 0
+    if a.db:
+        import user_store
+        stats = write_db(user_store.db_path(a.out), a.users, a.seed, a.start, a.end, log_every=log_every)
+    else:
+        stats = write_files(a.out, a.users, a.seed, a.start, a.end, log_every=log_every)
+    stats["seconds"] = round(time.perf_counter() - t0, 2)
+    print(json.dumps(stats, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
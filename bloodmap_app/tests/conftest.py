@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""bloodmap_app 모듈을 패키지 없이(앱과 같은 방식으로) import 하도록 경로 추가(루트 모듈은 뒤에)."""
+from __future__ import annotations
+import os, sys
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ROOT_DIR = os.path.dirname(_APP_DIR)
+if _APP_DIR not in sys.path:
+    sys.path.insert(0, _APP_DIR)
+if _ROOT_DIR not in sys.path:
+    sys.path.append(_ROOT_DIR)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""csv_importer(저장소 루트) — bloodmap_app 모듈 해석, 단위 없는 값 그대로, 환산 보고, lab_store 저장."""
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture()
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("BLOODMAP_LAB_STORE_DIR", str(tmp_path / "lab_store"))
+    return tmp_path
+
+
+def test_modules_resolved():
+    import csv_importer as C
+    assert C.BOUNDS and C.LAB_REF_ADULT and C._ingest is not None
+
+
+def test_import_validates_as_typed_and_reports_conversions(store_dir):
+    import csv_importer as C
+    import lab_store
+    data = ("ts_kst,WBC,Hb,PLT,ANC\n"
+            "2024-03-01 09:00,4.5,12,9999,2500\n"
+            "2024-03-02 09:00,4.1,120 g/L,150000,9999999\n").encode("utf-8")
+    res = C.import_to_store("nick#1", data)
+    assert res.written == 2
+    assert res.converted == {"Hb g/l": 1}
+    assert res.conversions == [("Hb", 120.0, "g/L", 12.0)]
+    assert [(e.line, e.column) for e in res.errors] == [(3, "ANC")]
+    rows = lab_store.query_rows("nick#1")   # 앱 누적 기록 그래프가 읽는 곳
+    assert rows[0]["PLT"] == 9999.0 and rows[1]["PLT"] == 150000.0 and rows[1]["Hb"] == 12.0
+
+
+def test_standalone_copy_imports_and_names_missing_module(tmp_path):
+    import importlib.util, shutil, sys
+    import csv_importer
+    dst = tmp_path / "csv_importer.py"   # install_full.py 가 쓰는 단독 사본(bloodmap_app/ 없음)
+    shutil.copy(csv_importer.__file__, dst)
+    spec = importlib.util.spec_from_file_location("csv_importer_copy", str(dst))
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules["csv_importer_copy"] = mod
+    try:
+        spec.loader.exec_module(mod)                       # import 자체는 성공
+        saved = {k: sys.modules.pop(k) for k in ("lazy_modules", "validators") if k in sys.modules}
+        path = list(sys.path)
+        sys.path[:] = [p for p in sys.path if not p.rstrip("/").endswith("bloodmap_app")]
+        try:
+            with pytest.raises(ImportError, match="validators"):
+                mod.validate_values({"WBC": 4.5})
+        finally:
+            sys.path[:] = path
+            sys.modules.update(saved)
+    finally:
+        sys.modules.pop("csv_importer_copy", None)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""lab_ingest — 단위 없는 값은 그대로, 자유 서술의 애매한 별칭은 근거가 있을 때만."""
+from __future__ import annotations
+
+import lab_ingest as L
+
+
+def _vals(text: str) -> dict:
+    return L.latest_values(L.parse_text(text))
+
+
+def test_unitless_counts_kept_as_typed():
+    v = _vals("PLT 150000\nANC 2500\nHb 13")
+    assert v == {"PLT": 150000.0, "ANC": 2500.0, "Hb": 13.0}
+    assert not v["PLT"] < 20000   # 응급도(혈소판 <20k) 에 걸리지 않음
+
+
+def test_unitless_small_plt_kept_as_typed():
+    assert _vals("PLT 9999")["PLT"] == 9999.0
+    assert _vals("WBC 4500")["WBC"] == 4500.0
+
+
+def test_explicit_units_convert_and_are_reported():
+    rep = L.IngestReport()
+    pts = L.parse_text("PLT 23 x10^3/uL\nHb 81 g/L\nWBC 4500 /uL", report=rep)
+    v = L.latest_values(pts)
+    assert v["PLT"] == 23000.0 and v["Hb"] == 8.1 and v["WBC"] == 4.5
+    note = L.conversion_note(rep)
+    assert "PLT 23" in note and "→ 23000" in note
+
+
+def test_ambiguous_aliases_in_prose_ignored():
+    assert _vals("The patient got 2 units of PRBC. CA 19-9 was 35") == {}
+    assert _vals("CA-125: 45") == {}
+    assert _vals("CA 19-9 35") == {}
+
+
+def test_ambiguous_aliases_with_evidence_parsed():
+    assert _vals("Na 140 K 4.1 Cl 100") == {"Na": 140.0, "K": 4.1, "Cl": 100.0}
+    assert _vals("Na 140, K 4.1, P 3.2") == {"Na": 140.0, "K": 4.1, "P": 3.2}
+    assert _vals("Ca 9.1") == {"Ca": 9.1}
+    assert _vals("K: 3.1") == {"K": 3.1}
+    assert _vals("칼슘 9.0, 인 3.5") == {"Ca": 9.0, "P": 3.5}
+    assert _vals("GOT 45 GPT 60") == {"AST": 45.0, "ALT": 60.0}
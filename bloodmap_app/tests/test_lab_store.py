@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""lab_store — 시각 파싱(소수 초/점 구분 날짜), append 가 WAL 을 다시 읽지 않음."""
+from __future__ import annotations
+from datetime import datetime
+
+import pytest
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("2024-03-01 09:00:00.250", datetime(2024, 3, 1, 9, 0, 0, 250000)),
+    ("2024-03-01T09:00:00.5", datetime(2024, 3, 1, 9, 0, 0, 500000)),
+    ("2024.03.01 09:00:00.250", datetime(2024, 3, 1, 9, 0, 0, 250000)),
+    ("2024.3.1", datetime(2024, 3, 1)),
+    ("2024/03/01 09:00", datetime(2024, 3, 1, 9, 0)),
+])
+def test_to_ms_keeps_fractional_seconds(raw, expected):
+    import lab_store
+    assert lab_store.from_ms(lab_store.to_ms(raw)) == expected
+
+
+def test_to_ms_rejects_garbage():
+    import lab_store
+    assert lab_store.to_ms("09:00:00.250") is None
+    assert lab_store.to_ms("not a date") is None
+
+
+def test_append_counts_wal_without_reparsing(tmp_path, monkeypatch):
+    import lab_store
+    root = str(tmp_path)
+    lab_store.append("u1", "2024-03-01 09:00", {"WBC": 4.5}, root=root)   # 첫 기록 → 한 번 파싱
+    parsed = []
+    real = lab_store._parse_wal
+    monkeypatch.setattr(lab_store, "_parse_wal", lambda d, gen: parsed.append(gen) or real(d, gen))
+    for i in range(5):
+        lab_store.append("u1", f"2024-03-01 10:00:00.{i}", {"WBC": 4.0 + i}, root=root)
+    lab_store.append_many("u1", [("2024-03-02 09:00", {"PLT": 90000})], fsync=False, root=root)
+    assert parsed == []
+    key = str(lab_store._udir("u1", root))
+    assert lab_store._WAL_LEN[key][2] == 7
+    ts, cols = lab_store.query_arrays("u1", root=root)
+    assert len(ts) == 7 and len(set(ts.tolist())) == 7    # 소수 초가 서로 다른 시각으로 남음
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""refdata 공유본 — 앱 rerun 간 재사용, 관련 모듈 hot-reload 시 폐기."""
+from __future__ import annotations
+import os, sys
+
+import pytest
+
+_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def _calls(block: str) -> int:
+    import perf_probe
+    return sum(r["calls"] for r in perf_probe.stats() if r["block"] == block)
+
+
+@pytest.fixture()
+def app_env(tmp_path, monkeypatch):
+    for env, sub in (("BLOODMAP_DATA_DIR", "data"), ("BLOODMAP_SNAPSHOT_DIR", "snap"),
+                     ("BLOODMAP_LAB_STORE_DIR", "lab_store"), ("BLOODMAP_CARE_LOG_DIR", "care_log")):
+        os.makedirs(tmp_path / sub, exist_ok=True)
+        monkeypatch.setenv(env, str(tmp_path / sub))
+    monkeypatch.chdir(os.path.dirname(_APP))
+    return tmp_path
+
+
+def test_reruns_reuse_shared_refdata(app_env):
+    st_testing = pytest.importorskip("streamlit.testing.v1")
+    import refdata
+    at = st_testing.AppTest.from_file(_APP, default_timeout=180)
+    at.secrets["ADMIN_PASS"] = "x"
+    at.run()
+    assert not at.exception
+    ref = refdata.peek()
+    assert ref is not None and ref.drug_db
+    ensured = _calls("ensure_onco_drug_db")
+    at.run()
+    assert not at.exception
+    assert refdata.peek() is ref and refdata.peek().drug_db is ref.drug_db
+    assert _calls("ensure_onco_drug_db") == ensured   # rerun 이 DRUG_DB 를 다시 만들지 않음
+
+
+def test_refresh_invalidates_on_onco_map_reload(tmp_path, monkeypatch):
+    import lazy_modules as L
+    import refdata
+    src = tmp_path / "onco_map.py"
+    src.write_text("X = 1\n", encoding="utf-8")
+    stat, sha = L._fingerprint(str(src))
+    monkeypatch.setattr(L, "_LOADED", {"onco_map": L._Entry(object(), str(src), stat, sha)})
+    prev = sys.modules.get("onco_map")   # refresh 가 임시 onco_map 을 sys.modules 에 올림 → 끝나면 복구
+    gen = refdata._GEN
+    try:
+        assert L.refresh(force=True) == []
+        assert refdata._GEN == gen                   # 그대로면 폐기하지 않음
+        src.write_text("X = 2\n", encoding="utf-8")
+        assert L.refresh(force=True) == ["onco_map"]
+        assert refdata._GEN == gen + 1
+    finally:
+        if prev is not None:
+            sys.modules["onco_map"] = prev
+        else:
+            sys.modules.pop("onco_map", None)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""emergency_level_batch ↔ app.emergency_level 행 단위 일치 — 섞인/지저분한 입력 포함."""
+from __future__ import annotations
+import ast, math, os, re
+
+import pytest
+
+_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# 숫자/문자열/None/NaN/지수·inf 표기/단위·쉼표가 섞인 열
+ROWS = [
+    {"ANC": 450, "PLT": 15000, "CRP": 12.5, "Hb": 6.8, "temp": 38.6, "hr": 140, "melena": True},
+    {"ANC": "1e3", "PLT": "inf", "CRP": "nan", "Hb": "7,5", "temp": "38.2℃", "hr": "131bpm"},
+    {"ANC": "inf", "PLT": "-inf", "CRP": "NaN", "Hb": None, "temp": float("nan"), "hr": None},
+    {"ANC": " 800 ", "PLT": "19,000", "CRP": "10", "Hb": "Hb 6.9 g/dL", "temp": "38", "hr": 0},
+    {"ANC": None, "PLT": "<20000", "CRP": "", "Hb": "abc", "temp": "37.9", "hr": "130", "confusion": 1},
+    {"ANC": 5e2, "PLT": 2e4, "CRP": 9.99, "Hb": 7, "temp": 38.5, "hr": 130.5, "dyspnea": "yes"},
+    {"ANC": "4.2e2", "PLT": "1.5E4", "CRP": "+11", "Hb": ".5", "temp": "-38.5", "hr": float("inf")},
+]
+_SYMPTOMS = ("melena", "confusion", "dyspnea")
+
+
+def _scalar_emergency_level(weights):
+    """app.py 의 _try_float/emergency_level 본문을 그대로 가져와 실행(Streamlit 없이)."""
+    tree = ast.parse(open(_APP, encoding="utf-8").read())
+    fns = [n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name in ("_try_float", "emergency_level")]
+    assert len(fns) == 2
+    ns = {"re": re, "get_weights": lambda: dict(weights)}
+    exec(compile(ast.Module(body=fns, type_ignores=[]), _APP, "exec"), ns)
+    return ns["emergency_level"]
+
+
+@pytest.mark.parametrize("as_frame", [False, True])
+def test_batch_matches_scalar_on_dirty_inputs(as_frame):
+    from ref_tables import EMERGENCY_DEFAULT_WEIGHTS
+    from triage_batch import emergency_level_batch
+    weights = {**EMERGENCY_DEFAULT_WEIGHTS, "w_anc_lt500": 1.5, "w_hr_gt130": 2.0}
+    scalar = _scalar_emergency_level(weights)
+    cols = ("ANC", "PLT", "CRP", "Hb", "temp", "hr") + _SYMPTOMS
+    data = {c: [r.get(c) for r in ROWS] for c in cols}
+    for s in _SYMPTOMS:
+        data[s] = [bool(v) for v in data[s]]
+    if as_frame:
+        pd = pytest.importorskip("pandas")
+        data = pd.DataFrame(data)
+    res = emergency_level_batch(data, weights=weights)
+    for i, r in enumerate(ROWS):
+        labs = {k: r.get(k) for k in ("ANC", "PLT", "CRP", "Hb")}
+        level, reasons, contrib = scalar(labs, r.get("temp"), r.get("hr"), {s: bool(r.get(s)) for s in _SYMPTOMS})
+        assert res.reasons(i) == reasons, (i, r)
+        assert res.level[i] == level, (i, r)
+        assert math.isclose(res.score[i], sum(c["score"] for c in contrib)), (i, r)
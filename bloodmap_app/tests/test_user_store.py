@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""user_store 이관 — meta 테이블은 자체 스키마, 중단/재시도해도 lab_store 에 중복 없음."""
+from __future__ import annotations
+import sys
+
+
+def _write_labs(d, name, rows):
+    p = d / name
+    p.write_text("ts_kst,WBC,PLT\n" + "".join(f"{ts},{w},{plt}\n" for ts, w, plt in rows), encoding="utf-8")
+    return p
+
+
+def test_meta_table_without_feedback_store(tmp_path, monkeypatch):
+    import user_store
+    monkeypatch.setitem(sys.modules, "feedback_store", None)   # import 실패
+    con = user_store.connect(str(tmp_path / "u.sqlite3"))
+    try:
+        assert con.execute("SELECT name FROM sqlite_master WHERE name='meta'").fetchone()
+    finally:
+        con.close()
+
+
+def test_lab_migration_retry_does_not_duplicate(tmp_path):
+    import user_store
+    graph = tmp_path / "graph"
+    graph.mkdir()
+    _write_labs(graph, "mr.kim_1234.labs.csv", [("2024-03-01 09:00", 4.5, 150000), ("2024-03-02 09:00", 4.1, 90000)])
+    db = str(tmp_path / "u.sqlite3")
+    assert user_store.migrate_files(str(graph), "", "", db)["labs"] == 2
+    # lab_store 에 쓴 뒤 meta 기록 전에 실패한 것과 같은 상태 → 다음 실행이 같은 파일을 다시 이관
+    con = user_store.connect(db)
+    try:
+        con.execute("DELETE FROM meta")
+    finally:
+        con.close()
+    user_store._MIGRATED.clear()
+    assert user_store.migrate_files(str(graph), "", "", db)["labs"] == 0
+    rows = user_store.query_labs("mr.kim_1234", path=db)
+    assert [r["ts_kst"] for r in rows] == ["2024-03-01 09:00", "2024-03-02 09:00"]
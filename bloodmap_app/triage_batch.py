@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+triage_batch.py
+응급도 일괄 계산(벡터화) — 병동/기록 전체 재평가용
+- emergency_level_batch : app.emergency_level 과 동일 규칙·가중치(w_*)를 행 단위 루프 없이 계산
+- compute_score_batch   : triage_weights.compute_score 의 다건 버전(신호 0~5 × 가중치 → 0~100)
+입력: pandas DataFrame 또는 {컬럼: 배열} dict. 결과: 레벨/점수/요인별 기여도 행렬
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import pandas as pd  # type: ignore
+except Exception:  # pragma: no cover
+    pd = None
+
+from ref_tables import EMERGENCY_DEFAULT_WEIGHTS, EMERGENCY_PRESETS
+
+LEVEL_EMERGENCY = "🚨 응급"
+LEVEL_CAUTION = "🟧 주의"
+LEVEL_OK = "🟢 안심"
+
+# (요인 라벨, 기본점수, 가중치 키) — app.emergency_level 과 같은 순서/라벨
+LAB_FACTORS: List[Tuple[str, float, str]] = [
+    ("ANC<500", 3, "w_anc_lt500"),
+    ("ANC 500~999", 2, "w_anc_500_999"),
+    ("고열 ≥38.5℃", 2, "w_temp_ge_38_5"),
+    ("발열 38.0~38.4℃", 1, "w_temp_38_0_38_4"),
+    ("혈소판 <20k", 2, "w_plt_lt20k"),
+    ("중증 빈혈(Hb<7)", 1, "w_hb_lt7"),
+    ("CRP ≥10", 1, "w_crp_ge10"),
+    ("빈맥(HR>130)", 1, "w_hr_gt130"),
+]
+# (증상 키, 요인 라벨, 기본점수, 가중치 키)
+SYMPTOM_FACTORS: List[Tuple[str, str, float, str]] = [
+    ("hematuria", "혈뇨", 1, "w_hematuria"),
+    ("melena", "흑색변", 2, "w_melena"),
+    ("hematochezia", "혈변", 2, "w_hematochezia"),
+    ("chest_pain", "흉통", 2, "w_chest_pain"),
+    ("dyspnea", "호흡곤란", 2, "w_dyspnea"),
+    ("confusion", "의식저하/혼돈", 3, "w_confusion"),
+    ("oliguria", "소변량 급감", 2, "w_oliguria"),
+    ("persistent_vomit", "지속 구토", 2, "w_persistent_vomit"),
+    ("petechiae", "점상출혈", 2, "w_petechiae"),
+    ("thunderclap", "번개치는 듯한 두통(Thunderclap)", 3, "w_thunderclap"),
+    ("visual_change", "시야 이상/복시/암점", 2, "w_visual_change"),
+]
+EMERGENCY_FACTORS: List[str] = [f[0] for f in LAB_FACTORS] + [f[1] for f in SYMPTOM_FACTORS]
+
+# 입력 컬럼 별칭
+_COL_ALIASES: Dict[str, Sequence[str]] = {
+    "ANC": ("ANC", "anc"),
+    "PLT": ("PLT", "plt"),
+    "CRP": ("CRP", "crp"),
+    "Hb": ("Hb", "HB", "hb"),
+    "temp": ("temp", "temp_c", "Temp", "T"),
+    "hr": ("hr", "HR", "heart"),
+}
+_NUM_RE = re.compile(r'([-+]?[0-9]*[\\.,]?[0-9]+)')  # app._try_float 과 같은 패턴
+
+
+@dataclass
+class TriageBatchResult:
+    level: np.ndarray                      # (n,) 레벨 문자열
+    score: np.ndarray                      # (n,) 가중 합계
+    contrib: np.ndarray                    # (n, F) 요인별 점수(base×weight, 미해당 0)
+    hit: np.ndarray                        # (n, F) 요인 해당 여부
+    factors: List[str] = field(default_factory=list)
+    index: Any = None
+
+    def reasons(self, i: int) -> List[str]:
+        """i번째 행의 해당 요인(emergency_level 의 reasons 와 동일 순서)."""
+        return [f for f, h in zip(self.factors, self.hit[i]) if h]
+
+    def to_frame(self):
+        if pd is None:
+            raise RuntimeError("pandas not available")
+        df = pd.DataFrame(self.contrib, columns=self.factors, index=self.index)
+        df.insert(0, "score", self.score)
+        df.insert(0, "level", self.level)
+        return df
+
+
+def _n_rows(data) -> int:
+    if pd is not None and isinstance(data, pd.DataFrame):
+        return len(data)
+    for v in (data or {}).values():
+        return int(np.asarray(v).shape[0]) if np.ndim(v) else 1
+    return 0
+
+
+def _get(data, names: Sequence[str]):
+    for nm in names:
+        try:
+            if nm in data:
+                return data[nm]
+        except Exception:
+            continue
+    return None
+
+
+def _to_float(values, n: int) -> np.ndarray:
+    """
+    _try_float 의 벡터 버전: int/float 는 그대로, 그 외는 문자열에서 첫 숫자 추출, 실패는 NaN.
+    문자열은 pd.to_numeric 을 거치지 않음 — "1e3"→1, "inf"/"nan"→NaN 으로 스칼라 경로와 같게.
+    """
+    if values is None:
+        return np.full(n, np.nan)
+    arr = np.asarray(values)
+    if arr.ndim == 0:
+        arr = np.full(n, arr.item(), dtype=object)
+    if arr.dtype.kind in "fiub":
+        return arr.astype(float)
+    if pd is not None:
+        s = pd.Series(arr, dtype="object")
+        out = np.full(n, np.nan)
+        is_num = s.map(lambda v: isinstance(v, (int, float))).to_numpy(dtype=bool)
+        if is_num.any():
+            out[is_num] = s[is_num].astype(float).to_numpy()
+        rest = ~is_num & s.notna().to_numpy()
+        if rest.any():
+            ext = s[rest].astype(str).str.extract(_NUM_RE, expand=False).str.replace(",", ".", regex=False)
+            out[rest] = pd.to_numeric(ext, errors="coerce").to_numpy(dtype=float)
+        return out
+    out = np.full(n, np.nan)
+    for i, v in enumerate(arr):
+        if v is None:
+            continue
+        if isinstance(v, (int, float)):
+            out[i] = float(v)
+            continue
+        m = _NUM_RE.search(str(v))
+        if m:
+            try:
+                out[i] = float(m.group(1).replace(",", "."))
+            except Exception:
+                pass
+    return out
+
+
+def _to_flag(values, n: int) -> np.ndarray:
+    if values is None:
+        return np.zeros(n, dtype=bool)
+    arr = np.asarray(values)
+    if arr.ndim == 0:
+        return np.full(n, bool(arr.item()))
+    if arr.dtype.kind == "b":
+        return arr
+    if arr.dtype.kind in "fiu":
+        return np.nan_to_num(arr.astype(float)) != 0
+    return np.array([bool(v) and not (isinstance(v, float) and np.isnan(v)) for v in arr], dtype=bool)
+
+
+def resolve_weights(weights: Optional[Mapping[str, float]] = None, preset: Optional[str] = None) -> Dict[str, float]:
+    """weights(app.get_weights() 결과 등) > preset 이름(PRESETS) > 기본값."""
+    if weights:
+        return {**EMERGENCY_DEFAULT_WEIGHTS, **dict(weights)}
+    if preset:
+        return dict(EMERGENCY_PRESETS.get(preset, EMERGENCY_DEFAULT_WEIGHTS))
+    return dict(EMERGENCY_DEFAULT_WEIGHTS)
+
+
+def emergency_level_batch(data, weights: Optional[Mapping[str, float]] = None,
+                          preset: Optional[str] = None, symptoms=None) -> TriageBatchResult:
+    """
+    data: DataFrame 또는 dict — ANC/PLT/CRP/Hb/temp/hr (+ 증상 키 bool 컬럼)
+    symptoms: 증상 컬럼을 별도로 줄 때(DataFrame/dict). 없으면 data에서 찾음
+    """
+    n = _n_rows(data)
+    W = resolve_weights(weights, preset)
+    col = {k: _to_float(_get(data, names), n) for k, names in _COL_ALIASES.items()}
+    a, t = col["ANC"], col["temp"]
+    with np.errstate(invalid="ignore"):
+        anc_lt500 = a < 500
+        hits = [
+            anc_lt500,
+            (a < 1000) & ~anc_lt500,
+            t >= 38.5,
+            (t >= 38.0) & ~(t >= 38.5),
+            col["PLT"] < 20000,
+            col["Hb"] < 7.0,
+            col["CRP"] >= 10,
+            col["hr"] > 130,
+        ]
+    sym_src = symptoms if symptoms is not None else data
+    for key, _label, _base, _w in SYMPTOM_FACTORS:
+        hits.append(_to_flag(_get(sym_src, (key,)), n))
+    H = np.column_stack(hits) if hits else np.zeros((n, 0), dtype=bool)
+    factor_w = np.array(
+        [b * W.get(wk, 1.0) for _f, b, wk in LAB_FACTORS] +
+        [b * W.get(wk, 1.0) for _k, _f, b, wk in SYMPTOM_FACTORS], dtype=float)
+    contrib = H * factor_w
+    score = contrib.sum(axis=1)
+    level = np.where(score >= 5, LEVEL_EMERGENCY, np.where(score >= 2, LEVEL_CAUTION, LEVEL_OK)).astype(object)
+    idx = data.index if (pd is not None and isinstance(data, pd.DataFrame)) else None
+    return TriageBatchResult(level=level, score=score, contrib=contrib, hit=H,
+                             factors=list(EMERGENCY_FACTORS), index=idx)
+
+
+def compute_score_batch(signals, weights: Optional[Mapping[str, float]] = None,
+                        preset: str = "기본(Default)") -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    triage_weights.compute_score 다건 버전.
+    signals: (n, len(FACTORS)) 배열 또는 FACTORS 라벨 컬럼을 가진 DataFrame/dict
+    반환: (0~100 점수(소수1자리), 기여도 행렬, max_raw)
+    """
+    from triage_weights import FACTORS, PRESETS
+    W = dict(weights) if weights else dict(PRESETS.get(preset) or next(iter(PRESETS.values())))
+    wv = np.array([float(W[f]) for f in FACTORS], dtype=float)
+    if isinstance(signals, np.ndarray):
+        S = signals.astype(float)
+    else:
+        n = _n_rows(signals)
+        S = np.column_stack([_to_float(_get(signals, (f,)), n) for f in FACTORS])
+        S = np.nan_to_num(S)
+    contrib = S * wv
+    max_raw = float((5.0 * wv).sum())
+    if max_raw <= 0:
+        return np.zeros(S.shape[0]), contrib, max_raw
+    score = np.round(np.clip(contrib.sum(axis=1) / max_raw * 100.0, 0.0, 100.0), 1)
+    return score, contrib, max_raw
@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+"""
+user_store.py
+사용자별 저장소 통합 — SQLite(WAL) 단일 DB 파일
+- profiles    : uid → 설정/프로필 JSON (graph_store.save_config / graph_io fig)
+- labs        : 검사수치는 lab_store(앱 누적 기록과 같은 저장소)에 — 여기서는 행 인터페이스만
+                (graph_store.save_labs_csv / graph_io df). 예전 labs 테이블 행은 migrate_files() 가 1회 이관
+- care_events : (uid, ts_kst) 케어로그 (carelog_ext)
+- schedules   : (uid, date) 미니 스케줄
+- feedback    : feedback_store 와 같은 테이블(같은 DB 파일을 feedback_store 에 넘기면 됨)
+모든 조회는 (uid, ts) 인덱스로, 저장은 행 단위 INSERT(파일 전체 재작성 없음).
+기존 파일(bloodmap_graph/*.json·*.labs.csv, care_log/*.jsonl, feedback.csv/sqlite3)은 migrate_files() 로 1회 이관
+(앱은 migrate_in_background() — import 시점에는 이관하지 않음).
+"""
+from __future__ import annotations
+import csv, glob, io, json, os, sqlite3, threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+DB_NAME = "bloodmap.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    uid TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_ts TEXT DEFAULT ''
+);
+-- labs: 이전 버전이 쓰던 테이블(읽기 전용 — migrate_files 가 lab_store 로 1회 이관)
+CREATE TABLE IF NOT EXISTS labs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT NOT NULL,
+    ts_kst TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_labs_uid_ts ON labs(uid, ts_kst);
+CREATE TABLE IF NOT EXISTS care_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT NOT NULL,
+    ts_kst TEXT NOT NULL,
+    type TEXT DEFAULT '',
+    detail TEXT DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS ix_care_uid_ts ON care_events(uid, ts_kst);
+CREATE TABLE IF NOT EXISTS schedules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT NOT NULL,
+    date TEXT NOT NULL,
+    name TEXT DEFAULT '',
+    who TEXT DEFAULT '',
+    data TEXT DEFAULT '{}'
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_sched_uid_date_name ON schedules(uid, date, name);
+-- meta: 이관 기록(migrated:<종류>:<파일>) — feedback_store 도 같은 테이블을 씀
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_INIT_LOCK = threading.Lock()
+_INITED: set = set()
+_MIGRATED: set = set()
+
+
+def db_path(base_dir: Optional[str] = None) -> str:
+    """통합 DB 경로: base_dir 지정 > pathsafe.resolve_db_path()(env BLOODMAP_USER_DB > 기본 데이터 폴더)."""
+    if base_dir:
+        os.makedirs(base_dir, exist_ok=True)
+        return os.path.join(base_dir, DB_NAME)
+    try:
+        from pathsafe import resolve_db_path  # type: ignore
+        p = resolve_db_path()
+    except Exception:
+        p = os.path.join(os.path.expanduser("~"), ".bloodmap", DB_NAME)
+    os.makedirs(os.path.dirname(p) or ".", exist_ok=True)
+    return p
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    path = path or db_path()
+    con = sqlite3.connect(path, timeout=15.0, isolation_level=None)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA busy_timeout=15000")
+    if path not in _INITED:
+        with _INIT_LOCK:
+            if path not in _INITED:
+                con.executescript(_SCHEMA)
+                try:
+                    import feedback_store  # type: ignore
+                    con.executescript(feedback_store._SCHEMA)
+                except Exception:
+                    pass
+                _INITED.add(path)
+    return con
+
+
+def _now_kst() -> str:
+    from datetime import datetime, timezone, timedelta
+    return datetime.now(timezone(timedelta(hours=9))).strftime("%Y-%m-%d %H:%M:%S")
+
+
+# ---------- profiles ----------
+def save_profile(uid: str, data: Dict[str, Any], path: Optional[str] = None) -> None:
+    con = connect(path)
+    try:
+        con.execute("INSERT INTO profiles(uid, data, updated_ts) VALUES (?,?,?) "
+                    "ON CONFLICT(uid) DO UPDATE SET data=excluded.data, updated_ts=excluded.updated_ts",
+                    (str(uid), json.dumps(data, ensure_ascii=False), _now_kst()))
+    finally:
+        con.close()
+
+
+def load_profile(uid: str, path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    con = connect(path)
+    try:
+        r = con.execute("SELECT data FROM profiles WHERE uid=?", (str(uid),)).fetchone()
+    finally:
+        con.close()
+    if not r:
+        return None
+    try:
+        return json.loads(r[0])
+    except Exception:
+        return None
+
+
+def has_profile(uid: str, path: Optional[str] = None) -> bool:
+    con = connect(path)
+    try:
+        return con.execute("SELECT 1 FROM profiles WHERE uid=?", (str(uid),)).fetchone() is not None
+    finally:
+        con.close()
+
+
+# ---------- labs ----------
+# 검사수치의 저장소는 lab_store 하나(앱 누적 기록 그래프·lab_ingest 와 같은 곳).
+# 여기 함수들은 기존 호출부(graph_store/graph_io/batch_export/csv_importer)를 위한 행(dict) 인터페이스.
+# path 를 지정하면 그 DB 파일 옆 lab_store/ 폴더, 아니면 lab_store 기본 위치(env BLOODMAP_LAB_STORE_DIR …).
+def _lab_root(path: Optional[str]) -> Optional[str]:
+    if not path or os.path.abspath(path) == os.path.abspath(db_path()):
+        return None
+    return os.path.join(os.path.dirname(os.path.abspath(path)), "lab_store")
+
+
+def _lab_points(rows: Iterable[Dict[str, Any]]):
+    """행 → (ts, {항목: 값}) — ts 는 ts_kst/ts/date 중 첫 값. 숫자가 아닌 칸은 lab_store 가 버림."""
+    for r in rows:
+        r = dict(r)
+        ts = r.pop("ts_kst", "") or r.pop("ts", "") or r.pop("date", "") or ""
+        yield ts, {str(k): v for k, v in r.items() if k not in ("ts", "date")}
+
+
+def save_labs(uid: str, rows: Iterable[Dict[str, Any]], replace: bool = True, path: Optional[str] = None) -> int:
+    """검사 행 저장. replace=True 면 해당 uid 의 기존 기록을 지우고 씀(기존 CSV 덮어쓰기 의미 유지)."""
+    return import_labs(uid, rows, replace=replace, path=path)
+
+
+def import_labs(uid: str, rows: Iterable[Dict[str, Any]], batch: int = 1000, replace: bool = False,
+                skip_existing: bool = False, path: Optional[str] = None) -> int:
+    """
+    대량 가져오기: batch 행마다 lab_store.append_many(잠금 1회·WAL 한 번 쓰기) → 메모리는 batch 만큼만.
+    replace=True 면 먼저 기존 기록 삭제. 중간 실패 시 앞 배치는 유지. 끝나고 압축 1회.
+    skip_existing=True 면 이미 저장된 시각(ts)의 행은 건너뜀 — 중단된 이관을 다시 돌려도 중복이 생기지 않음.
+    """
+    import lab_store  # type: ignore
+    root = _lab_root(path)
+    if replace:
+        lab_store.clear(uid, root=root)
+    have = set(lab_store.query_arrays(uid, root=root)[0].tolist()) if skip_existing and not replace else ()
+    n, buf = 0, []
+    for pt in _lab_points(rows):
+        if have and lab_store.to_ms(pt[0]) in have:
+            continue
+        buf.append(pt)
+        if len(buf) >= batch:
+            n += lab_store.append_many(uid, buf, autocompact=False, root=root)
+            buf = []
+    if buf:
+        n += lab_store.append_many(uid, buf, autocompact=False, root=root)
+    if n:
+        lab_store.compact(uid, root=root)
+    return n
+
+
+def append_lab(uid: str, ts_kst: str, values: Dict[str, Any], path: Optional[str] = None) -> None:
+    import lab_store  # type: ignore
+    lab_store.append(uid, ts_kst, values, root=_lab_root(path))
+
+
+def query_labs(uid: str, start: Optional[str] = None, end: Optional[str] = None,
+               path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """[start, end) 구간 검사 행(시간순). 각 행은 {"ts_kst", 항목...}."""
+    import lab_store  # type: ignore
+    return lab_store.query_rows(uid, start or None, end or None, root=_lab_root(path))
+
+
+def labs_csv(uid: str, columns: Optional[Sequence[str]] = None, path: Optional[str] = None) -> str:
+    rows = query_labs(uid, path=path)
+    cols = list(columns) if columns else ["ts_kst"] + sorted({k for r in rows for k in r if k != "ts_kst"})
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=cols, extrasaction="ignore")
+    w.writeheader()
+    for r in rows:
+        w.writerow(r)
+    return buf.getvalue()
+
+
+# ---------- care events ----------
+def add_event(uid: str, ts_kst: str, kind: str, detail: str, path: Optional[str] = None) -> int:
+    con = connect(path)
+    try:
+        cur = con.execute("INSERT INTO care_events(uid, ts_kst, type, detail) VALUES (?,?,?,?)",
+                          (str(uid), str(ts_kst), str(kind or ""), str(detail or "")))
+        return int(cur.lastrowid)
+    finally:
+        con.close()
+
+
+def query_events(uid: str, start: Optional[str] = None, end: Optional[str] = None,
+                 limit: Optional[int] = None, path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """[start, end) 구간의 최신 limit 건(시간순)."""
+    sql, args = "SELECT ts_kst, type, detail, id FROM care_events WHERE uid=?", [str(uid)]
+    if start:
+        sql += " AND ts_kst >= ?"; args.append(str(start))
+    if end:
+        sql += " AND ts_kst < ?"; args.append(str(end))
+    sql += " ORDER BY ts_kst DESC, id DESC"
+    if limit:
+        sql += " LIMIT ?"; args.append(int(limit))
+    con = connect(path)
+    try:
+        rows = con.execute(sql, args).fetchall()
+    finally:
+        con.close()
+    return [{"ts_kst": ts, "type": t, "detail": d} for ts, t, d, _id in reversed(rows)]
+
+
+def delete_last_event(uid: str, path: Optional[str] = None) -> bool:
+    con = connect(path)
+    try:
+        cur = con.execute("DELETE FROM care_events WHERE id = (SELECT id FROM care_events WHERE uid=? "
+                          "ORDER BY ts_kst DESC, id DESC LIMIT 1)", (str(uid),))
+        return cur.rowcount > 0
+    finally:
+        con.close()
+
+
+# ---------- schedules ----------
+def save_schedule(uid: str, rows: Iterable[Dict[str, Any]], path: Optional[str] = None) -> int:
+    """스케줄 행 upsert — (uid, Date, Name) 중복은 마지막 값 유지(mini_schedule 의 병합 규칙)."""
+    data = []
+    for r in rows:
+        r = dict(r)
+        data.append((str(uid), str(r.get("Date") or r.get("date") or ""), str(r.get("Name") or r.get("name") or ""),
+                     str(r.get("Who") or r.get("who") or ""), json.dumps(r, ensure_ascii=False, default=str)))
+    con = connect(path)
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.executemany("INSERT INTO schedules(uid, date, name, who, data) VALUES (?,?,?,?,?) "
+                            "ON CONFLICT(uid, date, name) DO UPDATE SET who=excluded.who, data=excluded.data", data)
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        return len(data)
+    finally:
+        con.close()
+
+
+def query_schedule(uid: str, start: Optional[str] = None, end: Optional[str] = None,
+                   path: Optional[str] = None) -> List[Dict[str, Any]]:
+    sql, args = "SELECT data FROM schedules WHERE uid=?", [str(uid)]
+    if start:
+        sql += " AND date >= ?"; args.append(str(start))
+    if end:
+        sql += " AND date < ?"; args.append(str(end))
+    con = connect(path)
+    try:
+        return [json.loads(r[0]) for r in con.execute(sql + " ORDER BY date, name", args)]
+    finally:
+        con.close()
+
+
+# ---------- listing ----------
+_UID_TABLES = {"profiles": "profiles", "care": "care_events", "schedules": "schedules"}
+
+
+def list_uids(kind: str = "labs", path: Optional[str] = None) -> List[str]:
+    """디렉터리 glob 대신 인덱스 조회로 uid 목록(labs 는 lab_store 폴더 목록)."""
+    if kind == "labs":
+        import lab_store  # type: ignore
+        return lab_store.list_uids(root=_lab_root(path))
+    table = _UID_TABLES.get(kind, "profiles")
+    con = connect(path)
+    try:
+        return [r[0] for r in con.execute(f"SELECT DISTINCT uid FROM {table} ORDER BY uid")]
+    finally:
+        con.close()
+
+
+# ---------- one-shot migration ----------
+def _done(con, key: str) -> bool:
+    return con.execute("SELECT 1 FROM meta WHERE key=?", (key,)).fetchone() is not None
+
+
+def _mark(con, key: str, n: int) -> None:
+    con.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, str(n)))
+
+
+def _file_key(kind: str, fp: str) -> str:
+    return f"migrated:{kind}:{os.path.abspath(fp)}"
+
+
+def _read_csv_rows(fp: str) -> List[Dict[str, Any]]:
+    # graph_store 는 utf-8, graph_io 는 utf-8-sig 로 써 왔음 — utf-8-sig 로 읽으면 둘 다 처리
+    with open(fp, "r", encoding="utf-8-sig", newline="") as f:
+        return [dict(r) for r in csv.DictReader(f)]
+
+
+# 파일 이름 → uid: 알려진 접미사만 뗌(uid 안의 '.' 보존 — "mr.kim_1234.json" → "mr.kim_1234")
+_FILE_SUFFIXES = {"profile": ".json", "labs": ".labs.csv", "care": ".jsonl"}
+
+
+def _uid_from_file(kind: str, fp: str) -> str:
+    name = os.path.basename(fp)
+    suffix = _FILE_SUFFIXES[kind]
+    return name[:-len(suffix)] if name.endswith(suffix) else name
+
+
+def migrate_files(graph_dir: Optional[str] = None, care_dir: Optional[str] = None,
+                  feedback_dir: Optional[str] = None, path: Optional[str] = None) -> Dict[str, int]:
+    """
+    기존 파일 → DB 1회 이관(파일별 meta 기록, 재실행 시 건너뜀). 원본 파일은 지우지 않음.
+    *.labs.csv 와 예전 labs 테이블은 lab_store 로(meta 기록은 이 DB).
+    기본 경로: pathsafe.resolve_data_dirs() 의 bloodmap_graph / care_log / metrics.
+    반환: {"profiles": n, "labs": n, "care": n, "feedback": n}
+    """
+    path = path or db_path()
+    memo = (path, graph_dir, care_dir, feedback_dir)
+    if memo in _MIGRATED:
+        return {}
+    _MIGRATED.add(memo)
+    if graph_dir is None or care_dir is None or feedback_dir is None:
+        try:
+            from pathsafe import resolve_data_dirs  # type: ignore
+            g, c, _p, m = resolve_data_dirs()
+        except Exception:
+            g = c = m = ""
+        graph_dir = g if graph_dir is None else graph_dir
+        care_dir = c if care_dir is None else care_dir
+        feedback_dir = m if feedback_dir is None else feedback_dir
+    stats = {"profiles": 0, "labs": 0, "care": 0, "feedback": 0}
+    con = connect(path)
+    try:
+        jobs = []
+        if graph_dir:
+            jobs += [("profile", fp) for fp in sorted(glob.glob(os.path.join(graph_dir, "*.json")))]
+            jobs += [("labs", fp) for fp in sorted(glob.glob(os.path.join(graph_dir, "*.labs.csv")))]
+        if care_dir:
+            jobs += [("care", fp) for fp in sorted(glob.glob(os.path.join(care_dir, "*.jsonl")))]
+        for kind, fp in jobs:
+            key = _file_key(kind, fp)
+            if _done(con, key):
+                continue
+            uid = _uid_from_file(kind, fp)
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                if _done(con, key):
+                    con.execute("ROLLBACK")
+                    continue
+                n = 0
+                if kind == "profile":
+                    with open(fp, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    con.execute("INSERT OR IGNORE INTO profiles(uid, data, updated_ts) VALUES (?,?,?)",
+                                (uid, json.dumps(data, ensure_ascii=False), _now_kst()))
+                    n = 1
+                    stats["profiles"] += 1
+                elif kind == "labs":
+                    # lab_store 쓰기는 아래 ROLLBACK 으로 되돌려지지 않음 → 이미 있는 ts 는 건너뛰어 재시도해도 중복 없음
+                    n = import_labs(uid, _read_csv_rows(fp), skip_existing=True, path=path)
+                    stats["labs"] += n
+                else:
+                    with open(fp, "r", encoding="utf-8") as f:
+                        for line in f:
+                            try:
+                                ev = json.loads(line)
+                            except Exception:
+                                continue
+                            con.execute("INSERT INTO care_events(uid, ts_kst, type, detail) VALUES (?,?,?,?)",
+                                        (uid, str(ev.get("ts_kst", "")), str(ev.get("type", "")),
+                                         str(ev.get("detail", ""))))
+                            n += 1
+                    stats["care"] += n
+                _mark(con, key, n)
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+        stats["labs"] += _migrate_lab_table(con, path)
+        if feedback_dir:
+            stats["feedback"] += _migrate_feedback(con, feedback_dir, path)
+    finally:
+        con.close()
+    return stats
+
+
+def migrate_in_background(graph_dir: Optional[str] = None, care_dir: Optional[str] = None,
+                          feedback_dir: Optional[str] = None, path: Optional[str] = None) -> Optional[threading.Thread]:
+    """migrate_files 를 데몬 스레드로(프로세스당 1회) — 앱 첫 rerun 이 파일 탐색/DB 쓰기를 기다리지 않도록.
+    이미 같은 인자로 돌았으면 None. 이관 전 기록은 graph_store/carelog_ext 가 파일에서 읽음."""
+    memo = (path or db_path(), graph_dir, care_dir, feedback_dir)
+    if memo in _MIGRATED:
+        return None
+    t = threading.Thread(target=lambda: _quiet_migrate(graph_dir, care_dir, feedback_dir, path),
+                         name="user_store-migrate", daemon=True)
+    t.start()
+    return t
+
+
+def _quiet_migrate(*args) -> None:
+    try:
+        migrate_files(*args)
+    except Exception:
+        pass
+
+
+def _migrate_lab_table(con, path: str) -> int:
+    """이전 버전이 labs 테이블에 쓴 행 → lab_store (1회, 테이블은 그대로 둠)."""
+    key = "migrated:labs_table"
+    if _done(con, key) or con.execute("SELECT 1 FROM labs LIMIT 1").fetchone() is None:
+        return 0
+    n = 0
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        if _done(con, key):
+            con.execute("ROLLBACK")
+            return 0
+        for (uid,) in con.execute("SELECT DISTINCT uid FROM labs").fetchall():
+            rows = []
+            for ts, data in con.execute("SELECT ts_kst, data FROM labs WHERE uid=? ORDER BY id", (uid,)):
+                try:
+                    rows.append({"ts_kst": ts, **json.loads(data)})
+                except Exception:
+                    continue
+            n += import_labs(uid, rows, skip_existing=True, path=path)
+        _mark(con, key, n)
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+    return n
+
+
+def _migrate_feedback(con, feedback_dir: str, path: str) -> int:
+    n = 0
+    legacy_db = os.path.join(feedback_dir, "feedback.sqlite3")
+    key = _file_key("feedback_db", legacy_db)
+    if os.path.exists(legacy_db) and os.path.abspath(legacy_db) != os.path.abspath(path) and not _done(con, key):
+        try:
+            con.execute("ATTACH DATABASE ? AS legacy", (legacy_db,))
+            try:
+                con.execute("BEGIN IMMEDIATE")
+                cur = con.execute("INSERT INTO feedback (ts_kst,name_or_nick,contact,category,rating,message,page) "
+                                  "SELECT ts_kst,name_or_nick,contact,category,rating,message,page FROM legacy.feedback "
+                                  "ORDER BY id")
+                n += max(cur.rowcount, 0)
+                # 이전 DB 가 이미 이관해 둔 CSV 는 다시 넣지 않도록 meta 도 옮김
+                con.execute("INSERT OR IGNORE INTO meta(key, value) SELECT key, value FROM legacy.meta")
+                _mark(con, key, n)
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+            finally:
+                con.execute("DETACH DATABASE legacy")
+        except Exception:
+            pass
+    try:
+        import feedback_store  # type: ignore
+        n += feedback_store.migrate_csv(os.path.join(feedback_dir, "feedback.csv"), path)
+    except Exception:
+        pass
+    return n
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="기존 사용자 파일 → 통합 SQLite DB 1회 이관")
+    ap.add_argument("--db", default=None)
+    ap.add_argument("--graph-dir", default=None)
+    ap.add_argument("--care-dir", default=None)
+    ap.add_argument("--feedback-dir", default=None)
+    a = ap.parse_args()
+    print(json.dumps(migrate_files(a.graph_dir, a.care_dir, a.feedback_dir, a.db), ensure_ascii=False))
@@ -2,10 +2,27 @@
 from __future__ import annotations
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-import json
+from bisect import bisect_left
+import json, os, struct
+
+try:
+    import fcntl  # type: ignore
+except Exception:
+    fcntl = None
+
+try:
+    import user_store as _db  # 통합 SQLite 저장소(있으면 우선, 없으면 아래 JSONL+인덱스)
+except Exception:
+    _db = None
 
 ROOT = Path("/mnt/data/care_log")
 ROOT.mkdir(parents=True, exist_ok=True)
+# 기존 JSONL 이관은 import 때 하지 않음(앱 기동 시 user_store.migrate_in_background / CLI) — DB 에 기록이 없으면 파일에서 읽음
+
+# 사이드카 인덱스: {uid}.jsonl.idx — 레코드당 (ts 분단위, 시작 offset, 끝 offset) 24바이트
+_REC = struct.Struct("=qqq")  # 네이티브 int64 — memoryview.cast("q") 로 바로 읽음
+_CHUNK = 64 * 1024
+_EPOCH = datetime(1970, 1, 1)
 
 def kst_now_str():
     KST = timezone(timedelta(hours=9))
@@ -17,36 +34,207 @@ def _uid(nick: str, pin: str) -> str:
 def _path(nick: str, pin: str) -> Path:
     return ROOT / f"{_uid(nick,pin)}.jsonl"
 
+def _idx_path(p: Path) -> Path:
+    return p.with_name(p.name + ".idx")
+
+def _ts_min(ts_kst: str) -> int:
+    try:
+        return int((datetime.fromisoformat((ts_kst or "").strip()) - _EPOCH).total_seconds() // 60)
+    except Exception:
+        return 0
+
+class _Lock:
+    def __init__(self, p: Path):
+        self.p, self.fh = p, None
+    def __enter__(self):
+        if fcntl is not None:
+            try:
+                self.fh = open(self.p.with_name(self.p.name + ".lock"), "a")
+                fcntl.flock(self.fh.fileno(), fcntl.LOCK_EX)
+            except Exception:
+                self.fh = None
+        return self
+    def __exit__(self, *exc):
+        if self.fh is not None:
+            try:
+                fcntl.flock(self.fh.fileno(), fcntl.LOCK_UN)
+                self.fh.close()
+            except Exception:
+                pass
+
+def _index_ok(p: Path) -> bool:
+    """인덱스 마지막 레코드의 끝 offset == 로그 크기인지(마지막 24바이트만 읽음)."""
+    ip = _idx_path(p)
+    try:
+        isz = ip.stat().st_size
+        if isz % _REC.size:
+            return False
+        if isz == 0:
+            return p.stat().st_size == 0
+        with ip.open("rb") as f:
+            f.seek(isz - _REC.size)
+            return _REC.unpack(f.read(_REC.size))[2] == p.stat().st_size
+    except Exception:
+        return False
+
+def rebuild_index(p: Path):
+    """로그 1회 스캔으로 인덱스 재구축(인덱스 없음/외부 수정/중단된 쓰기)."""
+    recs = []
+    if p.exists():
+        off = 0
+        with p.open("rb") as f:
+            for line in f:
+                end = off + len(line)
+                if line.strip():
+                    try:
+                        ts = _ts_min(json.loads(line).get("ts_kst", ""))
+                    except Exception:
+                        ts = 0
+                    recs.append((ts, off, end))
+                off = end
+        if recs and recs[-1][2] != off:
+            recs[-1] = (recs[-1][0], recs[-1][1], off)
+    tmp = _idx_path(p).with_suffix(".idx.tmp")
+    tmp.write_bytes(b"".join(_REC.pack(*r) for r in recs))
+    os.replace(tmp, _idx_path(p))
+    return recs
+
+def _tail_lines(p: Path):
+    """파일 끝에서부터 한 줄씩(역순) — 인덱스 없이 최근 N건만 필요할 때."""
+    with p.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos, buf = f.tell(), b""
+        while pos > 0:
+            step = min(_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            parts = buf.split(b"\n")
+            buf = parts[0]
+            for line in reversed(parts[1:]):
+                if line.strip():
+                    yield line
+        if buf.strip():
+            yield buf
+
 def add(nick: str, pin: str, kind: str, detail: str):
     data = {"ts_kst": kst_now_str(), "type": kind, "detail": detail}
+    if _db is not None:
+        try:
+            _db.add_event(_uid(nick, pin), data["ts_kst"], kind, detail)
+            return data
+        except Exception:
+            pass
     p = _path(nick, pin)
-    with p.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(data, ensure_ascii=False)+"\n")
+    line = (json.dumps(data, ensure_ascii=False)+"\n").encode("utf-8")
+    with _Lock(p):
+        if p.exists() and not _index_ok(p):
+            rebuild_index(p)  # 어긋나 있으면 여기서 맞춰 둠
+        with p.open("ab") as f:
+            start = f.tell()
+            f.write(line)
+        with _idx_path(p).open("ab") as f:
+            f.write(_REC.pack(_ts_min(data["ts_kst"]), start, start + len(line)))
     return data
 
-def read(nick: str, pin: str, hours: int = 24):
-    from datetime import datetime as dt
-    items = []
+def read(nick: str, pin: str, hours: int = 24, limit: int = 500):
+    """최근 hours 시간(없으면 전체) 중 최신 limit 건, 시간순. 인덱스로 구간만 seek+read."""
+    cutoff = _ts_min(kst_now_str()) - int(hours) * 60 if hours else None
+    if _db is not None:
+        try:
+            start = (_EPOCH + timedelta(minutes=cutoff)).strftime("%Y-%m-%d %H:%M") if cutoff is not None else None
+            rows = _db.query_events(_uid(nick, pin), start=start, limit=limit)
+            if rows or not _path(nick, pin).exists():
+                return rows
+        except Exception:
+            pass
     p = _path(nick, pin)
     if not p.exists(): return []
-    cutoff = dt.fromisoformat(kst_now_str())
-    with p.open("r", encoding="utf-8") as f:
-        for line in f:
+    try:
+        if not _index_ok(p):
+            rebuild_index(p)
+        q = memoryview(_idx_path(p).read_bytes()).cast("q")
+    except Exception:
+        q = None
+    if q is None:
+        items = []
+        for line in _tail_lines(p):
             try:
-                obj = json.loads(line.strip())
-                items.append(obj)
+                obj = json.loads(line)
             except Exception:
                 continue
-    # keep latest 24h-ish by simple count (UI will show latest anyway)
-    return items[-500:]
+            if cutoff is not None and _ts_min(obj.get("ts_kst", "")) < cutoff:
+                break
+            items.append(obj)
+            if len(items) >= limit: break
+        return items[::-1]
+    n = len(q) // 3
+    lo = bisect_left(q[0::3], cutoff) if cutoff is not None else 0
+    lo = max(lo, n - int(limit))
+    if lo >= n: return []
+    items = []
+    with p.open("rb") as f:
+        f.seek(q[3 * lo + 1])
+        chunk = f.read(q[-1] - q[3 * lo + 1])
+    for line in chunk.split(b"\n"):
+        if not line.strip(): continue
+        try:
+            items.append(json.loads(line))
+        except Exception:
+            continue
+    return items
+
+def read_range(nick: str, pin: str, start: str = "", end: str = ""):
+    """ts_kst 구간 [start, end) 조회("YYYY-MM-DD HH:MM" 또는 날짜) — 인덱스 이분탐색 후 해당 바이트만 읽음."""
+    if _db is not None:
+        try:
+            rows = _db.query_events(_uid(nick, pin), start=start or None, end=end or None)
+            if rows or not _path(nick, pin).exists():
+                return rows
+        except Exception:
+            pass
+    p = _path(nick, pin)
+    if not p.exists(): return []
+    with _Lock(p):
+        if not _index_ok(p):
+            rebuild_index(p)
+    q = memoryview(_idx_path(p).read_bytes()).cast("q")
+    ts = q[0::3]
+    lo = bisect_left(ts, _ts_min(start)) if start else 0
+    hi = bisect_left(ts, _ts_min(end)) if end else len(ts)
+    if lo >= hi: return []
+    with p.open("rb") as f:
+        f.seek(q[3 * lo + 1])
+        chunk = f.read(q[3 * (hi - 1) + 2] - q[3 * lo + 1])
+    out = []
+    for line in chunk.split(b"\n"):
+        if not line.strip(): continue
+        try:
+            out.append(json.loads(line))
+        except Exception:
+            continue
+    return out
 
 def delete_last(nick: str, pin: str):
+    """마지막 1건 삭제 — 인덱스의 시작 offset 으로 truncate(O(1))."""
+    if _db is not None:
+        try:
+            return _db.delete_last_event(_uid(nick, pin))
+        except Exception:
+            pass
     p = _path(nick, pin)
     if not p.exists(): return False
-    lines = p.read_text(encoding="utf-8").splitlines()
-    if not lines: return False
-    lines.pop()
-    p.write_text("\n".join(lines)+("\n" if lines else ""), encoding="utf-8")
+    with _Lock(p):
+        if not _index_ok(p):
+            rebuild_index(p)
+        ip = _idx_path(p)
+        isz = ip.stat().st_size
+        if isz < _REC.size: return False
+        with ip.open("rb") as f:
+            f.seek(isz - _REC.size)
+            start = _REC.unpack(f.read(_REC.size))[1]
+        os.truncate(p, start)
+        os.truncate(ip, isz - _REC.size)
     return True
 
 def export_txt(nick: str, pin: str) -> str:
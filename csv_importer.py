@@ -1,13 +1,197 @@
 # -*- coding: utf-8 -*-
+"""
+csv_importer.py
+검사결과 CSV 가져오기 — 한 줄씩 읽고(전체를 메모리에 올리지 않음) 행마다 검증
+- iter_validated : 검증된 행 생성기. 행 오류(숫자 아님/허용 범위 밖/날짜 없음)는 result.errors 에 쌓고 계속 진행
+    허용 범위 = validators.BOUNDS(입력 가능 범위, 벗어나면 값 제외), 참고치 = ref_tables.LAB_REF_*(벗어나면 H/L 표시만)
+    단위 없는 값은 적힌 그대로 검증·저장(크기로 단위 추측 안 함), 단위가 적힌 값만 환산 → result.converted
+- import_to_store : 검증된 행을 lab_store(앱 누적 기록 그래프와 같은 저장소)에 batch 행마다 저장
+- lab_ingest/validators/ref_tables/user_store/lab_store 는 bloodmap_app/ 에 있음 — import 시점이 아니라 쓸 때
+  lazy_modules.load 로 해석(sys.path 변경 없음). 단독 사본(install_full.py)은 같은 폴더/ sys.path 에서 찾고,
+  없으면 어떤 모듈이 필요한지 알려 주는 ImportError
+- sniff_and_parse : 기존 호출부용(COLUMNS 행 목록)
+"""
 from __future__ import annotations
-import csv, io
+import importlib, importlib.util, os, sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_APP_DIR = os.path.join(_HERE, "bloodmap_app")
 
 COLUMNS = ["ts_kst","WBC","Hb","PLT","CRP","ANC","Na","K","Cr"]
+BATCH_ROWS = 1000
+MAX_ERRORS = 500
+_BOUNDS_NAME = {"Glu": "Glucose"}   # lab_ingest 약어 → validators.BOUNDS 키
+# 저장 단위 → BOUNDS/참고치 단위. PLT 는 앱(응급도·식이 가이드)과 lab_ingest 가 /µL, BOUNDS·LAB_REF 는 ×10³/µL
+_CHECK_SCALE = {"PLT": 0.001}
+_FUTURE_SLACK = timedelta(days=1)
+# 모듈 속성으로도 보이는 값(csv_importer.BOUNDS 등) → (모듈, 속성) — 처음 접근할 때 로드
+_LAZY_ATTRS = {"BOUNDS": ("validators", "BOUNDS"), "LAB_REF_ADULT": ("ref_tables", "LAB_REF_ADULT"),
+               "LAB_REF_PEDS": ("ref_tables", "LAB_REF_PEDS"), "_ingest": ("lab_ingest", None)}
+
+
+def _lazy_modules():
+    """bloodmap_app/lazy_modules.py(이미 로드됐으면 그것). 단독 사본이라 없으면 None."""
+    lm = sys.modules.get("lazy_modules")
+    if lm is not None:
+        return lm
+    for d in (_APP_DIR, _HERE):
+        fp = os.path.join(d, "lazy_modules.py")
+        if os.path.isfile(fp):
+            spec = importlib.util.spec_from_file_location("lazy_modules", fp)
+            lm = importlib.util.module_from_spec(spec)
+            sys.modules["lazy_modules"] = lm
+            try:
+                spec.loader.exec_module(lm)
+            except Exception:
+                sys.modules.pop("lazy_modules", None)
+                continue
+            return lm
+    return None
+
+
+def _module(name: str):
+    """bloodmap_app 모듈 해석: lazy_modules.load(앱 폴더 → 이 파일 옆 → sys.path), 없으면 일반 import."""
+    lm = _lazy_modules()
+    if lm is not None:
+        mod = lm.load(name, [f"{name}.py", os.path.join(_HERE, f"{name}.py")])[0]
+    else:
+        try:
+            mod = importlib.import_module(name)
+        except ImportError:
+            mod = None
+    if mod is None:
+        raise ImportError(f"csv_importer: '{name}' 모듈을 찾을 수 없습니다 — bloodmap_app/{name}.py "
+                          f"(또는 csv_importer.py 와 같은 폴더의 {name}.py)가 필요합니다.")
+    return mod
+
+
+def __getattr__(attr: str):
+    if attr in _LAZY_ATTRS:
+        name, sub = _LAZY_ATTRS[attr]
+        mod = _module(name)
+        return mod if sub is None else getattr(mod, sub)
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
+
+
+@dataclass
+class RowError:
+    line: int
+    column: str
+    value: str
+    message: str
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0            # 검증 통과(값이 하나 이상 남은) 행
+    written: int = 0
+    skipped: int = 0         # 값이 하나도 안 남았거나 날짜가 없는 행
+    error_count: int = 0
+    errors: List[RowError] = field(default_factory=list)   # 앞에서부터 MAX_ERRORS 개
+    flagged: Dict[str, int] = field(default_factory=dict)  # 참고치 밖 건수(항목별)
+    unknown_columns: List[str] = field(default_factory=list)
+    converted: Dict[str, int] = field(default_factory=dict)   # 단위 환산 건수 "Hb g/l" → n (lab_ingest.IngestReport 와 같음)
+    conversions: List[Tuple[str, float, str, float]] = field(default_factory=list)   # (항목, 원값, 단위, 환산값) 예시
+    encoding: str = ""
+    delimiter: str = ""
+
+    def error(self, line: int, column: str, value: Any, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(RowError(line, column, str(value)[:40], message))
+
+
+def validate_values(values: Dict[str, float], is_peds: bool = False
+                    ) -> Tuple[Dict[str, float], List[Tuple[str, float, str]], Dict[str, str]]:
+    """(통과 값, [(항목, 값, 사유)], {항목: "H"/"L"}) — BOUNDS 밖은 제외, 참고치 밖은 표시만. 값은 저장 단위."""
+    tables = _module("ref_tables")
+    ref = tables.LAB_REF_PEDS if is_peds else tables.LAB_REF_ADULT
+    bounds = _module("validators").BOUNDS
+    clean, errs, flags = {}, [], {}
+    for k, v in values.items():
+        scale = _CHECK_SCALE.get(k, 1.0)
+        x = v * scale
+        b = bounds.get(_BOUNDS_NAME.get(k, k))
+        if b and not (b["min"] <= x <= b["max"]):
+            errs.append((k, v, f"허용 범위 밖({b['min'] / scale:.10g}~{b['max'] / scale:.10g})"))
+            continue
+        clean[k] = v
+        rng = ref.get(k)
+        if rng:
+            if x < rng[0]:
+                flags[k] = "L"
+            elif x > rng[1]:
+                flags[k] = "H"
+    return clean, errs, flags
+
+
+def iter_validated(file, encoding: Optional[str] = None, is_peds: bool = False,
+                   result: Optional[ImportResult] = None, now: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+    """
+    업로드(bytes/경로/파일 객체) → 검증된 행 {"ts_kst", 항목…, "_flags": {항목: H/L}}.
+    모르는 열은 버리지 않고 result.unknown_columns 로 알림.
+    """
+    ingest = _module("lab_ingest")   # 인코딩/구분자/단위 감지 + 날짜가 열인 표 지원
+    res = result if result is not None else ImportResult()
+    rep = ingest.IngestReport()
+    limit = (now or datetime.now()) + _FUTURE_SLACK
+    seen_bad = 0
+    for pt in ingest.iter_points(file, encoding=encoding, report=rep):
+        # 숫자가 아닌 셀은 lab_ingest 가 모아 둠 — 나온 만큼 옮김
+        for line, col, cell in rep.bad_cells[seen_bad:]:
+            res.error(line, col, cell, "숫자가 아님")
+        seen_bad = len(rep.bad_cells)
+        if pt.ts is None:
+            res.error(pt.line, "ts_kst", "", "날짜 없음")
+            res.skipped += 1
+            continue
+        if pt.ts > limit:
+            res.error(pt.line, "ts_kst", pt.ts, "미래 날짜")
+            res.skipped += 1
+            continue
+        clean, errs, flags = validate_values(pt.values, is_peds)
+        for col, v, msg in errs:
+            res.error(pt.line, col, v, msg)
+        if not clean:
+            res.skipped += 1
+            continue
+        for col in flags:
+            res.flagged[col] = res.flagged.get(col, 0) + 1
+        res.rows += 1
+        yield {"ts_kst": pt.ts.strftime("%Y-%m-%d %H:%M"), **clean, "_flags": flags}
+    for line, col, cell in rep.bad_cells[seen_bad:]:
+        res.error(line, col, cell, "숫자가 아님")
+    res.error_count += rep.bad_cell_count - len(rep.bad_cells)   # 보관 한도를 넘은 셀 오류
+    res.unknown_columns = list(rep.unknown_headers)
+    res.converted = dict(rep.converted)
+    res.conversions = list(rep.conversions)
+    res.encoding, res.delimiter = rep.encoding, rep.delimiter
+
+
+def import_to_store(uid: str, file, encoding: Optional[str] = None, is_peds: bool = False,
+                    batch: int = BATCH_ROWS, replace: bool = False, path: Optional[str] = None) -> ImportResult:
+    """검증된 행을 lab_store 에 batch 행마다 저장(user_store.import_labs 경유 — path 지정 시 그 DB 옆). H/L 표시는 저장하지 않음."""
+    _module("lab_store")   # user_store 가 안에서 import 하는 모듈 — 미리 해석해 sys.modules 에
+    user_store = _module("user_store")
+    res = ImportResult()
+    rows = ({k: v for k, v in r.items() if k != "_flags"}
+            for r in iter_validated(file, encoding, is_peds, res))
+    res.written = user_store.import_labs(uid, rows, batch=batch, replace=replace, path=path)
+    return res
+
+
+def iter_rows(file_bytes, encoding: Optional[str] = None) -> Iterator[Dict[str, str]]:
+    """업로드(bytes/파일 객체)를 한 줄씩 읽어 COLUMNS 행으로(검증 없음)."""
+    for pt in _module("lab_ingest").iter_points(file_bytes, encoding=encoding):
+        row = {k: "" for k in COLUMNS}
+        row["ts_kst"] = pt.ts.strftime("%Y-%m-%d %H:%M") if pt.ts else ""
+        for k, v in pt.values.items():
+            if k in row:
+                row[k] = v
+        yield row
 
-def sniff_and_parse(file_bytes: bytes, encoding: str = "utf-8"):
-    text = file_bytes.decode(encoding, errors="ignore")
-    reader = csv.DictReader(io.StringIO(text))
-    rows = []
-    for row in reader:
-        rows.append({k: row.get(k,"") for k in COLUMNS})
-    return rows
+def sniff_and_parse(file_bytes: bytes, encoding: Optional[str] = None):
+    return list(iter_rows(file_bytes, encoding))
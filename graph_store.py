@@ -4,8 +4,16 @@ from pathlib import Path
 import json, csv, os
 from datetime import datetime, timezone, timedelta
 
+try:
+    import user_store as _db  # 통합 SQLite 저장소(있으면 우선)
+except Exception:
+    _db = None
+
 ROOT = Path("/mnt/data/bloodmap_graph")
 ROOT.mkdir(parents=True, exist_ok=True)
+# 기존 파일 이관은 import 때 하지 않음(앱 기동 시 user_store.migrate_in_background / CLI) — 이관 전에는 아래 읽기가 파일로 폴백
+
+LAB_COLUMNS = ["ts_kst","WBC","Hb","PLT","CRP","ANC","Na","K","Cr"]
 
 def _uid(nick: str, pin: str) -> str:
     return f"{(nick or '').strip()}_{(pin or '').strip()}"
@@ -13,28 +21,71 @@ def _uid(nick: str, pin: str) -> str:
 def save_config(nick: str, pin: str, config: dict) -> Path:
     uid = _uid(nick, pin)
     p = ROOT / f"{uid}.json"
+    if _db is not None:
+        try:
+            _db.save_profile(uid, config)
+            return p
+        except Exception:
+            pass
     p.write_text(json.dumps(config, ensure_ascii=False, indent=2), encoding="utf-8")
     return p
 
 def save_labs_csv(nick: str, pin: str, rows):
     uid = _uid(nick, pin)
     p = ROOT / f"{uid}.labs.csv"
+    rows = list(rows)
+    if _db is not None:
+        try:
+            _db.save_labs(uid, [{c: r.get(c, "") for c in LAB_COLUMNS} for r in rows])
+            return p
+        except Exception:
+            pass
     with p.open("w", encoding="utf-8", newline="") as f:
         w = csv.writer(f)
-        w.writerow(["ts_kst","WBC","Hb","PLT","CRP","ANC","Na","K","Cr"])
+        w.writerow(LAB_COLUMNS)
         for r in rows:
-            w.writerow([r.get("ts_kst",""), r.get("WBC",""), r.get("Hb",""), r.get("PLT",""),
-                        r.get("CRP",""), r.get("ANC",""), r.get("Na",""), r.get("K",""), r.get("Cr","")])
+            w.writerow([r.get(c, "") for c in LAB_COLUMNS])
     return p
 
+def load_labs(nick: str, pin: str):
+    """저장된 검사 행 목록(시간순)."""
+    uid = _uid(nick, pin)
+    if _db is not None:
+        try:
+            rows = _db.query_labs(uid)
+            if rows:
+                return rows
+        except Exception:
+            pass
+    p = ROOT / f"{uid}.labs.csv"
+    if p.exists():
+        with p.open("r", encoding="utf-8-sig", newline="") as f:
+            return [dict(r) for r in csv.DictReader(f)]
+    return []
+
 def load_config(nick: str, pin: str) -> dict:
-    p = ROOT / f"{_uid(nick,pin)}.json"
+    uid = _uid(nick, pin)
+    if _db is not None:
+        try:
+            cfg = _db.load_profile(uid)
+            if cfg is not None:
+                return cfg
+        except Exception:
+            pass
+    p = ROOT / f"{uid}.json"
     if p.exists():
         return json.loads(p.read_text(encoding="utf-8"))
     return {}
 
 def exists(nick: str, pin: str) -> bool:
-    return (ROOT / f"{_uid(nick,pin)}.json").exists()
+    uid = _uid(nick, pin)
+    if _db is not None:
+        try:
+            if _db.has_profile(uid):
+                return True
+        except Exception:
+            pass
+    return (ROOT / f"{uid}.json").exists()
 
 def list_files(nick: str, pin: str):
     uid = _uid(nick, pin)
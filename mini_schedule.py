@@ -10,6 +10,17 @@ import pandas as pd
 import streamlit as st
 from datetime import date, timedelta
 
+try:
+    import user_store as _db  # 통합 SQLite 저장소 — PIN 인증 사용자는 스케줄 영구 저장
+except Exception:
+    _db = None
+
+def _store_uid():
+    uid = st.session_state.get("key")
+    if _db is None or not st.session_state.get("_pin_ok") or not uid or str(uid).startswith("guest"):
+        return None
+    return str(uid)
+
 def mini_schedule_ui(storage_key: str = "mini_sched") -> None:
     st.markdown("### 🗓️ 미니 스케줄표")
     c1, c2, c3 = st.columns(3)
@@ -22,6 +33,15 @@ def mini_schedule_ui(storage_key: str = "mini_sched") -> None:
     with c4: tag = st.text_input("스케줄 이름(예: 성인-감기, 소아-RSV, 항암캘린더 등)", key=f"{storage_key}_tag")
     with c5: who = st.selectbox("대상", ["공용","소아","성인","질환"], index=0, key=f"{storage_key}_who")
 
+    uid = _store_uid()
+    if uid and storage_key not in st.session_state:
+        try:
+            saved = _db.query_schedule(uid)
+            if saved:
+                st.session_state[storage_key] = pd.DataFrame(saved)
+        except Exception:
+            pass
+
     if st.button("➕ 생성/추가", key=f"{storage_key}_gen"):
         rows = []
         for i in range(int(n)):
@@ -35,6 +55,11 @@ def mini_schedule_ui(storage_key: str = "mini_sched") -> None:
         # 중복 날짜-이름 병합
         df = df.drop_duplicates(subset=["Date","Name"], keep="last").sort_values(["Date","Name"])
         st.session_state[storage_key] = df
+        if uid:
+            try:
+                _db.save_schedule(uid, rows)
+            except Exception:
+                pass
         st.success("스케줄 저장됨.")
 
     df = st.session_state.get(storage_key)
@@ -1,13 +1,22 @@
-
-# === PATCH: Stable key helpers for Special Tests (v2, patch-only) ===
+# === PATCH: Stable key helpers for Special Tests (v3, patch-only) ===
 # Drop this block at the TOP of your existing `special_tests.py` (without deleting anything),
 # or replace your existing helper key functions with these. It keeps keys STABLE across reruns.
 # - No deletion of features or paths
 # - Keys incorporate a stable session UID + fixed section id
 # - Avoids per-render counters which break persistence
+# - v3: no more global st.toggle/st.selectbox/st.text_input monkeypatch.
+#   Use the keyed widget factory instead:
+#       with special_section("urine") as w:
+#           alb = w.selectbox("Albumin (알부민뇨)", ["없음", "+", "++", "+++"])
+#           upcr = w.text_input("UPCR (mg/gCr)")
+#   (or w = widgets("urine") without the context manager)
+# - Intended users: external/legacy special_tests copies that still rely on the v2
+#   `<uid>.special.v2.<sec>.*` keys. bloodmap_app/special_tests.py (the module the app
+#   loads) builds its own `stx_in_<sec>_<name>` keys via _in_key and does not use this.
 
 import streamlit as st
 import re
+import time
 from typing import Optional
 
 def _stable_uid() -> str:
@@ -42,52 +51,112 @@ def _sel_key(sec_id: str, label: str) -> str:
     # For selectbox/radio keys
     return f"{_sec_ns(sec_id)}.sel.{_slug(label)}"
 
-# ---- OPTIONAL: safe wrappers (won't override if already patched) ----
-# If your code calls st.toggle/ st.selectbox without key=, these wrappers inject stable keys.
-try:
-    _orig_toggle = st.toggle
-    def _patched_toggle(label, key=None, **kwargs):
-        if key is None:
-            sec_id = st.session_state.get("_special_current_section", "root")
-            key = _tog_key(sec_id)
-        return _orig_toggle(label, key=key, **kwargs)
-    st.toggle = _patched_toggle  # monkeypatch
-except Exception:
-    pass
-
-try:
-    _orig_selectbox = st.selectbox
-    def _patched_selectbox(label, options, index=0, key=None, **kwargs):
-        if key is None:
-            sec_id = st.session_state.get("_special_current_section", "root")
-            key = _sel_key(sec_id, label)
-        return _orig_selectbox(label, options, index=index, key=key, **kwargs)
-    st.selectbox = _patched_selectbox
-except Exception:
-    pass
-
-try:
-    _orig_text_input = st.text_input
-    def _patched_text_input(label, value="", max_chars=None, key=None, **kwargs):
-        if key is None:
-            sec_id = st.session_state.get("_special_current_section", "root")
-            key = _w_key(sec_id, label)
-        return _orig_text_input(label, value=value, max_chars=max_chars, key=key, **kwargs)
-    st.text_input = _patched_text_input
-except Exception:
-    pass
+# ---- Keyed widget factory (replaces the v2 monkeypatch wrappers) ----
+class SectionWidgets:
+    """
+    Section-bound widget factory. Keys are the same as the v2 wrappers produced
+    (existing session values survive the upgrade), but the namespace and label
+    slugs are computed once per section/label instead of on every widget call,
+    and st.* itself is never replaced.
+    """
+    __slots__ = ("sec_id", "ns", "_keys")
+
+    def __init__(self, sec_id: Optional[str] = None):
+        self.sec_id = sec_id or "root"
+        self.ns = _sec_ns(self.sec_id)
+        self._keys = {}
+
+    def key(self, kind: str, label: str) -> str:
+        k = self._keys.get((kind, label))
+        if k is None:
+            k = f"{self.ns}.{kind}.{_slug(label)}" if kind else f"{self.ns}.{label}"
+            self._keys[(kind, label)] = k
+        return k
+
+    def toggle(self, label, key=None, **kwargs):
+        return st.toggle(label, key=key or f"{self.ns}.tog", **kwargs)
+
+    def selectbox(self, label, options, index=0, key=None, **kwargs):
+        return st.selectbox(label, options, index=index, key=key or self.key("sel", label), **kwargs)
+
+    def radio(self, label, options, index=0, key=None, **kwargs):
+        return st.radio(label, options, index=index, key=key or self.key("sel", label), **kwargs)
 
-# Helper context to mark current section (optional, use if convenient)
+    def text_input(self, label, value="", max_chars=None, key=None, **kwargs):
+        return st.text_input(label, value=value, max_chars=max_chars, key=key or self.key("w", label), **kwargs)
+
+    def number_input(self, label, key=None, **kwargs):
+        return st.number_input(label, key=key or self.key("w", label), **kwargs)
+
+def widgets(sec_id: Optional[str] = None) -> SectionWidgets:
+    # A fresh factory per call (cheap: one namespace lookup). No module-level cache —
+    # a dict keyed by session uid would grow with every visitor and is never evicted.
+    return SectionWidgets(sec_id or "root")
+
+# Helper context to mark current section; yields the section's widget factory
 class special_section:
     def __init__(self, sec_id: str):
         self.sec_id = sec_id
         self._prev = None
-    def __enter__(self):
+    def __enter__(self) -> SectionWidgets:
         self._prev = st.session_state.get("_special_current_section")
         st.session_state["_special_current_section"] = self.sec_id
+        return widgets(self.sec_id)
     def __exit__(self, exc_type, exc, tb):
         if self._prev is None:
             st.session_state.pop("_special_current_section", None)
         else:
             st.session_state["_special_current_section"] = self._prev
+
+# ---- Micro-benchmark: per-widget overhead, v2 wrapper vs factory ----
+def bench_widget_overhead(n: int = 2000, layer_n: int = 200000) -> dict:
+    """
+    µs per text_input call (bare mode, outside `streamlit run`):
+      direct  = st.text_input(label, key=...) with a precomputed key
+      patched = v2 global wrapper (session lookup + _w_key per call)
+      factory = widgets(sec).text_input(label) — a new factory per call, as callers use it
+      factory_reused = one `w = widgets(sec)` reused for every call (with-block usage)
+    The widget itself dominates and is noisy, so the key layer alone is also
+    timed over layer_n calls (layer_patched / layer_factory / layer_factory_reused, µs per call).
+    """
+    orig = st.text_input
+    labels = [f"Field {i} (항목, mg/dL)" for i in range(20)]
+
+    def _patched_text_input(label, value="", max_chars=None, key=None, **kwargs):
+        if key is None:
+            sec_id = st.session_state.get("_special_current_section", "root")
+            key = _w_key(sec_id, label)
+        return orig(label, value=value, max_chars=max_chars, key=key, **kwargs)
+
+    def _patched_key(label):
+        return _w_key(st.session_state.get("_special_current_section", "root"), label)
+
+    keys = [_w_key("bench", lb) for lb in labels]
+    w = widgets("bench")
+
+    def _run(fn, count):
+        t0 = time.perf_counter()
+        for i in range(count):
+            fn(labels[i % 20])
+        return (time.perf_counter() - t0) / count * 1e6
+
+    st.session_state["_special_current_section"] = "bench"
+    try:
+        res = {
+            "direct": _run(lambda lb: orig(lb, key=keys[labels.index(lb)]), n),
+            "patched": _run(lambda lb: _patched_text_input(lb), n),
+            "factory": _run(lambda lb: widgets("bench").text_input(lb), n),
+            "factory_reused": _run(lambda lb: w.text_input(lb), n),
+            "layer_patched": _run(_patched_key, layer_n),
+            "layer_factory": _run(lambda lb: widgets("bench").key("w", lb), layer_n),
+            "layer_factory_reused": _run(lambda lb: w.key("w", lb), layer_n),
+        }
+    finally:
+        st.session_state.pop("_special_current_section", None)
+    return {k: round(v, 3) for k, v in res.items()}
+
+if __name__ == "__main__":
+    import logging
+    logging.getLogger("streamlit").setLevel(logging.ERROR)   # bare-mode ScriptRunContext warnings
+    print(bench_widget_overhead())
 # === /PATCH ===